@@ -0,0 +1,388 @@
+"""Headless batch courseware generation for a directory of Course Proposals.
+
+For each CP file (.docx / .xlsx) the same pipeline as the UI pages runs:
+1. parse      — parse_cp_document (Extract Course Info)
+2. interpret  — interpret_cp agent → course context (+ TSC defaults, CP copied to Courseware)
+3. documents  — LG / AP / ASR / FG rendered concurrently (generate_ap_fg_lg.bulk_generation)
+4. lesson_plan — schedule + Lesson Plan DOCX
+5. assessments — assessment agent + question/answer DOCX per assessment type
+
+- Courses run concurrently, at most --concurrency at a time. All agent sessions
+  share the process-wide agent governor (AGENT_MAX_CONCURRENCY, or --max-agents).
+- Each course has a checkpoint in .output/batch/<run>/<course>/checkpoint.json;
+  re-running with the same --run skips finished stages, so a crashed or
+  interrupted batch resumes where it stopped. A changed CP file is a new course.
+- A summary (per-course stage timings, failures, throughput, agent governor
+  counters) is printed and written to .output/batch/<run>/summary.json.
+
+Usage:
+    uv run python batch_courseware.py CP_DIR [--run NAME] [--concurrency 3]
+        [--company "Org Name"] [--refs refs.json] [--stages parse,interpret,...]
+        [--max-agents 8]
+
+refs.json maps CP file names to TGS reference codes: {"CP_Data_Analytics.docx": "TGS-2024001234"}
+"""
+import argparse
+import asyncio
+import glob
+import hashlib
+import json
+import logging
+import os
+import re
+import sys
+import time
+import traceback
+from datetime import datetime
+
+logger = logging.getLogger("batch_courseware")
+
+BATCH_DIR = os.path.join(".output", "batch")
+CP_EXTENSIONS = (".docx", ".xlsx")
+STAGES = ("parse", "interpret", "documents", "lesson_plan", "assessments")
+STAGE_REQUIRES = {"interpret": "parse", "documents": "interpret", "lesson_plan": "interpret",
+                  "assessments": "interpret"}
+DEFAULT_CONCURRENCY = 3
+
+
+# ---------------------------------------------------------------------------
+# Checkpoints
+# ---------------------------------------------------------------------------
+
+def _course_id(cp_path: str) -> str:
+    """Stable per-course directory name: file stem + content hash."""
+    with open(cp_path, "rb") as f:
+        digest = hashlib.sha1(f.read()).hexdigest()[:10]
+    stem = re.sub(r"[^\w\-]+", "_", os.path.splitext(os.path.basename(cp_path))[0]).strip("_")[:60]
+    return f"{stem}_{digest}"
+
+
+class CourseCheckpoint:
+    """Stage results for one course, persisted after every stage."""
+
+    def __init__(self, course_dir: str, cp_path: str):
+        self.course_dir = course_dir
+        self.path = os.path.join(course_dir, "checkpoint.json")
+        os.makedirs(course_dir, exist_ok=True)
+        if os.path.exists(self.path):
+            with open(self.path, encoding="utf-8") as f:
+                self.data = json.load(f)
+        else:
+            self.data = {"cp_path": os.path.abspath(cp_path), "stages": {}}
+
+    def done(self, stage: str) -> bool:
+        return self.data["stages"].get(stage, {}).get("status") == "done"
+
+    def artifacts(self, stage: str) -> dict:
+        return self.data["stages"].get(stage, {}).get("artifacts", {})
+
+    def record(self, stage: str, status: str, seconds: float, artifacts: dict = None, error: str = None):
+        self.data["stages"][stage] = {
+            "status": status,
+            "seconds": round(seconds, 2),
+            "finished_at": datetime.now().isoformat(timespec="seconds"),
+            "artifacts": artifacts or {},
+            "error": error,
+        }
+        tmp = f"{self.path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self.data, f, indent=2, ensure_ascii=False)
+        os.replace(tmp, self.path)
+
+
+# ---------------------------------------------------------------------------
+# Stages
+# ---------------------------------------------------------------------------
+
+def _stage_parse(cp_path: str, ckpt: CourseCheckpoint, options: dict) -> dict:
+    from generate_ap_fg_lg.courseware_generation import parse_cp_document
+
+    with open(cp_path, "rb") as f:
+        text = parse_cp_document(f)
+    if not text:
+        raise ValueError("Parsed CP is empty")
+    parsed_path = os.path.join(ckpt.course_dir, "parsed_cp.md")
+    with open(parsed_path, "w", encoding="utf-8") as f:
+        f.write(text)
+    return {"parsed_cp_path": parsed_path, "chars": len(text)}
+
+
+async def _stage_interpret(cp_path: str, ckpt: CourseCheckpoint, options: dict) -> dict:
+    from courseware_agents.cp_interpreter import interpret_cp
+    from generate_ap_fg_lg.courseware_generation import apply_tsc_defaults
+    from utils.helpers import copy_to_courseware, get_courseware_folder
+
+    ref_code = options["refs"].get(os.path.basename(cp_path))
+    context_path = os.path.join(ckpt.course_dir, "context.json")
+    context = await interpret_cp(
+        ckpt.artifacts("parse")["parsed_cp_path"],
+        output_path=context_path,
+        course_ref_code=ref_code,
+    )
+    if ref_code and not context.get("TGS_Ref_No"):
+        context["TGS_Ref_No"] = ref_code
+    context = apply_tsc_defaults(context)
+    with open(context_path, "w", encoding="utf-8") as f:
+        json.dump(context, f, indent=2, ensure_ascii=False)
+
+    get_courseware_folder(context)
+    copy_to_courseware(cp_path, "Course Proposal", os.path.basename(cp_path), context)
+    return {"context_path": context_path, "course_title": context.get("Course_Title", ""),
+            "tgs_ref_no": context.get("TGS_Ref_No", "")}
+
+
+def _load_context(ckpt: CourseCheckpoint) -> dict:
+    with open(ckpt.artifacts("interpret")["context_path"], encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _resolve_company(context: dict, options: dict) -> dict:
+    from generate_ap_fg_lg.utils.organizations import get_default_organization, match_organization
+
+    if options["company"]:
+        company = match_organization(options["company"])
+        if not company:
+            raise ValueError(f"Company not found: {options['company']}")
+        return company
+    return match_organization(context.get("Name_of_Organisation", "")) or get_default_organization()
+
+
+def _stage_documents(cp_path: str, ckpt: CourseCheckpoint, options: dict) -> dict:
+    from generate_ap_fg_lg.bulk_generation import generate_courseware_documents
+
+    context = _load_context(ckpt)
+    company = _resolve_company(context, options)
+    current = datetime.now()
+    context["Date"] = current.strftime("%d %b %Y")
+    context["Year"] = current.year
+    context["TGS_Ref_No"] = context.get("TGS_Ref_No", "")
+    if company.get("uen"):
+        context["UEN"] = company["uen"]
+
+    result = generate_courseware_documents(context, company["name"])
+    failed = {k: d["error"] for k, d in result["documents"].items() if d["error"]}
+    if failed:
+        raise RuntimeError("; ".join(f"{k}: {e}" for k, e in failed.items()))
+    return {
+        "company": company["name"],
+        "files": {k: d["path"] for k, d in result["documents"].items()},
+        "seconds_by_document": {k: round(d["seconds"], 2) for k, d in result["documents"].items()},
+    }
+
+
+def _stage_lesson_plan(cp_path: str, ckpt: CourseCheckpoint, options: dict) -> dict:
+    from generate_ap_fg_lg.bulk_generation import sanitize_filename
+    from generate_lp.timetable_generator import build_lesson_plan_schedule, generate_lesson_plan_docx
+    from utils.helpers import copy_to_courseware
+
+    context = _load_context(ckpt)
+    company = _resolve_company(context, options)
+    schedule = build_lesson_plan_schedule(context)
+    docx_path = generate_lesson_plan_docx(context, schedule, company)
+
+    title = sanitize_filename(context.get("Course_Title", "Course"))
+    tgs = sanitize_filename(context.get("TGS_Ref_No", "")) if context.get("TGS_Ref_No") else ""
+    filename = f"LP_{tgs}_{title}_v1.docx" if tgs else f"LP_{title}_v1.docx"
+    dest = copy_to_courseware(docx_path, "Lesson Plan", filename, context) or docx_path
+    return {"file": dest, "num_days": schedule.get("num_days")}
+
+
+async def _stage_assessments(cp_path: str, ckpt: CourseCheckpoint, options: dict) -> dict:
+    from courseware_agents.assessment.assessment_generator import generate_assessments
+    from generate_assessment.assessment_generation import generate_documents
+    from utils.helpers import copy_to_courseware
+
+    context = _load_context(ckpt)
+    company = _resolve_company(context, options)
+    result = await generate_assessments(
+        course_context=context,
+        output_path=os.path.join(ckpt.course_dir, "assessment_context.json"),
+    )
+    files = {}
+    course_title = result.get("course_title", "") or context.get("Course_Title", "")
+    for assessment in result.get("assessment_types", []):
+        a_type = assessment.get("type", assessment.get("code", "Unknown"))
+        if not assessment.get("questions"):
+            continue
+        doc_context = {
+            "course_title": course_title,
+            "duration": assessment.get("duration", ""),
+            "assessment_code": assessment.get("code", a_type),
+            "questions": assessment["questions"],
+        }
+        generated = await asyncio.to_thread(
+            generate_documents, doc_context, a_type, ckpt.course_dir, company,
+        )
+        files[a_type] = {
+            "QUESTION": copy_to_courseware(generated["QUESTION"], "Assessment Questions and Answers",
+                                           f"{a_type} - {course_title}.docx", context) or generated["QUESTION"],
+            "ANSWER": copy_to_courseware(generated["ANSWER"], "Assessment Questions and Answers",
+                                         f"Answer to {a_type} - {course_title}.docx", context) or generated["ANSWER"],
+        }
+    if not files:
+        raise RuntimeError("Assessment agent returned no questions")
+    return {"files": files}
+
+
+_STAGE_FUNCS = {
+    "parse": _stage_parse,
+    "interpret": _stage_interpret,
+    "documents": _stage_documents,
+    "lesson_plan": _stage_lesson_plan,
+    "assessments": _stage_assessments,
+}
+
+
+# ---------------------------------------------------------------------------
+# Driver
+# ---------------------------------------------------------------------------
+
+async def run_course(cp_path: str, run_dir: str, stages: list, options: dict,
+                     semaphore: asyncio.Semaphore) -> dict:
+    """Run the requested stages for one CP, skipping those already checkpointed."""
+    course_id = _course_id(cp_path)
+    ckpt = CourseCheckpoint(os.path.join(run_dir, course_id), cp_path)
+    summary = {"course": course_id, "cp": os.path.basename(cp_path), "status": "done",
+               "stages": {}, "error": None}
+
+    async with semaphore:
+        started = time.perf_counter()
+        for stage in stages:
+            if ckpt.done(stage):
+                summary["stages"][stage] = "skipped (checkpoint)"
+                continue
+            logger.info(f"[{course_id}] {stage}...")
+            t0 = time.perf_counter()
+            try:
+                required = STAGE_REQUIRES.get(stage)
+                if required and not ckpt.done(required):
+                    raise RuntimeError(f"requires the '{required}' stage to have completed")
+                func = _STAGE_FUNCS[stage]
+                if asyncio.iscoroutinefunction(func):
+                    artifacts = await func(cp_path, ckpt, options)
+                else:
+                    artifacts = await asyncio.to_thread(func, cp_path, ckpt, options)
+            except Exception as e:
+                elapsed = time.perf_counter() - t0
+                error = f"{type(e).__name__}: {e}"
+                ckpt.record(stage, "failed", elapsed, error=error)
+                logger.error(f"[{course_id}] {stage} failed after {elapsed:.0f}s: {error}")
+                logger.debug(traceback.format_exc())
+                summary.update(status="failed", error=f"{stage}: {error}")
+                summary["stages"][stage] = f"failed ({elapsed:.1f}s)"
+                break
+            elapsed = time.perf_counter() - t0
+            ckpt.record(stage, "done", elapsed, artifacts)
+            summary["stages"][stage] = f"{elapsed:.1f}s"
+            logger.info(f"[{course_id}] {stage} done in {elapsed:.1f}s")
+        summary["seconds"] = round(time.perf_counter() - started, 2)
+    return summary
+
+
+async def run_batch(cp_dir: str, run_name: str, stages: list, options: dict, concurrency: int) -> dict:
+    from courseware_agents.base import get_agent_governor_stats
+
+    cp_files = sorted(
+        p for p in glob.glob(os.path.join(cp_dir, "*"))
+        if p.lower().endswith(CP_EXTENSIONS) and not os.path.basename(p).startswith("~$")
+    )
+    run_dir = os.path.join(BATCH_DIR, run_name)
+    os.makedirs(run_dir, exist_ok=True)
+    logger.info(f"Batch '{run_name}': {len(cp_files)} CP file(s), {concurrency} concurrent, stages {stages}")
+
+    # Import the pipeline once up front rather than racing imports in worker threads
+    import generate_ap_fg_lg.courseware_generation  # noqa: F401
+    if "lesson_plan" in stages:
+        import generate_lp.timetable_generator  # noqa: F401
+    if "assessments" in stages:
+        import generate_assessment.assessment_generation  # noqa: F401
+
+    semaphore = asyncio.Semaphore(concurrency)
+    started = time.perf_counter()
+    results = await asyncio.gather(
+        *(run_course(p, run_dir, stages, options, semaphore) for p in cp_files),
+        return_exceptions=True,
+    )
+    wall = time.perf_counter() - started
+
+    courses = []
+    for cp_path, result in zip(cp_files, results):
+        if isinstance(result, BaseException):
+            result = {"course": os.path.basename(cp_path), "cp": os.path.basename(cp_path),
+                      "status": "failed", "stages": {}, "error": f"{type(result).__name__}: {result}"}
+        courses.append(result)
+    completed = sum(1 for c in courses if c["status"] == "done")
+    summary = {
+        "run": run_name,
+        "finished_at": datetime.now().isoformat(timespec="seconds"),
+        "stages": stages,
+        "courses_total": len(courses),
+        "courses_completed": completed,
+        "courses_failed": len(courses) - completed,
+        "wall_seconds": round(wall, 1),
+        "courses_per_hour": round(completed / wall * 3600, 1) if wall and completed else 0.0,
+        "agent_governor": get_agent_governor_stats(),
+        "courses": courses,
+    }
+    with open(os.path.join(run_dir, "summary.json"), "w", encoding="utf-8") as f:
+        json.dump(summary, f, indent=2, ensure_ascii=False, default=str)
+    return summary
+
+
+def _print_summary(summary: dict):
+    print(f"\nBatch '{summary['run']}': {summary['courses_completed']}/{summary['courses_total']} "
+          f"course(s) completed in {summary['wall_seconds']:.0f}s "
+          f"({summary['courses_per_hour']} courses/hour)")
+    for course in summary["courses"]:
+        stages = ", ".join(f"{k} {v}" for k, v in course["stages"].items())
+        print(f"  [{course['status']:>6}] {course['cp']}: {stages}")
+        if course["error"]:
+            print(f"           {course['error']}")
+    gov = summary["agent_governor"]
+    print(f"Agent governor: limit {gov['limit']}/{gov['max_concurrency']}, "
+          + ", ".join(f"{k} {v}" for k, v in gov.items()
+                      if isinstance(v, (int, float)) and k not in ("limit", "max_concurrency")))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate courseware for a directory of Course Proposals.")
+    parser.add_argument("cp_dir", help="Directory containing CP files (.docx/.xlsx)")
+    parser.add_argument("--run", default=None, help="Run name (reuse to resume from checkpoints)")
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY,
+                        help=f"Courses processed at the same time (default {DEFAULT_CONCURRENCY})")
+    parser.add_argument("--company", default=None,
+                        help="Organisation for all courses (default: matched from each CP)")
+    parser.add_argument("--refs", default=None, help="JSON file mapping CP file names to TGS ref codes")
+    parser.add_argument("--stages", default=",".join(STAGES),
+                        help=f"Comma-separated subset of: {','.join(STAGES)}")
+    parser.add_argument("--max-agents", type=int, default=None,
+                        help="Max concurrent agent sessions across all courses (AGENT_MAX_CONCURRENCY)")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    if args.max_agents:
+        # Read by courseware_agents.base when the governor is created (first import below)
+        os.environ["AGENT_MAX_CONCURRENCY"] = str(args.max_agents)
+
+    stages = [s.strip() for s in args.stages.split(",") if s.strip()]
+    unknown = [s for s in stages if s not in STAGES]
+    if unknown:
+        parser.error(f"Unknown stage(s): {', '.join(unknown)}")
+    stages = [s for s in STAGES if s in stages]  # Pipeline order
+    if not os.path.isdir(args.cp_dir):
+        parser.error(f"Not a directory: {args.cp_dir}")
+
+    refs = {}
+    if args.refs:
+        with open(args.refs, encoding="utf-8") as f:
+            refs = json.load(f)
+
+    options = {"company": args.company, "refs": refs}
+    run_name = args.run or datetime.now().strftime("%Y%m%d_%H%M%S")
+    summary = asyncio.run(run_batch(args.cp_dir, run_name, stages, options, max(1, args.concurrency)))
+    _print_summary(summary)
+    sys.exit(0 if summary["courses_failed"] == 0 else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -3,14 +3,17 @@ WSQ Courseware Agents — AI-powered course material generation
 
 Architecture:
     courseware_agents/
-    ├── base.py                  # Core: run_agent(), run_agent_json()
+    ├── base.py                  # Core: run_agent(), run_agent_json(), concurrency governor
     ├── cp_interpreter.py        # Shared: CP Interpretation Agent
+    ├── cp_extractor.py          # Shared: deterministic CP table fields (no LLM)
     │
     ├── slides/                  # Slide Generation (5-phase pipeline)
     │   ├── research_agent.py    # Phase 1: Web Research
+    │   ├── research_store.py    # Phase 1: cross-course research reuse (MinHash lookup)
     │   ├── content_generator_agent.py  # Phase 2 & 5: Content + Assembly
     │   ├── editor_agent.py      # Phase 3: Slide Skeleton
     │   ├── infographic_agent.py # Phase 4: AntV → PNG
+    │   ├── render_pool.py       # Phase 4: warm Playwright page pool
     │   └── slides_agent.py      # Legacy: Document Analysis
     │
     ├── assessment/              # Assessment Generation
@@ -30,6 +33,7 @@ from courseware_agents.base import run_agent
 
 # Shared agent
 from courseware_agents.cp_interpreter import interpret_cp
+from courseware_agents.cp_extractor import extract_cp_fields
 
 # Slide generation agents (5-phase pipeline)
 from courseware_agents.slides import (
@@ -58,6 +62,7 @@ __all__ = [
     "run_agent",
     # Shared
     "interpret_cp",
+    "extract_cp_fields",
     # Slides pipeline
     "research_topic",
     "research_all_topics",
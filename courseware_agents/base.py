@@ -3,14 +3,306 @@ Base Agent Runner
 
 Wraps the Claude Agent SDK's query() function with common patterns
 used across all courseware agents.
+
+Agent results are cached on disk (.output/agent_cache), keyed by a hash of
+(prompt, system_prompt, tools, model, max_turns, working_dir when tools are
+enabled), so re-running a course with identical inputs returns instantly
+without a new agent session. Error results are never cached.
+
+Every agent session that does reach the SDK goes through one process-wide
+governor (shared by all Streamlit sessions and event loops):
+- a global limit (AGENT_MAX_CONCURRENCY) plus optional per-model limits
+  (AGENT_MODEL_CONCURRENCY="model-id=2,other-model=4")
+- a priority queue — PRIORITY_INTERACTIVE (e.g. CP extraction) is served
+  before PRIORITY_DEFAULT, which is served before PRIORITY_BULK (slide research,
+  content, infographics)
+- adaptive limits: a rate-limit error halves the effective limit, opens an
+  exponential backoff window and retries the session; the limit grows back
+  by one slot after a run of successes
+
+Callers can observe sessions as they stream by passing an event sink to
+run_agent (or installing one for a whole call tree with agent_event_sink()).
+The sink receives dicts for session start, turn starts, tool calls, partial
+text sizes, token usage, rate limits and session end, each tagged with the
+session id, model, current agent_phase() and elapsed seconds.
 """
 
 import asyncio
+import contextvars
+import hashlib
+import heapq
+import itertools
 import json
+import logging
 import os
-from typing import Optional
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Optional
 from claude_agent_sdk import query, ClaudeAgentOptions, AssistantMessage, ResultMessage
 
+from utils.json_stream import JSONStreamParser, extract_json
+
+# ---------- Response cache ----------
+_PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+AGENT_CACHE_DIR = os.path.join(_PROJECT_ROOT, ".output", "agent_cache")
+AGENT_CACHE_TTL_SECONDS = 7 * 24 * 3600    # Entries older than 7 days are re-run
+AGENT_CACHE_MAX_BYTES = 200 * 1024 * 1024  # Oldest entries evicted above 200 MB
+
+_cache_lock = threading.Lock()
+_cache_stats = {"hits": 0, "misses": 0, "writes": 0, "evictions": 0}
+
+logger = logging.getLogger(__name__)
+
+# ---------- Concurrency governor ----------
+PRIORITY_INTERACTIVE = 0   # A user is waiting on this call (CP extraction, single edits)
+PRIORITY_DEFAULT = 5
+PRIORITY_BULK = 10         # Background fan-out (slide research/content/infographics)
+
+AGENT_MAX_CONCURRENCY = int(os.environ.get("AGENT_MAX_CONCURRENCY", "8"))
+AGENT_MODEL_CONCURRENCY = os.environ.get("AGENT_MODEL_CONCURRENCY", "")  # "model=n,model=n"
+AGENT_RATE_LIMIT_RETRIES = 3          # Extra attempts for a session that hit a rate limit
+AGENT_BACKOFF_BASE_SECONDS = 5.0      # First backoff window; doubles per consecutive hit
+AGENT_BACKOFF_MAX_SECONDS = 120.0
+
+RATE_LIMIT_MARKERS = (
+    "rate limit", "rate_limit", "ratelimit", "429", "too many requests",
+    "overloaded", "529", "usage limit", "quota",
+)
+
+
+def _is_rate_limit_error(text: str) -> bool:
+    text = (text or "").lower()
+    return any(marker in text for marker in RATE_LIMIT_MARKERS)
+
+
+def _parse_model_limits(spec: str) -> dict:
+    """Parse "model-a=2,model-b=4" into {"model-a": 2, "model-b": 4}."""
+    limits = {}
+    for part in spec.split(","):
+        name, _, value = part.partition("=")
+        if name.strip() and value.strip().isdigit() and int(value) > 0:
+            limits[name.strip()] = int(value)
+    return limits
+
+
+class _Waiter:
+    __slots__ = ("priority", "seq", "model", "loop", "future", "granted", "cancelled")
+
+    def __init__(self, priority: int, seq: int, model: str, loop, future):
+        self.priority = priority
+        self.seq = seq
+        self.model = model
+        self.loop = loop
+        self.future = future
+        self.granted = False
+        self.cancelled = False
+
+    def __lt__(self, other: "_Waiter") -> bool:
+        return (self.priority, self.seq) < (other.priority, other.seq)
+
+
+def _resolve_waiter(future) -> None:
+    if not future.done():
+        future.set_result(None)
+
+
+class _AgentGovernor:
+    """Thread-safe priority semaphore with global/per-model limits and AIMD backoff.
+
+    Waiters may live on different event loops (one per Streamlit session
+    thread), so state is guarded by a threading.Lock and grants are delivered
+    with loop.call_soon_threadsafe.
+    """
+
+    def __init__(self, max_concurrency: int, model_limits: Optional[dict] = None):
+        self._lock = threading.Lock()
+        self._max = max(1, max_concurrency)
+        self._limit = float(self._max)           # Effective (adaptive) global limit
+        self._model_limits = dict(model_limits or {})
+        self._in_flight = 0
+        self._model_in_flight: dict = {}
+        self._waiters: list = []                 # heap of _Waiter
+        self._seq = itertools.count()
+        self._backoff_until = 0.0
+        self._consecutive_rate_limits = 0
+        self._success_streak = 0
+        self._stats = {"granted": 0, "queued": 0, "rate_limited": 0, "wait_seconds": 0.0}
+
+    def _can_grant(self, model: str) -> bool:
+        if self._in_flight >= int(self._limit):
+            return False
+        model_limit = self._model_limits.get(model)
+        return model_limit is None or self._model_in_flight.get(model, 0) < model_limit
+
+    def _take(self, model: str) -> None:
+        self._in_flight += 1
+        self._model_in_flight[model] = self._model_in_flight.get(model, 0) + 1
+        self._stats["granted"] += 1
+
+    def _give_back(self, model: str) -> None:
+        self._in_flight -= 1
+        self._model_in_flight[model] -= 1
+
+    def _dispatch(self) -> None:
+        """Grant queued waiters in priority order. Caller holds the lock.
+
+        A waiter blocked only by its model limit is skipped so other models
+        are not held up behind it.
+        """
+        kept = []
+        while self._waiters and self._in_flight < int(self._limit):
+            waiter = heapq.heappop(self._waiters)
+            if waiter.cancelled:
+                continue
+            if not self._can_grant(waiter.model):
+                kept.append(waiter)
+                continue
+            self._take(waiter.model)
+            waiter.granted = True
+            try:
+                waiter.loop.call_soon_threadsafe(_resolve_waiter, waiter.future)
+            except RuntimeError:
+                # Waiter's loop is closed — nobody will release this slot
+                waiter.granted = False
+                self._give_back(waiter.model)
+        for waiter in kept:
+            heapq.heappush(self._waiters, waiter)
+
+    async def acquire(self, model: str, priority: int) -> None:
+        """Wait for a slot, then sit out any active backoff window."""
+        loop = asyncio.get_running_loop()
+        started = time.monotonic()
+        with self._lock:
+            # Queue first and dispatch: waiters held back only by their own
+            # model limit must not block a request for another model
+            waiter = _Waiter(priority, next(self._seq), model, loop, loop.create_future())
+            heapq.heappush(self._waiters, waiter)
+            self._dispatch()
+            if not waiter.granted:
+                self._stats["queued"] += 1
+
+        try:
+            await waiter.future
+            delay = self._backoff_until - time.monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)
+        except BaseException:
+            with self._lock:
+                if waiter.granted:
+                    self._give_back(model)
+                    self._dispatch()
+                else:
+                    waiter.cancelled = True
+            raise
+
+        with self._lock:
+            self._stats["wait_seconds"] += time.monotonic() - started
+
+    def release(self, model: str) -> None:
+        with self._lock:
+            self._give_back(model)
+            self._dispatch()
+
+    def report_success(self) -> None:
+        """Additive increase: one slot back after `limit` successes in a row."""
+        with self._lock:
+            self._consecutive_rate_limits = 0
+            if self._limit >= self._max:
+                return
+            self._success_streak += 1
+            if self._success_streak >= int(self._limit):
+                self._limit = min(self._max, self._limit + 1)
+                self._success_streak = 0
+                self._dispatch()
+
+    def report_rate_limit(self) -> float:
+        """Multiplicative decrease plus an exponential backoff window. Returns the window."""
+        with self._lock:
+            self._stats["rate_limited"] += 1
+            self._success_streak = 0
+            self._limit = max(1.0, self._limit / 2)
+            window = min(
+                AGENT_BACKOFF_MAX_SECONDS,
+                AGENT_BACKOFF_BASE_SECONDS * (2 ** self._consecutive_rate_limits),
+            )
+            self._consecutive_rate_limits += 1
+            self._backoff_until = max(self._backoff_until, time.monotonic() + window)
+            return window
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                **self._stats,
+                "limit": int(self._limit),
+                "max_concurrency": self._max,
+                "model_limits": dict(self._model_limits),
+                "in_flight": self._in_flight,
+                "in_flight_by_model": {m: n for m, n in self._model_in_flight.items() if n},
+                "waiting": sum(1 for w in self._waiters if not w.cancelled),
+                "backoff_remaining": max(0.0, self._backoff_until - time.monotonic()),
+            }
+
+
+_governor = _AgentGovernor(AGENT_MAX_CONCURRENCY, _parse_model_limits(AGENT_MODEL_CONCURRENCY))
+
+# ---------- Streaming events ----------
+AGENT_EVENT_TEXT_INTERVAL = 1.0   # Min seconds between partial-text size events per session
+
+_event_sink_var: contextvars.ContextVar = contextvars.ContextVar("agent_event_sink", default=None)
+_phase_var: contextvars.ContextVar = contextvars.ContextVar("agent_phase", default="")
+_session_ids = itertools.count(1)
+
+
+@contextmanager
+def agent_event_sink(sink: Optional[Callable[[dict], None]]):
+    """Send events from every run_agent call made inside this block to sink.
+
+    Context-local: applies to tasks created inside the block, not to other
+    threads or sessions.
+    """
+    token = _event_sink_var.set(sink)
+    try:
+        yield
+    finally:
+        _event_sink_var.reset(token)
+
+
+@contextmanager
+def agent_phase(name: str):
+    """Tag events from run_agent calls inside this block with a phase name."""
+    token = _phase_var.set(name)
+    try:
+        yield
+    finally:
+        _phase_var.reset(token)
+
+
+class _EventEmitter:
+    """Builds and delivers events for one run_agent call. Sink errors are swallowed."""
+
+    def __init__(self, sink: Callable[[dict], None], model: Optional[str]):
+        self.sink = sink
+        self.session = next(_session_ids)
+        self.model = model or "default"
+        self.phase = _phase_var.get()
+        self.started = time.monotonic()
+
+    def emit(self, event_type: str, **fields) -> None:
+        event = {
+            "type": event_type,
+            "session": self.session,
+            "model": self.model,
+            "phase": self.phase,
+            "elapsed": round(time.monotonic() - self.started, 2),
+            "time": time.time(),
+            **fields,
+        }
+        try:
+            self.sink(event)
+        except Exception as e:
+            logger.debug(f"Agent event sink failed: {type(e).__name__}: {e}")
+
 
 async def run_agent(
     prompt: str,
@@ -19,6 +311,9 @@ async def run_agent(
     working_dir: Optional[str] = None,
     max_turns: int = 30,
     model: Optional[str] = None,
+    use_cache: bool = True,
+    priority: int = PRIORITY_DEFAULT,
+    event_sink: Optional[Callable[[dict], None]] = None,
 ) -> str:
     """
     Run a Claude agent with the given prompt and return the result text.
@@ -30,6 +325,12 @@ async def run_agent(
         working_dir: Working directory for the agent. Defaults to project root.
         max_turns: Maximum number of agent turns.
         model: Optional model ID (e.g. 'claude-sonnet-4-20250514').
+        use_cache: Return a cached result for identical inputs if available,
+            and store the result of a fresh run. Pass False to always re-run.
+        priority: Queue position under the concurrency governor
+            (PRIORITY_INTERACTIVE, PRIORITY_DEFAULT or PRIORITY_BULK).
+        event_sink: Optional callable receiving progress event dicts as the
+            session streams. Defaults to the sink set by agent_event_sink().
 
     Returns:
         The agent's final text output.
@@ -38,8 +339,20 @@ async def run_agent(
         tools = ["Read", "Glob", "Grep"]
     # Allow explicitly passing empty list [] to disable tools
 
+    sink = event_sink or _event_sink_var.get()
+    emitter = _EventEmitter(sink, model) if sink else None
+
     if working_dir is None:
-        working_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        working_dir = _PROJECT_ROOT
+
+    cache_key = None
+    if use_cache:
+        cache_key = _cache_key(prompt, system_prompt, tools, model, max_turns, working_dir)
+        cached = _cache_get(cache_key)
+        if cached is not None:
+            if emitter:
+                emitter.emit("cache_hit", chars=len(cached))
+            return cached
 
     options = ClaudeAgentOptions(
         allowed_tools=tools,
@@ -56,18 +369,103 @@ async def run_agent(
     if working_dir:
         options.cwd = working_dir
 
+    if emitter:
+        options.include_partial_messages = True  # StreamEvents carry turn starts and text deltas
+
+    governor_key = model or ""
+    for attempt in range(AGENT_RATE_LIMIT_RETRIES + 1):
+        waited = time.monotonic()
+        await _governor.acquire(governor_key, priority)
+        if emitter:
+            emitter.emit("start", attempt=attempt + 1, wait=round(time.monotonic() - waited, 2))
+        try:
+            result_text, rate_limited, is_error = await _query_text(prompt, options, emitter)
+        except Exception as e:
+            if not _is_rate_limit_error(str(e)) or attempt == AGENT_RATE_LIMIT_RETRIES:
+                if emitter:
+                    emitter.emit("end", status="error", error=f"{type(e).__name__}: {e}"[:200])
+                raise
+            result_text, rate_limited, is_error = "", True, True
+        finally:
+            _governor.release(governor_key)
+
+        if not rate_limited:
+            _governor.report_success()
+            break
+        window = _governor.report_rate_limit()
+        if emitter:
+            emitter.emit("rate_limited", attempt=attempt + 1, backoff=window)
+        if attempt == AGENT_RATE_LIMIT_RETRIES:
+            break
+        logger.warning(
+            f"Agent session rate-limited (model={model or 'default'}) — "
+            f"retry {attempt + 1}/{AGENT_RATE_LIMIT_RETRIES} after {window:.0f}s backoff"
+        )
+
+    # Error results (rate-limited or not) are never cached — the next call re-runs
+    if cache_key and result_text and not is_error:
+        _cache_put(cache_key, result_text)
+
+    if emitter:
+        emitter.emit("end", status="rate_limited" if rate_limited else "ok", chars=len(result_text))
+    return result_text
+
+
+async def _query_text(prompt: str, options: ClaudeAgentOptions,
+                      emitter: Optional[_EventEmitter] = None) -> tuple:
+    """Run one SDK session. Returns (result_text, rate_limited, is_error)."""
     result_text = ""
+    rate_limited = False
+    is_error = False
+    turns = 0
+    streamed = False          # StreamEvents seen — turn starts come from message_start
+    partial_chars = 0
+    last_text_event = 0.0
+    json_parser = JSONStreamParser()  # Fed with text deltas to count completed JSON items
 
     async for message in query(prompt=prompt, options=options):
         if isinstance(message, AssistantMessage):
+            if emitter and not streamed:
+                turns += 1
+                emitter.emit("turn", turn=turns)
             for block in message.content:
                 if hasattr(block, "text"):
                     result_text = block.text  # Keep last text block
+                elif emitter and hasattr(block, "name") and hasattr(block, "input"):
+                    emitter.emit("tool_call", tool=block.name)
         elif isinstance(message, ResultMessage):
             if hasattr(message, "result") and message.result:
                 result_text = message.result
+            if getattr(message, "is_error", False):
+                is_error = True
+                rate_limited = _is_rate_limit_error(result_text)
+            if emitter:
+                usage = getattr(message, "usage", None) or {}
+                emitter.emit(
+                    "usage",
+                    input_tokens=usage.get("input_tokens", 0),
+                    output_tokens=usage.get("output_tokens", 0),
+                    cache_read_tokens=usage.get("cache_read_input_tokens", 0),
+                    cost_usd=getattr(message, "total_cost_usd", None),
+                    num_turns=getattr(message, "num_turns", turns),
+                )
+        elif emitter and isinstance(getattr(message, "event", None), dict):
+            event = message.event
+            streamed = True
+            if event.get("type") == "message_start":
+                turns += 1
+                json_parser = JSONStreamParser()
+                emitter.emit("turn", turn=turns)
+            elif event.get("type") == "content_block_delta":
+                delta = event.get("delta", {}).get("text", "")
+                partial_chars += len(delta)
+                json_parser.feed(delta)
+                now = time.monotonic()
+                if now - last_text_event >= AGENT_EVENT_TEXT_INTERVAL:
+                    last_text_event = now
+                    emitter.emit("text", turn=turns, chars=partial_chars, items=json_parser.items)
 
-    return result_text
+    return result_text, rate_limited, is_error
 
 
 async def run_agent_json(
@@ -77,6 +475,9 @@ async def run_agent_json(
     working_dir: Optional[str] = None,
     max_turns: int = 30,
     model: Optional[str] = None,
+    use_cache: bool = True,
+    priority: int = PRIORITY_DEFAULT,
+    event_sink: Optional[Callable[[dict], None]] = None,
 ) -> dict:
     """
     Run a Claude agent and parse the result as JSON.
@@ -88,6 +489,9 @@ async def run_agent_json(
         working_dir: Working directory for the agent.
         max_turns: Maximum number of agent turns.
         model: Optional model ID (e.g. 'claude-sonnet-4-20250514').
+        use_cache: Use the on-disk response cache (see run_agent).
+        priority: Governor queue priority (see run_agent).
+        event_sink: Optional progress event callable (see run_agent).
 
     Returns:
         Parsed JSON dict from the agent's output.
@@ -102,49 +506,176 @@ async def run_agent_json(
         working_dir=working_dir,
         max_turns=max_turns,
         model=model,
+        use_cache=use_cache,
+        priority=priority,
+        event_sink=event_sink,
     )
 
     # Try to extract JSON from the result
     json_result = _extract_json(result)
     if json_result is None:
+        # Never let an unparseable response be served from cache on retry
+        if use_cache:
+            _cache_delete(_cache_key(
+                prompt, system_prompt,
+                tools if tools is not None else ["Read", "Glob", "Grep"],
+                model, max_turns, working_dir or _PROJECT_ROOT,
+            ))
         raise ValueError(f"Agent output is not valid JSON. Output: {result[:500]}")
 
     return json_result
 
 
 def _extract_json(text: str) -> Optional[dict]:
-    """Extract JSON from text, handling markdown code blocks."""
-    if not text:
+    """Extract a JSON object from agent output (fences, prose, control chars tolerated).
+
+    Returns None when the first top-level value is not an object (e.g. an array).
+    """
+    value = extract_json(text)
+    return value if isinstance(value, dict) else None
+
+
+def _cache_key(prompt: str, system_prompt: Optional[str], tools: list,
+               model: Optional[str], max_turns: int, working_dir: Optional[str] = None) -> str:
+    """Content hash identifying an agent run.
+
+    working_dir is part of the key when tools are enabled, since Read/Glob/Grep
+    answers depend on the directory they run in.
+    """
+    payload = json.dumps(
+        {
+            "prompt": prompt,
+            "system_prompt": system_prompt or "",
+            "tools": list(tools),
+            "model": model or "",
+            "max_turns": max_turns,
+            "working_dir": os.path.abspath(working_dir) if tools and working_dir else "",
+        },
+        sort_keys=True,
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _cache_path(key: str) -> str:
+    return os.path.join(AGENT_CACHE_DIR, f"{key}.json")
+
+
+def _cache_get(key: str) -> Optional[str]:
+    """Return the cached result text for key, or None on miss/expiry."""
+    path = _cache_path(key)
+    entry = None
+    try:
+        if time.time() - os.path.getmtime(path) <= AGENT_CACHE_TTL_SECONDS:
+            with open(path, "r", encoding="utf-8") as f:
+                entry = json.load(f)
+            os.utime(path)  # Refresh recency for LRU eviction
+        else:
+            _cache_delete(key)
+    except (OSError, json.JSONDecodeError):
+        entry = None
+
+    if not isinstance(entry, dict) or not entry.get("result"):
+        with _cache_lock:
+            _cache_stats["misses"] += 1
         return None
 
-    # Try direct parse
+    with _cache_lock:
+        _cache_stats["hits"] += 1
+    return entry.get("result")
+
+
+def _cache_put(key: str, result_text: str) -> None:
+    """Store result text for key (atomic write), then enforce the size budget."""
+    try:
+        os.makedirs(AGENT_CACHE_DIR, exist_ok=True)
+        path = _cache_path(key)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"created_at": time.time(), "result": result_text}, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+    except OSError:
+        return
+
+    with _cache_lock:
+        _cache_stats["writes"] += 1
+    _cache_evict()
+
+
+def _cache_delete(key: str) -> None:
     try:
-        return json.loads(text.strip())
-    except json.JSONDecodeError:
+        os.remove(_cache_path(key))
+    except OSError:
         pass
 
-    # Try extracting from markdown code block
-    import re
-    json_match = re.search(r'```(?:json)?\s*\n(.*?)\n```', text, re.DOTALL)
-    if json_match:
+
+def _cache_evict() -> None:
+    """Drop expired entries, then least-recently-used entries above the size budget."""
+    try:
+        names = os.listdir(AGENT_CACHE_DIR)
+    except OSError:
+        return
+
+    now = time.time()
+    entries = []
+    evicted = 0
+    for name in names:
+        if not name.endswith(".json"):
+            continue
+        path = os.path.join(AGENT_CACHE_DIR, name)
         try:
-            return json.loads(json_match.group(1).strip())
-        except json.JSONDecodeError:
-            pass
-
-    # Try finding JSON object in text
-    brace_start = text.find('{')
-    if brace_start != -1:
-        depth = 0
-        for i in range(brace_start, len(text)):
-            if text[i] == '{':
-                depth += 1
-            elif text[i] == '}':
-                depth -= 1
-                if depth == 0:
-                    try:
-                        return json.loads(text[brace_start:i + 1])
-                    except json.JSONDecodeError:
-                        break
-
-    return None
+            st = os.stat(path)
+        except OSError:
+            continue
+        if now - st.st_mtime > AGENT_CACHE_TTL_SECONDS:
+            try:
+                os.remove(path)
+                evicted += 1
+            except OSError:
+                pass
+            continue
+        entries.append((st.st_mtime, st.st_size, path))
+
+    total = sum(size for _, size, _ in entries)
+    if total > AGENT_CACHE_MAX_BYTES:
+        for _, size, path in sorted(entries):
+            try:
+                os.remove(path)
+                evicted += 1
+                total -= size
+            except OSError:
+                pass
+            if total <= AGENT_CACHE_MAX_BYTES:
+                break
+
+    if evicted:
+        with _cache_lock:
+            _cache_stats["evictions"] += evicted
+
+
+def get_agent_governor_stats() -> dict:
+    """Return the governor's current limit, in-flight/waiting counts and counters."""
+    return _governor.stats()
+
+
+def get_agent_cache_stats() -> dict:
+    """Return hit/miss/write/eviction counters for the agent response cache."""
+    with _cache_lock:
+        return dict(_cache_stats)
+
+
+def clear_agent_cache() -> int:
+    """Delete all cached agent responses. Returns the number of entries removed."""
+    removed = 0
+    try:
+        names = os.listdir(AGENT_CACHE_DIR)
+    except OSError:
+        return 0
+    for name in names:
+        if name.endswith(".json"):
+            try:
+                os.remove(os.path.join(AGENT_CACHE_DIR, name))
+                removed += 1
+            except OSError:
+                pass
+    return removed
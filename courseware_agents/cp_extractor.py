@@ -0,0 +1,370 @@
+"""
+Deterministic Course Proposal (CP) Field Extractor
+
+Pulls the fields that sit in fixed places of the CP template straight out of
+parse_cp_document() output, with no LLM round-trip:
+
+- Course particulars: organisation, course title, TGS ref, TSC title/code,
+  training/assessment/course hours and course fee (label -> value cells)
+- Learning Units: LU title, LO, topics with their K/A references and bullet
+  points, and the K/A statements each LU covers
+
+Works on both parse formats: Word CPs ("| a | b |" markdown tables) and Excel
+CPs ("a | b" rows). Line breaks inside a cell arrive as "<br>".
+
+Anything that is not found (or looks incomplete) is left out, so the CP
+interpreter agent only has to produce the missing and generative fields.
+Learning_Units is returned all-or-nothing: every LU must have a title, an LO,
+topics with bullet points and described K/A statements. So are the hours:
+training + assessment must equal the course duration (a missing one is
+derived from the other two).
+
+Usage:
+    from courseware_agents.cp_extractor import extract_cp_fields
+
+    fields = extract_cp_fields(cp_text)
+    fields.get("TSC_Code")         # "ICT-DIT-3002-1.1"
+    fields.get("Learning_Units")   # only present when every LU is complete
+"""
+
+import logging
+import re
+
+logger = logging.getLogger(__name__)
+
+# Context key -> label pattern of the cell holding (or preceding) its value
+SCALAR_LABELS = {
+    "Name_of_Organisation": r"name of (?:the )?(?:organisation|organization|training provider)|registered training provider|training provider name",
+    "Course_Title": r"course title",
+    "TSC_Title": r"tsc title",
+    "TSC_Code": r"tsc code",
+    "Total_Training_Hours": r"total (?:training|instructional) (?:hours|duration)",
+    "Total_Assessment_Hours": r"total assessment (?:hours|duration)",
+    "Total_Course_Duration_Hours": r"total course duration(?: hours)?",
+    "Course_Fee": r"(?:full )?course fees?",
+}
+HOURS_FIELDS = ("Total_Training_Hours", "Total_Assessment_Hours", "Total_Course_Duration_Hours")
+MAX_LABEL_QUALIFIER = 40  # Chars allowed after a label, e.g. "Course Title (as per TGS)"
+
+_LABEL_RE = {
+    key: re.compile(rf"^\s*(?:\d+(?:\.\d+)*[.)]?\s*)?(?:{pattern})\b([^:]{{0,{MAX_LABEL_QUALIFIER}}}?)\s*(?::\s*(.+))?$", re.IGNORECASE)
+    for key, pattern in SCALAR_LABELS.items()
+}
+_TSC_CODE_RE = re.compile(r"\b[A-Z]{2,4}(?:-[A-Z0-9]{2,5}){2}-\d+\.\d+\b")
+_TGS_REF_RE = re.compile(r"\bTGS-?\s?(\d{7,10})\b", re.IGNORECASE)
+_DURATION_RE = re.compile(
+    r"(\d+(?:\.\d+)?)\s*(hours?|hrs?|h|minutes?|mins?|m|days?|d)?\b", re.IGNORECASE,
+)
+_DAYS_RE = re.compile(r"\d\s*days?\b", re.IGNORECASE)
+
+# LU1: / LO1: / Topic 1: / T1: / K1: / A1: at the start of a segment
+_MARKER_RE = re.compile(
+    r"(?<![A-Za-z0-9])(?:(LU|LO)\s*(\d+)|(Topic)\s*(\d+)|(T)(\d+)|([KA])(\d+))\s*(?::|\s-|\.(?=\s))\s*(?=\S)",
+)
+_BARE_MARKER_RE = re.compile(r"^(LU|LO|Topic|T|K|A)\s*(\d+)$", re.IGNORECASE)
+_KA_REF_RE = re.compile(r"(?<![A-Za-z0-9])([KA])(\d+)(?![0-9])")
+_KA_REF_GROUP_RE = re.compile(r"\(([^()]*\b[KA]\d+[^()]*)\)")
+_KA_LIST_RE = re.compile(r"^\(?\s*[KA]\d+(?:\s*(?:,|/|&|and)\s*[KA]\d+)*\s*\)?$")
+_INLINE_BULLET_RE = re.compile(r"\s[•▪◦●○■]\s")
+_BULLET_PREFIX_RE = re.compile(r"^\s*(?:[-*•▪◦●○■–]|\d+[.)]|[a-z][.)])\s*")
+
+_NORMALIZE = str.maketrans({
+    "–": "-", "—": "-", "‘": "'", "’": "'",
+    "“": '"', "”": '"', "\xa0": " ",
+})
+
+
+def _rows(cp_text: str) -> list:
+    """Split parsed CP text into rows of cells; None marks a table/section boundary."""
+    rows = []
+    for line in cp_text.translate(_NORMALIZE).splitlines():
+        line = line.strip()
+        if not line or line.startswith("#"):
+            rows.append(None)
+            continue
+        if set(line) <= set("|-: "):
+            continue  # markdown table separator
+        cells = [c.strip() for c in line.strip("|").split("|")]
+        cells = [c for c in cells if c]
+        # "LU1" | "Title" -> "LU1: Title"
+        merged = []
+        for cell in cells:
+            if merged and _BARE_MARKER_RE.match(merged[-1]):
+                merged[-1] = f"{merged[-1]}: {cell}"
+            else:
+                merged.append(cell)
+        if merged:
+            rows.append(merged)
+    return rows
+
+
+def _cell_lines(cell: str) -> list:
+    return [part.strip() for part in re.split(r"<br\s*/?>", cell, flags=re.IGNORECASE) if part.strip()]
+
+
+def _plain(cell: str) -> str:
+    return " ".join(_cell_lines(cell))
+
+
+def _format_hours(value: str):
+    """Read a CP duration as hours, e.g. '16' / '16 hours 30 mins' / '90 mins' / '2 days (16 hrs)'.
+
+    Returns '16 hrs' / '16.5 hrs' / '1.5 hrs' / '16 hrs'. Days only restate the
+    duration, so they are used only as a check; a value given in days alone
+    (no hour count) returns None, as does a value with no number.
+    """
+    hours = minutes = bare = None
+    for number, unit in _DURATION_RE.findall(value.replace(",", "")):
+        number = float(number)
+        unit = unit.lower()
+        if unit.startswith("h"):
+            if hours is None:
+                hours = number
+        elif unit.startswith("m"):
+            if minutes is None:
+                minutes = number
+        elif not unit and bare is None:
+            bare = number
+    if hours is not None:
+        # "16 hrs 30 mins" adds up; "16 hrs (960 mins)" restates the hours
+        if minutes is not None and minutes < 60:
+            hours += minutes / 60
+    elif minutes is not None:
+        hours = minutes / 60
+    elif bare is not None and not _DAYS_RE.search(value):
+        hours = bare
+    else:
+        return None
+    hours = round(hours, 2)
+    return f"{hours:g} hr" if hours == 1 else f"{hours:g} hrs"
+
+
+def _hours_value(formatted: str) -> float:
+    return float(formatted.split()[0])
+
+
+def _consistent_hours(fields: dict) -> dict:
+    """Keep the hour fields only as a consistent training + assessment = duration set.
+
+    A missing one of the three is derived from the other two. Fewer than two,
+    or three that do not add up, are all dropped so the agent answers them.
+    """
+    hours = {k: _hours_value(fields[k]) for k in HOURS_FIELDS if fields.get(k)}
+    training, assessment, total = HOURS_FIELDS
+    if len(hours) == 2:
+        if total not in hours:
+            hours[total] = hours[training] + hours[assessment]
+        elif training not in hours:
+            hours[training] = hours[total] - hours[assessment]
+        else:
+            hours[assessment] = hours[total] - hours[training]
+    consistent = (
+        len(hours) == 3
+        and min(hours.values()) >= 0
+        and abs(hours[training] + hours[assessment] - hours[total]) <= 0.01
+    )
+    if hours and not consistent:
+        logger.warning(
+            f"CP extractor: hours incomplete or inconsistent ({', '.join(f'{k}={v:g}' for k, v in hours.items())}), "
+            "leaving them to the agent"
+        )
+    fields = {k: v for k, v in fields.items() if k not in HOURS_FIELDS}
+    if consistent:
+        for key in HOURS_FIELDS:
+            value = round(hours[key], 2)
+            fields[key] = f"{value:g} hr" if value == 1 else f"{value:g} hrs"
+    return fields
+
+
+def _valid_scalar(key: str, value: str) -> bool:
+    if not value or any(regex.match(value) for regex in _LABEL_RE.values()):
+        return False
+    if key == "TSC_Code":
+        return bool(_TSC_CODE_RE.search(value))
+    if key in HOURS_FIELDS or key == "Course_Fee":
+        return bool(re.search(r"\d", value))
+    return True
+
+
+def _extract_scalars(rows: list) -> dict:
+    """Label -> value lookups; the first valid value for each field wins."""
+    fields = {}
+    for row in rows:
+        if row is None:
+            continue
+        cells = [_plain(c) for c in row]
+        for i, cell in enumerate(cells):
+            for key, regex in _LABEL_RE.items():
+                if key in fields:
+                    continue
+                match = regex.match(cell)
+                if not match:
+                    continue
+                value = (match.group(2) or "").strip()
+                if not value:
+                    value = next((c for c in cells[i + 1:] if c != cell), "")
+                if _valid_scalar(key, value):
+                    fields[key] = value
+                break
+
+    if "TSC_Code" in fields:
+        fields["TSC_Code"] = _TSC_CODE_RE.search(fields["TSC_Code"]).group()
+    for key in HOURS_FIELDS:
+        if key in fields:
+            fields[key] = _format_hours(fields[key])
+    return {k: v for k, v in fields.items() if v}
+
+
+def _ka_number(kind: str, n: int) -> tuple:
+    return (kind.upper(), int(n))
+
+
+def _ka_refs(text: str) -> list:
+    return [_ka_number(kind, n) for kind, n in _KA_REF_RE.findall(text)]
+
+
+def _segments(line: str) -> list:
+    """Split a line into (kind, number, text) segments; kind None is unmarked text."""
+    segments = []
+    matches = list(_MARKER_RE.finditer(line))
+    if not matches:
+        return [(None, None, line)]
+    if matches[0].start() > 0 and line[:matches[0].start()].strip():
+        segments.append((None, None, line[:matches[0].start()].strip()))
+    for i, match in enumerate(matches):
+        end = matches[i + 1].start() if i + 1 < len(matches) else len(line)
+        groups = match.groups()
+        if groups[0]:
+            kind, number = groups[0].upper(), int(groups[1])
+        elif groups[2] or groups[4]:
+            kind, number = "TOPIC", int(groups[3] or groups[5])
+        else:
+            kind, number = groups[6].upper(), int(groups[7])
+        segments.append((kind, number, line[match.end():end].strip()))
+    return segments
+
+
+def _extract_learning_units(rows: list):
+    """Walk LU/LO/Topic/K/A markers in document order and build complete Learning Units (or None)."""
+    units = {}          # LU number -> working dict
+    outcomes = {}       # LO number -> text
+    statements = {"K": {}, "A": {}}
+    current = None      # LU dict in scope
+    last = None         # (kind, target, cell) that continuation lines extend
+
+    for row_index, row in enumerate(rows):
+        if row is None:
+            current, last = None, None
+            continue
+        for cell_index, cell in enumerate(row):
+            cell_id = (row_index, cell_index)
+            for line in _cell_lines(cell):
+                for kind, number, text in _segments(line):
+                    # Continuation lines belong to the last marker in the same cell
+                    continues = last is not None and last[2] == cell_id
+                    if kind is None:
+                        if current is not None and _KA_LIST_RE.match(text):
+                            current["scope_refs"].update(_ka_refs(text))
+                        elif continues and last[0] == "TOPIC":
+                            topic = last[1]
+                            if not topic["bullets"] and _KA_REF_GROUP_RE.fullmatch(text):
+                                topic["title"] = f"{topic['title']} {text}"
+                                current["topic_refs"].update(_ka_refs(text))
+                            else:
+                                bullet = _BULLET_PREFIX_RE.sub("", text).strip()
+                                if bullet:
+                                    topic["bullets"].append(bullet)
+                        continue
+
+                    last = None
+                    if kind == "LU":
+                        current = units.setdefault(number, {"title": "", "lo": None, "topics": {},
+                                                            "topic_refs": set(), "scope_refs": set()})
+                        if not current["title"] and text:
+                            current["title"] = text
+                    elif kind == "LO":
+                        outcomes.setdefault(number, text)
+                        if current is not None and current["lo"] is None:
+                            current["lo"] = number
+                    elif kind == "TOPIC":
+                        if current is None or number in current["topics"]:
+                            continue  # outside an LU, or a repeated (merged) cell
+                        title, *bullets = _INLINE_BULLET_RE.split(text)
+                        topic = current["topics"][number] = {"title": title.strip(), "bullets": [b.strip() for b in bullets if b.strip()]}
+                        current["topic_refs"].update(_ka_refs(" ".join(_KA_REF_GROUP_RE.findall(title))))
+                        last = ("TOPIC", topic, cell_id)
+                    else:
+                        if text:
+                            statements[kind].setdefault(number, text)
+                        if current is not None:
+                            current["scope_refs"].add((kind, number))
+
+    if not units:
+        return None
+    if sorted(units) != list(range(1, len(units) + 1)):
+        logger.info(f"CP extractor: LU numbering not contiguous ({sorted(units)})")
+        return None
+
+    learning_units = []
+    for number in sorted(units):
+        unit = units[number]
+        lo_number = unit["lo"] if unit["lo"] is not None else number
+        lo_text = outcomes.get(lo_number)
+        topics = [unit["topics"][n] for n in sorted(unit["topics"])]
+        # K/A references on the topic titles are authoritative; otherwise use the statements in the LU's rows
+        refs = sorted(unit["topic_refs"] or unit["scope_refs"])
+        if not (unit["title"] and lo_text and topics and refs
+                and all(t["title"] and t["bullets"] for t in topics)
+                and all(n in statements[kind] for kind, n in refs)):
+            logger.info(f"CP extractor: LU{number} incomplete, leaving Learning_Units to the agent")
+            return None
+        learning_units.append({
+            "LU_Title": f"LU{number}: {unit['title']}",
+            "Topics": [
+                {"Topic_Title": f"Topic {n}: {unit['topics'][n]['title']}", "Bullet_Points": unit["topics"][n]["bullets"]}
+                for n in sorted(unit["topics"])
+            ],
+            "LO": f"LO{lo_number}: {lo_text}",
+            "K_numbering_description": [
+                {"K_number": f"K{n}", "Description": statements["K"][n]} for kind, n in refs if kind == "K"
+            ],
+            "A_numbering_description": [
+                {"A_number": f"A{n}", "Description": statements["A"][n]} for kind, n in refs if kind == "A"
+            ],
+        })
+    return learning_units
+
+
+def extract_cp_fields(cp_text: str) -> dict:
+    """
+    Extract the template-fixed fields of a parsed CP without an LLM.
+
+    Args:
+        cp_text: Output of parse_cp_document() (Word or Excel CP).
+
+    Returns:
+        dict with the subset of course context keys that could be read
+        directly (Name_of_Organisation, Course_Title, TGS_Ref_No, TSC_Title,
+        TSC_Code, Total_*_Hours, Course_Fee, Learning_Units). Learning_Units
+        carries LU_Title, Topics, LO and K/A numbering only; Course_Overview,
+        LO_Description and assessment details are left to the agent.
+    """
+    rows = _rows(cp_text)
+    fields = _extract_scalars(rows)
+
+    if "TSC_Code" not in fields:
+        match = _TSC_CODE_RE.search(cp_text)
+        if match:
+            fields["TSC_Code"] = match.group()
+    match = _TGS_REF_RE.search(cp_text)
+    if match:
+        fields["TGS_Ref_No"] = f"TGS-{match.group(1)}"
+
+    learning_units = _extract_learning_units(rows)
+    if learning_units:
+        fields["Learning_Units"] = learning_units
+
+    fields = _consistent_hours(fields)
+
+    logger.info(f"CP extractor: {len(fields)} field(s) read from tables: {', '.join(fields)}")
+    return fields
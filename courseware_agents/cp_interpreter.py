@@ -3,17 +3,30 @@ Course Proposal (CP) Interpreter Agent
 
 Reads parsed CP text and extracts structured course data as JSON.
 Used by the courseware generation page to get context for template filling.
+
+Fields that sit in fixed CP table cells (TGS ref, TSC code, hours, fees, the
+LU/topic table and K/A numbering) are read deterministically by
+cp_extractor.extract_cp_fields first; the agent is then only asked for what is
+still missing plus the generative fields (Course_Overview, LO_Description,
+assessment details), which keeps the prompt and the response much smaller.
 """
 
 import json
+import logging
 import os
-from courseware_agents.base import run_agent_json
+from courseware_agents.base import run_agent_json, PRIORITY_INTERACTIVE
+from courseware_agents.cp_extractor import extract_cp_fields
+
+logger = logging.getLogger(__name__)
 
 SYSTEM_PROMPT = """You are an expert WSQ (Workforce Skills Qualifications) course data extractor.
 
 Your task is to read a parsed Course Proposal document and extract structured course information
 into a specific JSON format. Be thorough and accurate.
 
+In the parsed tables, "<br>" marks a line break inside a cell (e.g. between topic bullets or
+K/A statements). Treat it as a line break; never copy "<br>" into a JSON value.
+
 CRITICAL: Return ONLY a valid JSON object with no additional text or explanation.
 
 The JSON must follow this exact schema:
@@ -80,8 +93,122 @@ RULES:
 """
 
 
+# Per-key schema for the reduced request (keys the extractor could not read + generative fields)
+FIELD_SCHEMA = {
+    "Name_of_Organisation": '"string (Name of Registered Training Provider, e.g., SOPHIA IGNITE LEARNING ACADEMY PTE. LTD.)"',
+    "Course_Title": '"string"',
+    "TGS_Ref_No": '"string (TGS course reference code, e.g., TGS-2024001234)"',
+    "TSC_Title": '"string (Technical Skills & Competency title)"',
+    "TSC_Code": '"string (e.g., ICT-XXX-3.1)"',
+    "TSC_Category": '"string"',
+    "TSC_Description": '"string"',
+    "TSC_Sector": '"string"',
+    "Proficiency_Level": '"string (e.g., Level 3)"',
+    "Proficiency_Description": '"string"',
+    "Skills_Framework": '"string"',
+    "Total_Training_Hours": '"string (e.g., 16 hrs)"',
+    "Total_Assessment_Hours": '"string (e.g., 2 hrs)"',
+    "Total_Course_Duration_Hours": '"string (e.g., 18 hrs)"',
+    "Course_Overview": '"string (2-3 paragraph overview of the course)"',
+    "Learning_Units": '''[
+        {
+            "LU_Title": "string",
+            "Topics": [{"Topic_Title": "string", "Bullet_Points": ["string"]}],
+            "LO": "string (Learning Outcome, e.g., LO1: ...)",
+            "LO_Description": "string (detailed description of the Learning Outcome)",
+            "K_numbering_description": [{"K_number": "K1", "Description": "string"}],
+            "A_numbering_description": [{"A_number": "A1", "Description": "string"}],
+            "Assessment_Methods": ["string"],
+            "Instructional_Methods": ["string"]
+        }
+    ]''',
+    "Assessment_Methods_Details": '''[
+        {
+            "Assessment_Method": "string (e.g., Written Assessment - Short Answer Questions)",
+            "Method_Abbreviation": "string (e.g., WA-SAQ)",
+            "Total_Delivery_Hours": "string",
+            "Assessor_to_Candidate_Ratio": ["string"],
+            "Evidence": [{"LO": "string", "Evidence": "string"}],
+            "Submission": ["string"],
+            "Marking_Process": ["string"],
+            "Retention_Period": "string"
+        }
+    ]''',
+}
+# Learning_Units entry when the LU/topic/K/A tables were already read from the CP
+LU_GENERATIVE_SCHEMA = '''[
+        {
+            "LU_Title": "string (copy exactly from the CP, e.g., LU1: ...)",
+            "LO_Description": "string (detailed description of the Learning Outcome)",
+            "Assessment_Methods": ["string"],
+            "Instructional_Methods": ["string"]
+        }
+    ]'''
+
+PARTIAL_SYSTEM_PROMPT = """You are an expert WSQ (Workforce Skills Qualifications) course data extractor.
+
+Your task is to read a parsed Course Proposal document and return ONLY the requested fields
+as JSON. The other course fields have already been extracted from the CP tables.
+
+In the parsed tables, "<br>" marks a line break inside a cell (e.g. between topic bullets or
+K/A statements). Treat it as a line break; never copy "<br>" into a JSON value.
+
+CRITICAL: Return ONLY a valid JSON object with no additional text or explanation.
+
+RULES:
+1. Return exactly the keys in the requested schema — do not add other fields
+2. Course_Overview (if requested): 2-3 paragraphs describing what the course covers
+3. LO_Description (if requested): a detailed description of each Learning Unit's outcome,
+   one Learning_Units entry per LU in CP order
+4. For Assessment_Methods_Details, include Evidence for each LO showing what evidence is required
+5. If a field cannot be found in the document, use an empty string or empty list
+6. Do NOT truncate or omit any data
+"""
+
+
+def _partial_schema(extracted: dict) -> str:
+    """JSON schema text for the fields the extractor did not fill."""
+    entries = []
+    for key, schema in FIELD_SCHEMA.items():
+        if key == "Learning_Units" and key in extracted:
+            entries.append(f'    "{key}": {LU_GENERATIVE_SCHEMA}')
+        elif key not in extracted:
+            entries.append(f'    "{key}": {schema}')
+    return "{\n" + ",\n".join(entries) + "\n}"
+
+
+def _merge_extracted(context: dict, extracted: dict) -> dict:
+    """Overlay the deterministic fields on the agent output (extracted values win).
+
+    The hour fields arrive from the extractor as a consistent set or not at
+    all, so agent-answered hours are never mixed with extracted ones.
+    """
+    agent_units = context.get("Learning_Units") or []
+    for key, value in extracted.items():
+        if key != "Learning_Units":
+            context[key] = value
+    if "Learning_Units" in extracted:
+        by_title = {str(u.get("LU_Title", "")).split(":")[0].strip().upper(): u
+                    for u in agent_units if isinstance(u, dict)}
+        units = []
+        for index, unit in enumerate(extracted["Learning_Units"]):
+            generated = by_title.get(unit["LU_Title"].split(":")[0].strip().upper())
+            if generated is None and index < len(agent_units) and isinstance(agent_units[index], dict):
+                generated = agent_units[index]
+            generated = generated or {}
+            units.append({
+                **unit,
+                "LO_Description": generated.get("LO_Description", ""),
+                "Assessment_Methods": generated.get("Assessment_Methods", []),
+                "Instructional_Methods": generated.get("Instructional_Methods", []),
+            })
+        context["Learning_Units"] = units
+    return context
+
+
 async def interpret_cp(parsed_cp_path: str, output_path: str = None,
-                       course_ref_code: str = None, course_url: str = None) -> dict:
+                       course_ref_code: str = None, course_url: str = None,
+                       deterministic: bool = True) -> dict:
     """
     Interpret a parsed Course Proposal and extract structured course data.
 
@@ -90,6 +217,8 @@ async def interpret_cp(parsed_cp_path: str, output_path: str = None,
         output_path: Path to save the context JSON. Defaults to output/context.json.
         course_ref_code: Optional TGS reference code to supplement missing data.
         course_url: Optional course URL to fetch and supplement missing data.
+        deterministic: Read template-fixed fields from the CP tables first and
+            only ask the agent for the rest. False sends the full schema.
 
     Returns:
         Structured course data as a dict.
@@ -110,7 +239,27 @@ async def interpret_cp(parsed_cp_path: str, output_path: str = None,
         supplement += f"\n\nA course URL has been provided: {course_url}"
         supplement += "\nUse the WebFetch tool to fetch this URL and extract any missing information (e.g. Course_Fee, TGS_Ref_No, Course_Title, course description, etc.) to supplement the CP data."
 
-    prompt = f"""Read the following parsed Course Proposal document and extract ALL structured course information into JSON format.
+    extracted = extract_cp_fields(cp_text) if deterministic else {}
+
+    # Partial prompt only when the CP tables actually yielded fields; a given
+    # course_ref_code alone is not worth dropping the full-schema prompt for
+    if extracted:
+        known = {**extracted, "TGS_Ref_No": course_ref_code} if course_ref_code else extracted
+        system_prompt = PARTIAL_SYSTEM_PROMPT
+        prompt = f"""Read the following parsed Course Proposal document and return ONLY these fields as JSON:
+
+{_partial_schema(known)}
+
+--- PARSED COURSE PROPOSAL ---
+{cp_text}
+--- END ---
+{supplement}
+
+Return ONLY the JSON object, no additional text."""
+        logger.info(f"CP interpreter: {len(extracted)} field(s) read from CP tables, agent asked for the rest")
+    else:
+        system_prompt = SYSTEM_PROMPT
+        prompt = f"""Read the following parsed Course Proposal document and extract ALL structured course information into JSON format.
 
 Follow the JSON schema exactly as specified in your instructions.
 
@@ -130,12 +279,18 @@ Return ONLY the JSON object, no additional text."""
 
     context = await run_agent_json(
         prompt=prompt,
-        system_prompt=SYSTEM_PROMPT,
+        system_prompt=system_prompt,
         tools=tools,
         max_turns=max_turns,
         model="claude-sonnet-4-20250514",
+        priority=PRIORITY_INTERACTIVE,
     )
 
+    if extracted:
+        context = _merge_extracted(context, extracted)
+    if course_ref_code:
+        context["TGS_Ref_No"] = course_ref_code
+
     # Save to output file
     os.makedirs(os.path.dirname(output_path), exist_ok=True)
     with open(output_path, 'w', encoding='utf-8') as f:
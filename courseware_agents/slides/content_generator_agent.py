@@ -20,7 +20,7 @@ import asyncio
 import logging
 import os
 from typing import Optional
-from courseware_agents.base import run_agent_json
+from courseware_agents.base import run_agent_json, PRIORITY_BULK
 from generate_slides.multi_agent_config import (
     CONTENT_MAX_TURNS,
     CONTENT_MODEL,
@@ -248,6 +248,7 @@ RULES:
             tools=tools,
             max_turns=CONTENT_MAX_TURNS,
             model=model or CONTENT_MODEL,
+            priority=PRIORITY_BULK,
         )
 
         blocks = result.get("content_blocks", [])
@@ -328,6 +329,7 @@ def _fallback_content_blocks(
 
     return {
         "topic": topic_title,
+        "fallback": True,  # Marks bullet-point fallback so resumed runs retry it
         "content_blocks": blocks[:num_blocks],
         "activity": {
             "title": f"{topic_title} Practice",
@@ -463,28 +465,25 @@ async def generate_all_content_blocks(
     Returns:
         Dict mapping topic_title → content blocks result.
     """
-    # 5 parallel agent sessions for faster content generation
-    sem = asyncio.Semaphore(5)
-
+    # Concurrency is bounded by the agent governor in courseware_agents.base
     def _blocks_for(i: int) -> int:
         if per_topic_blocks and i < len(per_topic_blocks):
             return per_topic_blocks[i]
         return num_blocks_per_topic
 
-    async def _bounded_generate(t, i):
-        async with sem:
-            return await generate_content_blocks(
-                topic_title=t.get("topic_title", f"Topic {i+1}"),
-                research_data=research_map.get(t.get("topic_title", ""), {}),
-                bullet_points=t.get("bullet_points", []),
-                course_title=course_title,
-                lu_title=t.get("lu_title", ""),
-                lo_description=t.get("lo_description", ""),
-                num_blocks=_blocks_for(i),
-                model=model,
-            )
-
-    tasks = [_bounded_generate(t, i) for i, t in enumerate(topics)]
+    tasks = [
+        generate_content_blocks(
+            topic_title=t.get("topic_title", f"Topic {i+1}"),
+            research_data=research_map.get(t.get("topic_title", ""), {}),
+            bullet_points=t.get("bullet_points", []),
+            course_title=course_title,
+            lu_title=t.get("lu_title", ""),
+            lo_description=t.get("lo_description", ""),
+            num_blocks=_blocks_for(i),
+            model=model,
+        )
+        for i, t in enumerate(topics)
+    ]
     results = await asyncio.gather(*tasks, return_exceptions=True)
 
     content_map = {}
@@ -11,7 +11,7 @@ HYBRID APPROACH (AI-first, deterministic fallback):
 
 Tools & Skills:
   - Claude Agent SDK with infographic-syntax-creator skill knowledge
-  - Playwright (Chromium) for HTML → PNG screenshot
+  - Playwright (Chromium) for HTML → PNG screenshot, via a pool of warm pages
   - Deterministic DSL builder as fallback
 
 AntV Infographic: https://github.com/antvis/Infographic
@@ -26,10 +26,11 @@ from generate_slides.multi_agent_config import (
     INFOGRAPHIC_MAX_TURNS,
     FAST_MODEL,
 )
+from courseware_agents.slides.render_pool import InfographicRenderPool, ANTV_RESOURCE_LOADER_JS
 
 logger = logging.getLogger(__name__)
 
-# No concurrency — sequential rendering with a single shared browser is most reliable
+# Rendering concurrency is bounded by InfographicRenderPool (warm pages, one browser)
 
 # ---------------------------------------------------------------------------
 # AntV Infographic template mapping by visualization type
@@ -383,9 +384,6 @@ def build_antv_dsl(content_block: dict, assigned_template: str) -> str:
 # AI-powered DSL generation (Claude Agent SDK) with deterministic fallback
 # ---------------------------------------------------------------------------
 
-# AI DSL concurrency limit — max 2 concurrent agent calls for DSL
-_DSL_AI_SEMAPHORE = asyncio.Semaphore(2)
-
 INFOGRAPHIC_DSL_SYSTEM_PROMPT = """You are an AntV Infographic DSL expert. Output ONLY valid AntV Infographic syntax — NO markdown, NO code blocks, NO explanation.
 
 SYNTAX RULES:
@@ -479,7 +477,7 @@ async def generate_dsl_with_ai(
     Returns:
         AntV DSL string, or None if AI generation fails.
     """
-    from courseware_agents.base import run_agent
+    from courseware_agents.base import run_agent, PRIORITY_BULK
 
     block_data = content_block.get("data", {})
     title = block_data.get("title", topic_title)
@@ -527,14 +525,14 @@ CRITICAL — every text must be SHORT and COMPLETE (never cut off):
 Output ONLY the DSL — no markdown, no explanation."""
 
     try:
-        async with _DSL_AI_SEMAPHORE:
-            result = await run_agent(
-                prompt=prompt,
-                system_prompt=INFOGRAPHIC_DSL_SYSTEM_PROMPT,
-                tools=[],  # No tools needed — pure text generation
-                max_turns=INFOGRAPHIC_MAX_TURNS,
-                model=model or FAST_MODEL,
-            )
+        result = await run_agent(
+            prompt=prompt,
+            system_prompt=INFOGRAPHIC_DSL_SYSTEM_PROMPT,
+            tools=[],  # No tools needed — pure text generation
+            max_turns=INFOGRAPHIC_MAX_TURNS,
+            model=model or FAST_MODEL,
+            priority=PRIORITY_BULK,
+        )
 
         if not result:
             return None
@@ -579,11 +577,13 @@ async def generate_single_infographic(
     output_dir: str,
     model: Optional[str] = None,
     browser=None,
+    pool=None,
 ) -> dict:
     """Generate ONE infographic from a content block.
 
     Builds AntV DSL deterministically from content block data,
-    renders HTML, and converts to PNG via Playwright.
+    renders HTML, and converts to PNG via Playwright — on a warm page from
+    `pool` (InfographicRenderPool) if given, else a new page on `browser`.
     """
     sub_title = content_block.get("sub_title", f"Slide {slide_position + 1}")
     viz_type = content_block.get("visualization_type", "overview")
@@ -617,17 +617,23 @@ async def generate_single_infographic(
         if not antv_syntax:
             raise ValueError(f"Empty DSL/JSON generated for '{sub_title}'")
 
-        # Write HTML
         safe_title = _safe_filename(topic_title)
-        html_filename = f"infographic_{safe_title}_pos{slide_position}.html"
-        html_path = os.path.join(output_dir, html_filename)
-        _write_antv_html(html_path, antv_syntax, f"{topic_title} — {sub_title}")
-
-        # Convert to PNG (with browser semaphore)
         png_filename = f"infographic_{safe_title}_pos{slide_position}.png"
         png_path = os.path.join(output_dir, png_filename)
+        html_path = None
 
-        png_ok = await _html_to_png(html_path, png_path, browser=browser)
+        if pool is not None and pool.mode == "live":
+            # Live page already has AntV loaded — send the options payload only
+            png_ok = await pool.render_options(_to_options_json(antv_syntax), png_path)
+        else:
+            # Write a self-contained HTML file and screenshot it
+            html_filename = f"infographic_{safe_title}_pos{slide_position}.html"
+            html_path = os.path.join(output_dir, html_filename)
+            _write_antv_html(html_path, antv_syntax, f"{topic_title} — {sub_title}")
+            if pool is not None:
+                png_ok = await pool.render(html_path, png_path)
+            else:
+                png_ok = await _html_to_png(html_path, png_path, browser=browser)
 
         result = {
             "topic": topic_title,
@@ -840,12 +846,16 @@ async def generate_all_infographics(
     content_map: dict,
     output_dir: str = None,
     model: Optional[str] = None,
+    only_topics: Optional[set] = None,
 ) -> dict:
-    """Generate infographics for ALL topics using ONE shared browser.
+    """Generate infographics for ALL topics on a pool of warm browser pages.
+
+    Starts one InfographicRenderPool (single Chromium, a bounded number of
+    warm pages), renders every topic's infographics concurrently on it, and
+    closes it at the end. Page crashes are recovered per page by the pool.
 
-    Creates a single Playwright browser at the start, processes all topics
-    sequentially, and closes the browser at the end. This is the most
-    reliable approach — no concurrency issues, no resource exhaustion.
+    If only_topics is given, only those topic titles are rendered (used when
+    resuming a checkpointed run). Assignments are still filled in for all topics.
     """
     if output_dir is None:
         output_dir = tempfile.mkdtemp(prefix="multi_agent_infographics_")
@@ -863,26 +873,7 @@ async def generate_all_infographics(
                 blocks = topic_content.get("content_blocks", [])
 
                 if not assignments and blocks:
-                    import random
-                    assignments = []
-                    used_templates = set()
-                    for bi, b in enumerate(blocks):
-                        viz_type = b.get("visualization_type", "overview")
-                        suggested = b.get("suggested_template", "")
-                        if not suggested or suggested in used_templates:
-                            candidates = TEMPLATE_MAP.get(viz_type, TEMPLATE_MAP["overview"])
-                            available = [t for t in candidates if t not in used_templates]
-                            if not available:
-                                available = candidates
-                            suggested = random.choice(available)
-                        used_templates.add(suggested)
-                        assignments.append({
-                            "slide_position": bi,
-                            "content_block_index": bi,
-                            "sub_title": b.get("sub_title", ""),
-                            "visualization_type": viz_type,
-                            "assigned_template": suggested,
-                        })
+                    assignments = assignments_from_blocks(blocks)
                     # Write back to skeleton so assemble_final_slides can find them
                     topic["infographic_assignments"] = assignments
 
@@ -890,6 +881,9 @@ async def generate_all_infographics(
                     logger.warning(f"No assignments or blocks for topic '{t_title}' — skipping")
                     continue
 
+                if only_topics is not None and t_title not in only_topics:
+                    continue
+
                 safe_title = _safe_filename(t_title)
                 topic_dir = os.path.join(output_dir, safe_title)
                 os.makedirs(topic_dir, exist_ok=True)
@@ -913,29 +907,8 @@ async def generate_all_infographics(
     total_attempted = 0
 
     try:
-        from playwright.async_api import async_playwright
-        pw = await async_playwright().start()
-        # Robust Chromium launch with retry
-        browser = None
-        for _attempt in range(3):
-            try:
-                browser = await pw.chromium.launch(
-                    headless=True,
-                    args=[
-                        "--disable-gpu",
-                        "--no-sandbox",
-                        "--disable-dev-shm-usage",
-                        "--disable-web-security",
-                        "--allow-file-access-from-files",
-                    ],
-                )
-                break
-            except Exception as launch_err:
-                logger.warning(f"Browser launch attempt {_attempt + 1} failed: {launch_err}")
-                await asyncio.sleep(1)
-        if browser is None:
-            raise RuntimeError("Failed to launch Chromium after 3 attempts")
-        logger.info("Playwright browser launched for infographic generation")
+        pool = InfographicRenderPool()
+        await pool.start()
     except Exception as e:
         logger.error(f"Failed to launch Playwright: {e}")
         # Return empty map — all topics will get text fallback
@@ -943,70 +916,33 @@ async def generate_all_infographics(
             infographic_map[task["title"]] = []
         return infographic_map
 
-    _BROWSER_ARGS = [
-        "--disable-gpu", "--no-sandbox",
-        "--disable-dev-shm-usage", "--disable-web-security",
-        "--allow-file-access-from-files",
-    ]
-
-    async def _fresh_browser():
-        """Launch a fresh browser instance."""
-        return await pw.chromium.launch(headless=True, args=_BROWSER_ARGS)
-
     try:
-        # Process topics SEQUENTIALLY — browser is managed per-infographic
-        # inside generate_topic_infographics (restarts every 8 renders).
-        for ti, task in enumerate(topic_tasks):
-            logger.info(f"Rendering topic {ti + 1}/{len(topic_tasks)}: '{task['title']}' ({len(task['assignments'])} infographics)")
-            try:
-                result, browser = await generate_topic_infographics(
+        # All topics render concurrently; the pool bounds how many pages are busy
+        results = await asyncio.gather(
+            *[
+                _render_topic_pooled(
                     topic_title=task["title"],
                     content_blocks=task["blocks"],
                     infographic_assignments=task["assignments"],
                     output_dir=task["dir"],
+                    pool=pool,
                     model=model,
-                    browser=browser,
-                    pw=pw,
                 )
-                infographic_map[task["title"]] = result
-                gen = sum(1 for r in result if r.get("generated"))
-                total_generated += gen
-                total_attempted += len(result)
-            except Exception as e:
-                logger.error(f"All infographics failed for '{task['title']}': {e}", exc_info=True)
-                infographic_map[task["title"]] = []
-
-            # ALWAYS restart browser between topics for clean state
-            if ti < len(topic_tasks) - 1:
-                try:
-                    if browser:
-                        await browser.close()
-                except Exception:
-                    pass
-                browser = None
-                for _attempt in range(3):
-                    try:
-                        browser = await _fresh_browser()
-                        logger.info(f"Browser restarted between topics ({ti + 1}/{len(topic_tasks)})")
-                        break
-                    except Exception as restart_err:
-                        logger.warning(f"Browser restart attempt {_attempt + 1} failed: {restart_err}")
-                        await asyncio.sleep(1)
-                if browser is None:
-                    logger.error("Browser restart failed 3x — remaining topics will use text fallback")
-                    break
+                for task in topic_tasks
+            ],
+            return_exceptions=True,
+        )
     finally:
-        # Always close browser and playwright
-        try:
-            if browser:
-                await browser.close()
-        except Exception:
-            pass
-        try:
-            await pw.stop()
-        except Exception:
-            pass
-        logger.info("Playwright browser closed")
+        await pool.close()
+
+    for task, result in zip(topic_tasks, results):
+        if isinstance(result, Exception):
+            logger.error(f"All infographics failed for '{task['title']}': {result}")
+            infographic_map[task["title"]] = []
+            continue
+        infographic_map[task["title"]] = result
+        total_generated += sum(1 for r in result if r.get("generated"))
+        total_attempted += len(result)
 
     logger.info(
         f"Infographics complete: {total_generated}/{total_attempted} generated "
@@ -1015,6 +951,162 @@ async def generate_all_infographics(
     return infographic_map
 
 
+async def _render_topic_pooled(
+    topic_title: str,
+    content_blocks: list,
+    infographic_assignments: list,
+    output_dir: str,
+    pool,
+    model: Optional[str] = None,
+) -> list:
+    """Render all infographics of a topic concurrently on the shared render pool.
+
+    Same per-infographic policy as generate_topic_infographics: if the
+    assigned template fails, retry once with a fallback list template.
+    """
+    _FALLBACK_TEMPLATES = [
+        "list-grid-badge-card",
+        "list-grid-candy-card-lite",
+        "list-row-horizontal-icon-arrow",
+        "list-column-done-list",
+    ]
+
+    async def _one(assignment: dict) -> dict:
+        block_idx = assignment.get("content_block_index", 0)
+        slide_pos = assignment.get("slide_position", 0)
+        assigned_template = assignment.get("assigned_template", "list-grid-badge-card")
+
+        if block_idx < len(content_blocks):
+            block = content_blocks[block_idx]
+        else:
+            block = {
+                "sub_title": assignment.get("sub_title", f"Slide {slide_pos + 1}"),
+                "visualization_type": assignment.get("visualization_type", "overview"),
+                "data": {
+                    "title": assignment.get("sub_title", topic_title),
+                    "items": [{"label": topic_title[:15], "desc": "Key content", "icon": "mdi/information"}],
+                },
+            }
+
+        result = await generate_single_infographic(
+            content_block=block,
+            assigned_template=assigned_template,
+            topic_title=topic_title,
+            slide_position=slide_pos,
+            output_dir=output_dir,
+            model=model,
+            pool=pool,
+        )
+        if not result.get("generated"):
+            result = await generate_single_infographic(
+                content_block=block,
+                assigned_template=_FALLBACK_TEMPLATES[slide_pos % len(_FALLBACK_TEMPLATES)],
+                topic_title=topic_title,
+                slide_position=slide_pos,
+                output_dir=output_dir,
+                model=model,
+                pool=pool,
+            )
+        return result
+
+    infographic_list = list(await asyncio.gather(*[_one(a) for a in infographic_assignments]))
+    generated = sum(1 for r in infographic_list if r.get("generated"))
+    logger.info(f"Topic '{topic_title}': {generated}/{len(infographic_list)} infographics generated")
+    return infographic_list
+
+
+async def render_infographic_stream(
+    queue: asyncio.Queue,
+    output_dir: str,
+    model: Optional[str] = None,
+) -> dict:
+    """Render topics as they arrive on a queue, using the shared render pool.
+
+    Used by the streaming pipeline: each queue item is a
+    (topic_title, content_blocks, infographic_assignments) tuple, and a None
+    item ends the stream. Empty assignments are derived from the content
+    blocks. Rendering of early topics overlaps with research and content
+    generation of later ones.
+
+    Returns:
+        Dict mapping topic_title → list of infographic results.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    infographic_map = {}
+    pending = {}
+
+    pool = InfographicRenderPool()
+    try:
+        await pool.start()
+    except Exception as e:
+        logger.error(f"Failed to launch Playwright: {e}")
+        pool = None
+
+    try:
+        while True:
+            item = await queue.get()
+            if item is None:
+                break
+            t_title, blocks, assignments = item
+            if not assignments:
+                assignments = assignments_from_blocks(blocks)
+            if pool is None or not assignments:
+                infographic_map[t_title] = []
+                continue
+
+            topic_dir = os.path.join(output_dir, _safe_filename(t_title))
+            os.makedirs(topic_dir, exist_ok=True)
+            pending[t_title] = asyncio.create_task(_render_topic_pooled(
+                topic_title=t_title,
+                content_blocks=blocks,
+                infographic_assignments=assignments,
+                output_dir=topic_dir,
+                pool=pool,
+                model=model,
+            ))
+
+        for t_title, task in pending.items():
+            try:
+                infographic_map[t_title] = await task
+            except Exception as e:
+                logger.error(f"All infographics failed for '{t_title}': {e}", exc_info=True)
+                infographic_map[t_title] = []
+    finally:
+        if pool is not None:
+            await pool.close()
+
+    return infographic_map
+
+
+def assignments_from_blocks(blocks: list) -> list:
+    """Build infographic assignments for a topic directly from its content blocks.
+
+    Uses each block's suggested_template, swapping in an unused template of
+    the same visualization type when the suggestion is missing or repeated.
+    """
+    import random
+    assignments = []
+    used_templates = set()
+    for bi, b in enumerate(blocks):
+        viz_type = b.get("visualization_type", "overview")
+        suggested = b.get("suggested_template", "")
+        if not suggested or suggested in used_templates:
+            candidates = TEMPLATE_MAP.get(viz_type, TEMPLATE_MAP["overview"])
+            available = [t for t in candidates if t not in used_templates]
+            if not available:
+                available = candidates
+            suggested = random.choice(available)
+        used_templates.add(suggested)
+        assignments.append({
+            "slide_position": bi,
+            "content_block_index": bi,
+            "sub_title": b.get("sub_title", ""),
+            "visualization_type": viz_type,
+            "assigned_template": suggested,
+        })
+    return assignments
+
+
 # ---------------------------------------------------------------------------
 # Utilities
 # ---------------------------------------------------------------------------
@@ -1064,15 +1156,8 @@ def _write_antv_html(html_path: str, syntax: str, title: str) -> None:
     INLINES the AntV script directly into HTML for 100% reliable rendering
     (no CDN, no file:// cross-origin issues).
     """
-    import json as _json
     safe_title = title.replace("<", "&lt;").replace(">", "&gt;")
-
-    # Convert DSL syntax to JSON options if needed
-    if syntax.strip().startswith("{"):
-        options_json = syntax
-    else:
-        # Legacy DSL string — convert to JSON options
-        options_json = _dsl_to_json_options(syntax)
+    options_json = _to_options_json(syntax)
 
     # Inline the script for reliability — no network, no file:// issues
     antv_js = _get_antv_script_content()
@@ -1096,25 +1181,7 @@ def _write_antv_html(html_path: str, syntax: str, title: str) -> None:
 <body>
   <div id="container"></div>
   {script_tag}
-  <script>
-    AntVInfographic.registerResourceLoader(async (config) => {{
-      const {{ data, scene }} = config;
-      try {{
-        let url;
-        if (scene === 'icon') url = `https://api.iconify.design/${{data}}.svg`;
-        else if (scene === 'illus') url = `https://raw.githubusercontent.com/balazser/undraw-svg-collection/refs/heads/main/svgs/${{data}}.svg`;
-        else return null;
-        const controller = new AbortController();
-        const timeoutId = setTimeout(() => controller.abort(), 3000);
-        const r = await fetch(url, {{ referrerPolicy: 'no-referrer', signal: controller.signal }});
-        clearTimeout(timeoutId);
-        if (!r.ok) return null;
-        const text = await r.text();
-        if (!text || !text.trim().startsWith('<svg')) return null;
-        return AntVInfographic.loadSVGResource(text);
-      }} catch (e) {{ return null; }}
-    }});
-  </script>
+  <script>{ANTV_RESOURCE_LOADER_JS}</script>
   <script>
     window.__RENDERED__ = false;
     try {{
@@ -1126,8 +1193,19 @@ def _write_antv_html(html_path: str, syntax: str, title: str) -> None:
       const opts = {options_json};
       ig.setOptions(opts);
       ig.performRender();
-      setTimeout(() => {{ try {{ ig.performRender(); }} catch(e) {{}} window.__RENDERED__ = true; }}, 2000);
-      setTimeout(() => {{ try {{ ig.performRender(); }} catch(e) {{}} window.__RENDERED__ = true; }}, 4000);
+      // Ready once resource fetches have settled: re-render with loaded icons,
+      // then flag after two frames so the final paint is on screen.
+      const started = performance.now();
+      const settle = () => {{
+        const quiet = window.__PENDING__ === 0 && performance.now() - window.__LAST_LOAD__ > 150;
+        if (quiet || performance.now() - started > 6000) {{
+          try {{ ig.performRender(); }} catch(e) {{}}
+          requestAnimationFrame(() => requestAnimationFrame(() => {{ window.__RENDERED__ = true; }}));
+        }} else {{
+          setTimeout(settle, 100);
+        }}
+      }};
+      setTimeout(settle, 100);
     }} catch (e) {{
       console.error('AntV render error:', e);
       window.__RENDERED__ = true;
@@ -1141,6 +1219,14 @@ def _write_antv_html(html_path: str, syntax: str, title: str) -> None:
     logger.debug(f"AntV HTML written: {html_path}")
 
 
+def _to_options_json(syntax: str) -> str:
+    """Return AntV setOptions() JSON for a JSON-options string or legacy DSL."""
+    if syntax.strip().startswith("{"):
+        return syntax
+    # Legacy DSL string — convert to JSON options
+    return _dsl_to_json_options(syntax)
+
+
 def _dsl_to_json_options(dsl: str) -> str:
     """Convert legacy AntV DSL syntax string to JSON options for setOptions() API."""
     import json as _json
@@ -1206,16 +1292,15 @@ async def _html_to_png(html_path: str, png_path: str, browser=None) -> bool:
                 page.set_default_timeout(30000)
                 # domcontentloaded is enough — script is inlined, no network needed
                 await page.goto(file_url, wait_until="domcontentloaded")
-                # Wait for AntV to finish rendering (set by our HTML template)
+                # Wait for AntV to finish rendering (set by our HTML template
+                # once icon fetches settle); screenshot whatever is there on timeout
                 try:
                     await page.wait_for_function(
                         "() => window.__RENDERED__ === true",
                         timeout=wait_ms,
                     )
                 except Exception:
-                    await page.wait_for_timeout(wait_ms)
-                # Brief buffer for final render pass
-                await page.wait_for_timeout(500)
+                    pass
                 await page.screenshot(path=png_path, full_page=True)
             finally:
                 await page.close()
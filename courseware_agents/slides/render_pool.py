@@ -0,0 +1,315 @@
+"""
+Infographic Render Pool — Warm Playwright pages for AntV HTML → PNG
+
+Phase 4 rendering service. Keeps ONE Chromium browser with a bounded pool of
+warm browser contexts (one page each) so several infographics render at the
+same time across topics, instead of one page per PNG in a browser that is
+restarted between topics.
+
+Two render modes:
+  - "live" (default): each page loads the AntV bundle ONCE, then receives
+    successive option payloads via page.evaluate() and is screenshotted after
+    each performRender(). No per-infographic HTML file, no re-parse of the
+    864 KB bundle.
+  - "file": navigate to a self-contained HTML file per infographic
+    (written by infographic_agent._write_antv_html).
+
+Readiness is signalled by the page itself (once all icon/illustration fetches
+have settled) rather than fixed sleeps. A page that crashes or times out is
+replaced on its own; the browser is only relaunched if it has disconnected.
+
+Usage:
+    async with InfographicRenderPool(size=4) as pool:
+        ok = await pool.render_options(options_json, png_path)   # live mode
+        ok = await pool.render(html_path, png_path)              # file mode
+"""
+
+import asyncio
+import json
+import logging
+import os
+from pathlib import Path
+from typing import Awaitable, Callable, Optional
+
+from generate_slides.multi_agent_config import (
+    INFOGRAPHIC_WIDTH,
+    INFOGRAPHIC_HEIGHT,
+    INFOGRAPHIC_RENDER_CONCURRENCY,
+    INFOGRAPHIC_RENDER_MODE,
+)
+
+logger = logging.getLogger(__name__)
+
+_BROWSER_ARGS = [
+    "--disable-gpu", "--no-sandbox",
+    "--disable-dev-shm-usage", "--disable-web-security",
+    "--allow-file-access-from-files",
+]
+
+MIN_PNG_SIZE = 10000           # Smaller PNGs are blank/partial renders
+RENDER_TIMEOUT_MS = 15000      # Max wait for window.__RENDERED__
+MAX_RENDERS_PER_PAGE = 25      # Recycle a context after this many renders
+
+ANTV_SCRIPT_PATH = os.path.join(os.path.dirname(__file__), "templates", "infographic.min.js")
+ANTV_CDN_URL = "https://unpkg.com/@antv/infographic@0.2.15/dist/infographic.min.js"
+
+# Icon/illustration loader shared by file-mode HTML and live-mode pages.
+# Tracks outstanding fetches so readiness can wait for them to settle.
+ANTV_RESOURCE_LOADER_JS = """
+window.__PENDING__ = 0;
+window.__LAST_LOAD__ = 0;
+AntVInfographic.registerResourceLoader(async (config) => {
+  const { data, scene } = config;
+  window.__PENDING__++;
+  try {
+    let url;
+    if (scene === 'icon') url = `https://api.iconify.design/${data}.svg`;
+    else if (scene === 'illus') url = `https://raw.githubusercontent.com/balazser/undraw-svg-collection/refs/heads/main/svgs/${data}.svg`;
+    else return null;
+    const controller = new AbortController();
+    const timeoutId = setTimeout(() => controller.abort(), 3000);
+    const r = await fetch(url, { referrerPolicy: 'no-referrer', signal: controller.signal });
+    clearTimeout(timeoutId);
+    if (!r.ok) return null;
+    const text = await r.text();
+    if (!text || !text.trim().startsWith('<svg')) return null;
+    return AntVInfographic.loadSVGResource(text);
+  } catch (e) { return null; }
+  finally { window.__PENDING__--; window.__LAST_LOAD__ = performance.now(); }
+});
+"""
+
+_LIVE_HOST_HTML = """<!DOCTYPE html>
+<html lang="en">
+<head>
+  <meta charset="utf-8">
+  <style>
+    * { margin: 0; padding: 0; box-sizing: border-box; }
+    body { background: #FFFFFF; }
+    #container { width: 1792px; min-height: 1024px; }
+  </style>
+</head>
+<body><div id="container"></div></body>
+</html>"""
+
+# Renders one options payload into #container; resolves with null when the
+# final paint is on screen, or with an error string.
+_LIVE_RENDER_JS = """
+window.__renderInfographic = (opts) => new Promise((resolve) => {
+  const container = document.getElementById('container');
+  if (window.__IG__) { try { window.__IG__.destroy(); } catch (e) {} }
+  container.innerHTML = '';
+  let ig;
+  try {
+    ig = new AntVInfographic.Infographic({ container: '#container', width: 1792, height: 1024 });
+    window.__IG__ = ig;
+    ig.setOptions(opts);
+    ig.performRender();
+  } catch (e) { resolve(String(e)); return; }
+  const started = performance.now();
+  const settle = () => {
+    const quiet = window.__PENDING__ === 0 && performance.now() - window.__LAST_LOAD__ > 150;
+    if (quiet || performance.now() - started > 6000) {
+      try { ig.performRender(); } catch (e) {}
+      requestAnimationFrame(() => requestAnimationFrame(() => resolve(null)));
+    } else {
+      setTimeout(settle, 100);
+    }
+  };
+  setTimeout(settle, 100);
+});
+"""
+
+
+class _PageSlot:
+    """One warm browser context + page owned by the pool."""
+
+    def __init__(self):
+        self.context = None
+        self.page = None
+        self.renders = 0
+        self.browser_generation = -1
+        self.live_ready = False  # AntV bundle + render hook loaded on this page
+
+
+class InfographicRenderPool:
+    """Bounded pool of warm Playwright pages for rendering AntV infographics."""
+
+    def __init__(self, size: int = INFOGRAPHIC_RENDER_CONCURRENCY,
+                 mode: str = INFOGRAPHIC_RENDER_MODE):
+        if mode not in ("live", "file"):
+            raise ValueError(f"Unknown render mode '{mode}' (expected 'live' or 'file')")
+        self.size = max(1, size)
+        self.mode = mode
+        self._pw = None
+        self._browser = None
+        self._browser_generation = 0
+        self._browser_lock = asyncio.Lock()
+        self._idle: asyncio.Queue = asyncio.Queue()
+        self.stats = {"rendered": 0, "failed": 0, "page_recycles": 0, "browser_relaunches": 0}
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    async def start(self) -> None:
+        """Start Playwright and launch the browser. Raises if Chromium cannot start."""
+        from playwright.async_api import async_playwright
+        self._pw = await async_playwright().start()
+        try:
+            await self._launch_browser()
+        except Exception:
+            await self._pw.stop()
+            self._pw = None
+            raise
+        for _ in range(self.size):
+            self._idle.put_nowait(_PageSlot())
+        logger.info(f"Infographic render pool started ({self.size} pages, {self.mode} mode)")
+
+    async def close(self) -> None:
+        while not self._idle.empty():
+            await self._close_slot(self._idle.get_nowait())
+        try:
+            if self._browser:
+                await self._browser.close()
+        except Exception:
+            pass
+        try:
+            if self._pw:
+                await self._pw.stop()
+        except Exception:
+            pass
+        self._browser = None
+        self._pw = None
+        logger.info(f"Infographic render pool closed: {self.stats}")
+
+    async def render(self, html_path: str, png_path: str) -> bool:
+        """Render one self-contained HTML file to PNG (file mode)."""
+        file_url = Path(html_path).as_uri()
+
+        async def _load(slot: _PageSlot) -> None:
+            slot.live_ready = False  # Navigating away drops the live runtime
+            await slot.page.goto(file_url, wait_until="domcontentloaded")
+            await slot.page.wait_for_function(
+                "() => window.__RENDERED__ === true", timeout=RENDER_TIMEOUT_MS,
+            )
+
+        return await self._render_with_retry(_load, os.path.basename(html_path), png_path)
+
+    async def render_options(self, options_json: str, png_path: str) -> bool:
+        """Render one AntV options payload to PNG on a live page (live mode)."""
+        options = json.loads(options_json)
+
+        async def _load(slot: _PageSlot) -> None:
+            if not slot.live_ready:
+                await self._init_live_page(slot)
+            error = await asyncio.wait_for(
+                slot.page.evaluate("(opts) => window.__renderInfographic(opts)", options),
+                timeout=RENDER_TIMEOUT_MS / 1000,
+            )
+            if error:
+                raise RuntimeError(f"AntV render error: {error}")
+
+        return await self._render_with_retry(_load, os.path.basename(png_path), png_path)
+
+    async def _render_with_retry(
+        self,
+        load: Callable[[_PageSlot], Awaitable[None]],
+        label: str,
+        png_path: str,
+    ) -> bool:
+        """Run load() on a pooled page and screenshot it. Retries once on a fresh page."""
+        for attempt in range(2):
+            slot = await self._idle.get()
+            try:
+                await self._ensure_slot(slot)
+                await load(slot)
+                await slot.page.screenshot(path=png_path, full_page=True)
+                slot.renders += 1
+                if os.path.exists(png_path) and os.path.getsize(png_path) >= MIN_PNG_SIZE:
+                    self.stats["rendered"] += 1
+                    return True
+                logger.warning(f"PNG small for {label} (attempt {attempt + 1}) — retrying on fresh page")
+                await self._close_slot(slot)
+            except Exception as e:
+                logger.warning(f"Render attempt {attempt + 1} failed for {label}: {e}")
+                await self._close_slot(slot)
+            finally:
+                if slot.renders >= MAX_RENDERS_PER_PAGE:
+                    await self._close_slot(slot)
+                self._idle.put_nowait(slot)
+
+        self.stats["failed"] += 1
+        # Keep a non-empty partial render rather than nothing (matches _html_to_png)
+        return os.path.exists(png_path) and os.path.getsize(png_path) > 0
+
+    async def _init_live_page(self, slot: _PageSlot) -> None:
+        """Load the AntV bundle and render hook into a page, once per page."""
+        page = slot.page
+        await page.set_content(_LIVE_HOST_HTML)
+        if os.path.exists(ANTV_SCRIPT_PATH):
+            await page.add_script_tag(path=ANTV_SCRIPT_PATH)
+        else:
+            await page.add_script_tag(url=ANTV_CDN_URL)
+        await page.add_script_tag(content=ANTV_RESOURCE_LOADER_JS + _LIVE_RENDER_JS)
+        slot.live_ready = True
+
+    async def _ensure_slot(self, slot: _PageSlot) -> None:
+        """(Re)create the slot's context/page if it is missing, closed or stale."""
+        if (
+            slot.page is not None
+            and not slot.page.is_closed()
+            and slot.browser_generation == self._browser_generation
+        ):
+            return
+        await self._close_slot(slot)
+        browser = await self._get_browser()
+        slot.context = await browser.new_context(
+            viewport={"width": INFOGRAPHIC_WIDTH, "height": INFOGRAPHIC_HEIGHT},
+        )
+        slot.page = await slot.context.new_page()
+        slot.page.set_default_timeout(30000)
+        slot.browser_generation = self._browser_generation
+
+    async def _close_slot(self, slot: _PageSlot) -> None:
+        if slot.context is not None:
+            self.stats["page_recycles"] += 1
+            try:
+                await slot.context.close()
+            except Exception:
+                pass
+        slot.context = None
+        slot.page = None
+        slot.renders = 0
+        slot.live_ready = False
+
+    async def _get_browser(self):
+        async with self._browser_lock:
+            if self._browser is None or not self._browser.is_connected():
+                logger.warning("Render pool browser disconnected — relaunching")
+                self.stats["browser_relaunches"] += 1
+                await self._launch_browser()
+            return self._browser
+
+    async def _launch_browser(self) -> None:
+        """Launch Chromium (3 attempts). Caller holds _browser_lock or is start()."""
+        try:
+            if self._browser:
+                await self._browser.close()
+        except Exception:
+            pass
+        self._browser = None
+        last_err: Optional[Exception] = None
+        for attempt in range(3):
+            try:
+                self._browser = await self._pw.chromium.launch(headless=True, args=_BROWSER_ARGS)
+                self._browser_generation += 1
+                return
+            except Exception as e:
+                last_err = e
+                logger.warning(f"Browser launch attempt {attempt + 1} failed: {e}")
+                await asyncio.sleep(1)
+        raise RuntimeError(f"Failed to launch Chromium after 3 attempts: {last_err}")
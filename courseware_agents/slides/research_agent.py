@@ -5,13 +5,16 @@ Searches the internet for 3-5 quality sources per topic (~20-30 total across cou
 using WebSearch + WebFetch (built-in, no MCP needed). Tags data suitable for
 infographic visualization (charts, processes, comparisons).
 
-Runs as Phase 1 in the multi-agent pipeline.
+Runs as Phase 1 in the multi-agent pipeline. Results are kept in the
+cross-course research store (research_store.py); topics that closely match
+fresh stored research reuse it instead of running the agent again.
 """
 
 import asyncio
 import logging
 from typing import Optional
-from courseware_agents.base import run_agent_json
+from courseware_agents.base import run_agent_json, PRIORITY_BULK
+from courseware_agents.slides.research_store import lookup_research, save_research
 from generate_slides.multi_agent_config import (
     RESEARCH_MAX_TURNS,
     RESEARCH_MODEL,
@@ -57,6 +60,7 @@ async def research_topic(
     lo_description: str = "",
     research_depth: int = 20,
     model: Optional[str] = None,
+    use_store: bool = True,
 ) -> dict:
     """Research a single topic using WebSearch + WebFetch.
 
@@ -67,10 +71,19 @@ async def research_topic(
         lo_description: Learning outcome description.
         research_depth: Target number of sources (10/20/30).
         model: Optional model override.
+        use_store: Reuse matching research from the cross-course store, and
+            store fresh results. Pass False to always run the agent.
 
     Returns:
         Dict with sources, summary, key_statistics, infographic_data, etc.
+        Reused results carry a "reused_from" list; a failed run returns
+        empty data marked "failed": True.
     """
+    if use_store:
+        prior = await asyncio.to_thread(lookup_research, topic_title, bullet_points, lo_description)
+        if prior is not None:
+            return prior
+
     bp_text = ""
     if bullet_points:
         bp_text = "\nKey points to cover:\n" + "\n".join(f"  - {bp}" for bp in bullet_points[:10])
@@ -153,15 +166,21 @@ IMPORTANT:
             tools=["WebSearch"],
             max_turns=4,
             model=model or RESEARCH_MODEL,
+            priority=PRIORITY_BULK,
         )
         source_count = len(result.get("sources", []))
         logger.info(f"Research complete for '{topic_title}': {source_count} sources")
+        if use_store:
+            await asyncio.to_thread(
+                save_research, topic_title, bullet_points, lo_description, course_title, result,
+            )
         return result
 
     except Exception as e:
         logger.error(f"Research failed for '{topic_title}': {e}")
         return {
             "topic": topic_title,
+            "failed": True,  # Marks a failed run so resumed runs retry it (empty sources alone do not)
             "search_queries_used": [],
             "sources": [],
             "summary": f"Research unavailable for {topic_title}.",
@@ -182,33 +201,36 @@ async def research_all_topics(
     course_title: str = "",
     research_depth: int = 20,
     model: Optional[str] = None,
+    use_store: bool = True,
 ) -> dict:
     """Research all topics in parallel.
 
+    Topics matching fresh research in the cross-course store are served from
+    it; only genuinely new topics run the research agent.
+
     Args:
         topics: List of dicts with topic_title, bullet_points, lo_description.
         course_title: Parent course title.
         research_depth: Sources per topic.
         model: Optional model override.
+        use_store: Use the cross-course research store (see research_topic).
 
     Returns:
         Dict mapping topic_title → research results.
     """
-    # 8 parallel agent sessions for faster research
-    sem = asyncio.Semaphore(8)
-
-    async def _bounded_research(t, i):
-        async with sem:
-            return await research_topic(
-                topic_title=t.get("topic_title", f"Topic {i+1}"),
-                bullet_points=t.get("bullet_points", []),
-                course_title=course_title,
-                lo_description=t.get("lo_description", ""),
-                research_depth=research_depth,
-                model=model,
-            )
-
-    tasks = [_bounded_research(t, i) for i, t in enumerate(topics)]
+    # Concurrency is bounded by the agent governor in courseware_agents.base
+    tasks = [
+        research_topic(
+            topic_title=t.get("topic_title", f"Topic {i+1}"),
+            bullet_points=t.get("bullet_points", []),
+            course_title=course_title,
+            lo_description=t.get("lo_description", ""),
+            research_depth=research_depth,
+            model=model,
+            use_store=use_store,
+        )
+        for i, t in enumerate(topics)
+    ]
     results = await asyncio.gather(*tasks, return_exceptions=True)
 
     research_map = {}
@@ -217,7 +239,7 @@ async def research_all_topics(
         if isinstance(result, Exception):
             logger.error(f"Research failed for '{t_title}': {result}")
             research_map[t_title] = {
-                "topic": t_title, "sources": [], "summary": "Research unavailable.",
+                "topic": t_title, "failed": True, "sources": [], "summary": "Research unavailable.",
                 "key_statistics": [],
                 "recommended_frameworks": [],
                 "infographic_data": {"chart_data": [], "process_steps": [],
@@ -228,5 +250,7 @@ async def research_all_topics(
             research_map[t_title] = result
 
     total_sources = sum(len(v.get("sources", [])) for v in research_map.values())
-    logger.info(f"Research complete: {len(research_map)} topics, {total_sources} total sources")
+    reused = sum(1 for v in research_map.values() if v.get("reused_from"))
+    logger.info(f"Research complete: {len(research_map)} topics ({reused} from research store), "
+                f"{total_sources} total sources")
     return research_map
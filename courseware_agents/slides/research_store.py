@@ -0,0 +1,373 @@
+"""
+Research Store — cross-course knowledge base of topic research
+
+Persists every successful research_topic() result together with its topic
+title, CP bullet points and learning outcome, so recurring WSQ topics
+("Data Protection Principles", "Agile Scrum Roles", ...) are researched once
+and reused by later courses instead of re-running the WebSearch agent.
+
+- Storage: SQLite at .output/research_store/research.db (WAL, safe across
+  Streamlit sessions).
+- Lookup: MinHash signatures over title/bullet/LO word shingles, bucketed with
+  LSH banding, find candidate topics without scanning the store; candidates
+  are then scored exactly (title-weighted Jaccard).
+- Reuse: fresh matches at or above RESEARCH_REUSE_THRESHOLD are merged
+  (best match first, sources de-duplicated by URL) into one research dict.
+
+Usage:
+    from courseware_agents.slides.research_store import lookup_research, save_research
+
+    prior = lookup_research("Data Protection Principles", bullet_points)
+    if prior is None:
+        result = await research_topic(...)
+        save_research("Data Protection Principles", bullet_points, "", course_title, result)
+"""
+
+import hashlib
+import json
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from typing import List, Optional
+
+from generate_slides.multi_agent_config import (
+    RESEARCH_STORE_MAX_AGE_DAYS,
+    RESEARCH_REUSE_THRESHOLD,
+)
+
+logger = logging.getLogger(__name__)
+
+RESEARCH_STORE_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+    ".output", "research_store",
+)
+RESEARCH_STORE_DB = os.path.join(RESEARCH_STORE_DIR, "research.db")
+
+MINHASH_PERMUTATIONS = 64
+LSH_BANDS = 16                  # 16 bands x 4 rows — candidates from ~0.5 Jaccard upwards
+TITLE_WEIGHT = 0.7              # Title similarity dominates; bullets/LO refine
+MAX_MERGED_MATCHES = 3
+
+_MERSENNE_PRIME = (1 << 61) - 1
+_STOPWORDS = frozenset(
+    "a an and are as at be by for from how in into is it its of on or the their "
+    "to using use with within your you what why when which".split()
+)
+
+_stats_lock = threading.Lock()
+_stats = {"lookups": 0, "reused": 0, "saved": 0}
+
+
+def _permutations() -> list:
+    """Deterministic (a, b) pairs for the MinHash hash family."""
+    perms = []
+    for i in range(MINHASH_PERMUTATIONS):
+        digest = hashlib.sha256(f"research-store-perm-{i}".encode()).digest()
+        a = int.from_bytes(digest[:8], "big") % (_MERSENNE_PRIME - 1) + 1
+        b = int.from_bytes(digest[8:16], "big") % _MERSENNE_PRIME
+        perms.append((a, b))
+    return perms
+
+
+_PERMS = _permutations()
+
+
+# ---------------------------------------------------------------------------
+# Text features
+# ---------------------------------------------------------------------------
+
+def _tokens(text: str) -> List[str]:
+    words = re.findall(r"[a-z0-9]+", (text or "").lower())
+    # Crude plural folding so "roles"/"role" and "principles"/"principle" match
+    return [w[:-1] if len(w) > 3 and w.endswith("s") and not w.endswith("ss") else w
+            for w in words if w not in _STOPWORDS]
+
+
+def _title_features(topic_title: str) -> set:
+    return set(_tokens(topic_title))
+
+
+def _content_features(topic_title: str, bullet_points: Optional[list], lo_description: str) -> set:
+    """Unigram + bigram shingles over title, bullets and LO."""
+    features = set()
+    for text in [topic_title, lo_description, *(bullet_points or [])]:
+        toks = _tokens(text)
+        features.update(toks)
+        features.update(f"{x} {y}" for x, y in zip(toks, toks[1:]))
+    return features
+
+
+def _minhash(features: set) -> List[int]:
+    hashes = [int.from_bytes(hashlib.blake2b(f.encode(), digest_size=8).digest(), "big")
+              for f in features]
+    if not hashes:
+        return [_MERSENNE_PRIME] * MINHASH_PERMUTATIONS
+    return [min((a * h + b) % _MERSENNE_PRIME for h in hashes) for a, b in _PERMS]
+
+
+def _band_keys(signature: List[int]) -> List[str]:
+    rows = MINHASH_PERMUTATIONS // LSH_BANDS
+    keys = []
+    for band in range(LSH_BANDS):
+        chunk = signature[band * rows:(band + 1) * rows]
+        digest = hashlib.blake2b(repr(chunk).encode(), digest_size=8).hexdigest()
+        keys.append(f"{band}:{digest}")
+    return keys
+
+
+def _index_keys(topic_title: str, bullet_points: Optional[list], lo_description: str) -> List[str]:
+    """LSH buckets for a topic: full-content bands plus title-only bands.
+
+    The title-only bands catch the same topic listed with different bullets.
+    """
+    keys = _band_keys(_minhash(_content_features(topic_title, bullet_points, lo_description)))
+    keys += _band_keys(_minhash(_content_features(topic_title, None, "")))
+    return list(dict.fromkeys(keys))
+
+
+def _jaccard(a: set, b: set) -> float:
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+def _similarity(title_a: set, content_a: set, title_b: set, content_b: set,
+                has_detail: bool) -> float:
+    title_sim = _jaccard(title_a, title_b)
+    if not has_detail:
+        return title_sim
+    return TITLE_WEIGHT * title_sim + (1 - TITLE_WEIGHT) * _jaccard(content_a, content_b)
+
+
+# ---------------------------------------------------------------------------
+# Storage
+# ---------------------------------------------------------------------------
+
+@contextmanager
+def _connect():
+    os.makedirs(RESEARCH_STORE_DIR, exist_ok=True)
+    conn = sqlite3.connect(RESEARCH_STORE_DB, timeout=30)
+    conn.row_factory = sqlite3.Row
+    try:
+        _ensure_schema(conn)
+        yield conn
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+
+def _ensure_schema(conn: sqlite3.Connection) -> None:
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS research (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            topic_title TEXT NOT NULL,
+            bullet_points TEXT NOT NULL,
+            lo_description TEXT NOT NULL,
+            course_title TEXT NOT NULL,
+            has_detail INTEGER NOT NULL,
+            result TEXT NOT NULL,
+            source_count INTEGER NOT NULL,
+            created_at REAL NOT NULL
+        )
+    """)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS research_bands (
+            bucket TEXT NOT NULL,
+            research_id INTEGER NOT NULL
+        )
+    """)
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_research_bands ON research_bands(bucket)")
+
+
+def save_research(
+    topic_title: str,
+    bullet_points: Optional[list],
+    lo_description: str,
+    course_title: str,
+    result: dict,
+) -> bool:
+    """Store a research_topic() result. Results without sources are not stored.
+
+    Returns:
+        True if the result was stored.
+    """
+    sources = result.get("sources") or []
+    if not sources or result.get("reused_from"):
+        return False
+
+    bullets = list(bullet_points or [])
+    keys = set(_index_keys(topic_title, bullets, lo_description))
+    try:
+        with _connect() as conn:
+            cur = conn.execute(
+                "INSERT INTO research (topic_title, bullet_points, lo_description, course_title, "
+                "has_detail, result, source_count, created_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    topic_title,
+                    json.dumps(bullets, ensure_ascii=False),
+                    lo_description or "",
+                    course_title or "",
+                    int(bool(bullets or lo_description)),
+                    json.dumps(result, ensure_ascii=False),
+                    len(sources),
+                    time.time(),
+                ),
+            )
+            conn.executemany(
+                "INSERT INTO research_bands (bucket, research_id) VALUES (?, ?)",
+                [(key, cur.lastrowid) for key in sorted(keys)],
+            )
+    except sqlite3.Error as e:
+        logger.warning(f"Research store write failed for '{topic_title}': {e}")
+        return False
+
+    with _stats_lock:
+        _stats["saved"] += 1
+    return True
+
+
+def find_similar_topics(
+    topic_title: str,
+    bullet_points: Optional[list] = None,
+    lo_description: str = "",
+    max_age_days: Optional[float] = None,
+    limit: int = 5,
+) -> List[dict]:
+    """Return stored topics similar to the given one, best first.
+
+    Each entry: {"score", "topic_title", "course_title", "age_days", "result"}.
+    Only LSH candidates (sharing at least one MinHash band) are scored.
+    """
+    if max_age_days is None:
+        max_age_days = RESEARCH_STORE_MAX_AGE_DAYS
+    bullets = list(bullet_points or [])
+    title = _title_features(topic_title)
+    content = _content_features(topic_title, bullets, lo_description)
+    keys = _index_keys(topic_title, bullets, lo_description)
+
+    now = time.time()
+    try:
+        with _connect() as conn:
+            placeholders = ",".join("?" * len(keys))
+            rows = conn.execute(
+                f"SELECT * FROM research WHERE created_at >= ? AND id IN "
+                f"(SELECT DISTINCT research_id FROM research_bands WHERE bucket IN ({placeholders}))",
+                (now - max_age_days * 86400, *keys),
+            ).fetchall()
+    except sqlite3.Error as e:
+        logger.warning(f"Research store lookup failed for '{topic_title}': {e}")
+        return []
+
+    matches = []
+    for row in rows:
+        stored_bullets = json.loads(row["bullet_points"])
+        has_detail = bool(bullets or lo_description) and bool(row["has_detail"])
+        score = _similarity(
+            title, content,
+            _title_features(row["topic_title"]),
+            _content_features(row["topic_title"], stored_bullets, row["lo_description"]),
+            has_detail,
+        )
+        matches.append({
+            "score": round(score, 3),
+            "topic_title": row["topic_title"],
+            "course_title": row["course_title"],
+            "age_days": round((now - row["created_at"]) / 86400, 1),
+            "result": json.loads(row["result"]),
+        })
+    matches.sort(key=lambda m: (-m["score"], m["age_days"]))
+    return matches[:limit]
+
+
+def _merge_results(topic_title: str, matches: List[dict]) -> dict:
+    """Merge stored research dicts (best first) into one, de-duplicating sources."""
+    merged = json.loads(json.dumps(matches[0]["result"]))  # Deep copy of the best match
+    merged["topic"] = topic_title
+    seen_urls = {s.get("url") for s in merged.get("sources", [])}
+    seen_stats = {s.get("stat") for s in merged.get("key_statistics", [])}
+    for match in matches[1:]:
+        other = match["result"]
+        for source in other.get("sources", []):
+            if source.get("url") not in seen_urls:
+                merged.setdefault("sources", []).append(source)
+                seen_urls.add(source.get("url"))
+        for stat in other.get("key_statistics", []):
+            if stat.get("stat") not in seen_stats:
+                merged.setdefault("key_statistics", []).append(stat)
+                seen_stats.add(stat.get("stat"))
+        for fw in other.get("recommended_frameworks", []):
+            if fw not in merged.setdefault("recommended_frameworks", []):
+                merged["recommended_frameworks"].append(fw)
+    merged["reused_from"] = [
+        {"topic_title": m["topic_title"], "course_title": m["course_title"],
+         "score": m["score"], "age_days": m["age_days"]}
+        for m in matches
+    ]
+    return merged
+
+
+def lookup_research(
+    topic_title: str,
+    bullet_points: Optional[list] = None,
+    lo_description: str = "",
+    threshold: Optional[float] = None,
+    max_age_days: Optional[float] = None,
+) -> Optional[dict]:
+    """Return reusable research for a topic, or None if it is genuinely new.
+
+    Fresh stored topics scoring at least `threshold` are merged into a single
+    research dict (with a "reused_from" list describing the matches).
+    """
+    if threshold is None:
+        threshold = RESEARCH_REUSE_THRESHOLD
+    with _stats_lock:
+        _stats["lookups"] += 1
+
+    matches = [
+        m for m in find_similar_topics(topic_title, bullet_points, lo_description,
+                                       max_age_days=max_age_days, limit=MAX_MERGED_MATCHES)
+        if m["score"] >= threshold and m["result"].get("sources")
+    ]
+    if not matches:
+        return None
+
+    with _stats_lock:
+        _stats["reused"] += 1
+    logger.info(
+        f"Research store: reusing '{matches[0]['topic_title']}' "
+        f"(score {matches[0]['score']}, {len(matches)} match(es)) for '{topic_title}'"
+    )
+    return _merge_results(topic_title, matches)
+
+
+def get_research_store_stats() -> dict:
+    """Return lookup/reuse/save counters plus the number of stored topics."""
+    with _stats_lock:
+        stats = dict(_stats)
+    try:
+        with _connect() as conn:
+            stats["stored"] = conn.execute("SELECT COUNT(*) FROM research").fetchone()[0]
+    except sqlite3.Error:
+        stats["stored"] = None
+    return stats
+
+
+def prune_research_store(max_age_days: Optional[float] = None) -> int:
+    """Delete entries older than max_age_days. Returns the number removed."""
+    if max_age_days is None:
+        max_age_days = RESEARCH_STORE_MAX_AGE_DAYS
+    cutoff = time.time() - max_age_days * 86400
+    with _connect() as conn:
+        conn.execute(
+            "DELETE FROM research_bands WHERE research_id IN "
+            "(SELECT id FROM research WHERE created_at < ?)", (cutoff,),
+        )
+        return conn.execute("DELETE FROM research WHERE created_at < ?", (cutoff,)).rowcount
@@ -10,7 +10,7 @@ import json
 import logging
 import os
 from typing import Optional
-from courseware_agents.base import run_agent, run_agent_json
+from courseware_agents.base import run_agent, run_agent_json, PRIORITY_BULK
 
 logger = logging.getLogger(__name__)
 
@@ -284,6 +284,7 @@ CRITICAL RULES:
             system_prompt=TOPIC_SLIDES_SYSTEM,
             tools=["WebSearch", "WebFetch"],
             max_turns=20,
+            priority=PRIORITY_BULK,
         )
         # Validate
         slides = result.get('slides', [])
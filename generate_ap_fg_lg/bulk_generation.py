@@ -0,0 +1,213 @@
+"""
+Bulk Courseware Document Generation (no Streamlit)
+
+Renders the Learning Guide, Assessment Plan, Assessment Summary Record and
+Facilitator's Guide for one course concurrently on worker threads.
+
+- Threads rather than processes: with the template registry's caches
+  (utils/template_registry.py) a render is mostly cache hits, and threads
+  share those caches, so they stay warm from one course to the next. A
+  process pool would re-import pandas/docxtpl/PIL and start with empty
+  caches in every worker.
+- Each document is rendered from its own deep copy of the context (the
+  generators mutate the context they are given). The ASR is the exception:
+  it renders after the AP in the same job, from the context the AP step
+  filled in (TSC details, company logo), as generate_assessment_documents
+  does. An ASR requested without the AP still runs the AP step first.
+- Finished files are moved straight into the course's Courseware subfolder
+  (or a temp folder when the course has no TGS reference) and appended to a
+  ZIP on disk as they complete, while the other documents are still rendering.
+- Per-document render times and errors are returned; one failed document does
+  not stop the others.
+
+Usage:
+    from generate_ap_fg_lg.bulk_generation import generate_courseware_documents
+
+    result = generate_courseware_documents(context, "Tertiary Infotech")
+    result["zip_path"]                       # ZIP with all generated documents
+    result["documents"]["FG"]["path"]        # final .docx path
+    result["documents"]["FG"]["seconds"]     # render time
+"""
+
+import copy
+import logging
+import os
+import re
+import shutil
+import tempfile
+import time
+import traceback
+import zipfile
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Iterable, Optional
+
+from utils.helpers import get_courseware_folder
+
+logger = logging.getLogger(__name__)
+
+# Document key -> (file prefix, Courseware subfolder)
+DOCUMENT_TYPES = {
+    "LG": ("LG", "Learner Guide"),
+    "AP": ("Assessment_Plan", "Assessment Plan"),
+    "ASR": ("Assessment_Summary_Record", "Assessment Plan"),
+    "FG": ("FG", "Facilitator Guide"),
+}
+DEFAULT_SFW_DATASET = ".claude/skills/generate_courseware/data/Sfw_dataset.xlsx"
+RENDERS_AFTER = {"ASR": "AP"}   # Document -> document whose rendered context it uses
+
+
+def sanitize_filename(name) -> str:
+    """Make a course title / TGS ref safe for use in a file name (ASCII, max 50 chars)."""
+    if not name:
+        return "Document"
+    name = str(name).strip()
+    invalid_chars = ['/', '\\', ':', '*', '?', '"', '<', '>', '|', '\n', '\r', '\t', '&', '%', '$', '#', '@', '!', '^', '~', '`', "'", ';', ',', '(', ')', '[', ']', '{', '}']
+    for char in invalid_chars:
+        name = name.replace(char, '_')
+    name = re.sub(r'[\s_]+', '_', name)
+    name = name.strip('_')
+    name = ''.join(c if ord(c) < 128 else '_' for c in name)
+    name = name[:50] if len(name) > 50 else name
+    return name if name else "Document"
+
+
+def document_filename(doc_type: str, context: dict) -> str:
+    """Final file name for a document, e.g. FG_TGS-2024001_Data_Analytics_v1.docx."""
+    prefix = DOCUMENT_TYPES[doc_type][0]
+    course_title = sanitize_filename(context.get('Course_Title', 'Course'))
+    tgs_ref_no = sanitize_filename(context.get('TGS_Ref_No', ''))
+    if context.get('TGS_Ref_No'):
+        return f"{prefix}_{tgs_ref_no}_{course_title}_v1.docx"
+    return f"{prefix}_{course_title}_v1.docx"
+
+
+def _render_document(doc_type: str, context: dict, name_of_organisation: str,
+                     sfw_dataset_dir: str) -> dict:
+    """Render one document to a temp file. The generators mutate context."""
+    started = time.perf_counter()
+    try:
+        if doc_type == "LG":
+            from generate_ap_fg_lg.utils.agentic_LG import generate_learning_guide
+            path = generate_learning_guide(context, name_of_organisation)
+        elif doc_type == "AP":
+            from generate_ap_fg_lg.utils.agentic_AP import generate_assessment_plan
+            path = generate_assessment_plan(context, name_of_organisation, sfw_dataset_dir)
+        elif doc_type == "ASR":
+            from generate_ap_fg_lg.utils.agentic_AP import generate_asr_document
+            path = generate_asr_document(context, name_of_organisation)
+        elif doc_type == "FG":
+            from generate_ap_fg_lg.utils.agentic_FG import generate_facilitators_guide
+            path = generate_facilitators_guide(context, name_of_organisation, sfw_dataset_dir)
+        else:
+            raise ValueError(f"Unknown document type: {doc_type}")
+        return {"temp_path": path, "seconds": time.perf_counter() - started, "error": None}
+    except Exception as e:
+        return {
+            "temp_path": None,
+            "seconds": time.perf_counter() - started,
+            "error": f"{type(e).__name__}: {e}",
+            "traceback": traceback.format_exc(),
+        }
+
+
+def _render_documents(doc_types: list, context: dict, name_of_organisation: str,
+                      sfw_dataset_dir: str) -> dict:
+    """Worker job: render documents in order on one shared context.
+
+    A document in RENDERS_AFTER whose predecessor is not in doc_types gets the
+    predecessor's step run first; that extra file is discarded.
+    """
+    outcomes = {}
+    for doc_type in doc_types:
+        before = RENDERS_AFTER.get(doc_type)
+        if before and before not in outcomes:
+            outcome = _render_document(before, context, name_of_organisation, sfw_dataset_dir)
+            if outcome["temp_path"]:
+                os.remove(outcome["temp_path"])
+        outcomes[doc_type] = _render_document(doc_type, context, name_of_organisation, sfw_dataset_dir)
+    return outcomes
+
+
+def _render_groups(documents: list) -> list:
+    """Split documents into worker jobs; a RENDERS_AFTER document joins its predecessor's job."""
+    groups = {}
+    for doc_type in documents:
+        before = RENDERS_AFTER.get(doc_type)
+        key = before if before in documents else doc_type
+        groups.setdefault(key, []).append(doc_type)
+    # Predecessors first within a job, whatever order the caller listed them in
+    return [sorted(group, key=lambda d: d in RENDERS_AFTER) for group in groups.values()]
+
+
+def generate_courseware_documents(
+    context: dict,
+    name_of_organisation: str,
+    documents: Iterable[str] = ("LG", "AP", "ASR", "FG"),
+    sfw_dataset_dir: str = DEFAULT_SFW_DATASET,
+    output_dir: Optional[str] = None,
+    workers: Optional[int] = None,
+) -> dict:
+    """
+    Render the requested courseware documents concurrently from one context.
+
+    Args:
+        context: Course context (as produced by Extract Course Info).
+        name_of_organisation: Organisation name for branding/UEN.
+        documents: Keys of DOCUMENT_TYPES to generate.
+        sfw_dataset_dir: Skills Framework workbook for AP/FG TSC details.
+        output_dir: Where to place the documents. Defaults to the course's
+            Courseware folder, or a new temp folder if it has no TGS ref.
+        workers: Thread count (default: one per job; the AP and ASR share
+            one). 1 renders serially.
+
+    Returns:
+        dict with:
+            - documents: {key: {"path", "seconds", "error"}} per requested document
+            - zip_path: ZIP containing every successfully generated document
+            - wall_seconds: total elapsed time
+    """
+    started = time.perf_counter()
+    documents = [d for d in documents if d in DOCUMENT_TYPES]
+    course_dir = output_dir or get_courseware_folder(context) or tempfile.mkdtemp(prefix="courseware_")
+    course_title = sanitize_filename(context.get('Course_Title', 'Course'))
+    zip_path = os.path.join(tempfile.mkdtemp(prefix="courseware_zip_"), f"courseware_{course_title}.zip")
+    results = {}
+
+    def _place(doc_type: str, outcome: dict, zipf: zipfile.ZipFile):
+        entry = {"path": None, "seconds": outcome["seconds"], "error": outcome["error"]}
+        if outcome["error"]:
+            logger.warning(f"{doc_type} generation failed: {outcome['error']}\n{outcome.get('traceback', '')}")
+        elif outcome["temp_path"]:
+            subfolder = DOCUMENT_TYPES[doc_type][1] if not output_dir else ""
+            dest_dir = os.path.join(course_dir, subfolder)
+            os.makedirs(dest_dir, exist_ok=True)
+            filename = document_filename(doc_type, context)
+            entry["path"] = shutil.move(outcome["temp_path"], os.path.join(dest_dir, filename))
+            zipf.write(entry["path"], filename)
+            logger.info(f"{doc_type} generated in {outcome['seconds']:.1f}s")
+        results[doc_type] = entry
+
+    groups = _render_groups(documents)
+    workers = min(workers or len(groups), len(groups)) if groups else 1
+    with zipfile.ZipFile(zip_path, "w", zipfile.ZIP_DEFLATED) as zipf:
+        if workers > 1:
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="courseware-doc") as pool:
+                futures = [
+                    pool.submit(_render_documents, group, copy.deepcopy(context),
+                                name_of_organisation, sfw_dataset_dir)
+                    for group in groups
+                ]
+                for future in as_completed(futures):
+                    for doc_type, outcome in future.result().items():
+                        _place(doc_type, outcome, zipf)
+        else:
+            for group in groups:
+                outcomes = _render_documents(group, copy.deepcopy(context), name_of_organisation, sfw_dataset_dir)
+                for doc_type, outcome in outcomes.items():
+                    _place(doc_type, outcome, zipf)
+
+    return {
+        "documents": {d: results[d] for d in documents},
+        "zip_path": zip_path,
+        "wall_seconds": time.perf_counter() - started,
+    }
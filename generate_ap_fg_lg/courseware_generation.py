@@ -1,10 +1,6 @@
-from generate_ap_fg_lg.utils.agentic_LG import generate_learning_guide
-from generate_ap_fg_lg.utils.agentic_AP import generate_assessment_documents
 from generate_ap_fg_lg.utils.agentic_LP import generate_lesson_plan
-from generate_ap_fg_lg.utils.agentic_FG import generate_facilitators_guide
+from generate_ap_fg_lg.bulk_generation import generate_courseware_documents, sanitize_filename
 import os
-import io
-import zipfile
 import tempfile
 import json
 import re
@@ -15,7 +11,7 @@ from docx import Document as DocxDocument
 import openpyxl
 from pydantic import BaseModel
 from typing import List, Optional
-from utils.helpers import save_uploaded_file, parse_json_content, copy_to_courseware
+from utils.helpers import save_uploaded_file, parse_json_content
 import asyncio
 from generate_ap_fg_lg.utils.organization_utils import (
     load_organizations,
@@ -123,6 +119,8 @@ def parse_cp_document(uploaded_file):
 
     For Word CP (.docx): Trims to Part 1 through Part 4.
     For Excel CP (.xlsx): Trims to Course Particulars through Declarations.
+    Line breaks inside a table cell are written as "<br>" (the interpreter
+    prompts in courseware_agents/cp_interpreter.py say so).
 
     Args:
         uploaded_file: The file uploaded via st.file_uploader.
@@ -190,7 +188,8 @@ def parse_cp_document(uploaded_file):
                     for row_text in rows_data[1:]:
                         while len(row_text) < max_cols:
                             row_text.append("")
-                        text_content.append("| " + " | ".join(v.replace("\n", " ").replace("|", "/") for v in row_text[:max_cols]) + " |")
+                        # Keep in-cell line breaks (topic bullets, K/A lists) as <br>
+                        text_content.append("| " + " | ".join(v.replace("\n", "<br>").replace("|", "/") for v in row_text[:max_cols]) + " |")
 
         elif ext == ".xlsx":
             wb = openpyxl.load_workbook(temp_file_path, data_only=True)
@@ -198,7 +197,7 @@ def parse_cp_document(uploaded_file):
                 ws = wb[sheet]
                 text_content.append(f"## {sheet}")
                 for row in ws.iter_rows(values_only=True):
-                    row_text = [str(cell) if cell is not None else "" for cell in row]
+                    row_text = [str(cell).replace("\n", "<br>") if cell is not None else "" for cell in row]
                     if any(row_text):
                         text_content.append(" | ".join(row_text))
             wb.close()
@@ -411,6 +410,7 @@ def app():
         st.session_state['ap_output'] = None
         st.session_state['asr_output'] = None
         st.session_state['fg_output'] = None
+        st.session_state['courseware_zip'] = None
 
         # Add metadata
         current_datetime = datetime.now()
@@ -425,41 +425,31 @@ def app():
 
         st.session_state['context'] = context
 
-        # Generate Learning Guide
-        if generate_lg:
-            try:
-                with st.spinner('Generating Learning Guide...'):
-                    lg_output = generate_learning_guide(context, selected_org)
-                if lg_output:
-                    st.success("Learning Guide generated successfully!")
-                    st.session_state['lg_output'] = lg_output
-            except Exception as e:
-                st.error(f"Error generating Learning Guide: {e}")
-
-        # Generate Assessment Plan
-        if generate_ap:
-            try:
-                with st.spinner('Generating Assessment Plan and Assessment Summary Record...'):
-                    ap_output, asr_output = generate_assessment_documents(context, selected_org)
-                if ap_output:
-                    st.success("Assessment Plan generated successfully!")
-                    st.session_state['ap_output'] = ap_output
-                if asr_output:
-                    st.success("Assessment Summary Record generated successfully!")
-                    st.session_state['asr_output'] = asr_output
-            except Exception as e:
-                st.error(f"Error generating Assessment Documents: {e}")
-
-        # Generate Facilitator's Guide
-        if generate_fg:
-            try:
-                with st.spinner("Generating Facilitator's Guide..."):
-                    fg_output = generate_facilitators_guide(context, selected_org)
-                if fg_output:
-                    st.success("Facilitator's Guide generated successfully!")
-                    st.session_state['fg_output'] = fg_output
-            except Exception as e:
-                st.error(f"Error generating Facilitator's Guide: {e}")
+        # Render all selected documents concurrently (AP also produces the ASR)
+        _labels = {
+            "LG": "Learning Guide",
+            "AP": "Assessment Plan",
+            "ASR": "Assessment Summary Record",
+            "FG": "Facilitator's Guide",
+        }
+        _selected = (["LG"] if generate_lg else []) + (["AP", "ASR"] if generate_ap else []) \
+            + (["FG"] if generate_fg else [])
+        if not _selected:
+            st.warning("Select at least one document to generate.")
+            return
+
+        with st.spinner(f"Generating {', '.join(_labels[d] for d in _selected)}..."):
+            result = generate_courseware_documents(context, selected_org, documents=_selected)
+
+        for doc_type in _selected:
+            doc = result["documents"][doc_type]
+            if doc["path"]:
+                st.success(f"{_labels[doc_type]} generated successfully! ({doc['seconds']:.1f}s)")
+                st.session_state[f"{doc_type.lower()}_output"] = doc["path"]
+            else:
+                st.error(f"Error generating {_labels[doc_type]}: {doc['error']}")
+        st.session_state['courseware_zip'] = result["zip_path"]
+        st.caption(f"Generated in {result['wall_seconds']:.1f}s")
 
     # Download section
     if any([
@@ -470,64 +460,21 @@ def app():
     ]):
         st.subheader("Download All Generated Documents as ZIP")
 
-        def sanitize_filename(name):
-            if not name:
-                return "Document"
-            name = str(name).strip()
-            invalid_chars = ['/', '\\', ':', '*', '?', '"', '<', '>', '|', '\n', '\r', '\t', '&', '%', '$', '#', '@', '!', '^', '~', '`', "'", ';', ',', '(', ')', '[', ']', '{', '}']
-            for char in invalid_chars:
-                name = name.replace(char, '_')
-            name = re.sub(r'[\s_]+', '_', name)
-            name = name.strip('_')
-            name = ''.join(c if ord(c) < 128 else '_' for c in name)
-            name = name[:50] if len(name) > 50 else name
-            return name if name else "Document"
-
         ctx = st.session_state.get('context', {}) or {}
         course_title = sanitize_filename(ctx.get('Course_Title', 'Course'))
-        tgs_ref_no = sanitize_filename(ctx.get('TGS_Ref_No', ''))
-
-        # Copy generated files to Courseware subfolders
-        _file_map = {
-            "lg_output": ("LG", "Learner Guide"),
-            "ap_output": ("Assessment_Plan", "Assessment Plan"),
-            "asr_output": ("Assessment_Summary_Record", "Assessment Plan"),
-            "fg_output": ("FG", "Facilitator Guide"),
-        }
-        for key, (prefix, subfolder) in _file_map.items():
-            fpath = st.session_state.get(key)
-            if fpath and os.path.exists(fpath):
-                if tgs_ref_no:
-                    fname = f"{prefix}_{tgs_ref_no}_{course_title}_v1.docx"
-                else:
-                    fname = f"{prefix}_{course_title}_v1.docx"
-                copy_to_courseware(fpath, subfolder, fname, ctx)
-
-        zip_buffer = io.BytesIO()
+        zip_path = st.session_state.get('courseware_zip')
+
         try:
-            with zipfile.ZipFile(zip_buffer, "w", zipfile.ZIP_DEFLATED) as zipf:
-                def add_file(file_path, prefix):
-                    if file_path and os.path.exists(file_path):
-                        if tgs_ref_no:
-                            file_name = f"{prefix}_{tgs_ref_no}_{course_title}_v1.docx"
-                        else:
-                            file_name = f"{prefix}_{course_title}_v1.docx"
-                        with open(file_path, 'rb') as f:
-                            zipf.writestr(file_name, f.read())
-
-                add_file(st.session_state.get('lg_output'), "LG")
-                add_file(st.session_state.get('ap_output'), "Assessment_Plan")
-                add_file(st.session_state.get('asr_output'), "Assessment_Summary_Record")
-                add_file(st.session_state.get('fg_output'), "FG")
-
-            zip_buffer.seek(0)
+            if not zip_path or not os.path.exists(zip_path):
+                raise FileNotFoundError("generated ZIP is no longer available — please regenerate")
             zip_filename = f"courseware_{course_title}.zip" if course_title else "courseware_documents.zip"
 
-            st.download_button(
-                label="Download All Documents (ZIP)",
-                data=zip_buffer.getvalue(),
-                file_name=zip_filename,
-                mime="application/zip"
-            )
+            with open(zip_path, "rb") as f:
+                st.download_button(
+                    label="Download All Documents (ZIP)",
+                    data=f.read(),
+                    file_name=zip_filename,
+                    mime="application/zip"
+                )
         except Exception as e:
             st.error(f"Error creating ZIP file: {e}")
@@ -12,7 +12,7 @@ import tempfile
 import json
 from pydantic import BaseModel
 from typing import List, Union, Optional
-from docxtpl import DocxTemplate
+from generate_ap_fg_lg.utils.template_registry import load_template
 from generate_ap_fg_lg.utils.helper import retrieve_excel_data, process_logo_image
 from utils.helpers import parse_json_content
 
@@ -115,7 +115,7 @@ def generate_assessment_plan(context: dict, name_of_organisation, sfw_dataset_di
     if not is_evidence_extracted(context):
         print("WARNING: Assessment evidence is incomplete. Run Claude Code skill /generate_courseware to generate evidence.")
 
-    doc = DocxTemplate(AP_TEMPLATE_DIR)
+    doc = load_template(AP_TEMPLATE_DIR)
 
     import os
     if os.path.exists(sfw_dataset_dir):
@@ -156,7 +156,7 @@ def generate_assessment_plan(context: dict, name_of_organisation, sfw_dataset_di
 
 def generate_asr_document(context: dict, name_of_organisation) -> str:
     """Generates an Assessment Summary Report (ASR) document."""
-    doc = DocxTemplate(ASR_TEMPLATE_DIR)
+    doc = load_template(ASR_TEMPLATE_DIR)
     context['Name_of_Organisation'] = name_of_organisation
 
     from generate_ap_fg_lg.utils.organizations import get_organizations, get_default_organization
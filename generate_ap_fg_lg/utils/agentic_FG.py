@@ -20,7 +20,7 @@ Main Functionalities:
 Dependencies:
     - Standard Libraries: tempfile
     - External Libraries:
-         • docxtpl (DocxTemplate) – For rendering DOCX templates.
+         • docxtpl (via template_registry.load_template) – For rendering cached DOCX templates.
     - Custom Utilities:
          • retrieve_excel_data, process_logo_image from generate_ap_fg_lg/utils/helper
 
@@ -39,7 +39,7 @@ Date:
 """
 
 import tempfile
-from docxtpl import DocxTemplate
+from generate_ap_fg_lg.utils.template_registry import load_template
 from generate_ap_fg_lg.utils.helper import retrieve_excel_data, process_logo_image
 
 FG_TEMPLATE_DIR = ".claude/skills/generate_facilitator_guide/templates/FG_TGS-Ref-No_Course-Title_v1.docx"
@@ -113,7 +113,7 @@ def generate_facilitators_guide(context: dict, name_of_organisation: str, sfw_da
     else:
         print(f"Dataset file not found at {sfw_dataset_dir}, continuing without it...")
 
-    doc = DocxTemplate(FG_TEMPLATE_DIR)
+    doc = load_template(FG_TEMPLATE_DIR)
 
     # Add the logo and organization details to the context
     context['company_logo'] = process_logo_image(doc, name_of_organisation)
@@ -10,7 +10,7 @@ No API calls are made from this module.
 
 import json
 import tempfile
-from docxtpl import DocxTemplate
+from generate_ap_fg_lg.utils.template_registry import load_template
 from generate_ap_fg_lg.utils.helper import process_logo_image
 
 LG_TEMPLATE_DIR = ".claude/skills/generate_learner_guide/templates/LG_TGS-Ref-No_Course-Title_v1.docx"
@@ -84,7 +84,7 @@ def generate_learning_guide(context: dict, name_of_organisation: str) -> str:
 
     context["Learning_Units"] = validated_learning_units
 
-    doc = DocxTemplate(LG_TEMPLATE_DIR)
+    doc = load_template(LG_TEMPLATE_DIR)
 
     # Add the logo and organization details to the context
     context['company_logo'] = process_logo_image(doc, name_of_organisation)
@@ -21,7 +21,7 @@ Main Functionalities:
 Dependencies:
     - Standard Libraries: tempfile
     - External Libraries:
-         • docxtpl (DocxTemplate) – For rendering DOCX templates.
+         • docxtpl (via template_registry.load_template) – For rendering cached DOCX templates.
     - Custom Utilities:
          • process_logo_image from generate_ap_fg_lg/utils/helper – For processing and embedding the organization's logo.
 
@@ -39,7 +39,7 @@ Date:
 """
 
 import tempfile
-from docxtpl import DocxTemplate
+from generate_ap_fg_lg.utils.template_registry import load_template
 from generate_ap_fg_lg.utils.helper import process_logo_image
 
 LP_TEMPLATE_DIR = ".claude/skills/generate_lesson_plan/templates/LP_TGS-Ref-No_Course-Title_v1.docx"
@@ -138,7 +138,7 @@ def generate_lesson_plan(context: dict, name_of_organisation: str) -> str:
     context["Learning_Units"] = validated_learning_units
     print(f"LP DEBUG: Total validated Learning_Units = {len(validated_learning_units)}")
 
-    doc = DocxTemplate(LP_TEMPLATE_DIR)
+    doc = load_template(LP_TEMPLATE_DIR)
 
     # Add the logo and organization details to the context
     context['company_logo'] = process_logo_image(doc, name_of_organisation)
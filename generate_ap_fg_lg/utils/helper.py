@@ -14,18 +14,20 @@ Description:
 
 Main Functionalities:
     • retrieve_excel_data(context: dict, sfw_dataset_dir: str) -> dict:
-          - Reads an Excel file from the specified directory.
+          - Looks the TSC Code up in a cached SQLite index of the Excel file (built on first use,
+            rebuilt when the workbook changes) instead of parsing the workbook every call.
           - Extracts relevant information from the "TSC_K&A" sheet using the TSC Code provided in the context.
           - Updates and returns the context dictionary with additional keys:
                 "TSC_Sector", "TSC_Sector_Abbr", "TSC_Category", "Proficiency_Level", and "Proficiency_Description".
     • process_logo_image(doc, name_of_organisation, max_width_inch=7, max_height_inch=2.5) -> InlineImage:
-          - Processes and resizes the organization's logo image to fit within the defined maximum dimensions.
+          - Processes and resizes the organization's logo image to fit within the defined maximum dimensions
+            (logo bytes and scaled size are cached per organisation by template_registry.get_logo).
           - Returns an InlineImage object for insertion into DOCX templates using docxtpl.
 
 Dependencies:
     - pandas: For reading and parsing Excel files.
+    - sqlite3: For the on-disk TSC Code index of the Skills Framework dataset.
     - os: For file system operations.
-    - PIL (Pillow): For image processing.
     - docx.shared.Inches: For specifying dimensions in Word documents.
     - docxtpl.InlineImage: For embedding images into DOCX templates.
 
@@ -43,18 +45,119 @@ Date:
 ===============================================================================
 """
 
+import functools
+import hashlib
+import io
 import pandas as pd
 import os
-from PIL import Image
+import sqlite3
+import threading
 from docx.shared import Inches
 from docxtpl import InlineImage
 
+SFW_SHEET = "TSC_K&A"
+SFW_COLUMNS = ["TSC Code", "Sector", "Category", "Proficiency Level", "Proficiency Description"]
+SFW_INDEX_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), ".output", "sfw_index"
+)
+_sfw_build_lock = threading.Lock()
+
+
+def _sfw_index_path(source_path: str) -> str:
+    digest = hashlib.sha1(os.path.abspath(source_path).encode("utf-8")).hexdigest()[:12]
+    return os.path.join(SFW_INDEX_DIR, f"sfw_{digest}.db")
+
+
+def _sfw_index_is_current(index_path: str, mtime_ns: int, size: int) -> bool:
+    if not os.path.exists(index_path):
+        return False
+    try:
+        conn = sqlite3.connect(index_path)
+        try:
+            meta = dict(conn.execute("SELECT key, value FROM meta").fetchall())
+        finally:
+            conn.close()
+    except sqlite3.Error:
+        return False
+    return meta.get("source_mtime_ns") == str(mtime_ns) and meta.get("source_size") == str(size)
+
+
+def _build_sfw_index(source_path: str, index_path: str, mtime_ns: int, size: int):
+    """Parse the TSC_K&A sheet once and write the first row per TSC Code to SQLite."""
+    df = pd.read_excel(source_path, sheet_name=SFW_SHEET, usecols=SFW_COLUMNS, dtype=str)
+    df = df.dropna(subset=["TSC Code"])
+    df["TSC Code"] = df["TSC Code"].str.strip()
+    df = df.drop_duplicates(subset="TSC Code", keep="first")
+
+    os.makedirs(SFW_INDEX_DIR, exist_ok=True)
+    tmp_path = f"{index_path}.{os.getpid()}.tmp"
+    conn = sqlite3.connect(tmp_path)
+    try:
+        conn.execute(
+            "CREATE TABLE tsc (code TEXT PRIMARY KEY, sector TEXT, category TEXT, "
+            "proficiency_level TEXT, proficiency_description TEXT)"
+        )
+        # Empty cells keep the str(NaN) value the per-call sheet parse produced
+        conn.executemany(
+            "INSERT INTO tsc VALUES (?, ?, ?, ?, ?)",
+            df[SFW_COLUMNS].fillna("nan").itertuples(index=False, name=None),
+        )
+        conn.execute("CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT)")
+        conn.executemany("INSERT INTO meta VALUES (?, ?)", [
+            ("source_path", os.path.abspath(source_path)),
+            ("source_mtime_ns", str(mtime_ns)),
+            ("source_size", str(size)),
+        ])
+        conn.commit()
+    finally:
+        conn.close()
+    os.replace(tmp_path, index_path)
+
+
+@functools.lru_cache(maxsize=4)
+def _load_sfw_index(source_path: str, mtime_ns: int, size: int) -> dict:
+    """TSC Code -> row dict, memoized per workbook version (path, mtime, size)."""
+    index_path = _sfw_index_path(source_path)
+    with _sfw_build_lock:
+        if not _sfw_index_is_current(index_path, mtime_ns, size):
+            _build_sfw_index(source_path, index_path, mtime_ns, size)
+    conn = sqlite3.connect(index_path)
+    try:
+        rows = conn.execute("SELECT * FROM tsc").fetchall()
+    finally:
+        conn.close()
+    return {
+        code: {
+            "Sector": sector,
+            "Category": category,
+            "Proficiency Level": level,
+            "Proficiency Description": description,
+        }
+        for code, sector, category, level, description in rows
+    }
+
+
+def get_sfw_index(sfw_dataset_dir: str) -> dict:
+    """
+    Return the Skills Framework TSC index (TSC Code -> Sector/Category/Proficiency row).
+
+    The "TSC_K&A" sheet is parsed once into a SQLite index under .output/sfw_index
+    and rebuilt automatically when the workbook's modification time or size changes.
+    The loaded index is memoized in-process, so repeated lookups are dictionary hits.
+
+    Raises:
+        FileNotFoundError: If the workbook does not exist.
+    """
+    stat = os.stat(sfw_dataset_dir)
+    return _load_sfw_index(os.path.abspath(sfw_dataset_dir), stat.st_mtime_ns, stat.st_size)
+
+
 def retrieve_excel_data(context: dict, sfw_dataset_dir: str) -> dict:
     """
     Retrieve course-related data from an Excel dataset based on the provided TSC Code.
 
-    This function reads an Excel file and extracts relevant information from the "TSC_K&A" sheet 
-    using the TSC Code present in the `context` dictionary. The retrieved data, including 
+    This function looks up the TSC Code present in the `context` dictionary in the cached
+    index of the Excel file's "TSC_K&A" sheet (see `get_sfw_index`). The retrieved data, including 
     sector, category, proficiency level, and description, is added to the `context` dictionary.
 
     Args:
@@ -82,19 +185,13 @@ def retrieve_excel_data(context: dict, sfw_dataset_dir: str) -> dict:
         ValueError: 
             If the provided TSC Code is not found in the dataset.
     """
-    # Load the Excel file
-    excel_data = pd.ExcelFile(sfw_dataset_dir)
-    
-    # Load the specific sheet named 'TSC_K&A'
-    df = excel_data.parse('TSC_K&A')
-    
+    # Cached index of the 'TSC_K&A' sheet (rebuilt when the workbook changes)
+    index = get_sfw_index(sfw_dataset_dir)
+
     tsc_code = context.get("TSC_Code")
-    # Filter the DataFrame based on the TSC Code
-    filtered_df = df[df['TSC Code'] == tsc_code]
-    
-    if not filtered_df.empty:
-        row = filtered_df.iloc[0]
-        
+    row = index.get(tsc_code.strip()) if isinstance(tsc_code, str) else None
+
+    if row is not None:
         context["TSC_Sector"] = str(row['Sector'])
         context["TSC_Sector_Abbr"] = str(tsc_code.split('-')[0])
         context["TSC_Category"] = str(row['Category'])
@@ -117,40 +214,9 @@ def process_logo_image(doc, name_of_organisation, max_width_inch=7, max_height_i
     Returns:
         InlineImage: The resized logo image for use in the document.
     """
-    # Get logo path from organization data
-    from generate_ap_fg_lg.utils.organizations import get_organizations
-    organizations = get_organizations()
-    org = next((o for o in organizations if o["name"] == name_of_organisation), None)
-
-    if org and org.get("logo"):
-        logo_path = org["logo"].replace("\\", "/")
-    else:
-        # Fallback: check company/logo/ then generate_ap_fg_lg/utils/logo/
-        logo_filename = name_of_organisation.lower().replace(" ", "_") + ".jpg"
-        logo_path = f"company/logo/{logo_filename}"
-        if not os.path.exists(logo_path):
-            logo_path = f"generate_ap_fg_lg/utils/logo/{logo_filename}"
-
-    if not os.path.exists(logo_path):
-        raise FileNotFoundError(f"Logo file not found for organisation: {name_of_organisation}")
-
-    # Open the logo image
-    image = Image.open(logo_path)
-    width_px, height_px = image.size
-
-    # Get DPI and calculate dimensions in inches
-    dpi = image.info.get('dpi', (96, 96))  # Default to 96 DPI if not specified
-    width_inch = width_px / dpi[0]
-    height_inch = height_px / dpi[1]
-
-    # Scale dimensions if they exceed the maximum
-    width_ratio = max_width_inch / width_inch if width_inch > max_width_inch else 1
-    height_ratio = max_height_inch / height_inch if height_inch > max_height_inch else 1
-    scaling_factor = min(width_ratio, height_ratio)
-
-    # Apply scaling
-    width_docx = Inches(width_inch * scaling_factor)
-    height_docx = Inches(height_inch * scaling_factor)
+    # Logo path resolution, file bytes and scaled size are cached per organisation
+    from generate_ap_fg_lg.utils.template_registry import get_logo
+    logo_bytes, width_inch, height_inch = get_logo(name_of_organisation, max_width_inch, max_height_inch)
 
     # Create and return the InlineImage
-    return InlineImage(doc, logo_path, width=width_docx, height=height_docx)
\ No newline at end of file
+    return InlineImage(doc, io.BytesIO(logo_bytes), width=Inches(width_inch), height=Inches(height_inch))
@@ -40,6 +40,31 @@ def get_organization_by_name(name: str) -> Dict[str, Any]:
     return org if org else {}
 
 
+def match_organization(org_name: str) -> Dict[str, Any]:
+    """Match an organisation name (e.g. from a CP) against the database.
+
+    Exact match ignoring case/punctuation first, then substring match
+    (e.g. "SOPHIA IGNITE" matches "Sophia Ignite Learning Academy Pte Ltd").
+    Returns the matching organization, or {} if none.
+    """
+    if not org_name:
+        return {}
+
+    def _norm(s: str) -> str:
+        return s.lower().strip().replace(".", "").replace(",", "")
+
+    organizations = get_organizations()
+    target = _norm(org_name)
+    for org in organizations:
+        if _norm(org.get("name", "")) == target:
+            return org
+    for org in organizations:
+        org_norm = _norm(org.get("name", ""))
+        if target in org_norm or org_norm in target:
+            return org
+    return {}
+
+
 def get_default_organization() -> Dict[str, Any]:
     """Get Tertiary Infotech as default organization"""
     organizations = get_organizations()
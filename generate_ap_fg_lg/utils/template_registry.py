@@ -0,0 +1,196 @@
+"""
+DOCX Template Registry
+
+Keeps the expensive parts of docxtpl rendering in memory so bulk AP/ASR/FG/LG/LP
+generation does not repeat them for every course:
+
+- Template files are read once per (path, mtime, size); each call gets a fresh
+  CachedDocxTemplate opened from the in-memory bytes (a rendered document is
+  mutated in place, so instances are never shared).
+- patch_xml() output (docxtpl's regex clean-up of the body/header/footer XML)
+  is memoized by source XML.
+- Jinja templates are compiled once per source XML by a shared Environment per
+  autoescape setting, instead of re-compiling on every render.
+- Organisation logos: the resolved logo path is remembered per company for
+  LOGO_RESOLVE_TTL_SECONDS (no organisations query per document) and the logo
+  bytes plus scaled display size are cached per (file, mtime, size, bounds).
+
+Usage:
+    from generate_ap_fg_lg.utils.template_registry import load_template
+
+    doc = load_template(FG_TEMPLATE_DIR)
+    doc.render(context, autoescape=True)
+    doc.save(output_path)
+"""
+
+import functools
+import io
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from docxtpl import DocxTemplate
+from jinja2 import Environment
+from PIL import Image
+
+TEMPLATE_XML_CACHE_SIZE = 64   # Patched XML / compiled Jinja entries kept per cache
+LOGO_RESOLVE_TTL_SECONDS = 60  # Re-check an organisation's logo path after this long
+
+
+class _LRU:
+    """Small thread-safe LRU mapping."""
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            value = self._data.get(key)
+            if value is not None:
+                self._data.move_to_end(key)
+            return value
+
+    def put(self, key, value):
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+
+_patched_xml = _LRU(TEMPLATE_XML_CACHE_SIZE)
+
+
+class _CompiledTemplateEnvironment(Environment):
+    """Jinja Environment that memoizes from_string() by source text."""
+
+    def __init__(self, **options):
+        super().__init__(**options)
+        self._compiled = _LRU(TEMPLATE_XML_CACHE_SIZE)
+
+    def from_string(self, source, globals=None, template_class=None):
+        if globals is not None or template_class is not None or not isinstance(source, str):
+            return super().from_string(source, globals, template_class)
+        template = self._compiled.get(source)
+        if template is None:
+            template = super().from_string(source)
+            self._compiled.put(source, template)
+        return template
+
+
+@functools.lru_cache(maxsize=2)
+def get_jinja_env(autoescape: bool = False) -> Environment:
+    """Shared compiling Environment for the given autoescape setting."""
+    return _CompiledTemplateEnvironment(autoescape=autoescape)
+
+
+class CachedDocxTemplate(DocxTemplate):
+    """DocxTemplate that reuses patched XML and compiled Jinja across renders."""
+
+    def patch_xml(self, src_xml):
+        patched = _patched_xml.get(src_xml)
+        if patched is None:
+            patched = super().patch_xml(src_xml)
+            _patched_xml.put(src_xml, patched)
+        return patched
+
+    def render(self, context, jinja_env=None, autoescape=False):
+        if jinja_env is None:
+            jinja_env = get_jinja_env(autoescape)
+        super().render(context, jinja_env=jinja_env, autoescape=autoescape)
+
+
+@functools.lru_cache(maxsize=16)
+def _template_bytes(path: str, mtime_ns: int, size: int) -> bytes:
+    with open(path, "rb") as f:
+        return f.read()
+
+
+def load_template(template_path: str) -> CachedDocxTemplate:
+    """
+    Return a fresh template for rendering, backed by the cached template file.
+
+    The cache is keyed by the file's modification time and size, so an edited
+    template is picked up on the next call.
+
+    Raises:
+        FileNotFoundError: If the template does not exist.
+    """
+    path = os.path.abspath(template_path)
+    stat = os.stat(path)
+    return CachedDocxTemplate(io.BytesIO(_template_bytes(path, stat.st_mtime_ns, stat.st_size)))
+
+
+_logo_paths = {}   # name_of_organisation -> (resolved_at, logo_path)
+
+
+def _resolve_logo_path(name_of_organisation: str) -> str:
+    cached = _logo_paths.get(name_of_organisation)
+    if cached and time.time() - cached[0] < LOGO_RESOLVE_TTL_SECONDS and os.path.exists(cached[1]):
+        return cached[1]
+
+    from generate_ap_fg_lg.utils.organizations import get_organizations
+    organizations = get_organizations()
+    org = next((o for o in organizations if o["name"] == name_of_organisation), None)
+
+    if org and org.get("logo"):
+        logo_path = org["logo"].replace("\\", "/")
+    else:
+        # Fallback: check company/logo/ then generate_ap_fg_lg/utils/logo/
+        logo_filename = name_of_organisation.lower().replace(" ", "_") + ".jpg"
+        logo_path = f"company/logo/{logo_filename}"
+        if not os.path.exists(logo_path):
+            logo_path = f"generate_ap_fg_lg/utils/logo/{logo_filename}"
+
+    if not os.path.exists(logo_path):
+        raise FileNotFoundError(f"Logo file not found for organisation: {name_of_organisation}")
+
+    _logo_paths[name_of_organisation] = (time.time(), logo_path)
+    return logo_path
+
+
+@functools.lru_cache(maxsize=64)
+def _scaled_logo(path: str, mtime_ns: int, size: int, max_width_inch: float, max_height_inch: float) -> tuple:
+    with open(path, "rb") as f:
+        data = f.read()
+    with Image.open(io.BytesIO(data)) as image:
+        width_px, height_px = image.size
+        dpi = image.info.get('dpi', (96, 96))  # Default to 96 DPI if not specified
+
+    width_inch = width_px / dpi[0]
+    height_inch = height_px / dpi[1]
+
+    # Scale dimensions if they exceed the maximum
+    width_ratio = max_width_inch / width_inch if width_inch > max_width_inch else 1
+    height_ratio = max_height_inch / height_inch if height_inch > max_height_inch else 1
+    scaling_factor = min(width_ratio, height_ratio)
+    return data, width_inch * scaling_factor, height_inch * scaling_factor
+
+
+def get_logo(name_of_organisation: str, max_width_inch: float = 7, max_height_inch: float = 2.5) -> tuple:
+    """
+    Return (logo bytes, width_inch, height_inch) for an organisation, scaled to fit the bounds.
+
+    Raises:
+        FileNotFoundError: If no logo file exists for the organisation.
+    """
+    path = _resolve_logo_path(name_of_organisation)
+    stat = os.stat(path)
+    return _scaled_logo(path, stat.st_mtime_ns, stat.st_size, max_width_inch, max_height_inch)
+
+
+def clear_template_cache():
+    """Drop all cached templates, patched XML, compiled Jinja templates and logos."""
+    _template_bytes.cache_clear()
+    _patched_xml.clear()
+    for autoescape in (False, True):
+        get_jinja_env(autoescape)._compiled.clear()
+    _logo_paths.clear()
+    _scaled_logo.cache_clear()
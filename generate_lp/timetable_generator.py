@@ -24,7 +24,6 @@ from docx import Document
 from docx.shared import Pt, RGBColor, Inches
 from docx.enum.text import WD_ALIGN_PARAGRAPH
 from docx.oxml.ns import qn
-from docxtpl import DocxTemplate
 from PIL import Image
 
 
@@ -346,8 +345,9 @@ def _render_lp_template(context: dict, company: dict) -> Document:
     Returns a python-docx Document ready for appending schedule tables.
     """
     from generate_ap_fg_lg.utils.helper import process_logo_image
+    from generate_ap_fg_lg.utils.template_registry import load_template
 
-    tpl = DocxTemplate(LP_TEMPLATE_PATH)
+    tpl = load_template(LP_TEMPLATE_PATH)
 
     org_name = company.get("name", "") if company else ""
 
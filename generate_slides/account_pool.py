@@ -8,14 +8,18 @@ Credentials loaded from environment variables:
   NOTEBOOKLM_EMAILS          - comma-separated list of emails
   NOTEBOOKLM_PASSWORD        - shared password
   NOTEBOOKLM_MAX_DECKS_PER_ACCOUNT - max decks per account (default 3)
+  NOTEBOOKLM_ACCOUNT_CONCURRENCY   - max decks in flight per account (default 2)
+  NOTEBOOKLM_RATE_LIMIT_COOLDOWN   - base cooldown in seconds after a 429 (default 60)
 """
 
+import asyncio
 import math
 import os
 import logging
+import time
 from dataclasses import dataclass, field
 from pathlib import Path
-from typing import List, Optional, Tuple
+from typing import Any, Awaitable, Callable, List, Optional, Tuple
 
 from dotenv import load_dotenv
 
@@ -37,6 +41,13 @@ class AccountInfo:
     decks_completed: int = 0
     decks_failed: int = 0
     error: Optional[str] = None
+    # Scheduler state (learned during a run)
+    max_concurrency: int = 1
+    in_flight: int = 0
+    cooldown_until: float = 0.0
+    rate_limit_hits: int = 0
+    success_streak: int = 0
+    retired: bool = False
 
 
 class AccountPool:
@@ -142,3 +153,241 @@ class AccountPool:
                 for a in self.accounts
             ],
         }
+
+
+# =============================================================================
+# Work-stealing deck scheduler
+# =============================================================================
+
+# Specific phrases only: words like "rate" or "limit" alone also appear in
+# unrelated errors (e.g. "generate", "source limit reached")
+RATE_LIMIT_MARKERS = (
+    "rate limit", "rate_limit", "ratelimit", "429", "quota",
+    "resource_exhausted", "too many requests",
+)
+
+
+def is_rate_limit_error(text: str) -> bool:
+    """True if an error message / status string indicates a NotebookLM rate limit."""
+    text = (text or "").lower()
+    return any(marker in text for marker in RATE_LIMIT_MARKERS)
+
+
+@dataclass
+class _QueuedChunk:
+    chunk: dict
+    attempts: int = 0
+    failed_on: set = field(default_factory=set)  # account_keys that failed it
+
+
+class AccountScheduler:
+    """
+    Shared work queue that NotebookLM accounts pull deck chunks from.
+
+    Each account opens ONE client and runs up to ``max_concurrency`` decks at a
+    time, pulling the next chunk as soon as a slot frees up, so fast accounts
+    naturally take more of the work. Per account:
+
+      - A rate-limit result (429 / "quota" / "rate limit" / "too many
+        requests" in the error or status) requeues the chunk, puts the account
+        into an exponential cooldown and lowers its concurrency. Accounts
+        hitting ``max_rate_limit_hits`` are retired for the rest of the run.
+      - A deck succeeds only when it completed and a PPTX was downloaded. A
+        run of successes raises concurrency again (up to the configured cap).
+      - Any other failure requeues the chunk for a different account, up to
+        ``max_attempts`` attempts in total.
+      - If the account's client cannot be opened (auth expired, missing
+        storage state), the account is retired and its work stays queued.
+
+    Usage:
+        scheduler = AccountScheduler(accounts, chunk_meta)
+        results, failed = await scheduler.run(open_client, run_chunk)
+    """
+
+    def __init__(
+        self,
+        accounts: List[AccountInfo],
+        chunks: List[dict],
+        concurrency: Optional[int] = None,
+        cooldown_seconds: Optional[float] = None,
+        max_attempts: int = 3,
+        max_rate_limit_hits: int = 3,
+        progress_callback=None,
+    ):
+        self.accounts = list(accounts)
+        self.concurrency = max(1, concurrency or int(
+            os.environ.get("NOTEBOOKLM_ACCOUNT_CONCURRENCY", "2")
+        ))
+        self.cooldown_seconds = cooldown_seconds if cooldown_seconds is not None else float(
+            os.environ.get("NOTEBOOKLM_RATE_LIMIT_COOLDOWN", "60")
+        )
+        self.max_attempts = max_attempts
+        self.max_rate_limit_hits = max_rate_limit_hits
+        self.progress_callback = progress_callback
+
+        self._pending: List[_QueuedChunk] = [_QueuedChunk(c) for c in chunks]
+        self._in_flight = 0
+        self._cond: Optional[asyncio.Condition] = None
+        self.results: List[dict] = []
+        self.failed: List[Tuple[dict, str]] = []
+
+    def _progress(self, msg: str) -> None:
+        logger.info(msg)
+        if self.progress_callback:
+            self.progress_callback(msg, None)
+
+    @staticmethod
+    def _name(account: AccountInfo) -> str:
+        return account.email.split("@")[0]
+
+    def _alive(self) -> List[AccountInfo]:
+        return [a for a in self.accounts if not a.retired]
+
+    async def run(
+        self,
+        open_client: Callable[[AccountInfo], Awaitable[Any]],
+        run_chunk: Callable[[Any, AccountInfo, dict], Awaitable[dict]],
+    ) -> Tuple[List[dict], List[Tuple[dict, str]]]:
+        """Run every chunk to completion across all accounts.
+
+        Args:
+            open_client: async fn(account) -> async context manager yielding
+                the client (a NotebookLMClient, or a client pool lease).
+            run_chunk: async fn(client, account, chunk) -> result dict with a
+                ``generation_status`` key. Only "completed" results with a
+                ``pptx_path`` succeed; other results and exceptions are failures.
+
+        Returns:
+            (results, failed) — successful result dicts, and (chunk, reason)
+            pairs for chunks that could not be generated.
+        """
+        self._cond = asyncio.Condition()
+        for account in self.accounts:
+            account.max_concurrency = self.concurrency
+            account.in_flight = 0
+            account.cooldown_until = 0.0
+            account.retired = False
+
+        await asyncio.gather(*[
+            self._account_loop(account, open_client, run_chunk) for account in self.accounts
+        ])
+
+        # Anything still queued had no account left to run it
+        for item in self._pending:
+            self.failed.append((item.chunk, "no account available"))
+        self._pending.clear()
+        return self.results, self.failed
+
+    async def _account_loop(self, account, open_client, run_chunk) -> None:
+        try:
+            async with await open_client(account) as client:
+                workers = [self._worker(account, client, run_chunk) for _ in range(self.concurrency)]
+                await asyncio.gather(*workers)
+        except Exception as e:
+            account.error = f"{type(e).__name__}: {e}"
+            self._progress(f"[{self._name(account)}] Account unavailable: {account.error}")
+        finally:
+            async with self._cond:
+                account.retired = True
+                self._cond.notify_all()
+
+    def _take(self, account: AccountInfo) -> Optional[_QueuedChunk]:
+        """Pop the first chunk this account should run (prefers chunks it has not failed)."""
+        alive_keys = {a.account_key for a in self._alive()}
+        for i, item in enumerate(self._pending):
+            if account.account_key not in item.failed_on or alive_keys <= item.failed_on:
+                return self._pending.pop(i)
+        return None
+
+    async def _worker(self, account: AccountInfo, client, run_chunk) -> None:
+        name = self._name(account)
+        while True:
+            async with self._cond:
+                while True:
+                    if account.retired:
+                        return
+                    if not self._pending and self._in_flight == 0:
+                        self._cond.notify_all()
+                        return
+                    wait = account.cooldown_until - time.monotonic()
+                    if wait > 0:
+                        try:
+                            await asyncio.wait_for(self._cond.wait(), timeout=wait)
+                        except asyncio.TimeoutError:
+                            pass
+                        continue
+                    if account.in_flight < account.max_concurrency:
+                        item = self._take(account)
+                        if item is not None:
+                            break
+                    await self._cond.wait()
+                item.attempts += 1
+                account.in_flight += 1
+                account.decks_assigned += 1
+                self._in_flight += 1
+
+            label = item.chunk.get("label", "?")
+            self._progress(f"[{name}] Starting {label} (attempt {item.attempts}, "
+                           f"{account.in_flight}/{account.max_concurrency} in flight)")
+            try:
+                result = await run_chunk(client, account, item.chunk)
+                reason = "" if isinstance(result, dict) else "no result"
+                status = (result or {}).get("generation_status", "") if isinstance(result, dict) else ""
+            except Exception as e:
+                result, status = None, ""
+                reason = f"{type(e).__name__}: {e}"
+            # Only a downloaded deck counts; "api_triggered", "pending", "timeout"
+            # and a completed run without a PPTX are all failures
+            if not reason and status != "completed":
+                reason = f"status {status or 'unknown'}"
+            elif not reason and not result.get("pptx_path"):
+                reason = "completed without a PPTX"
+
+            async with self._cond:
+                account.in_flight -= 1
+                self._in_flight -= 1
+                if is_rate_limit_error(reason):
+                    self._on_rate_limit(account, item)
+                elif reason:
+                    self._on_failure(account, item, reason)
+                else:
+                    account.decks_completed += 1
+                    account.success_streak += 1
+                    if account.success_streak >= 2 and account.max_concurrency < self.concurrency:
+                        account.max_concurrency += 1
+                        account.success_streak = 0
+                    self.results.append(result)
+                    self._progress(f"[{name}] {label} completed")
+                self._cond.notify_all()
+
+    def _on_rate_limit(self, account: AccountInfo, item: _QueuedChunk) -> None:
+        name = self._name(account)
+        account.decks_failed += 1
+        account.rate_limit_hits += 1
+        account.success_streak = 0
+        account.max_concurrency = max(1, account.max_concurrency - 1)
+        account.error = "rate_limited"
+        item.attempts -= 1  # Rate limits do not count against the chunk
+        self._pending.insert(0, item)
+        if account.rate_limit_hits >= self.max_rate_limit_hits:
+            account.retired = True
+            self._progress(f"[{name}] Rate limited {account.rate_limit_hits}x — retiring account for this run")
+            return
+        cooldown = self.cooldown_seconds * (2 ** (account.rate_limit_hits - 1))
+        account.cooldown_until = time.monotonic() + cooldown
+        self._progress(f"[{name}] Rate limited on {item.chunk.get('label', '?')} — "
+                       f"requeued, cooling down {cooldown:.0f}s (concurrency {account.max_concurrency})")
+
+    def _on_failure(self, account: AccountInfo, item: _QueuedChunk, reason: str) -> None:
+        name = self._name(account)
+        label = item.chunk.get("label", "?")
+        account.decks_failed += 1
+        account.success_streak = 0
+        account.error = f"{label}: {reason}"
+        item.failed_on.add(account.account_key)
+        if item.attempts >= self.max_attempts:
+            self.failed.append((item.chunk, reason))
+            self._progress(f"[{name}] {label} failed after {item.attempts} attempts: {reason}")
+        else:
+            self._pending.append(item)
+            self._progress(f"[{name}] {label} failed ({reason}) — requeued for another account")
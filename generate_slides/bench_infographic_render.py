@@ -0,0 +1,113 @@
+"""Benchmark AntV infographic rendering: file mode vs live mode.
+
+file mode: one self-contained HTML per infographic (AntV bundle inlined,
+           ~1 MB written and re-parsed by Chromium every time).
+live mode: each pooled page loads the bundle once, then receives option
+           payloads via page.evaluate().
+
+Renders the same deterministic content blocks in both modes on an
+InfographicRenderPool and reports per-infographic latency and disk written.
+
+Usage:
+    uv run python -m generate_slides.bench_infographic_render [count] [concurrency]
+"""
+import asyncio
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+
+def _sample_blocks(count: int) -> list:
+    """Deterministic content blocks cycling through visualization types."""
+    from courseware_agents.slides.infographic_agent import TEMPLATE_MAP
+
+    viz_types = ["overview", "process", "comparison", "statistics", "timeline", "hierarchy"]
+    blocks = []
+    for i in range(count):
+        viz = viz_types[i % len(viz_types)]
+        templates = TEMPLATE_MAP[viz]
+        items = [
+            {"label": f"Point {j + 1}", "desc": "Short complete benchmark phrase",
+             "value": 10 * (j + 1), "icon": "mdi/check-circle"}
+            for j in range(4)
+        ]
+        if viz == "comparison":
+            items = [
+                {"label": "Option A", "children": items[:2]},
+                {"label": "Option B", "children": items[2:]},
+            ]
+        blocks.append((
+            {
+                "sub_title": f"Benchmark {i + 1}",
+                "visualization_type": viz,
+                "data": {"title": f"Benchmark Slide {i + 1}", "desc": "Render timing", "items": items},
+            },
+            templates[i % len(templates)],
+        ))
+    return blocks
+
+
+async def _run_mode(mode: str, blocks: list, concurrency: int) -> dict:
+    from courseware_agents.slides.infographic_agent import generate_single_infographic
+    from courseware_agents.slides.render_pool import InfographicRenderPool
+
+    out_dir = tempfile.mkdtemp(prefix=f"bench_render_{mode}_")
+    latencies = []
+
+    async def _one(i, block, template):
+        t0 = time.perf_counter()
+        result = await generate_single_infographic(
+            content_block=block,
+            assigned_template=template,
+            topic_title="Benchmark",
+            slide_position=i,
+            output_dir=out_dir,
+            pool=pool,
+        )
+        latencies.append(time.perf_counter() - t0)
+        return result
+
+    t_start = time.perf_counter()
+    async with InfographicRenderPool(size=concurrency, mode=mode) as pool:
+        t_ready = time.perf_counter()
+        results = await asyncio.gather(*[_one(i, b, t) for i, (b, t) in enumerate(blocks)])
+    t_end = time.perf_counter()
+
+    disk_bytes = sum(
+        os.path.getsize(os.path.join(out_dir, f)) for f in os.listdir(out_dir)
+        if f.endswith(".html")
+    )
+    shutil.rmtree(out_dir, ignore_errors=True)
+
+    latencies.sort()
+    return {
+        "mode": mode,
+        "generated": sum(1 for r in results if r.get("generated")),
+        "startup_s": t_ready - t_start,
+        "total_s": t_end - t_start,
+        "mean_s": statistics.mean(latencies),
+        "p95_s": latencies[max(0, int(len(latencies) * 0.95) - 1)],
+        "html_bytes": disk_bytes,
+    }
+
+
+async def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 24
+    concurrency = int(sys.argv[2]) if len(sys.argv) > 2 else 4
+    blocks = _sample_blocks(count)
+
+    print(f"Rendering {count} infographics per mode, {concurrency} pages\n")
+    print(f"{'mode':<6} {'ok':>4} {'startup':>8} {'total':>8} {'mean':>7} {'p95':>7} {'html MB':>8}")
+    for mode in ("file", "live"):
+        r = await _run_mode(mode, blocks, concurrency)
+        print(
+            f"{r['mode']:<6} {r['generated']:>4} {r['startup_s']:>7.2f}s {r['total_s']:>7.2f}s "
+            f"{r['mean_s']:>6.2f}s {r['p95_s']:>6.2f}s {r['html_bytes'] / 1e6:>8.1f}"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,141 @@
+"""Benchmark NotebookLM logo removal on a synthetic deck.
+
+Builds a PPTX-shaped ZIP with one full-slide PNG per slide (NotebookLM
+layout: background, a coloured footer bar, a logo box bottom-right) and times:
+
+  legacy : per-pixel img.load() loop, serial, every member re-deflated
+  serial : vectorized erase, 1 process, raw copy of unchanged members
+  pool   : vectorized erase across a process pool (default: all CPUs)
+
+Also checks that the vectorized erase is pixel-identical to the legacy loop.
+
+Usage:
+    uv run python -m generate_slides.bench_logo_removal [slides] [workers]
+"""
+import io
+import os
+import random
+import sys
+import time
+import zipfile
+
+
+def _legacy_erase(img):
+    """The original pixel-by-pixel erase, kept here as the reference."""
+    w, h = img.size
+    original_format = img.format or 'PNG'
+    if img.mode not in ('RGB', 'RGBA'):
+        img = img.convert('RGBA')
+    logo_region_w = max(int(w * 8 / 100), 70)
+    logo_region_h = max(int(h * 0.03), 23)
+    logo_left = w - logo_region_w
+    logo_top = h - logo_region_h
+    pixels = img.load()
+    right_bg = pixels[min(w - 1, w - 3), max(0, logo_top - 3)]
+    for y in range(logo_top, h):
+        left_color = pixels[max(0, logo_left - 1), y]
+        dist = sum(abs(left_color[i] - right_bg[i]) for i in range(3))
+        for x in range(logo_left, w):
+            if dist < 50:
+                pixels[x, y] = left_color
+                continue
+            above_c = pixels[x, max(0, logo_top - 3)]
+            dist_to_bar = sum(abs(above_c[i] - left_color[i]) for i in range(3))
+            dist_to_bg = sum(abs(above_c[i] - right_bg[i]) for i in range(3))
+            pixels[x, y] = left_color if dist_to_bar <= dist_to_bg else right_bg
+    out = io.BytesIO()
+    if original_format.upper() == 'JPEG':
+        img.convert('RGB').save(out, format='JPEG', quality=95)
+    else:
+        img.save(out, format='PNG')
+    return out.getvalue()
+
+
+def _slide_png(i: int, w: int = 1920, h: int = 1080) -> bytes:
+    from PIL import Image, ImageDraw
+
+    rng = random.Random(i)
+    bg = (rng.randint(230, 255), rng.randint(230, 255), rng.randint(230, 255))
+    img = Image.new("RGB", (w, h), bg)
+    draw = ImageDraw.Draw(img)
+    for _ in range(40):  # "text" blocks
+        x, y = rng.randint(60, w - 400), rng.randint(60, h - 200)
+        draw.rectangle([x, y, x + rng.randint(80, 380), y + 14], fill=(40, 40, 40))
+    bar_end = w - rng.choice([0, 60, 200])  # Some footer bars stop before the edge
+    draw.rectangle([0, h - 40, bar_end, h], fill=(30, 60, 120))
+    draw.rectangle([w - 140, h - 28, w - 10, h - 6], fill=(90, 90, 90))  # logo
+    buf = io.BytesIO()
+    img.save(buf, format="PNG")
+    return buf.getvalue()
+
+
+def _build_deck(slides: int) -> bytes:
+    buf = io.BytesIO()
+    with zipfile.ZipFile(buf, "w", zipfile.ZIP_DEFLATED) as z:
+        z.writestr("[Content_Types].xml", '<?xml version="1.0"?><Types/>')
+        for i in range(slides):
+            z.writestr(f"ppt/slides/slide{i + 1}.xml",
+                       f'<?xml version="1.0"?><p:sld><p:txBody>Slide {i + 1}</p:txBody></p:sld>')
+            z.writestr(f"ppt/media/image{i + 1}.png", _slide_png(i))
+    return buf.getvalue()
+
+
+def _legacy_remove(pptx_bytes: bytes) -> bytes:
+    from PIL import Image
+
+    src = zipfile.ZipFile(io.BytesIO(pptx_bytes))
+    out = io.BytesIO()
+    with zipfile.ZipFile(out, "w", zipfile.ZIP_DEFLATED) as dst:
+        for item in src.infolist():
+            data = src.read(item.filename)
+            if item.filename.startswith("ppt/media/"):
+                data = _legacy_erase(Image.open(io.BytesIO(data)))
+            dst.writestr(item, data)
+    return out.getvalue()
+
+
+def _check_identical(deck: bytes, samples: int = 6) -> bool:
+    from PIL import Image
+    from generate_slides.logo_erase import erase_logo_region
+
+    z = zipfile.ZipFile(io.BytesIO(deck))
+    media = [n for n in z.namelist() if n.startswith("ppt/media/")][:samples]
+    for name in media:
+        data = z.read(name)
+        a = Image.open(io.BytesIO(_legacy_erase(Image.open(io.BytesIO(data)))))
+        b = Image.open(io.BytesIO(erase_logo_region(Image.open(io.BytesIO(data)))))
+        if a.tobytes() != b.tobytes():
+            print(f"MISMATCH: {name}")
+            return False
+    return True
+
+
+def main():
+    from generate_slides.slides_generation import _remove_notebooklm_logo
+
+    slides = int(sys.argv[1]) if len(sys.argv) > 1 else 120
+    workers = int(sys.argv[2]) if len(sys.argv) > 2 else (os.cpu_count() or 1)
+
+    t0 = time.perf_counter()
+    deck = _build_deck(slides)
+    print(f"Built {slides}-slide deck: {len(deck) / 1e6:.1f} MB in {time.perf_counter() - t0:.1f}s")
+    print(f"Vectorized erase identical to legacy: {_check_identical(deck)}\n")
+
+    runs = []
+    t0 = time.perf_counter()
+    _legacy_remove(deck)
+    runs.append(("legacy", time.perf_counter() - t0))
+
+    for name, n in (("serial", 1), (f"pool({workers})", workers)):
+        t0 = time.perf_counter()
+        _remove_notebooklm_logo(deck, workers=n)
+        runs.append((name, time.perf_counter() - t0))
+
+    base = runs[0][1]
+    print(f"{'variant':<10} {'total':>8} {'per slide':>10} {'speedup':>8}")
+    for name, secs in runs:
+        print(f"{name:<10} {secs:>7.2f}s {secs / slides * 1000:>8.1f}ms {base / secs:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,291 @@
+"""Benchmark the NotebookLM slide schedulers against the offline simulator.
+
+Runs the real scheduling code in slides_generation.py with ``notebooklm``
+replaced by generate_slides.nblm_simulator (virtual time: simulated hours take
+seconds) on the same synthetic course, and reports throughput and tail
+latency for each strategy:
+
+  account_batches : decks split up front across accounts, one
+                    _run_account_batch per account
+  shared_queue    : _generate_slides_multi_account (every account pulls decks
+                    from one work queue)
+  topic_fallback  : one image deck per topic via _generate_nblm_images_for_topic
+                    (accounts tried in turn, topics in sequence as in the app)
+  per_slide       : one notebook per slide via _generate_nblm_images_for_lu_slides
+  per_slide_batch : the same, with slides packed NOTEBOOKLM_SLIDES_PER_NOTEBOOK
+                    to a notebook
+
+Each strategy gets a fresh simulator (same seed), a throwaway HOME and an
+empty deck cache, so account quotas and cached decks/images do not leak
+between runs. "latency" is
+notebook creation -> successful download, in simulated seconds; "polls" is
+the number of list_slide_decks status queries and "opens" the number of
+clients opened (successful from_storage calls). The first ``expired``
+accounts have expired auth, like a stale storage_state.json.
+
+Usage:
+    uv run python -m generate_slides.bench_nblm_schedulers [accounts] [topics] [seed] [decks_per_hour] [expired]
+"""
+import asyncio
+import contextlib
+import io
+import logging
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+SLIDES_PER_TOPIC = 3
+BENCH_SCOPE_ENV = ("HOME", "NOTEBOOKLM_EMAILS", "NOTEBOOKLM_PASSWORD")
+
+
+def _sample_context(topics: int) -> dict:
+    """Synthetic course: topics spread over two Learning Units."""
+    lus = []
+    per_lu = [topics - topics // 2, topics // 2] if topics > 1 else [topics]
+    t = 0
+    for lu_idx, count in enumerate(n for n in per_lu if n):
+        lu_topics = []
+        for _ in range(count):
+            t += 1
+            lu_topics.append({
+                "Topic_Title": f"Topic {t}: Benchmark concept {t} (K{t}, A{t})",
+                "Bullet_Points": [f"Principle {t}.{b}" for b in range(1, 4)],
+            })
+        lus.append({
+            "LU_Title": f"LU{lu_idx + 1}: Benchmark unit {lu_idx + 1}",
+            "LO": f"LO{lu_idx + 1}: Apply benchmark unit {lu_idx + 1}",
+            "Topics": lu_topics,
+            "K_numbering_description": [{"K_number": f"K{lu_idx + 1}", "Description": "Benchmark knowledge"}],
+            "A_numbering_description": [{"A_number": f"A{lu_idx + 1}", "Description": "Benchmark ability"}],
+        })
+    return {
+        "Course_Title": "Scheduler Benchmark Course",
+        "TGS_Ref_No": "TGS-0000000000",
+        "TSC_Code": "ICT-BEN-0001-1.1",
+        "Total_Course_Duration_Hours": "16 hrs",
+        "Learning_Units": lus,
+    }
+
+
+def _chunk_meta(sg, context: dict) -> list:
+    """One deck per topic, built the same way _generate_slides_multi_account does."""
+    lus = context["Learning_Units"]
+    flat = [(lu_idx, t_idx) for lu_idx, lu in enumerate(lus) for t_idx in range(len(lu["Topics"]))]
+    chunks = []
+    for c_idx, (lu_idx, t_idx) in enumerate(flat):
+        lu = lus[lu_idx]
+        label = f"LU{lu_idx + 1}_T{t_idx + 1}"
+        chunks.append({
+            "chunk_idx": c_idx,
+            "lu_idx": lu_idx,
+            "lu_num": f"LU{lu_idx + 1}",
+            "lu_title": lu["LU_Title"],
+            "label": label,
+            "topic_indices": [t_idx],
+            "topic_range": f"T{t_idx + 1}",
+            "topic_names": [lu["Topics"][t_idx]["Topic_Title"]],
+            "num_topics": 1,
+            "content": sg._format_chunk_source_text(
+                context, lu_idx, len(lus), [t_idx], label,
+                is_first_chunk_of_course=c_idx == 0,
+                is_last_chunk_of_course=c_idx == len(flat) - 1,
+            ),
+            "is_first": c_idx == 0,
+            "is_last": c_idx == len(flat) - 1,
+        })
+    return chunks
+
+
+def _slides_data(context: dict) -> list:
+    """Claude-style per-LU slide content for the image strategies."""
+    return [
+        (f"LU{i + 1}", lu["LU_Title"], {
+            "topics": [
+                {
+                    "title": topic["Topic_Title"],
+                    "slides": [
+                        {"title": f"{topic['Topic_Title']} - part {s + 1}",
+                         "bullets": topic["Bullet_Points"]}
+                        for s in range(SLIDES_PER_TOPIC)
+                    ],
+                }
+                for topic in lu["Topics"]
+            ],
+        })
+        for i, lu in enumerate(context["Learning_Units"])
+    ]
+
+
+async def _account_batches(sg, context, config, accounts):
+    chunks = _chunk_meta(sg, context)
+    per_account = -(-len(chunks) // len(accounts))
+    batches = [chunks[i * per_account:(i + 1) * per_account] for i in range(len(accounts))]
+    results = await asyncio.gather(*[
+        sg._run_account_batch(account, batch, context["Course_Title"], config, context=context)
+        for account, batch in zip(accounts, batches) if batch
+    ])
+    return len(chunks), sum(1 for batch in results for r in batch if r.get("pptx_path"))
+
+
+async def _shared_queue(sg, context, config, accounts):
+    result = await sg._generate_slides_multi_account(context, context["Course_Title"], config)
+    return len(_chunk_meta(sg, context)), len(result.get("pptx_paths") or [])
+
+
+async def _topic_fallback(sg, context, config, accounts):
+    target = done = 0
+    for lu_num, lu_title, slides_data in _slides_data(context):
+        for ti, topic in enumerate(slides_data["topics"]):
+            n_slides = len(topic["slides"])
+            target += n_slides
+            source_text = sg._format_topic_as_nblm_source(topic, context["Course_Title"], lu_title)
+            try:
+                images = await asyncio.wait_for(
+                    sg._generate_nblm_images_for_topic(source_text, topic["title"], f"{lu_num}_T{ti + 1}", n_slides),
+                    timeout=90,
+                )
+            except asyncio.TimeoutError:
+                images = []
+            done += len(images)
+    return target, done
+
+
+async def _per_slide(sg, context, config, accounts, slides_per_notebook=1):
+    target = done = 0
+    for lu_num, lu_title, slides_data in _slides_data(context):
+        target += sum(len(t["slides"]) for t in slides_data["topics"])
+        images = await sg._generate_nblm_images_for_lu_slides(
+            slides_data, lu_num, context["Course_Title"], lu_title,
+            slides_per_notebook=slides_per_notebook,
+        )
+        done += sum(1 for paths in (images or {}).values() for p in paths if p)
+    return target, done
+
+
+async def _per_slide_batch(sg, context, config, accounts):
+    return await _per_slide(sg, context, config, accounts, slides_per_notebook=sg._NBLM_SLIDES_PER_NOTEBOOK)
+
+
+STRATEGIES = {
+    "account_batches": ("decks", _account_batches),
+    "shared_queue": ("decks", _shared_queue),
+    "topic_fallback": ("images", _topic_fallback),
+    "per_slide": ("images", _per_slide),
+    "per_slide_batch": ("images", _per_slide_batch),
+}
+
+
+@contextlib.contextmanager
+def _sandbox(n_accounts: int):
+    """Throwaway HOME with n authenticated simulated accounts; restores env afterwards."""
+    from generate_slides import deck_cache
+
+    saved_env = {k: os.environ.get(k) for k in BENCH_SCOPE_ENV}
+    saved_tempdir = tempfile.tempdir
+    saved_cache_dir = deck_cache.DECK_CACHE_DIR
+    home = tempfile.mkdtemp(prefix="bench_nblm_home_")
+    names = [f"training{11 + i}" for i in range(n_accounts)]
+    for name in names:
+        account_dir = os.path.join(home, ".notebooklm", "accounts", name)
+        os.makedirs(account_dir)
+        with open(os.path.join(account_dir, "storage_state.json"), "w") as f:
+            f.write("{}")
+    os.makedirs(os.path.join(home, "tmp"))
+    os.environ["HOME"] = home
+    os.environ["NOTEBOOKLM_EMAILS"] = ",".join(f"{n}@sim.invalid" for n in names)
+    os.environ["NOTEBOOKLM_PASSWORD"] = ""
+    tempfile.tempdir = os.path.join(home, "tmp")
+    deck_cache.DECK_CACHE_DIR = os.path.join(home, "nblm_cache")
+    try:
+        yield
+    finally:
+        deck_cache.DECK_CACHE_DIR = saved_cache_dir
+        tempfile.tempdir = saved_tempdir
+        for k, v in saved_env.items():
+            if v is None:
+                os.environ.pop(k, None)
+            else:
+                os.environ[k] = v
+        shutil.rmtree(home, ignore_errors=True)
+
+
+def _percentile(values: list, pct: float) -> float:
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, max(0, int(round(pct / 100 * len(values))) - 1))]
+
+
+def _run_strategy(name: str, n_accounts: int, topics: int, seed: int, decks_per_hour: int,
+                  expired: int = 0) -> dict:
+    from generate_slides import slides_generation as sg
+    from generate_slides.account_pool import AccountPool
+    from generate_slides.nblm_simulator import (
+        AccountProfile, NotebookLMSimulator, SimulatorConfig, run_simulated,
+    )
+
+    unit, strategy = STRATEGIES[name]
+    sim = NotebookLMSimulator(SimulatorConfig(
+        seed=seed, default_account=AccountProfile(generations_per_hour=decks_per_hour),
+        accounts={
+            f"training{11 + i}": AccountProfile(generations_per_hour=decks_per_hour, auth_valid=False)
+            for i in range(min(expired, n_accounts))
+        },
+    ))
+    context = _sample_context(topics)
+    config = {"_context": context, "slide_style": "Professional"}
+
+    t0 = time.perf_counter()
+    with _sandbox(n_accounts), sim.installed(), contextlib.redirect_stdout(io.StringIO()):
+        accounts = AccountPool().get_authenticated()
+        target, done = run_simulated(strategy(sg, context, config, accounts))
+    real_s = time.perf_counter() - t0
+    sim_s = run_simulated.last_elapsed
+
+    latencies = sim.deck_latencies()
+    stats = sim.stats()
+    return {
+        "strategy": name,
+        "unit": unit,
+        "target": target,
+        "done": done,
+        "sim_s": sim_s,
+        "per_hour": done / sim_s * 3600 if sim_s else 0.0,
+        "p50_s": _percentile(latencies, 50),
+        "p95_s": _percentile(latencies, 95),
+        "max_s": max(latencies, default=0.0),
+        "generations": stats["generations_requested"],
+        "rate_limited": stats["rate_limited"],
+        "status_queries": stats["status_queries"],
+        "clients_opened": stats["clients_opened"],
+        "real_s": real_s,
+    }
+
+
+def main():
+    n_accounts = int(sys.argv[1]) if len(sys.argv) > 1 else 3
+    topics = int(sys.argv[2]) if len(sys.argv) > 2 else 8
+    seed = int(sys.argv[3]) if len(sys.argv) > 3 else 0
+    decks_per_hour = int(sys.argv[4]) if len(sys.argv) > 4 else 6
+    expired = int(sys.argv[5]) if len(sys.argv) > 5 else 0
+    logging.basicConfig(level=logging.ERROR)
+
+    print(f"Simulated NotebookLM: {n_accounts} account(s), {topics} topics "
+          f"({SLIDES_PER_TOPIC} slides each), {decks_per_hour} decks/hour/account, seed {seed}, "
+          f"{expired} expired\n")
+    print(f"{'strategy':<16} {'unit':<6} {'done':>9} {'sim time':>9} {'per hour':>9} "
+          f"{'p50':>7} {'p95':>7} {'max':>7} {'gens':>5} {'429s':>5} {'polls':>6} {'opens':>6} {'real':>7}")
+    for name in STRATEGIES:
+        r = _run_strategy(name, n_accounts, topics, seed, decks_per_hour, expired)
+        print(
+            f"{r['strategy']:<16} {r['unit']:<6} {r['done']:>4}/{r['target']:<4} {r['sim_s'] / 60:>7.1f}m "
+            f"{r['per_hour']:>9.1f} {r['p50_s']:>6.0f}s {r['p95_s']:>6.0f}s {r['max_s']:>6.0f}s "
+            f"{r['generations']:>5} {r['rate_limited']:>5} {r['status_queries']:>6} {r['clients_opened']:>6} "
+            f"{r['real_s']:>6.1f}s"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,248 @@
+"""
+Warm NotebookLM client pool with proactive auth health checks.
+
+Every NotebookLM job used to open its own client with
+``NotebookLMClient.from_storage()``. An expired storage_state.json was only
+discovered after notebooks had been attempted, because AccountPool only
+checks that the file exists. The pool keeps one open client per account
+(per event loop) and shares it across jobs:
+
+- probe() checks accounts concurrently. It opens the account's client (or
+  reuses the open one) and lists notebooks. An account that fails is marked
+  unhealthy until a later probe succeeds. Results are reused for
+  NOTEBOOKLM_HEALTH_INTERVAL seconds, so schedulers can probe before every
+  run without extra requests.
+- A background task re-probes every known account each
+  NOTEBOOKLM_HEALTH_INTERVAL seconds. It also closes clients that have been
+  unused for NOTEBOOKLM_CLIENT_IDLE seconds.
+- lease() yields the account's open client. Concurrent leases share it, and
+  it is never closed while leased. An error raised inside a lease that looks
+  like an auth failure, or a client that fails to open, triggers an
+  immediate re-probe. Only a failed probe marks the account unhealthy:
+  job errors such as a source URL answering 403 say nothing about the
+  account's session.
+- Clients are closed by close(), or when asyncio.run() cancels the
+  background task at shutdown. Streamlit runs each action in its own
+  asyncio.run(), so there the pool lives for one action. Headless runs
+  (batch_courseware.py) keep it for the whole batch.
+
+Environment:
+  NOTEBOOKLM_HEALTH_INTERVAL  - seconds between health probes of an account (default 600)
+  NOTEBOOKLM_PROBE_TIMEOUT    - seconds before a probe counts as failed (default 30)
+  NOTEBOOKLM_CLIENT_IDLE      - close clients unused for this long, in seconds (default 900)
+
+Usage:
+    from generate_slides.client_pool import get_client_pool
+
+    pool = get_client_pool()
+    accounts = await pool.healthy([("training11", storage_path), ...])
+    async with pool.lease("training11", storage_path) as client:
+        nb = await client.notebooks.create("...")
+"""
+
+import asyncio
+import contextlib
+import logging
+import os
+import weakref
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+HEALTH_INTERVAL = float(os.environ.get("NOTEBOOKLM_HEALTH_INTERVAL", "600"))
+PROBE_TIMEOUT = float(os.environ.get("NOTEBOOKLM_PROBE_TIMEOUT", "30"))
+CLIENT_IDLE = float(os.environ.get("NOTEBOOKLM_CLIENT_IDLE", "900"))
+
+AUTH_ERROR_MARKERS = (
+    "authenticat", "login", "log in", "sign in", "expired", "unauthorized",
+    "forbidden", "401", "403", "cookie",
+)
+
+
+def is_auth_error(text: str) -> bool:
+    """True if an error message may indicate expired or invalid NotebookLM auth."""
+    text = (text or "").lower()
+    return any(marker in text for marker in AUTH_ERROR_MARKERS)
+
+
+@dataclass
+class _Account:
+    label: str
+    storage_path: str
+    client: Any = None
+    leases: int = 0
+    healthy: Optional[bool] = None  # None until the first probe
+    checked_at: float = float("-inf")
+    last_used: float = 0.0
+    error: str = ""
+    opening: asyncio.Lock = field(default_factory=asyncio.Lock)
+    reprobe: Optional[asyncio.Future] = None  # Shared by leases failing at the same time
+
+
+class NotebookLMClientPool:
+    """Open NotebookLM clients keyed by storage path; use get_client_pool()."""
+
+    def __init__(self, health_interval: float = HEALTH_INTERVAL,
+                 probe_timeout: float = PROBE_TIMEOUT, client_idle: float = CLIENT_IDLE):
+        self.health_interval = health_interval
+        self.probe_timeout = probe_timeout
+        self.client_idle = client_idle
+        self.probes = 0
+        self._accounts: Dict[str, _Account] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    def _account(self, label: str, storage_path: str) -> _Account:
+        key = os.path.abspath(str(storage_path))
+        acct = self._accounts.get(key)
+        if acct is None:
+            acct = self._accounts[key] = _Account(label, key)
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._maintain())
+        return acct
+
+    async def _open(self, acct: _Account):
+        async with acct.opening:
+            if acct.client is None:
+                from notebooklm import NotebookLMClient
+
+                client = await NotebookLMClient.from_storage(path=acct.storage_path)
+                await client.__aenter__()
+                acct.client = client
+                acct.last_used = asyncio.get_running_loop().time()
+            return acct.client
+
+    async def _close_client(self, acct: _Account):
+        client, acct.client = acct.client, None
+        if client is not None:
+            try:
+                await client.__aexit__(None, None, None)
+            except Exception as e:
+                logger.debug(f"[{acct.label}] Closing NotebookLM client failed: {e}")
+
+    def _mark_unhealthy(self, acct: _Account, error: str):
+        if acct.healthy is not False:
+            logger.warning(f"[{acct.label}] NotebookLM account unavailable: {error}")
+        acct.healthy = False
+        acct.error = error
+        acct.checked_at = asyncio.get_running_loop().time()
+
+    async def _probe_one(self, acct: _Account):
+        self.probes += 1
+        try:
+            client = await asyncio.wait_for(self._open(acct), timeout=self.probe_timeout)
+            await asyncio.wait_for(client.notebooks.list(), timeout=self.probe_timeout)
+        except Exception as e:
+            self._mark_unhealthy(acct, f"{type(e).__name__}: {e}")
+            if acct.leases == 0:
+                await self._close_client(acct)
+            return
+        if acct.healthy is False:
+            logger.info(f"[{acct.label}] NotebookLM account healthy again")
+        acct.healthy = True
+        acct.error = ""
+        acct.checked_at = asyncio.get_running_loop().time()
+
+    async def _reprobe(self, acct: _Account):
+        if acct.reprobe is None or acct.reprobe.done():
+            acct.reprobe = asyncio.ensure_future(self._probe_one(acct))
+        await asyncio.shield(acct.reprobe)
+
+    async def probe(self, accounts: List[Tuple[str, str]], force: bool = False) -> Dict[str, bool]:
+        """Check (label, storage_path) accounts concurrently.
+
+        Accounts checked within the health interval are not probed again
+        unless force is set. Returns {storage_path: healthy} in input order.
+        """
+        now = asyncio.get_running_loop().time()
+        accts = [self._account(label, path) for label, path in accounts]
+        stale = {id(a): a for a in accts
+                 if force or a.healthy is None or now - a.checked_at >= self.health_interval}
+        if stale:
+            await asyncio.gather(*(self._probe_one(a) for a in stale.values()))
+        return {path: bool(a.healthy) for (_, path), a in zip(accounts, accts)}
+
+    async def healthy(self, accounts: list) -> list:
+        """The (label, storage_path, ...) tuples whose account passes its health probe."""
+        health = await self.probe([(a[0], a[1]) for a in accounts])
+        return [a for a in accounts if health[a[1]]]
+
+    def error(self, storage_path: str) -> str:
+        """Last health error for an account ("" if healthy or unknown)."""
+        acct = self._accounts.get(os.path.abspath(str(storage_path)))
+        return acct.error if acct else ""
+
+    @contextlib.asynccontextmanager
+    async def lease(self, label: str, storage_path: str):
+        """Yield the account's open client (opened on first use).
+
+        Raises RuntimeError for an account marked unhealthy, without
+        contacting NotebookLM. If the client fails to open, the account is
+        re-probed (which retries the open) and the lease continues when the
+        probe succeeds. A suspected auth error inside the lease also
+        re-probes the account before the error propagates.
+        """
+        acct = self._account(label, storage_path)
+        if acct.healthy is False:
+            raise RuntimeError(f"NotebookLM account '{label}' unavailable: {acct.error}")
+        try:
+            client = await self._open(acct)
+        except Exception:
+            # A single failed open may be transient; only a failed probe drops the account
+            await self._reprobe(acct)
+            if not acct.healthy or acct.client is None:
+                raise
+            client = acct.client
+        acct.leases += 1
+        try:
+            yield client
+        except Exception as e:
+            if is_auth_error(str(e)):
+                # The session itself must fail a probe before the account is dropped
+                await self._reprobe(acct)
+            raise
+        finally:
+            acct.leases -= 1
+            acct.last_used = asyncio.get_running_loop().time()
+            if acct.healthy is False and acct.leases == 0:
+                await self._close_client(acct)
+
+    async def _maintain(self):
+        loop = asyncio.get_running_loop()
+        try:
+            while self._accounts:
+                # Wake when the next probe or idle close is due
+                wake_at = min(
+                    [a.checked_at + self.health_interval for a in self._accounts.values()]
+                    + [a.last_used + self.client_idle for a in self._accounts.values() if a.client is not None]
+                )
+                await asyncio.sleep(max(1.0, wake_at - loop.time()))
+                now = loop.time()
+                for acct in list(self._accounts.values()):
+                    if acct.client is not None and acct.leases == 0 and now - acct.last_used >= self.client_idle:
+                        logger.debug(f"[{acct.label}] Closing idle NotebookLM client")
+                        await self._close_client(acct)
+                due = [a for a in self._accounts.values() if now - a.checked_at >= self.health_interval]
+                if due:
+                    await asyncio.gather(*(self._probe_one(a) for a in due))
+        finally:
+            await self.close()
+
+    async def close(self):
+        """Close every open client (leased clients included)."""
+        for acct in list(self._accounts.values()):
+            await self._close_client(acct)
+
+
+_pools: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, NotebookLMClientPool]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def get_client_pool() -> NotebookLMClientPool:
+    """The client pool for the running event loop (created on first use)."""
+    loop = asyncio.get_running_loop()
+    pool = _pools.get(loop)
+    if pool is None:
+        pool = _pools[loop] = NotebookLMClientPool()
+    return pool
@@ -0,0 +1,256 @@
+"""
+Content-addressed cache for NotebookLM decks and extracted slide images.
+
+Entries are keyed by a SHA-256 of exactly what is sent to NotebookLM: the
+source texts/URLs, the generation instructions and the generation options.
+A changed Course Proposal therefore never reuses stale images, and unchanged
+content reuses them whatever its topic label or position in the course.
+
+Layout (.output/nblm_cache/<key[:2]>/<key>/):
+    deck.pdf / deck.pptx   downloaded NotebookLM artifacts (before logo stamping)
+    pages/slide_NNN.png    extracted page images (NNN = page index in the PDF)
+    entry.json             label, created time, size in bytes
+
+- New entries are built in a temp dir and renamed into place, so readers
+  never see a half-written entry. Adding files to an existing entry replaces
+  them one by one.
+- A hit refreshes the entry's last-used time (entry.json mtime). After each
+  store, least recently used entries are evicted until the cache fits in
+  NOTEBOOKLM_CACHE_MAX_MB.
+- Files are copied out of the cache (restore_*), so eviction never removes a
+  file a caller is still using.
+
+Environment:
+  NOTEBOOKLM_CACHE_DIR      - cache root (default .output/nblm_cache)
+  NOTEBOOKLM_CACHE_MAX_MB   - disk budget (default 2048)
+  NOTEBOOKLM_CACHE_DISABLE  - "1" turns lookups and stores off
+
+Usage:
+    from generate_slides import deck_cache
+
+    key = deck_cache.cache_key("topic_images", [topic_text], instructions)
+    images = deck_cache.restore_images(key, work_dir)   # None on a miss
+    if images is None:
+        ...  # generate, download pdf_path, extract images
+        deck_cache.store(key, files={"deck.pdf": pdf_path}, images=images, label=topic_key)
+"""
+
+import hashlib
+import json
+import logging
+import os
+import shutil
+import tempfile
+import threading
+import time
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+DECK_CACHE_DIR = os.environ.get("NOTEBOOKLM_CACHE_DIR") or os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    ".output", "nblm_cache",
+)
+DECK_CACHE_MAX_BYTES = int(float(os.environ.get("NOTEBOOKLM_CACHE_MAX_MB", "2048")) * 1024 * 1024)
+DECK_CACHE_ENABLED = os.environ.get("NOTEBOOKLM_CACHE_DISABLE", "") != "1"
+CACHE_KEY_VERSION = 1           # Bump to invalidate every entry (e.g. page extraction changes)
+
+_ENTRY_FILE = "entry.json"
+_PAGES_DIR = "pages"
+
+_lock = threading.Lock()
+_stats = {"hits": 0, "misses": 0, "stores": 0, "evicted": 0}
+
+
+def cache_key(kind: str, sources: List[str], instructions: str, **options) -> str:
+    """Hash of everything that determines a NotebookLM deck.
+
+    Args:
+        kind: What the entry holds, e.g. "chunk_deck", "topic_images", "slide_image".
+        sources: Source texts / URLs in the order they are added to the notebook.
+        instructions: The exact generation instructions.
+        **options: Other generation inputs (deck format, length, page limits, ...).
+    """
+    payload = json.dumps(
+        {
+            "v": CACHE_KEY_VERSION,
+            "kind": kind,
+            "sources": [str(s) for s in sources],
+            "instructions": instructions or "",
+            "options": {k: str(v) for k, v in options.items()},
+        },
+        sort_keys=True,
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _entry_dir(key: str) -> str:
+    return os.path.join(DECK_CACHE_DIR, key[:2], key)
+
+
+def _lookup(key: str) -> Optional[str]:
+    """Entry directory for key (refreshing its last-used time), or None."""
+    if not DECK_CACHE_ENABLED:
+        return None
+    entry = _entry_dir(key)
+    try:
+        os.utime(os.path.join(entry, _ENTRY_FILE))
+    except OSError:
+        return None
+    return entry
+
+
+def _count(hit: bool):
+    with _lock:
+        _stats["hits" if hit else "misses"] += 1
+
+
+def restore_deck(key: str, dest_dir) -> Optional[str]:
+    """Copy the cached deck (deck.pptx preferred over deck.pdf) into dest_dir.
+
+    Returns the copied file's path, or None on a miss.
+    """
+    entry = _lookup(key)
+    for name in ("deck.pptx", "deck.pdf"):
+        if entry and os.path.isfile(os.path.join(entry, name)):
+            os.makedirs(dest_dir, exist_ok=True)
+            dest = os.path.join(str(dest_dir), f"{key[:12]}_{name}")
+            shutil.copyfile(os.path.join(entry, name), dest)
+            _count(True)
+            return dest
+    _count(False)
+    return None
+
+
+def restore_images(key: str, dest_dir, limit: Optional[int] = None) -> Optional[List[str]]:
+    """Copy cached page images into dest_dir and return their paths (page order).
+
+    Returns None on a miss or when the entry has no images.
+    """
+    entry = _lookup(key)
+    pages_dir = os.path.join(entry, _PAGES_DIR) if entry else None
+    names = sorted(n for n in os.listdir(pages_dir) if n.endswith(".png")) \
+        if pages_dir and os.path.isdir(pages_dir) else []
+    if not names:
+        _count(False)
+        return None
+    os.makedirs(dest_dir, exist_ok=True)
+    restored = []
+    for name in names[:limit] if limit else names:
+        dest = os.path.join(str(dest_dir), name)
+        shutil.copyfile(os.path.join(pages_dir, name), dest)
+        restored.append(dest)
+    _count(True)
+    return restored
+
+
+def _dir_size(path: str) -> int:
+    total = 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            try:
+                total += os.path.getsize(os.path.join(root, name))
+            except OSError:
+                pass
+    return total
+
+
+def _write_files(target: str, files: Dict[str, str], images: List[str]):
+    os.makedirs(os.path.join(target, _PAGES_DIR), exist_ok=True)
+    copies = [(src, os.path.join(target, name)) for name, src in files.items()]
+    copies += [(src, os.path.join(target, _PAGES_DIR, os.path.basename(src))) for src in images]
+    for src, dest in copies:
+        tmp = f"{dest}.{os.getpid()}.{threading.get_ident()}.tmp"
+        shutil.copyfile(src, tmp)
+        os.replace(tmp, dest)
+
+
+def store(key: str, files: Optional[Dict[str, str]] = None, images: Optional[List[str]] = None,
+          label: str = "") -> Optional[str]:
+    """Add artifacts and/or page images to the entry for key, then enforce the disk budget.
+
+    Args:
+        files: {name in entry: source path}, e.g. {"deck.pdf": pdf_path}.
+        images: Page image paths; stored under pages/ with their file names.
+        label: Human-readable origin (topic/slide key) for entry.json.
+
+    Returns the entry directory, or None if caching is disabled or failed.
+    """
+    files = {n: p for n, p in (files or {}).items() if p and os.path.isfile(p)}
+    images = [p for p in (images or []) if p and os.path.isfile(p)]
+    if not DECK_CACHE_ENABLED or not (files or images):
+        return None
+    entry = _entry_dir(key)
+    try:
+        if not os.path.isdir(entry):
+            os.makedirs(os.path.dirname(entry), exist_ok=True)
+            staging = tempfile.mkdtemp(prefix=f".{key[:12]}_", dir=os.path.dirname(entry))
+            _write_files(staging, files, images)
+            try:
+                os.rename(staging, entry)
+            except OSError:
+                # Another writer created the entry first — add to it instead
+                shutil.rmtree(staging, ignore_errors=True)
+                _write_files(entry, files, images)
+        else:
+            _write_files(entry, files, images)
+
+        meta_path = os.path.join(entry, _ENTRY_FILE)
+        try:
+            with open(meta_path) as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            meta = {"created": time.time()}
+        meta.update({"label": label or meta.get("label", ""), "size": _dir_size(entry)})
+        with open(meta_path + ".tmp", "w") as f:
+            json.dump(meta, f)
+        os.replace(meta_path + ".tmp", meta_path)
+    except OSError as e:
+        logger.warning(f"NotebookLM cache store failed for {label or key[:12]}: {e}")
+        return None
+
+    with _lock:
+        _stats["stores"] += 1
+    evict()
+    return entry
+
+
+def evict(max_bytes: Optional[int] = None) -> int:
+    """Remove least recently used entries until the cache fits max_bytes. Returns count removed."""
+    max_bytes = DECK_CACHE_MAX_BYTES if max_bytes is None else max_bytes
+    if not os.path.isdir(DECK_CACHE_DIR):
+        return 0
+    with _lock:
+        entries = []
+        for shard in os.scandir(DECK_CACHE_DIR):
+            if not shard.is_dir():
+                continue
+            for entry in os.scandir(shard.path):
+                meta_path = os.path.join(entry.path, _ENTRY_FILE)
+                try:
+                    last_used = os.path.getmtime(meta_path)
+                    with open(meta_path) as f:
+                        size = int(json.load(f).get("size", 0))
+                except (OSError, ValueError):
+                    continue  # Being written (or not ours)
+                entries.append((last_used, size, entry.path))
+
+        total = sum(size for _, size, _ in entries)
+        removed = 0
+        for _, size, path in sorted(entries):
+            if total <= max_bytes:
+                break
+            shutil.rmtree(path, ignore_errors=True)
+            total -= size
+            removed += 1
+        _stats["evicted"] += removed
+    if removed:
+        logger.info(f"NotebookLM cache: evicted {removed} entries (now {total // (1024 * 1024)} MB)")
+    return removed
+
+
+def cache_stats() -> dict:
+    """Hit/miss/store/eviction counters for this process."""
+    with _lock:
+        return dict(_stats)
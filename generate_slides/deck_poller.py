@@ -0,0 +1,263 @@
+"""
+Shared NotebookLM slide deck status poller.
+
+Deck and slide-image tasks used to run their own fixed 2-3 s
+``list_slide_decks`` loops, so N outstanding decks on an account meant N
+status requests every few seconds. Now a task registers the notebook it is
+waiting on and awaits a future. One poller per account (per event loop)
+serves every outstanding notebook on that account:
+
+- Each notebook is checked on its own adaptive schedule. The poller keeps a
+  moving average of how long decks on the account take. Until that time is
+  reached the gap is half the expected remaining time. After it, the gap
+  starts at DECK_POLL_MIN_INTERVAL and grows exponentially up to
+  DECK_POLL_MAX_INTERVAL. Every gap gets +/-20% jitter so accounts do not
+  poll in lockstep.
+- One ``list_slide_decks`` call returns every deck in a notebook, so tasks
+  waiting on the same notebook share one query.
+- Queries that are due together are sent together, with at most
+  DECK_POLL_MAX_PARALLEL in flight per account. If a query fails or is rate
+  limited, only that notebook backs off.
+- Each waiter receives completed, failed or timeout. A notebook is always
+  queried once more at a waiter's deadline, so a deck that finished between
+  polls is not reported as a timeout. A timeout removes only that waiter; the
+  notebook is kept for anyone else still waiting on it.
+
+Environment:
+  NOTEBOOKLM_POLL_MIN_INTERVAL  - shortest gap between queries of one notebook (default 2s)
+  NOTEBOOKLM_POLL_MAX_INTERVAL  - longest gap between queries of one notebook (default 10s)
+  NOTEBOOKLM_POLL_MAX_PARALLEL  - status queries in flight per account (default 4)
+
+Usage:
+    from generate_slides.deck_poller import wait_for_slide_deck
+
+    result = await wait_for_slide_deck(client, nb_id, account="training11", timeout=60)
+    if result.state == "completed":
+        ...
+"""
+
+import asyncio
+import logging
+import os
+import random
+import weakref
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+
+from generate_slides.account_pool import is_rate_limit_error
+
+logger = logging.getLogger(__name__)
+
+DECK_POLL_MIN_INTERVAL = float(os.environ.get("NOTEBOOKLM_POLL_MIN_INTERVAL", "2"))
+DECK_POLL_MAX_INTERVAL = float(os.environ.get("NOTEBOOKLM_POLL_MAX_INTERVAL", "10"))
+DECK_POLL_MAX_PARALLEL = int(os.environ.get("NOTEBOOKLM_POLL_MAX_PARALLEL", "4"))
+DECK_POLL_BACKOFF = 1.5        # interval growth per unfinished poll
+DECK_POLL_JITTER = 0.2         # +/- fraction applied to every interval
+EXPECTED_DURATION_WEIGHT = 0.3  # EWMA weight of the newest completion time
+
+COMPLETED = "completed"
+FAILED = "failed"
+PENDING = "pending"
+TIMEOUT = "timeout"
+
+
+def deck_state(deck) -> tuple:
+    """Classify one slide deck artifact as (COMPLETED | FAILED | PENDING, raw status text).
+
+    Status can be an int (3=COMPLETED, 4=FAILED), a string, or exposed via
+    is_completed / is_failed / is_generating flags depending on library version.
+    """
+    raw_status = getattr(deck, 'status', '')
+    ds = str(raw_status or '').lower()
+    is_failed = getattr(deck, 'is_failed', False)
+    is_generating = getattr(deck, 'is_generating', None)
+    if is_failed or raw_status == 4 or ds in ('failed', 'error', '4'):
+        return FAILED, ds
+    if (raw_status == 3 or ds in ('completed', '3')
+            or getattr(deck, 'is_completed', False)
+            or (is_generating is not None and not is_generating)):
+        return COMPLETED, ds
+    return PENDING, ds
+
+
+def notebook_state(decks) -> tuple:
+    """State of a notebook's decks: the first finished deck decides, else PENDING."""
+    for deck in decks or []:
+        state, ds = deck_state(deck)
+        if state != PENDING:
+            return state, ds
+    return PENDING, ""
+
+
+@dataclass
+class DeckPollResult:
+    state: str            # COMPLETED, FAILED or TIMEOUT
+    status: str = ""      # raw deck status text when finished
+    elapsed: float = 0.0  # seconds this waiter waited
+
+
+@dataclass
+class _Waiter:
+    client: Any
+    future: asyncio.Future
+    started: float
+    deadline: float
+    on_poll: Optional[Callable[[float], None]] = None
+
+
+@dataclass
+class _Watch:
+    notebook_id: str
+    registered_at: float
+    interval: float
+    next_poll: float = 0.0
+    polled_at: float = float("-inf")  # when the latest status query was sent
+    waiters: List[_Waiter] = field(default_factory=list)
+
+
+class DeckStatusPoller:
+    """Polls every outstanding notebook of one account; use get_deck_poller()."""
+
+    def __init__(self, account: str, min_interval: float = DECK_POLL_MIN_INTERVAL,
+                 max_interval: float = DECK_POLL_MAX_INTERVAL,
+                 max_parallel: int = DECK_POLL_MAX_PARALLEL):
+        self.account = account
+        self.min_interval = min_interval
+        self.max_interval = max(max_interval, min_interval)
+        self.max_parallel = max(1, max_parallel)
+        self.expected_duration: Optional[float] = None  # EWMA of register -> completed
+        self.queries = 0
+        self._watches: Dict[str, _Watch] = {}
+        self._wake = asyncio.Event()
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._task: Optional[asyncio.Task] = None
+        self._rng = random.Random()
+
+    async def wait(self, client, notebook_id: str, timeout: float,
+                   on_poll: Optional[Callable[[float], None]] = None) -> DeckPollResult:
+        """Wait until the notebook's slide deck completes or fails, or timeout expires.
+
+        client is used for status queries while this waiter is registered, so
+        it must stay open until wait() returns. on_poll(elapsed) is called
+        after each status query of this notebook.
+        """
+        loop = asyncio.get_running_loop()
+        now = loop.time()
+        watch = self._watches.get(notebook_id)
+        if watch is None:
+            watch = _Watch(notebook_id, registered_at=now, interval=self.min_interval / DECK_POLL_BACKOFF)
+            watch.next_poll = now + self._next_interval(watch, now)
+            self._watches[notebook_id] = watch
+        waiter = _Waiter(client, loop.create_future(), now, now + timeout, on_poll)
+        watch.waiters.append(waiter)
+        watch.next_poll = min(watch.next_poll, waiter.deadline)
+        if self._task is None or self._task.done():
+            self._task = loop.create_task(self._run())
+        self._wake.set()
+        try:
+            return await waiter.future
+        finally:
+            self._drop(watch, waiter)
+
+    def _drop(self, watch: _Watch, waiter: _Waiter):
+        if waiter in watch.waiters:
+            watch.waiters.remove(waiter)
+        if not watch.waiters and self._watches.get(watch.notebook_id) is watch:
+            del self._watches[watch.notebook_id]
+
+    def _next_interval(self, watch: _Watch, now: float) -> float:
+        elapsed = now - watch.registered_at
+        if self.expected_duration and elapsed < self.expected_duration:
+            # Approach the expected completion time, halving the gap each poll
+            interval = (self.expected_duration - elapsed) / 2
+        else:
+            interval = watch.interval * DECK_POLL_BACKOFF
+        watch.interval = min(self.max_interval, max(self.min_interval, interval))
+        return watch.interval * (1 + self._rng.uniform(-DECK_POLL_JITTER, DECK_POLL_JITTER))
+
+    def _resolve(self, watch: _Watch, state: str, status: str, now: float):
+        for waiter in list(watch.waiters):
+            if not waiter.future.done():
+                waiter.future.set_result(DeckPollResult(state, status, now - waiter.started))
+        watch.waiters.clear()
+        if self._watches.get(watch.notebook_id) is watch:
+            del self._watches[watch.notebook_id]
+
+    def _expire(self, now: float):
+        for watch in list(self._watches.values()):
+            for waiter in list(watch.waiters):
+                if waiter.deadline <= watch.polled_at and not waiter.future.done():
+                    waiter.future.set_result(DeckPollResult(TIMEOUT, "", now - waiter.started))
+                    self._drop(watch, waiter)
+
+    async def _poll(self, watch: _Watch):
+        async with self._slots:
+            if not watch.waiters:
+                return
+            self.queries += 1
+            watch.polled_at = asyncio.get_running_loop().time()
+            try:
+                decks = await watch.waiters[0].client.artifacts.list_slide_decks(watch.notebook_id)
+                state, status = notebook_state(decks)
+            except Exception as e:
+                state, status = PENDING, ""
+                if is_rate_limit_error(str(e)):
+                    watch.interval = self.max_interval
+                logger.debug(f"[{self.account}] Status query for {watch.notebook_id[:16]} failed: {e}")
+        now = asyncio.get_running_loop().time()
+        for waiter in list(watch.waiters):
+            if waiter.on_poll:
+                try:
+                    waiter.on_poll(now - waiter.started)
+                except Exception:
+                    pass
+        if state == PENDING:
+            deadlines = [w.deadline for w in watch.waiters if w.deadline > watch.polled_at]
+            watch.next_poll = min([now + self._next_interval(watch, now)] + deadlines)
+            return
+        if state == COMPLETED:
+            duration = now - watch.registered_at
+            self.expected_duration = duration if self.expected_duration is None else (
+                (1 - EXPECTED_DURATION_WEIGHT) * self.expected_duration
+                + EXPECTED_DURATION_WEIGHT * duration
+            )
+        self._resolve(watch, state, status, now)
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.max_parallel)
+        while self._watches:
+            now = loop.time()
+            self._expire(now)
+            due = [w for w in self._watches.values() if w.waiters and w.next_poll <= now]
+            if due:
+                await asyncio.gather(*(self._poll(w) for w in due))
+                continue
+            wake_at = min((w.next_poll for w in self._watches.values()), default=now)
+            self._wake.clear()
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=max(0.0, wake_at - now))
+            except asyncio.TimeoutError:
+                pass
+
+
+_pollers: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, DeckStatusPoller]]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def get_deck_poller(account: str = "default") -> DeckStatusPoller:
+    """The poller for an account on the running event loop (created on first use)."""
+    pollers = _pollers.setdefault(asyncio.get_running_loop(), {})
+    poller = pollers.get(account)
+    if poller is None:
+        poller = pollers[account] = DeckStatusPoller(account)
+    return poller
+
+
+async def wait_for_slide_deck(client, notebook_id: str, account: str = "default",
+                              timeout: float = 240.0,
+                              on_poll: Optional[Callable[[float], None]] = None) -> DeckPollResult:
+    """Wait for a notebook's slide deck via the account's shared poller."""
+    return await get_deck_poller(account).wait(client, notebook_id, timeout, on_poll)
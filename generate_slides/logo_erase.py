@@ -0,0 +1,155 @@
+"""
+NotebookLM Logo Erase — vectorized image edit for slide images
+
+Helpers for _remove_notebooklm_logo in slides_generation.py, kept in a small
+module (no Streamlit import) so process-pool workers start quickly.
+
+- erase_logo_region(): left-clone fill of the bottom-right logo box done as
+  NumPy array operations (per-row masks, broadcast colour distances).
+- process_logo_image(): picklable worker — decode, erase, re-encode, verify.
+- erase_logo_images(): runs the worker over many images in a process pool,
+  falling back to serial for small decks or if the pool cannot start.
+  Workers are spawned, not forked: the caller runs inside Streamlit with
+  event-loop and agent threads, and forking a threaded process can deadlock.
+"""
+
+import io
+import logging
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+MIN_SLIDE_IMAGE_W = 400        # Smaller images are icons/thumbnails — left as is
+MIN_SLIDE_IMAGE_H = 200
+LOGO_REGION_W_PCT = 0.08       # Logo box: 8% width x 3% height, bottom-right
+LOGO_REGION_H_PCT = 0.03
+LOGO_REGION_MIN_W = 70
+LOGO_REGION_MIN_H = 23
+UNIFORM_ROW_DIST = 50          # L1 RGB distance under which a row is plain background
+PARALLEL_MIN_IMAGES = 8        # Below this, process-pool startup costs more than it saves
+
+
+def erase_logo_region(img) -> Optional[bytes]:
+    """
+    Erase the NotebookLM logo from a slide image.
+
+    Simple left-clone approach with a VERY TIGHT region:
+    - Region: 8% width × 3% height (just the logo, nothing else)
+    - For each row, clone the pixel from just left of the region
+    - Rows whose left colour differs from the right-edge background (a bar
+      that ends before the edge) only continue the bar where the row above
+      the region still matches it; elsewhere the background colour is used.
+
+    Returns modified image as bytes, or None on failure.
+    """
+    import numpy as np
+
+    try:
+        w, h = img.size
+        original_format = img.format or 'PNG'
+
+        if img.mode not in ('RGB', 'RGBA'):
+            img = img.convert('RGBA')
+
+        logo_region_w = max(int(w * LOGO_REGION_W_PCT), LOGO_REGION_MIN_W)
+        logo_region_h = max(int(h * LOGO_REGION_H_PCT), LOGO_REGION_MIN_H)
+        logo_left = w - logo_region_w
+        logo_top = h - logo_region_h
+        above_y = max(0, logo_top - 3)
+
+        # Only a small crop is converted to an array: the logo box plus the
+        # source column to its left and the reference row above it.
+        crop_x0 = max(0, logo_left - 1)
+        arr = np.array(img.crop((crop_x0, above_y, w, h)))  # (rows, cols, channels)
+        region_x = logo_left - crop_x0
+        region_y = logo_top - above_y
+
+        # Background colour at the right edge, just above the logo
+        right_bg = arr[0, min(w - 1, w - 3) - crop_x0].copy()
+        # Per-row source colour just left of the region: (rows, channels)
+        left = arr[region_y:, 0].copy()
+        # Reference row above the region: (cols, channels)
+        above = arr[0, region_x:].astype(np.int16)
+
+        left_rgb = left[:, :3].astype(np.int16)
+        bg_rgb = right_bg[:3].astype(np.int16)
+
+        uniform_rows = np.abs(left_rgb - bg_rgb).sum(axis=1) < UNIFORM_ROW_DIST        # (rows,)
+        dist_to_bar = np.abs(above[None, :, :3] - left_rgb[:, None, :]).sum(axis=2)   # (rows, cols)
+        dist_to_bg = np.abs(above[:, :3] - bg_rgb).sum(axis=1)                        # (cols,)
+        use_left = uniform_rows[:, None] | (dist_to_bar <= dist_to_bg[None, :])
+
+        fill = np.where(use_left[:, :, None], left[:, None, :], right_bg).astype(np.uint8)
+
+        from PIL import Image
+        img.paste(Image.fromarray(fill), (logo_left, logo_top))
+
+        out = io.BytesIO()
+        if original_format.upper() == 'JPEG':
+            save_img = img.convert('RGB') if img.mode == 'RGBA' else img
+            save_img.save(out, format='JPEG', quality=95)
+        else:
+            img.save(out, format='PNG')
+        return out.getvalue()
+
+    except Exception as e:
+        logger.error(f"erase_logo_region failed: {type(e).__name__}: {e}")
+        return None
+
+
+def process_logo_image(data: bytes) -> Tuple[str, Optional[bytes], str]:
+    """Erase the logo from one encoded image. Runs in pool workers.
+
+    Returns:
+        (status, new_data, message) where status is:
+        "processed" (new_data set), "skipped" (too small to be a slide),
+        "failed" (erase/verify problem) or "unreadable" (not an image).
+    """
+    from PIL import Image
+
+    try:
+        img = Image.open(io.BytesIO(data))
+        w, h = img.size
+    except Exception as e:
+        return "unreadable", None, f"{type(e).__name__}: {e}"
+
+    if w < MIN_SLIDE_IMAGE_W or h < MIN_SLIDE_IMAGE_H:
+        return "skipped", None, ""
+
+    new_data = erase_logo_region(img)
+    if not new_data:
+        return "failed", None, "erase_logo_region returned None"
+    try:
+        verify = Image.open(io.BytesIO(new_data))
+        if verify.size != (w, h):
+            return "failed", None, f"output size mismatch {verify.size} != {(w, h)}"
+    except Exception as e:
+        return "failed", None, f"output unreadable: {e}"
+    return "processed", new_data, ""
+
+
+def erase_logo_images(images: List[bytes], workers: Optional[int] = None) -> list:
+    """Run process_logo_image over many images, in parallel when worthwhile.
+
+    Args:
+        images: Encoded image bytes, one entry per ZIP member.
+        workers: Process count (default: CPU count). 1 forces serial.
+
+    Returns:
+        List of process_logo_image results, same order as images.
+    """
+    workers = workers or os.cpu_count() or 1
+    workers = min(workers, len(images))
+    if workers > 1 and len(images) >= PARALLEL_MIN_IMAGES:
+        try:
+            with ProcessPoolExecutor(
+                max_workers=workers, mp_context=multiprocessing.get_context("spawn")
+            ) as pool:
+                chunksize = max(1, len(images) // (workers * 4))
+                return list(pool.map(process_logo_image, images, chunksize=chunksize))
+        except Exception as e:
+            logger.warning(f"Logo erase process pool failed ({type(e).__name__}: {e}) — running serially")
+    return [process_logo_image(data) for data in images]
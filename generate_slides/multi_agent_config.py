@@ -29,6 +29,8 @@ MAX_SLIDES_PER_TOPIC = 30    # Must be high enough to hit 4-day (250) targets wi
 DEFAULT_RESEARCH_DEPTH = 5    # Sources per topic (~20-30 total across all topics)
 RESEARCH_MAX_TURNS = 5        # 2 searches + 2 fetches + JSON output
 RESEARCH_MODEL = FAST_MODEL   # Haiku — fast for web search tasks
+RESEARCH_STORE_MAX_AGE_DAYS = 30   # Stored research older than this is re-run, not reused
+RESEARCH_REUSE_THRESHOLD = 0.8     # Similarity (0-1) at which a stored topic counts as the same topic
 
 # ---------- Phase 2: Content Generator ----------
 CONTENT_MAX_TURNS = 5         # JSON generation + optional WebSearch for thin research
@@ -43,6 +45,8 @@ EDITOR_MODEL = FAST_MODEL     # Haiku — fast for structured JSON
 INFOGRAPHIC_MAX_TURNS = 2     # Per single infographic (DSL generation only)
 INFOGRAPHIC_WIDTH = 1792      # AntV canvas width
 INFOGRAPHIC_HEIGHT = 1024     # AntV canvas height
+INFOGRAPHIC_RENDER_CONCURRENCY = 4  # Warm Playwright pages rendering in parallel
+INFOGRAPHIC_RENDER_MODE = "live"    # "live": AntV loaded once per page; "file": HTML file per PNG
 
 # ---------- Color scheme (matching PPTX template) ----------
 COLORS = {
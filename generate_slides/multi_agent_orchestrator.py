@@ -9,21 +9,39 @@ Coordinates specialized agents to produce infographic-based training slides:
   Phase 5: Assembly → Map PNGs to slide positions → Build PPTX
 
 Content slides are ALL infographic images. Standard WSQ slides remain text.
+
+Every phase's output is checkpointed to a per-course run directory
+(.output/slide_runs/<course>_<hash>). With config["resume"] set, completed
+phases are restored from disk and only failed or missing topics are re-run.
+
+With config["streaming"] set, phases 1, 2 and 4 run as a per-topic dataflow
+instead of global barriers: each topic moves on to content generation as soon
+as its research lands, and on to rendering as soon as its blocks exist. Wall
+time then tracks the slowest topic chain rather than the sum of phase maxima.
 """
 
 import asyncio
+import hashlib
+import json
 import logging
 import os
+import re
 import tempfile
 from typing import Callable, Optional
 
-from courseware_agents.slides.research_agent import research_all_topics
+from courseware_agents.base import agent_phase
+from courseware_agents.slides.research_agent import research_topic, research_all_topics
 from courseware_agents.slides.content_generator_agent import (
+    generate_content_blocks,
     generate_all_content_blocks,
     assemble_final_slides,
 )
 from courseware_agents.slides.editor_agent import generate_skeleton
-from courseware_agents.slides.infographic_agent import generate_all_infographics
+from courseware_agents.slides.infographic_agent import (
+    assignments_from_blocks,
+    generate_all_infographics,
+    render_infographic_stream,
+)
 from generate_slides.multi_agent_config import (
     DEFAULT_MODEL,
     DEFAULT_RESEARCH_DEPTH,
@@ -33,9 +51,64 @@ from generate_slides.multi_agent_config import (
     compute_total_target,
     compute_standard_slide_count,
 )
+from utils.helpers import load_json_file, save_json_file
 
 logger = logging.getLogger(__name__)
 
+SLIDE_RUNS_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), ".output", "slide_runs"
+)
+
+
+def _course_run_dir(context: dict) -> str:
+    """Return the checkpoint directory for a course.
+
+    The directory name embeds a hash of the CP context, so an edited CP
+    never resumes from checkpoints of an earlier version.
+    """
+    fingerprint = hashlib.sha256(
+        json.dumps(context, sort_keys=True, ensure_ascii=False, default=str).encode("utf-8")
+    ).hexdigest()[:12]
+    safe_title = re.sub(r"[^\w\-]+", "_", context.get("Course_Title", "Course")).strip("_")[:40]
+    return os.path.join(SLIDE_RUNS_DIR, f"{safe_title or 'Course'}_{fingerprint}")
+
+
+def _load_checkpoint(run_dir: str, name: str) -> Optional[dict]:
+    """Load a phase checkpoint, or None if it was never written."""
+    path = os.path.join(run_dir, f"{name}.json")
+    if not os.path.exists(path):
+        return None
+    return load_json_file(path)
+
+
+def _save_checkpoint(run_dir: str, name: str, data: dict) -> None:
+    if not save_json_file(data, os.path.join(run_dir, f"{name}.json")):
+        logger.warning(f"Could not write checkpoint '{name}' to {run_dir}")
+
+
+def _research_done(research: Optional[dict]) -> bool:
+    """True if a topic's research ran (even with no sources) and did not fail."""
+    return bool(research) and not research.get("failed")
+
+
+def _set_topic_assignments(skeleton: dict, assignments_by_title: dict) -> None:
+    """Replace the infographic assignments of the given topics in a skeleton."""
+    for lo in skeleton.get("learning_outcomes", []):
+        for lu in lo.get("learning_units", []):
+            for topic in lu.get("topics", []):
+                assignments = assignments_by_title.get(topic.get("topic_title", ""))
+                if assignments:
+                    topic["infographic_assignments"] = assignments
+                    topic["num_infographic_slides"] = len(assignments)
+
+
+def _infographics_complete(results: list) -> bool:
+    """True if every infographic for a topic rendered and its PNG still exists."""
+    return bool(results) and all(
+        r.get("generated") and r.get("image_path") and os.path.exists(r["image_path"])
+        for r in results
+    )
+
 
 async def orchestrate_multi_agent_slides(
     context: dict,
@@ -52,6 +125,11 @@ async def orchestrate_multi_agent_slides(
             - infographic_model: str (model for infographic agent)
             - skip_infographics: bool (skip image generation)
             - num_blocks_per_topic: int (content blocks per topic, 4-8)
+            - run_dir: str (checkpoint directory; defaults to a per-course
+              directory under .output/slide_runs)
+            - resume: bool (restore completed phases from run_dir and only
+              re-run failed or missing topics)
+            - streaming: bool (per-topic dataflow across phases 1, 2 and 4)
         progress_callback: Optional callback(message, percent) for UI updates.
 
     Returns:
@@ -63,6 +141,9 @@ async def orchestrate_multi_agent_slides(
     model = config.get("model", DEFAULT_MODEL)
     research_depth = config.get("research_depth", DEFAULT_RESEARCH_DEPTH)
     skip_infographics = config.get("skip_infographics", False)
+    resume = config.get("resume", False)
+    run_dir = config.get("run_dir") or _course_run_dir(context)
+    os.makedirs(run_dir, exist_ok=True)
 
     course_title = context.get("Course_Title", "Course")
     lus = context.get("Learning_Units", [])
@@ -135,11 +216,6 @@ async def orchestrate_multi_agent_slides(
             except Exception:
                 pass
 
-    # ===================================================================
-    # PHASE 1: Research Agent — Research all topics (parallel)
-    # ===================================================================
-    _progress(f"Phase 1/5: Researching {total_topics} topics (WebSearch)...", 5)
-
     # Flatten all topics from context
     all_topics = []
     for lu in lus:
@@ -153,17 +229,66 @@ async def orchestrate_multi_agent_slides(
                 "lu_title": lu_title,
             })
 
-    research_map = {}
-    if all_topics:
-        try:
-            research_map = await research_all_topics(
-                topics=all_topics,
-                course_title=course_title,
-                research_depth=research_depth,
-                model=model,
+    def _target_blocks(i: int) -> int:
+        return per_topic_blocks[i] if i < len(per_topic_blocks) else num_blocks
+
+    # Streaming hands its skeleton, infographic map and attempted topics to the
+    # phased code below, which then only fills the gaps
+    stream = None
+    if config.get("streaming") and all_topics:
+        stream = await _run_streaming_phases(
+            context=context,
+            all_topics=all_topics,
+            target_blocks=[_target_blocks(i) for i in range(len(all_topics))],
+            run_dir=run_dir,
+            resume=resume,
+            research_depth=research_depth,
+            model=model,
+            infographic_model=config.get("infographic_model", model),
+            skip_infographics=skip_infographics,
+            progress=_progress,
+        )
+        # Everything the stream produced is checkpointed; the phased code below
+        # restores it and only retries topics that failed along the way.
+        # Research the stream already attempted is not retried in this run.
+        resume = True
+
+    # ===================================================================
+    # PHASE 1: Research Agent — Research all topics (parallel)
+    # ===================================================================
+    _progress(f"Phase 1/5: Researching {total_topics} topics (WebSearch)...", 5)
+
+    research_map = (_load_checkpoint(run_dir, "research_map") or {}) if resume else {}
+    pending_research = [
+        t for t in all_topics
+        if not _research_done(research_map.get(t["topic_title"]))
+        and not (stream and t["topic_title"] in stream["research_attempted"])
+    ]
+    # Topics whose upstream data changed in this run — downstream phases must redo them
+    refreshed_topics = {t["topic_title"] for t in pending_research}
+
+    if pending_research:
+        if resume and research_map:
+            _progress(
+                f"Phase 1/5: Resuming — {len(all_topics) - len(pending_research)} topics "
+                f"restored, researching {len(pending_research)}...",
+                8,
             )
+        try:
+            with agent_phase("research"):
+                research_map.update(await research_all_topics(
+                    topics=pending_research,
+                    course_title=course_title,
+                    research_depth=research_depth,
+                    model=model,
+                ))
         except Exception as e:
             logger.warning(f"Research phase failed, continuing without research: {e}")
+        research_map = {
+            t["topic_title"]: research_map[t["topic_title"]]
+            for t in all_topics if t["topic_title"] in research_map
+        }
+        _save_checkpoint(run_dir, "research_map", research_map)
 
     researched_count = sum(
         1 for v in research_map.values()
@@ -181,19 +306,42 @@ async def orchestrate_multi_agent_slides(
     # ===================================================================
     _progress("Phase 2/5: Generating content blocks for infographics...", 25)
 
-    content_map = {}
-    if all_topics:
-        try:
-            content_map = await generate_all_content_blocks(
-                topics=all_topics,
-                research_map=research_map,
-                course_title=course_title,
-                num_blocks_per_topic=num_blocks,
-                per_topic_blocks=per_topic_blocks,
-                model=model,
+    content_map = (_load_checkpoint(run_dir, "content_map") or {}) if resume else {}
+    pending_content = []
+    for i, t in enumerate(all_topics):
+        cached = content_map.get(t["topic_title"], {})
+        if (
+            t["topic_title"] in refreshed_topics
+            or not cached
+            or cached.get("fallback")
+            or len(cached.get("content_blocks", [])) < _target_blocks(i)
+        ):
+            pending_content.append(i)
+    refreshed_topics.update(all_topics[i]["topic_title"] for i in pending_content)
+
+    if pending_content:
+        if resume and content_map:
+            _progress(
+                f"Phase 2/5: Resuming — regenerating content for {len(pending_content)} topics...",
+                28,
             )
+        try:
+            with agent_phase("content"):
+                content_map.update(await generate_all_content_blocks(
+                    topics=[all_topics[i] for i in pending_content],
+                    research_map=research_map,
+                    course_title=course_title,
+                    num_blocks_per_topic=num_blocks,
+                    per_topic_blocks=[_target_blocks(i) for i in pending_content],
+                    model=model,
+                ))
         except Exception as e:
             logger.warning(f"Content generation failed, continuing with fallback: {e}")
+        content_map = {
+            t["topic_title"]: content_map[t["topic_title"]]
+            for t in all_topics if t["topic_title"] in content_map
+        }
+        _save_checkpoint(run_dir, "content_map", content_map)
 
     total_blocks = sum(len(v.get("content_blocks", [])) for v in content_map.values())
     # Log per-topic block counts for debugging
@@ -213,15 +361,39 @@ async def orchestrate_multi_agent_slides(
     # ===================================================================
     _progress("Phase 3/5: Creating slide skeleton with infographic assignments...", 45)
 
-    try:
-        skeleton = await generate_skeleton(
-            context=context,
-            content_map=content_map,
-            model=model,
-        )
-    except Exception as e:
-        logger.error(f"Skeleton generation failed: {e}")
-        return {"success": False, "message": f"Skeleton generation failed: {e}"}
+    # On resume the checkpointed skeleton is kept; only topics whose content
+    # changed get new assignments, so other topics' PNGs stay valid
+    skeleton = stream["skeleton"] if stream else None
+    if skeleton is None and resume:
+        skeleton = _load_checkpoint(run_dir, "skeleton")
+    reused_skeleton = skeleton is not None
+    # Existing renders match the skeleton: resumed, or rendered by the stream
+    reuse_renders = reused_skeleton or bool(stream)
+
+    if skeleton is None:
+        try:
+            with agent_phase("editor"):
+                skeleton = await generate_skeleton(
+                    context=context,
+                    content_map=content_map,
+                    model=model,
+                )
+        except Exception as e:
+            logger.error(f"Skeleton generation failed: {e}")
+            return {
+                "success": False,
+                "message": f"Skeleton generation failed: {e}",
+                "run_dir": run_dir,
+            }
+    if stream:
+        # Keep the assignments the stream rendered with
+        _set_topic_assignments(skeleton, stream["rendered_assignments"])
+    if reused_skeleton and refreshed_topics:
+        _set_topic_assignments(skeleton, {
+            title: assignments_from_blocks(content_map.get(title, {}).get("content_blocks", []))
+            for title in refreshed_topics
+        })
+    _save_checkpoint(run_dir, "skeleton", skeleton)
 
     total_assignments = 0
     for lo in skeleton.get("learning_outcomes", []):
@@ -244,16 +416,43 @@ async def orchestrate_multi_agent_slides(
     if not skip_infographics:
         _progress("Phase 4/5: Generating infographic images (AntV DSL → HTML → PNG)...", 55)
 
-        infographic_dir = tempfile.mkdtemp(prefix="multi_agent_infographics_")
-        try:
-            infographic_map = await generate_all_infographics(
-                skeleton=skeleton,
-                content_map=content_map,
-                output_dir=infographic_dir,
-                model=config.get("infographic_model", model),
+        infographic_dir = os.path.join(run_dir, "infographics")
+        only_topics = None
+        if reuse_renders:
+            # Re-render only topics whose content changed or whose PNGs are missing
+            infographic_map = (
+                stream["infographic_map"] if stream
+                else _load_checkpoint(run_dir, "infographic_map") or {}
             )
-        except Exception as e:
-            logger.error(f"Infographic phase failed: {e}", exc_info=True)
+            only_topics = {
+                topic.get("topic_title", "Topic")
+                for lo in skeleton.get("learning_outcomes", [])
+                for lu in lo.get("learning_units", [])
+                for topic in lu.get("topics", [])
+                if topic.get("topic_title", "Topic") in refreshed_topics
+                or not _infographics_complete(infographic_map.get(topic.get("topic_title", "Topic"), []))
+            }
+
+        if only_topics is None or only_topics:
+            if only_topics:
+                _progress(
+                    f"Phase 4/5: Resuming — rendering infographics for {len(only_topics)} topics...",
+                    58,
+                )
+            try:
+                with agent_phase("infographic"):
+                    infographic_map.update(await generate_all_infographics(
+                        skeleton=skeleton,
+                        content_map=content_map,
+                        output_dir=infographic_dir,
+                        model=config.get("infographic_model", model),
+                        only_topics=only_topics,
+                    ))
+            except Exception as e:
+                logger.error(f"Infographic phase failed: {e}", exc_info=True)
+            _save_checkpoint(run_dir, "infographic_map", infographic_map)
+            # Infographic phase fills in missing assignments on the skeleton
+            _save_checkpoint(run_dir, "skeleton", skeleton)
 
         total_infographics = sum(len(v) for v in infographic_map.values())
         generated_count = sum(
@@ -301,7 +500,7 @@ async def orchestrate_multi_agent_slides(
         )
     except Exception as e:
         logger.error(f"PPTX build failed: {e}")
-        return {"success": False, "message": f"PPTX build failed: {e}"}
+        return {"success": False, "message": f"PPTX build failed: {e}", "run_dir": run_dir}
 
     _progress(f"Phase 5/5: PPTX built! {pptx_result.get('message', '')}", 100)
 
@@ -319,6 +518,7 @@ async def orchestrate_multi_agent_slides(
         "pptx_paths": pptx_result.get("pptx_paths", []),
         "lu_results": pptx_result.get("lu_results", []),
         "skeleton": skeleton,
+        "run_dir": run_dir,
         "research_stats": {
             "topics_researched": researched_count,
             "total_sources": total_sources,
@@ -335,6 +535,164 @@ async def orchestrate_multi_agent_slides(
     }
 
 
+async def _run_streaming_phases(
+    context: dict,
+    all_topics: list,
+    target_blocks: list,
+    run_dir: str,
+    resume: bool,
+    research_depth: int,
+    model: str,
+    infographic_model: str,
+    skip_infographics: bool,
+    progress: Callable,
+) -> dict:
+    """Run research → content → infographics as independent per-topic chains.
+
+    Each topic enters content generation as soon as its research lands and is
+    queued for rendering as soon as its blocks exist; a single renderer owns
+    the browser and drains the queue while other topics are still in flight.
+    The skeleton is built once all content is ready, overlapping the tail of
+    rendering; on resume the checkpointed one is reused and only topics whose
+    content changed get new assignments. Results are written to the run_dir
+    checkpoints.
+
+    Returns a dict with the skeleton (None if it failed), the infographic map,
+    the assignments rendered per topic and the titles whose research was
+    attempted, so the phased gap-filling pass can reuse them.
+    """
+    course_title = context.get("Course_Title", "Course")
+    research_map = (_load_checkpoint(run_dir, "research_map") or {}) if resume else {}
+    content_map = (_load_checkpoint(run_dir, "content_map") or {}) if resume else {}
+    infographic_map = (_load_checkpoint(run_dir, "infographic_map") or {}) if resume else {}
+
+    # Agent concurrency is bounded by the governor in courseware_agents.base
+    render_queue: asyncio.Queue = asyncio.Queue()
+    rendered_assignments = {}
+    research_attempted = set()
+    refreshed_topics = set()
+    finished = 0
+
+    renderer = None
+    if not skip_infographics:
+        with agent_phase("infographic"):
+            renderer = asyncio.create_task(render_infographic_stream(
+                render_queue,
+                output_dir=os.path.join(run_dir, "infographics"),
+                model=infographic_model,
+            ))
+
+    async def _topic_chain(i: int, t: dict):
+        nonlocal finished
+        title = t["topic_title"]
+        refreshed = False
+
+        if not _research_done(research_map.get(title)):
+            research_attempted.add(title)
+            with agent_phase("research"):
+                research_map[title] = await research_topic(
+                    topic_title=title,
+                    bullet_points=t.get("bullet_points", []),
+                    course_title=course_title,
+                    lo_description=t.get("lo_description", ""),
+                    research_depth=research_depth,
+                    model=model,
+                )
+            refreshed = True
+
+        cached = content_map.get(title, {})
+        if (
+            refreshed
+            or not cached
+            or cached.get("fallback")
+            or len(cached.get("content_blocks", [])) < target_blocks[i]
+        ):
+            with agent_phase("content"):
+                content_map[title] = await generate_content_blocks(
+                    topic_title=title,
+                    research_data=research_map.get(title, {}),
+                    bullet_points=t.get("bullet_points", []),
+                    course_title=course_title,
+                    lu_title=t.get("lu_title", ""),
+                    lo_description=t.get("lo_description", ""),
+                    num_blocks=target_blocks[i],
+                    model=model,
+                )
+            refreshed = True
+
+        if refreshed:
+            refreshed_topics.add(title)
+        if renderer is not None and (
+            refreshed or not _infographics_complete(infographic_map.get(title, []))
+        ):
+            blocks = content_map[title].get("content_blocks", [])
+            rendered_assignments[title] = assignments_from_blocks(blocks)
+            await render_queue.put((title, blocks, rendered_assignments[title]))
+
+        finished += 1
+        progress(
+            f"Streaming: '{title}' through content ({finished}/{len(all_topics)} topics)",
+            5 + int(45 * finished / len(all_topics)),
+        )
+
+    chain_results = await asyncio.gather(
+        *[_topic_chain(i, t) for i, t in enumerate(all_topics)],
+        return_exceptions=True,
+    )
+    for t, res in zip(all_topics, chain_results):
+        if isinstance(res, Exception):
+            logger.error(f"Streaming chain failed for '{t['topic_title']}': {res}")
+
+    _save_checkpoint(run_dir, "research_map", research_map)
+    _save_checkpoint(run_dir, "content_map", content_map)
+
+    # Skeleton needs every topic's content; build it while rendering drains
+    if renderer is not None:
+        await render_queue.put(None)
+    progress("Streaming: all content ready — building skeleton while rendering finishes...", 55)
+
+    # On resume the checkpointed skeleton still matches the unchanged topics'
+    # PNGs; only topics whose content changed get new assignments
+    skeleton = _load_checkpoint(run_dir, "skeleton") if resume else None
+    if skeleton is not None:
+        _set_topic_assignments(skeleton, {
+            title: assignments_from_blocks(content_map.get(title, {}).get("content_blocks", []))
+            for title in refreshed_topics
+        })
+    else:
+        try:
+            with agent_phase("editor"):
+                skeleton = await generate_skeleton(
+                    context=context, content_map=content_map, model=model,
+                )
+        except Exception as e:
+            logger.error(f"Skeleton generation failed during streaming: {e}")
+
+    if renderer is not None:
+        try:
+            infographic_map.update(await renderer)
+        except Exception as e:
+            logger.error(f"Streaming renderer failed: {e}", exc_info=True)
+        _save_checkpoint(run_dir, "infographic_map", infographic_map)
+
+    if skeleton is not None:
+        # Record the assignments actually rendered so the skeleton matches the PNGs
+        _set_topic_assignments(skeleton, rendered_assignments)
+        _save_checkpoint(run_dir, "skeleton", skeleton)
+
+    generated = sum(sum(1 for r in v if r.get("generated")) for v in infographic_map.values())
+    progress(
+        f"Streaming: {len(all_topics)} topics done, {generated} infographics rendered",
+        75,
+    )
+    return {
+        "skeleton": skeleton,
+        "infographic_map": infographic_map,
+        "rendered_assignments": rendered_assignments,
+        "research_attempted": research_attempted,
+    }
+
+
 def _recover_infographic_images(infographic_data: dict, infographic_results: dict):
     """Fill in missing image_path on infographic_slides from infographic_results.
 
@@ -0,0 +1,705 @@
+"""
+Offline NotebookLM simulator for benchmarking the slide schedulers.
+
+Implements the subset of notebooklm-py's ``NotebookLMClient`` that
+slides_generation.py uses, so the NotebookLM scheduling paths
+(_run_account_batch, _generate_slides_multi_account, _try_generate_with_account,
+_generate_nblm_images_for_lu_slides) can be exercised without Google accounts:
+
+    NotebookLMClient.from_storage(path)            (async with client: ...)
+    client.notebooks.list / create / delete
+    client.sources.add_text / add_url / wait_for_sources / list / delete
+    client.artifacts.generate_slide_deck / list_slide_decks / wait_for_completion
+    client.artifacts.download_slide_deck           (PDF, or PPTX via output_format)
+    client.artifacts._list_raw / _download_url     (direct PPTX export probe)
+
+Behaviour is configured by SimulatorConfig:
+
+- Latency: lognormal per operation (median + p95 seconds). Deck processing time
+  is a base latency plus a per-slide cost for the slide count the instructions ask for.
+- Content: content pages are headed with the "=== SLIDE <n> ...: <title> ==="
+  sections found in the deck's text sources, in order, like NotebookLM titling
+  each slide after its source section.
+- Failures: per-operation failure probabilities (notebook create, text/URL
+  sources, generation, download), scaled per account.
+- Accounts: an account is identified by its storage path (the directory name,
+  e.g. "training11"). Each has a rolling-hour generation quota and a cap on
+  concurrent generations; exceeding either returns a rate-limited
+  GenerationStatus like the real API. Accounts can also be marked as having
+  expired auth (from_storage, notebooks.list and notebooks.create raise).
+
+Time is virtual: run_simulated() runs the coroutine on a VirtualTimeLoop whose
+clock jumps straight to the next timer whenever the loop is idle, and points
+time.time / time.monotonic at that clock, so an hour of simulated NotebookLM
+work (including the callers' own polling sleeps and timeouts) takes seconds.
+
+Usage:
+    from generate_slides.nblm_simulator import NotebookLMSimulator, SimulatorConfig, run_simulated
+
+    sim = NotebookLMSimulator(SimulatorConfig(seed=1))
+    with sim.installed():          # `from notebooklm import NotebookLMClient` -> simulator
+        result = run_simulated(_run_deck_scheduler(accounts, chunks, title, config))
+    print(sim.stats())
+"""
+
+import asyncio
+import contextlib
+import enum
+import functools
+import io
+import math
+import random
+import re
+import selectors
+import sys
+import time
+import types
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional
+
+_real_time = time.time
+_real_monotonic = time.monotonic
+
+RATE_LIMIT_ERROR = "Rate limit exceeded (429): too many slide deck generations for this account"
+HOUR = 3600.0
+
+# Slide deck artifact status codes (same integers the real API returns)
+STATUS_IN_PROGRESS = 1
+STATUS_COMPLETED = 3
+STATUS_FAILED = 4
+
+
+# =============================================================================
+# Configuration
+# =============================================================================
+
+@dataclass
+class Latency:
+    """Lognormal latency distribution given by its median and 95th percentile (seconds)."""
+    median: float
+    p95: float
+
+    def sample(self, rng: random.Random) -> float:
+        if self.median <= 0:
+            return 0.0
+        sigma = math.log(max(self.p95, self.median) / self.median) / 1.645
+        return rng.lognormvariate(math.log(self.median), sigma)
+
+
+@dataclass
+class AccountProfile:
+    """Per-account service limits."""
+    generations_per_hour: int = 6           # Rolling-hour slide deck quota
+    max_concurrent_generations: int = 2     # Decks processing at once before 429s
+    failure_multiplier: float = 1.0         # Scales every failure rate for this account
+    auth_valid: bool = True                 # False: from_storage() and notebook calls raise (expired cookies)
+
+
+@dataclass
+class SimulatorConfig:
+    seed: int = 0
+    open_latency: Latency = field(default_factory=lambda: Latency(0.5, 1.5))
+    create_latency: Latency = field(default_factory=lambda: Latency(1.5, 4.0))
+    add_text_latency: Latency = field(default_factory=lambda: Latency(2.0, 5.0))
+    add_url_latency: Latency = field(default_factory=lambda: Latency(4.0, 12.0))
+    source_processing: Latency = field(default_factory=lambda: Latency(6.0, 20.0))
+    generate_request_latency: Latency = field(default_factory=lambda: Latency(2.0, 6.0))
+    deck_base: Latency = field(default_factory=lambda: Latency(45.0, 120.0))
+    deck_seconds_per_slide: float = 5.0     # Added to deck_base per generated slide
+    list_latency: Latency = field(default_factory=lambda: Latency(0.3, 1.0))
+    download_latency: Latency = field(default_factory=lambda: Latency(3.0, 10.0))
+    delete_latency: Latency = field(default_factory=lambda: Latency(0.5, 1.5))
+
+    create_failure_rate: float = 0.01
+    text_source_failure_rate: float = 0.01
+    url_source_failure_rate: float = 0.15   # Wikipedia URL sources fail far more often
+    generation_failure_rate: float = 0.05   # Deck ends in status 4 after processing
+    download_failure_rate: float = 0.01
+
+    default_slides: int = 15                # Slides when the instructions give no count
+    max_slides_per_deck: int = 40
+    pptx_export: bool = False               # Expose a direct PPTX URL in _list_raw()
+
+    default_account: AccountProfile = field(default_factory=AccountProfile)
+    accounts: Dict[str, AccountProfile] = field(default_factory=dict)  # account key -> profile
+
+
+# =============================================================================
+# notebooklm-py shaped types
+# =============================================================================
+
+class SlideDeckFormat(enum.Enum):
+    DETAILED_DECK = 1
+    PRESENTER_SLIDES = 2
+
+
+class SlideDeckLength(enum.Enum):
+    DEFAULT = 1
+    SHORT = 2
+
+
+@dataclass
+class Notebook:
+    id: str
+    title: str
+
+
+@dataclass
+class Source:
+    id: str
+    title: str
+    status: str
+
+
+@dataclass
+class GenerationStatus:
+    task_id: str
+    status: str
+    error: Optional[str] = None
+    error_code: Optional[str] = None
+
+    @property
+    def is_complete(self) -> bool:
+        return self.status == "completed"
+
+    @property
+    def is_failed(self) -> bool:
+        return self.status == "failed"
+
+    @property
+    def is_rate_limited(self) -> bool:
+        return self.error_code == "RATE_LIMITED"
+
+
+@dataclass
+class SlideDeck:
+    id: str
+    title: str
+    status: int
+
+    @property
+    def is_completed(self) -> bool:
+        return self.status == STATUS_COMPLETED
+
+    @property
+    def is_failed(self) -> bool:
+        return self.status == STATUS_FAILED
+
+    @property
+    def is_processing(self) -> bool:
+        return self.status == STATUS_IN_PROGRESS
+
+
+@dataclass
+class _SimSource:
+    id: str
+    title: str
+    ready_at: float
+    content: str = ""
+
+
+@dataclass
+class _SimDeck:
+    id: str
+    slides: int
+    requested_at: float
+    done_at: float
+    fails: bool
+    headings: tuple = ()
+
+    def status(self, now: float) -> int:
+        if now < self.done_at:
+            return STATUS_IN_PROGRESS
+        return STATUS_FAILED if self.fails else STATUS_COMPLETED
+
+
+@dataclass
+class _SimNotebook:
+    id: str
+    title: str
+    account: str
+    created_at: float
+    sources: Dict[str, _SimSource] = field(default_factory=dict)
+    decks: List[_SimDeck] = field(default_factory=list)
+    downloaded_at: Optional[float] = None
+
+
+@dataclass
+class AccountStats:
+    clients_opened: int = 0
+    auth_failures: int = 0
+    notebooks_created: int = 0
+    generations_requested: int = 0
+    rate_limited: int = 0
+    decks_completed: int = 0
+    decks_failed: int = 0
+    downloads: int = 0
+    status_queries: int = 0
+    errors: int = 0
+    generation_times: List[float] = field(default_factory=list)  # accepted generation start times
+
+
+# =============================================================================
+# Simulator
+# =============================================================================
+
+def _now() -> float:
+    return asyncio.get_running_loop().time()
+
+
+def _account_key(path) -> str:
+    """Storage path -> account key ("…/accounts/training11/storage_state.json" -> "training11")."""
+    if not path:
+        return "default"
+    p = Path(str(path))
+    return p.parent.name if p.suffix == ".json" else p.name
+
+
+class NotebookLMSimulator:
+    """In-process stand-in for the NotebookLM service shared by every simulated client."""
+
+    def __init__(self, config: Optional[SimulatorConfig] = None):
+        self.config = config or SimulatorConfig()
+        self.rng = random.Random(self.config.seed)
+        self.notebooks: Dict[str, _SimNotebook] = {}
+        self.accounts: Dict[str, AccountStats] = {}
+        self._ids = 0
+
+    # ── helpers ──
+
+    def _id(self, prefix: str) -> str:
+        self._ids += 1
+        return f"sim-{prefix}-{self._ids:06d}"
+
+    def profile(self, account: str) -> AccountProfile:
+        return self.config.accounts.get(account, self.config.default_account)
+
+    def _stats(self, account: str) -> AccountStats:
+        return self.accounts.setdefault(account, AccountStats())
+
+    def _fails(self, account: str, rate: float) -> bool:
+        return self.rng.random() < rate * self.profile(account).failure_multiplier
+
+    async def _delay(self, latency: Latency) -> None:
+        await asyncio.sleep(latency.sample(self.rng))
+
+    def _notebook(self, account: str, notebook_id: str) -> _SimNotebook:
+        nb = self.notebooks.get(notebook_id)
+        if nb is None or nb.account != account:
+            raise ValueError(f"Notebook not found: {notebook_id}")
+        return nb
+
+    @staticmethod
+    def _slide_headings(sources) -> tuple:
+        return tuple(
+            m.group(1).strip()
+            for src in sources
+            for m in re.finditer(r"^=== SLIDE \d+\b[^:\n]*:\s*(.*?)\s*===$", src.content, re.MULTILINE)
+        )
+
+    def _requested_slides(self, instructions: Optional[str]) -> int:
+        match = re.search(r"EXACTLY\s+(\d+)|~\s*(\d+)\s+slides", instructions or "", re.IGNORECASE)
+        slides = int(match.group(1) or match.group(2)) if match else self.config.default_slides
+        return max(1, min(slides, self.config.max_slides_per_deck))
+
+    # ── client entry point ──
+
+    async def open_client(self, path=None) -> "SimulatedClient":
+        account = _account_key(path)
+        stats = self._stats(account)
+        await self._delay(self.config.open_latency)
+        self._require_auth(account)
+        stats.clients_opened += 1
+        return SimulatedClient(self, account)
+
+    def _require_auth(self, account: str):
+        if not self.profile(account).auth_valid:
+            self._stats(account).auth_failures += 1
+            raise RuntimeError(f"Authentication expired for {account}. Run 'notebooklm login'.")
+
+    def module(self) -> types.ModuleType:
+        """A stand-in ``notebooklm`` module bound to this simulator."""
+        sim = self
+
+        class NotebookLMClient(SimulatedClient):
+            @classmethod
+            async def from_storage(cls, path=None, **kwargs):
+                return await sim.open_client(path)
+
+        module = types.ModuleType("notebooklm")
+        module.NotebookLMClient = NotebookLMClient
+        module.SlideDeckFormat = SlideDeckFormat
+        module.SlideDeckLength = SlideDeckLength
+        module.__simulator__ = sim
+        return module
+
+    @contextlib.contextmanager
+    def installed(self):
+        """Make ``from notebooklm import ...`` resolve to this simulator for the duration."""
+        previous = sys.modules.get("notebooklm")
+        sys.modules["notebooklm"] = self.module()
+        try:
+            yield self
+        finally:
+            if previous is None:
+                sys.modules.pop("notebooklm", None)
+            else:
+                sys.modules["notebooklm"] = previous
+
+    # ── results ──
+
+    def deck_latencies(self) -> List[float]:
+        """Notebook creation -> successful download, per downloaded notebook (simulated seconds)."""
+        return sorted(nb.downloaded_at - nb.created_at for nb in self.notebooks.values()
+                      if nb.downloaded_at is not None)
+
+    def stats(self) -> dict:
+        totals = AccountStats()
+        for s in self.accounts.values():
+            for name in ("clients_opened", "auth_failures", "notebooks_created", "generations_requested",
+                         "rate_limited", "decks_completed", "decks_failed", "downloads", "status_queries",
+                         "errors"):
+                setattr(totals, name, getattr(totals, name) + getattr(s, name))
+        summary = {k: v for k, v in vars(totals).items() if k != "generation_times"}
+        summary["accounts"] = {
+            name: {k: v for k, v in vars(s).items() if k != "generation_times"}
+            for name, s in sorted(self.accounts.items())
+        }
+        return summary
+
+    # ── documents ──
+
+    @staticmethod
+    @functools.lru_cache(maxsize=32)
+    def _deck_pdf(pages: int, headings: tuple = ()) -> bytes:
+        import fitz
+
+        doc = fitz.open()
+        for i in range(pages):
+            page = doc.new_page(width=480, height=270)
+            label = "Cover" if i == 0 else "Summary" if i == pages - 1 else f"Content slide {i}"
+            page.insert_text((24, 40), f"Simulated NotebookLM deck - {label}", fontsize=12)
+            if 0 < i <= len(headings) and i < pages - 1:
+                page.insert_text((24, 60), headings[i - 1][:70], fontsize=9)
+            if 0 < i < pages - 1:
+                page.draw_rect(fitz.Rect(240, 70, 450, 240), color=(0.1, 0.3, 0.6), fill=(0.2, 0.5, 0.8))
+        data = doc.tobytes()
+        doc.close()
+        return data
+
+    @staticmethod
+    @functools.lru_cache(maxsize=32)
+    def _deck_pptx(pages: int) -> bytes:
+        from pptx import Presentation
+        from pptx.util import Inches
+
+        prs = Presentation()
+        prs.slide_width, prs.slide_height = Inches(13.333), Inches(7.5)
+        for i in range(pages):
+            slide = prs.slides.add_slide(prs.slide_layouts[6])
+            slide.shapes.add_textbox(Inches(1), Inches(1), Inches(8), Inches(1)).text_frame.text = \
+                f"Simulated NotebookLM deck - slide {i + 1}"
+        out = io.BytesIO()
+        prs.save(out)
+        return out.getvalue()
+
+
+class _Api:
+    def __init__(self, sim: NotebookLMSimulator, account: str):
+        self._sim = sim
+        self._account = account
+
+
+class _Notebooks(_Api):
+    async def list(self) -> list:
+        sim, account = self._sim, self._account
+        await sim._delay(sim.config.list_latency)
+        sim._require_auth(account)
+        return [Notebook(id=nb.id, title=nb.title) for nb in sim.notebooks.values() if nb.account == account]
+
+    async def create(self, title: str) -> Notebook:
+        sim, account = self._sim, self._account
+        await sim._delay(sim.config.create_latency)
+        sim._require_auth(account)
+        if sim._fails(account, sim.config.create_failure_rate):
+            sim._stats(account).errors += 1
+            raise RuntimeError("Simulated: notebook creation failed (500)")
+        nb = _SimNotebook(id=sim._id("nb"), title=title, account=account, created_at=_now())
+        sim.notebooks[nb.id] = nb
+        sim._stats(account).notebooks_created += 1
+        return Notebook(id=nb.id, title=title)
+
+    async def delete(self, notebook_id: str) -> bool:
+        await self._sim._delay(self._sim.config.delete_latency)
+        nb = self._sim._notebook(self._account, notebook_id)
+        nb.sources.clear()
+        return True
+
+
+class _Sources(_Api):
+    async def _add(self, notebook_id: str, title: str, latency: Latency, failure_rate: float,
+                   content: str = "") -> Source:
+        sim, account = self._sim, self._account
+        await sim._delay(latency)
+        nb = sim._notebook(account, notebook_id)
+        if sim._fails(account, failure_rate):
+            sim._stats(account).errors += 1
+            raise RuntimeError(f"Simulated: could not add source '{title[:40]}'")
+        src = _SimSource(id=sim._id("src"), title=title,
+                         ready_at=_now() + sim.config.source_processing.sample(sim.rng), content=content)
+        nb.sources[src.id] = src
+        return Source(id=src.id, title=title, status="processing")
+
+    async def add_text(self, notebook_id: str, title: str, content: str) -> Source:
+        return await self._add(notebook_id, title, self._sim.config.add_text_latency,
+                               self._sim.config.text_source_failure_rate, content=content or "")
+
+    async def add_url(self, notebook_id: str, url: str) -> Source:
+        return await self._add(notebook_id, url, self._sim.config.add_url_latency,
+                               self._sim.config.url_source_failure_rate)
+
+    async def wait_for_sources(self, notebook_id: str, source_ids: list, timeout: float = 120.0) -> list:
+        nb = self._sim._notebook(self._account, notebook_id)
+        sources = [nb.sources[s] for s in source_ids if s in nb.sources]
+        wait = max((s.ready_at for s in sources), default=_now()) - _now()
+        if wait > timeout:
+            await asyncio.sleep(timeout)
+            raise TimeoutError(f"Sources not ready after {timeout}s")
+        await asyncio.sleep(max(0.0, wait))
+        return [Source(id=s.id, title=s.title, status="ready") for s in sources]
+
+    async def list(self, notebook_id: str) -> list:
+        await self._sim._delay(self._sim.config.list_latency)
+        nb = self._sim._notebook(self._account, notebook_id)
+        now = _now()
+        return [Source(id=s.id, title=s.title, status="ready" if now >= s.ready_at else "processing")
+                for s in nb.sources.values()]
+
+    async def delete(self, notebook_id: str, source_id: str) -> bool:
+        await self._sim._delay(self._sim.config.delete_latency)
+        self._sim._notebook(self._account, notebook_id).sources.pop(source_id, None)
+        return True
+
+
+class _Artifacts(_Api):
+    async def generate_slide_deck(self, notebook_id: str, source_ids: list = None,
+                                  instructions: str = None, slide_format=None,
+                                  slide_length=None, **kwargs) -> GenerationStatus:
+        sim, account = self._sim, self._account
+        config, stats, profile = sim.config, sim._stats(account), sim.profile(account)
+        await sim._delay(config.generate_request_latency)
+        nb = sim._notebook(account, notebook_id)
+        now = _now()
+        stats.generations_requested += 1
+
+        recent = [t for t in stats.generation_times if now - t < HOUR]
+        processing = sum(1 for other in sim.notebooks.values() if other.account == account
+                         for deck in other.decks if deck.done_at > now)
+        if len(recent) >= profile.generations_per_hour or processing >= profile.max_concurrent_generations:
+            stats.rate_limited += 1
+            return GenerationStatus(task_id="", status="failed", error=RATE_LIMIT_ERROR, error_code="RATE_LIMITED")
+
+        slides = sim._requested_slides(instructions)
+        deck = _SimDeck(
+            id=sim._id("deck"),
+            slides=slides,
+            requested_at=now,
+            done_at=now + config.deck_base.sample(sim.rng) + config.deck_seconds_per_slide * slides,
+            fails=sim._fails(account, config.generation_failure_rate),
+            headings=sim._slide_headings(
+                src for sid, src in nb.sources.items() if not source_ids or sid in source_ids
+            ),
+        )
+        nb.decks.append(deck)
+        stats.generation_times.append(now)
+        if deck.fails:
+            stats.decks_failed += 1
+        else:
+            stats.decks_completed += 1
+        return GenerationStatus(task_id=deck.id, status="in_progress")
+
+    async def list_slide_decks(self, notebook_id: str) -> list:
+        await self._sim._delay(self._sim.config.list_latency)
+        self._sim._stats(self._account).status_queries += 1
+        nb = self._sim._notebook(self._account, notebook_id)
+        now = _now()
+        return [SlideDeck(id=d.id, title=nb.title, status=d.status(now)) for d in nb.decks]
+
+    async def wait_for_completion(self, notebook_id: str, task_id: str, timeout: float = 300.0,
+                                  **kwargs) -> GenerationStatus:
+        nb = self._sim._notebook(self._account, notebook_id)
+        deck = next((d for d in nb.decks if d.id == task_id), None)
+        if deck is None:
+            raise ValueError(f"Unknown task: {task_id}")
+        wait = deck.done_at - _now()
+        if wait > timeout:
+            await asyncio.sleep(timeout)
+            raise TimeoutError(f"Generation not complete after {timeout}s")
+        await asyncio.sleep(max(0.0, wait))
+        if deck.fails:
+            return GenerationStatus(task_id=task_id, status="failed", error="Simulated: generation failed")
+        return GenerationStatus(task_id=task_id, status="completed")
+
+    def _completed_deck(self, notebook_id: str) -> _SimDeck:
+        nb = self._sim._notebook(self._account, notebook_id)
+        now = _now()
+        for deck in reversed(nb.decks):
+            if deck.status(now) == STATUS_COMPLETED:
+                return deck
+        raise ValueError(f"No completed slide deck in notebook {notebook_id}")
+
+    async def _write(self, notebook_id: str, output_path: str, data: bytes) -> str:
+        sim, account = self._sim, self._account
+        await sim._delay(sim.config.download_latency)
+        if sim._fails(account, sim.config.download_failure_rate):
+            sim._stats(account).errors += 1
+            raise RuntimeError("Simulated: slide deck download failed")
+        Path(output_path).parent.mkdir(parents=True, exist_ok=True)
+        Path(output_path).write_bytes(data)
+        sim._stats(account).downloads += 1
+        nb = sim._notebook(account, notebook_id)
+        if nb.downloaded_at is None:
+            nb.downloaded_at = _now()
+        return output_path
+
+    async def download_slide_deck(self, notebook_id: str, output_path: str, artifact_id: str = None,
+                                  output_format: str = "pdf", **kwargs) -> str:
+        deck = self._completed_deck(notebook_id)
+        pages = deck.slides + 2  # cover + summary
+        if str(output_format).lower() == "pptx":
+            data = NotebookLMSimulator._deck_pptx(pages)
+        else:
+            data = NotebookLMSimulator._deck_pdf(pages, deck.headings)
+        return await self._write(notebook_id, output_path, data)
+
+    async def _list_raw(self, notebook_id: str) -> list:
+        await self._sim._delay(self._sim.config.list_latency)
+        nb = self._sim._notebook(self._account, notebook_id)
+        if not self._sim.config.pptx_export:
+            return []
+        now = _now()
+        raw = []
+        for deck in nb.decks:
+            status = deck.status(now)
+            art = [deck.id, nb.title, 10, None, status] + [None] * 11
+            base = f"https://sim.notebooklm.invalid/{notebook_id}/{deck.id}"
+            art.append([None, None, None, f"{base}.pdf", f"{base}.pptx"])
+            raw.append(art)
+        return raw
+
+    async def _download_url(self, url: str, output_path: str) -> str:
+        match = re.search(r"/(sim-nb-\d+)/(sim-deck-\d+)", url)
+        if not match:
+            raise ValueError(f"Unknown download URL: {url}")
+        notebook_id, deck_id = match.groups()
+        deck = next(d for d in self._sim._notebook(self._account, notebook_id).decks if d.id == deck_id)
+        pages = deck.slides + 2
+        if "pptx" in url:
+            data = NotebookLMSimulator._deck_pptx(pages)
+        else:
+            data = NotebookLMSimulator._deck_pdf(pages, deck.headings)
+        return await self._write(notebook_id, output_path, data)
+
+
+class SimulatedClient:
+    """Client handle for one account; usable as ``async with client``."""
+
+    def __init__(self, sim: NotebookLMSimulator, account: str):
+        self.account = account
+        self.notebooks = _Notebooks(sim, account)
+        self.sources = _Sources(sim, account)
+        self.artifacts = _Artifacts(sim, account)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+# =============================================================================
+# Virtual time
+# =============================================================================
+
+class _VirtualSelector(selectors.DefaultSelector):
+    """Selector that advances the loop's virtual clock instead of sleeping."""
+
+    def __init__(self, loop: "VirtualTimeLoop"):
+        super().__init__()
+        self._loop = loop
+
+    def select(self, timeout=None):
+        ready = super().select(0)
+        if ready or (timeout is not None and timeout <= 0):
+            return ready
+        if timeout is None or self._loop._executor_jobs:
+            # Waiting on real I/O or a worker thread: block for real (takes no virtual time)
+            return super().select(None if timeout is None else min(timeout, 0.05))
+        self._loop._now += timeout
+        return []
+
+
+class VirtualTimeLoop(asyncio.SelectorEventLoop):
+    """Event loop whose clock jumps to the next timer whenever it would otherwise sleep."""
+
+    def __init__(self):
+        self._now = 0.0
+        self._executor_jobs = 0
+        super().__init__(selector=_VirtualSelector(self))
+
+    def time(self) -> float:
+        return self._now
+
+    def run_in_executor(self, executor, func, *args):
+        future = super().run_in_executor(executor, func, *args)
+        self._executor_jobs += 1
+
+        def _done(_):
+            self._executor_jobs -= 1
+        future.add_done_callback(_done)
+        return future
+
+
+@contextlib.contextmanager
+def _virtual_wall_clock(loop: VirtualTimeLoop):
+    """Point time.time / time.monotonic at the loop's virtual clock (callers poll with them)."""
+    epoch = _real_time()
+    time.time = lambda: epoch + loop.time()
+    time.monotonic = loop.time
+    try:
+        yield
+    finally:
+        time.time = _real_time
+        time.monotonic = _real_monotonic
+
+
+def run_simulated(coro):
+    """
+    Run a coroutine on a VirtualTimeLoop (like asyncio.run) and return its result.
+
+    The loop's simulated elapsed time is available afterwards as
+    ``run_simulated.last_elapsed`` (seconds).
+    """
+    loop = VirtualTimeLoop()
+    asyncio.set_event_loop(loop)
+    try:
+        with _virtual_wall_clock(loop):
+            return loop.run_until_complete(coro)
+    finally:
+        run_simulated.last_elapsed = loop.time()
+        try:
+            # Like asyncio.run: cancel leftover background tasks (pollers, client pools)
+            pending = asyncio.all_tasks(loop)
+            for task in pending:
+                task.cancel()
+            if pending:
+                with _virtual_wall_clock(loop):
+                    loop.run_until_complete(asyncio.gather(*pending, return_exceptions=True))
+            loop.run_until_complete(loop.shutdown_asyncgens())
+        finally:
+            asyncio.set_event_loop(None)
+            loop.close()
+
+
+run_simulated.last_elapsed = 0.0
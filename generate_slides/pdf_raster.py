@@ -0,0 +1,118 @@
+"""
+PDF Rasterization — parallel PyMuPDF page rendering to in-memory images
+
+Used to turn NotebookLM PDFs into slide images. Pages are filtered first
+(e.g. the junk-page text check) so skipped pages are never rendered, then the
+remaining pages are rendered in worker processes, each opening its own copy of
+the document. Pixmaps are encoded straight to PNG/JPEG bytes — no temp files.
+
+Kept free of Streamlit imports so pool workers start quickly. Workers are
+spawned rather than forked, since forking the threaded Streamlit process can
+deadlock in the child.
+
+Usage:
+    pages = rasterize_pdf(pdf_path)                       # [(page_index, png_bytes), ...]
+    pages = rasterize_pdf(pdf_path, dpi=110, image_format="jpeg", jpeg_quality=85)
+"""
+
+import logging
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+PDF_RASTER_DPI = 144            # 2x of PDF's 72 dpi — matches the old fitz.Matrix(2.0, 2.0)
+PDF_RASTER_FORMAT = "png"       # "png" (lossless) or "jpeg" (smaller, faster to embed)
+PDF_RASTER_JPEG_QUALITY = 90
+PARALLEL_MIN_PAGES = 6          # Below this, process-pool startup costs more than it saves
+
+
+def _encode_page(page, dpi: int, image_format: str, jpeg_quality: int) -> bytes:
+    pix = page.get_pixmap(dpi=dpi, alpha=False)
+    if image_format == "jpeg":
+        return pix.tobytes("jpg", jpg_quality=jpeg_quality)
+    return pix.tobytes("png")
+
+
+def _render_pages(pdf_path: str, page_indices: List[int], dpi: int,
+                  image_format: str, jpeg_quality: int) -> List[Tuple[int, bytes]]:
+    """Render a chunk of pages. Runs in pool workers (opens its own document)."""
+    import fitz
+
+    doc = fitz.open(pdf_path)
+    try:
+        return [(idx, _encode_page(doc[idx], dpi, image_format, jpeg_quality))
+                for idx in page_indices]
+    finally:
+        doc.close()
+
+
+def rasterize_pdf(
+    pdf_path: str,
+    pages: Optional[List[int]] = None,
+    dpi: int = PDF_RASTER_DPI,
+    image_format: str = PDF_RASTER_FORMAT,
+    jpeg_quality: int = PDF_RASTER_JPEG_QUALITY,
+    skip_page: Optional[Callable] = None,
+    max_images: Optional[int] = None,
+    workers: Optional[int] = None,
+) -> List[Tuple[int, bytes]]:
+    """Render PDF pages to encoded image bytes, in parallel when worthwhile.
+
+    Args:
+        pdf_path: Path to the PDF.
+        pages: Page indices to consider (default: all), in output order.
+        dpi: Render resolution. Lower is faster and smaller (72 = 1x).
+        image_format: "png" or "jpeg".
+        jpeg_quality: JPEG quality (1-100) when image_format is "jpeg".
+        skip_page: Optional predicate(fitz.Page) -> bool, evaluated before
+            rendering; pages it returns True for are not rendered.
+        max_images: Stop selecting pages once this many pass skip_page.
+        workers: Process count (default: CPU count). 1 forces serial.
+
+    Returns:
+        List of (page_index, image_bytes), in page order.
+    """
+    import fitz
+
+    if image_format not in ("png", "jpeg"):
+        raise ValueError(f"Unknown image format '{image_format}' (expected 'png' or 'jpeg')")
+
+    doc = fitz.open(pdf_path)
+    try:
+        candidates = list(range(len(doc))) if pages is None else list(pages)
+        selected = []
+        for idx in candidates:
+            if max_images is not None and len(selected) >= max_images:
+                break
+            if skip_page is not None and skip_page(doc[idx]):
+                continue
+            selected.append(idx)
+
+        workers = min(workers or os.cpu_count() or 1, len(selected))
+        if workers <= 1 or len(selected) < PARALLEL_MIN_PAGES:
+            return [(idx, _encode_page(doc[idx], dpi, image_format, jpeg_quality))
+                    for idx in selected]
+    finally:
+        doc.close()
+
+    # Contiguous chunks keep each worker's page access sequential
+    chunk = -(-len(selected) // workers)
+    chunks = [selected[i:i + chunk] for i in range(0, len(selected), chunk)]
+    try:
+        with ProcessPoolExecutor(
+            max_workers=len(chunks), mp_context=multiprocessing.get_context("spawn")
+        ) as pool:
+            futures = [
+                pool.submit(_render_pages, pdf_path, c, dpi, image_format, jpeg_quality)
+                for c in chunks
+            ]
+            results = []
+            for f in futures:
+                results.extend(f.result())
+        return results
+    except Exception as e:
+        logger.warning(f"PDF raster process pool failed ({type(e).__name__}: {e}) — rendering serially")
+        return _render_pages(pdf_path, selected, dpi, image_format, jpeg_quality)
@@ -0,0 +1,464 @@
+"""
+PPTX Package Merge — OPC-level deck merging without python-pptx
+
+Merges PowerPoint decks by working on the package parts (ZIP members)
+directly instead of loading each deck into python-pptx:
+
+- Slide XML, media and every other part are streamed from the input ZIP to
+  the output ZIP as raw compressed bytes (never inflated, parsed or re-saved).
+- Only the small relationship parts, presentation.xml and [Content_Types].xml
+  are parsed and rewritten.
+- Identical media (same sha256) is stored once across all decks; only media
+  whose CRC and size collide with another part is actually hashed.
+- Decks are processed one at a time, so memory stays flat however many decks
+  are merged.
+
+The first deck is the base: its masters, layouts, theme and slide size are
+kept. Slides from later decks are re-pointed at the base layout with the same
+name (falling back to the base's "Blank" layout). Speaker notes of appended
+slides are dropped, as in the previous python-pptx merge.
+
+Usage:
+    slide_count = merge_pptx_packages([deck1, deck2, ...], "merged.pptx")
+"""
+
+import hashlib
+import io
+import logging
+import posixpath
+import re
+import struct
+import zipfile
+from typing import BinaryIO, Dict, List, Optional, Union
+
+from lxml import etree
+
+logger = logging.getLogger(__name__)
+
+NS_P = "http://schemas.openxmlformats.org/presentationml/2006/main"
+NS_R = "http://schemas.openxmlformats.org/officeDocument/2006/relationships"
+NS_PKG_REL = "http://schemas.openxmlformats.org/package/2006/relationships"
+NS_CT = "http://schemas.openxmlformats.org/package/2006/content-types"
+
+RT_OFFICE_DOCUMENT = f"{NS_R}/officeDocument"
+RT_SLIDE = f"{NS_R}/slide"
+RT_SLIDE_LAYOUT = f"{NS_R}/slideLayout"
+RT_NOTES_SLIDE = f"{NS_R}/notesSlide"
+
+CT_SLIDE = "application/vnd.openxmlformats-officedocument.presentationml.slide+xml"
+CONTENT_TYPES_PART = "[Content_Types].xml"
+
+_LOCAL_HEADER_SIZE = 30
+_COPY_CHUNK = 1024 * 1024
+_HASH_CHUNK = 1024 * 1024
+
+PptxSource = Union[str, bytes, BinaryIO]
+
+# Private zipfile API used by the raw member copy; checked so a Python
+# without it still merges (through the slower writestr path)
+_HAS_RAW_COPY_INTERNALS = (
+    hasattr(zipfile.ZipInfo, "FileHeader")
+    and hasattr(zipfile, "stringFileHeader")
+    and hasattr(zipfile, "ZIP64_LIMIT")
+)
+
+
+# ---------- ZIP helpers ----------
+
+def copy_zip_member_raw(src: zipfile.ZipFile, dst: zipfile.ZipFile, info: zipfile.ZipInfo,
+                        arcname: Optional[str] = None) -> None:
+    """Copy one member's compressed bytes from src to dst without recompressing.
+
+    CRC, sizes and compression method are carried over from the source entry;
+    the local header is rewritten with the sizes inline (no data descriptor).
+    Data is copied in chunks. dst must be a seekable archive opened in 'w'
+    mode with no open member handles.
+
+    The raw copy relies on zipfile internals (ZipFile.start_dir/_didModify,
+    ZipInfo.FileHeader). If a Python version lacks them, the member is
+    decompressed and re-written with writestr() instead.
+    """
+    if not (_HAS_RAW_COPY_INTERNALS and hasattr(dst, "start_dir") and hasattr(dst, "_didModify")):
+        zinfo = zipfile.ZipInfo(arcname or info.filename, info.date_time)
+        zinfo.compress_type = info.compress_type
+        zinfo.external_attr = info.external_attr
+        zinfo.create_system = info.create_system
+        zinfo.comment = info.comment
+        dst.writestr(zinfo, src.read(info))
+        return
+
+    src.fp.seek(info.header_offset)
+    header = src.fp.read(_LOCAL_HEADER_SIZE)
+    if header[:4] != zipfile.stringFileHeader:
+        raise zipfile.BadZipFile(f"Bad local header for {info.filename}")
+    name_len, extra_len = struct.unpack('<HH', header[26:30])
+    data_offset = info.header_offset + _LOCAL_HEADER_SIZE + name_len + extra_len
+
+    zinfo = zipfile.ZipInfo(arcname or info.filename, info.date_time)
+    zinfo.compress_type = info.compress_type
+    zinfo.external_attr = info.external_attr
+    zinfo.create_system = info.create_system
+    zinfo.comment = info.comment
+    zinfo.CRC = info.CRC
+    zinfo.compress_size = info.compress_size
+    zinfo.file_size = info.file_size
+    zinfo.flag_bits = info.flag_bits & ~0x08  # Sizes go in the local header
+
+    zip64 = zinfo.file_size > zipfile.ZIP64_LIMIT or zinfo.compress_size > zipfile.ZIP64_LIMIT
+    dst.fp.seek(dst.start_dir)
+    zinfo.header_offset = dst.fp.tell()
+    dst.fp.write(zinfo.FileHeader(zip64))
+
+    remaining = info.compress_size
+    src.fp.seek(data_offset)
+    while remaining > 0:
+        chunk = src.fp.read(min(_COPY_CHUNK, remaining))
+        if not chunk:
+            raise zipfile.BadZipFile(f"Truncated member {info.filename}")
+        dst.fp.write(chunk)
+        remaining -= len(chunk)
+
+    dst.start_dir = dst.fp.tell()
+    dst.filelist.append(zinfo)
+    dst.NameToInfo[zinfo.filename] = zinfo
+    dst._didModify = True
+
+
+def _member_sha256(zf: zipfile.ZipFile, name: str) -> str:
+    h = hashlib.sha256()
+    with zf.open(name) as f:
+        for chunk in iter(lambda: f.read(_HASH_CHUNK), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+# ---------- OPC helpers ----------
+
+def _rels_name(part: str) -> str:
+    d, base = posixpath.split(part)
+    return posixpath.join(d, "_rels", f"{base}.rels")
+
+
+def _resolve(source_part: str, target: str) -> str:
+    if target.startswith("/"):
+        return target.lstrip("/")
+    return posixpath.normpath(posixpath.join(posixpath.dirname(source_part), target))
+
+
+def _relative(from_part: str, to_part: str) -> str:
+    return posixpath.relpath(to_part, posixpath.dirname(from_part) or ".")
+
+
+def _read_rels(zf: zipfile.ZipFile, part: str) -> List[dict]:
+    try:
+        root = etree.fromstring(zf.read(_rels_name(part)))
+    except KeyError:
+        return []
+    return [dict(el.attrib) for el in root.iter(f"{{{NS_PKG_REL}}}Relationship")]
+
+
+def _rels_xml(rels: List[dict]) -> bytes:
+    root = etree.Element(f"{{{NS_PKG_REL}}}Relationships", nsmap={None: NS_PKG_REL})
+    for rel in rels:
+        etree.SubElement(root, f"{{{NS_PKG_REL}}}Relationship", {k: v for k, v in rel.items()})
+    return etree.tostring(root, xml_declaration=True, encoding="UTF-8", standalone=True)
+
+
+class _ContentTypes:
+    """Parsed [Content_Types].xml: extension defaults + part overrides."""
+
+    def __init__(self, xml: bytes):
+        root = etree.fromstring(xml)
+        self.defaults: Dict[str, str] = {}
+        self.overrides: Dict[str, str] = {}
+        for el in root:
+            tag = etree.QName(el).localname
+            if tag == "Default":
+                self.defaults[el.get("Extension").lower()] = el.get("ContentType")
+            elif tag == "Override":
+                self.overrides[el.get("PartName").lstrip("/")] = el.get("ContentType")
+
+    def get(self, part: str) -> Optional[str]:
+        if part in self.overrides:
+            return self.overrides[part]
+        ext = posixpath.splitext(part)[1].lstrip(".").lower()
+        return self.defaults.get(ext)
+
+    def add(self, part: str, content_type: Optional[str]) -> None:
+        """Register part in the output, as a Default if the extension allows."""
+        if not content_type:
+            return
+        ext = posixpath.splitext(part)[1].lstrip(".").lower()
+        if self.defaults.get(ext) == content_type:
+            return
+        if ext and ext not in self.defaults and not ext.endswith("xml") and ext != "rels":
+            self.defaults[ext] = content_type
+            return
+        self.overrides[part] = content_type
+
+    def to_xml(self) -> bytes:
+        root = etree.Element(f"{{{NS_CT}}}Types", nsmap={None: NS_CT})
+        for ext, ct in self.defaults.items():
+            etree.SubElement(root, f"{{{NS_CT}}}Default", Extension=ext, ContentType=ct)
+        for part, ct in self.overrides.items():
+            etree.SubElement(root, f"{{{NS_CT}}}Override", PartName=f"/{part}", ContentType=ct)
+        return etree.tostring(root, xml_declaration=True, encoding="UTF-8", standalone=True)
+
+
+def _main_part(zf: zipfile.ZipFile) -> str:
+    for rel in _read_rels(zf, ""):
+        if rel.get("Type") == RT_OFFICE_DOCUMENT:
+            return rel["Target"].lstrip("/")
+    return "ppt/presentation.xml"
+
+
+def _slide_parts(zf: zipfile.ZipFile, pres_part: str) -> List[str]:
+    """Slide part names in presentation order."""
+    rid_to_part = {
+        rel["Id"]: _resolve(pres_part, rel["Target"])
+        for rel in _read_rels(zf, pres_part) if rel.get("Type") == RT_SLIDE
+    }
+    root = etree.fromstring(zf.read(pres_part))
+    lst = root.find(f"{{{NS_P}}}sldIdLst")
+    if lst is None:
+        return []
+    return [rid_to_part[el.get(f"{{{NS_R}}}id")] for el in lst
+            if el.get(f"{{{NS_R}}}id") in rid_to_part]
+
+
+def _layout_name(zf: zipfile.ZipFile, part: str) -> Optional[str]:
+    try:
+        root = etree.fromstring(zf.read(part))
+    except KeyError:
+        return None
+    csld = root.find(f"{{{NS_P}}}cSld")
+    return csld.get("name") if csld is not None else None
+
+
+_NUMBERED = re.compile(r"^(.*?)(\d*)(\.[^./]+)$")
+
+
+def _unique_part_name(part: str, used: set) -> str:
+    if part not in used:
+        return part
+    m = _NUMBERED.match(part)
+    stem, num, ext = (m.group(1), int(m.group(2) or 1), m.group(3)) if m else (part, 1, "")
+    while True:
+        num += 1
+        candidate = f"{stem}{num}{ext}"
+        if candidate not in used:
+            return candidate
+
+
+def count_slides(source: PptxSource) -> int:
+    """Number of slides in a PPTX, read from presentation.xml only."""
+    with zipfile.ZipFile(_as_file(source)) as zf:
+        return len(_slide_parts(zf, _main_part(zf)))
+
+
+def _as_file(source: PptxSource):
+    return io.BytesIO(source) if isinstance(source, (bytes, bytearray)) else source
+
+
+# ---------- Merge ----------
+
+class _Merger:
+    def __init__(self, out: zipfile.ZipFile, shared_media_keys: set):
+        self.out = out
+        # (CRC, size) of media appearing more than once across all decks;
+        # only these are hashed — a unique (CRC, size) cannot be a duplicate.
+        self.shared_media_keys = shared_media_keys
+        self.used: set = set()
+        self.media_by_hash: Dict[str, str] = {}
+        self.media_deduped = 0
+        self.content_types: Optional[_ContentTypes] = None
+        self.pres_part = ""
+        self.pres_xml: Optional[etree._Element] = None
+        self.pres_rels: List[dict] = []
+        self.layouts_by_name: Dict[str, str] = {}
+        self.fallback_layout = ""
+        self.slide_count = 0
+
+    # -- base deck --
+
+    def add_base(self, zf: zipfile.ZipFile) -> None:
+        self.content_types = _ContentTypes(zf.read(CONTENT_TYPES_PART))
+        self.pres_part = _main_part(zf)
+        self.pres_xml = etree.fromstring(zf.read(self.pres_part))
+        self.pres_rels = _read_rels(zf, self.pres_part)
+        self.slide_count = len(_slide_parts(zf, self.pres_part))
+
+        skip = {CONTENT_TYPES_PART, self.pres_part, _rels_name(self.pres_part)}
+        for info in zf.infolist():
+            if info.filename in skip or info.is_dir():
+                continue
+            copy_zip_member_raw(zf, self.out, info)
+            self.used.add(info.filename)
+            if info.filename.startswith("ppt/media/"):
+                self.media_by_hash.setdefault(self._media_key(zf, info), info.filename)
+            elif info.filename.startswith("ppt/slideLayouts/") and info.filename.endswith(".xml"):
+                name = _layout_name(zf, info.filename)
+                if name:
+                    self.layouts_by_name.setdefault(name, info.filename)
+        self.used.update(skip)
+
+        layouts = sorted(
+            (p for p in self.used if p.startswith("ppt/slideLayouts/") and p.endswith(".xml")),
+            key=lambda p: int(re.sub(r"\D", "", posixpath.basename(p)) or 0),
+        )
+        # Same choice as the python-pptx merge: "Blank", else layout 7, else the first
+        self.fallback_layout = (
+            self.layouts_by_name.get("Blank")
+            or (layouts[6] if len(layouts) > 6 else (layouts[0] if layouts else ""))
+        )
+
+    # -- appended decks --
+
+    def add_deck(self, zf: zipfile.ZipFile) -> int:
+        src_ct = _ContentTypes(zf.read(CONTENT_TYPES_PART))
+        src_slides = _slide_parts(zf, _main_part(zf))
+        copied: Dict[str, str] = {}
+
+        # Reserve output names first so slide-to-slide links can be re-pointed
+        for part in src_slides:
+            name = _unique_part_name(f"ppt/slides/slide{self.slide_count + 1}.xml", self.used)
+            self.used.add(name)
+            copied[part] = name
+            self.slide_count += 1
+
+        for part in src_slides:
+            new_part = copied[part]
+            copy_zip_member_raw(zf, self.out, zf.getinfo(part), arcname=new_part)
+            self._write_rels(zf, src_ct, part, new_part, copied)
+            self.content_types.add(new_part, CT_SLIDE)
+            self._append_slide_id(new_part)
+        return len(src_slides)
+
+    def _write_rels(self, zf, src_ct, part: str, new_part: str, copied: Dict[str, str]) -> None:
+        rels = _read_rels(zf, part)
+        if not rels:
+            return
+        new_rels = []
+        for rel in rels:
+            rel = dict(rel)
+            rtype = rel.get("Type")
+            if rel.get("TargetMode") == "External":
+                new_rels.append(rel)
+                continue
+            if rtype == RT_NOTES_SLIDE:
+                continue
+            target = _resolve(part, rel["Target"])
+            if rtype == RT_SLIDE_LAYOUT:
+                dest = self.layouts_by_name.get(_layout_name(zf, target)) or self.fallback_layout
+            elif target in copied:
+                dest = copied[target]
+            else:
+                dest = self._copy_part(zf, src_ct, target, copied)
+            if not dest:
+                continue
+            rel["Target"] = _relative(new_part, dest)
+            new_rels.append(rel)
+        self.out.writestr(_rels_name(new_part), _rels_xml(new_rels), zipfile.ZIP_DEFLATED)
+        self.used.add(_rels_name(new_part))
+
+    def _copy_part(self, zf, src_ct, part: str, copied: Dict[str, str]) -> Optional[str]:
+        """Copy a non-slide part (media, chart, embedding, ...) and its own rels."""
+        try:
+            info = zf.getinfo(part)
+        except KeyError:
+            logger.warning(f"PPTX merge: missing part {part} — relationship dropped")
+            return None
+
+        if part.startswith("ppt/media/"):
+            digest = self._media_key(zf, info)
+            existing = self.media_by_hash.get(digest)
+            if existing:
+                self.media_deduped += 1
+                copied[part] = existing
+                return existing
+
+        new_part = _unique_part_name(part, self.used)
+        self.used.add(new_part)
+        copied[part] = new_part
+        copy_zip_member_raw(zf, self.out, info, arcname=new_part)
+        self.content_types.add(new_part, src_ct.get(part))
+        if part.startswith("ppt/media/"):
+            self.media_by_hash[digest] = new_part
+        self._write_rels(zf, src_ct, part, new_part, copied)
+        return new_part
+
+    def _media_key(self, zf: zipfile.ZipFile, info: zipfile.ZipInfo) -> str:
+        if (info.CRC, info.file_size) in self.shared_media_keys:
+            return _member_sha256(zf, info.filename)
+        return f"unique:{info.CRC}:{info.file_size}"
+
+    def _append_slide_id(self, new_part: str) -> None:
+        rid_nums = [int(r["Id"][3:]) for r in self.pres_rels if r["Id"][3:].isdigit()]
+        rid = f"rId{max(rid_nums, default=0) + 1}"
+        self.pres_rels.append({
+            "Id": rid, "Type": RT_SLIDE, "Target": _relative(self.pres_part, new_part),
+        })
+
+        lst = self.pres_xml.find(f"{{{NS_P}}}sldIdLst")
+        if lst is None:
+            lst = etree.Element(f"{{{NS_P}}}sldIdLst")
+            # sldIdLst follows sldMasterIdLst / notesMasterIdLst / handoutMasterIdLst
+            anchor = 0
+            for i, child in enumerate(self.pres_xml):
+                if etree.QName(child).localname in ("sldMasterIdLst", "notesMasterIdLst",
+                                                    "handoutMasterIdLst"):
+                    anchor = i + 1
+            self.pres_xml.insert(anchor, lst)
+        ids = [int(el.get("id")) for el in lst]
+        new_id = max(ids + [255]) + 1
+        el = etree.SubElement(lst, f"{{{NS_P}}}sldId")
+        el.set("id", str(new_id))
+        el.set(f"{{{NS_R}}}id", rid)
+
+    def finish(self) -> None:
+        self.out.writestr(
+            self.pres_part,
+            etree.tostring(self.pres_xml, xml_declaration=True, encoding="UTF-8", standalone=True),
+            zipfile.ZIP_DEFLATED,
+        )
+        self.out.writestr(_rels_name(self.pres_part), _rels_xml(self.pres_rels), zipfile.ZIP_DEFLATED)
+        self.out.writestr(CONTENT_TYPES_PART, self.content_types.to_xml(), zipfile.ZIP_DEFLATED)
+
+
+def merge_pptx_packages(sources: List[PptxSource], output: Union[str, BinaryIO]) -> int:
+    """Merge PPTX decks into one at the package level.
+
+    Args:
+        sources: Decks in order — file paths, raw bytes or binary file objects.
+            The first deck is the base (masters, layouts, theme, slide size).
+        output: Output path or seekable binary file object.
+
+    Returns:
+        Total slide count of the merged deck.
+    """
+    if not sources:
+        raise ValueError("No PPTX files provided.")
+
+    # Central directories only — no member data is read here
+    seen, shared = set(), set()
+    for source in sources:
+        with zipfile.ZipFile(_as_file(source)) as zf:
+            for info in zf.infolist():
+                if info.filename.startswith("ppt/media/"):
+                    key = (info.CRC, info.file_size)
+                    (shared if key in seen else seen).add(key)
+
+    with zipfile.ZipFile(output, "w", zipfile.ZIP_DEFLATED) as out:
+        merger = _Merger(out, shared)
+        with zipfile.ZipFile(_as_file(sources[0])) as zf:
+            merger.add_base(zf)
+        for source in sources[1:]:
+            with zipfile.ZipFile(_as_file(source)) as zf:
+                merger.add_deck(zf)
+        merger.finish()
+
+    logger.info(
+        f"Merged {len(sources)} PPTX packages: {merger.slide_count} slides, "
+        f"{merger.media_deduped} duplicate media parts shared"
+    )
+    return merger.slide_count
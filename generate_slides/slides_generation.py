@@ -26,6 +26,7 @@ import logging
 import os
 import re
 import shutil
+import threading
 import time
 import urllib.parse
 from typing import Optional, Dict, Any, List
@@ -38,24 +39,9 @@ def _auto_match_company(org_name: str) -> dict:
 
     Returns the matching company dict, or empty dict if no match.
     """
-    if not org_name:
-        return {}
     try:
-        from generate_ap_fg_lg.utils.organizations import get_organizations
-        organizations = get_organizations()
-        if not organizations:
-            return {}
-        def _norm(s: str) -> str:
-            return s.lower().strip().replace(".", "").replace(",", "")
-        target = _norm(org_name)
-        for org in organizations:
-            if _norm(org.get("name", "")) == target:
-                return org
-        # Fallback: substring match
-        for org in organizations:
-            org_norm = _norm(org.get("name", ""))
-            if target in org_norm or org_norm in target:
-                return org
+        from generate_ap_fg_lg.utils.organizations import match_organization
+        return match_organization(org_name)
     except Exception:
         pass
     return {}
@@ -551,19 +537,20 @@ def _pdf_to_pptx(pdf_path: str, pptx_path: str) -> str:
     Returns:
         Path to the created PPTX file.
     """
-    import tempfile
-    from pathlib import Path
+    import io
 
     try:
         from pptx import Presentation
         from pptx.util import Inches, Emu
-        import fitz  # pymupdf — already installed
+        import fitz  # noqa: F401  pymupdf — used by rasterize_pdf
+        from generate_slides.pdf_raster import rasterize_pdf
     except ImportError as e:
         logger.warning(f"PDF to PPTX conversion skipped — missing dependency: {e}")
         return pdf_path
 
     try:
-        doc = fitz.open(pdf_path)
+        # Render all pages in parallel, straight to in-memory PNGs
+        pages = rasterize_pdf(pdf_path)
         prs = Presentation()
 
         # Set slide dimensions to widescreen 16:9 (matching NotebookLM)
@@ -572,33 +559,16 @@ def _pdf_to_pptx(pdf_path: str, pptx_path: str) -> str:
 
         blank_layout = prs.slide_layouts[6]  # Blank layout
 
-        for page_num in range(len(doc)):
-            page = doc[page_num]
-            # Render at 2x resolution for high quality
-            mat = fitz.Matrix(2.0, 2.0)
-            pix = page.get_pixmap(matrix=mat, alpha=False)
-
-            # Save page as temp PNG
-            img_tmp = tempfile.mktemp(suffix=f"_page{page_num}.png")
-            pix.save(img_tmp)
-
+        for _, img_bytes in pages:
             # Add slide with full-page image
             slide = prs.slides.add_slide(blank_layout)
             slide.shapes.add_picture(
-                img_tmp, Emu(0), Emu(0),
+                io.BytesIO(img_bytes), Emu(0), Emu(0),
                 prs.slide_width, prs.slide_height
             )
 
-            # Clean up temp image
-            try:
-                import os
-                os.unlink(img_tmp)
-            except Exception:
-                pass
-
-        doc.close()
         prs.save(pptx_path)
-        logger.info(f"Converted PDF to PPTX: {pptx_path} ({len(doc)} slides)")
+        logger.info(f"Converted PDF to PPTX: {pptx_path} ({len(pages)} slides)")
         return pptx_path
 
     except Exception as e:
@@ -1646,6 +1616,19 @@ def _build_topic_search_url(topic_names: list, course_title: str) -> List[str]:
     return urls
 
 
+def _wikipedia_source_urls(topic_names: list) -> List[str]:
+    """Direct Wikipedia article URLs (not search pages) for a chunk's first two topics."""
+    direct_urls = []
+    for topic in topic_names[:2]:
+        clean = re.sub(r'\([^)]*\)', '', topic).strip()
+        clean = re.sub(r'^(T\d+[:\-\s]*)', '', clean, flags=re.IGNORECASE).strip()
+        # Use direct Wikipedia article URLs for common BCM concepts
+        if len(clean) > 5:
+            wiki_title = clean.replace(' ', '_')
+            direct_urls.append(f"https://en.wikipedia.org/wiki/{wiki_title}")
+    return direct_urls
+
+
 async def _add_multi_sources(client, nb_id: str, cm: dict, course_title: str,
                               context: dict, logger_obj=None) -> List[str]:
     """Add sources to a notebook:
@@ -1686,18 +1669,7 @@ async def _add_multi_sources(client, nb_id: str, cm: dict, course_title: str,
     # Sources 3-4: Web URL sources for internet content quality
     # Uses direct Wikipedia article URLs (not search pages) for reliability
     try:
-        topic_names = cm.get('topic_names', [])
-        # Build reliable direct URLs (Wikipedia articles, not search pages)
-        direct_urls = []
-        for topic in topic_names[:2]:
-            clean = re.sub(r'\([^)]*\)', '', topic).strip()
-            clean = re.sub(r'^(T\d+[:\-\s]*)', '', clean, flags=re.IGNORECASE).strip()
-            # Use direct Wikipedia article URLs for common BCM concepts
-            if len(clean) > 5:
-                wiki_title = clean.replace(' ', '_')
-                direct_urls.append(f"https://en.wikipedia.org/wiki/{wiki_title}")
-
-        for url in direct_urls:
+        for url in _wikipedia_source_urls(cm.get('topic_names', [])):
             try:
                 src_url = await client.sources.add_url(nb_id, url)
                 source_ids.append(src_url.id)
@@ -2281,11 +2253,25 @@ async def _generate_slides_direct(content: str, course_title: str, config: Dict[
 # Browser-based generation fallback (bypasses API rate limits)
 # =============================================================================
 
+# Chromium locks a persistent profile dir, so only one fallback browser runs at a time
+_BROWSER_FALLBACK_LOCK = threading.Lock()
+
+
 async def _generate_via_browser(notebook_id: str, label: str, progress_callback=None) -> str:
     """Trigger slide generation via browser UI when API is rate limited.
     Opens notebook in visible browser, clicks 'Slide Deck', waits for completion.
+    Runs are serialized across sessions (one shared browser profile).
     Returns generation_status string.
     """
+    while not _BROWSER_FALLBACK_LOCK.acquire(blocking=False):
+        await asyncio.sleep(1)
+    try:
+        return await _generate_via_browser_locked(notebook_id, label, progress_callback)
+    finally:
+        _BROWSER_FALLBACK_LOCK.release()
+
+
+async def _generate_via_browser_locked(notebook_id: str, label: str, progress_callback=None) -> str:
     from pathlib import Path as _Path
     _profile_dir = _Path.home() / ".notebooklm" / "browser_profile"
     _profile_dir.mkdir(parents=True, exist_ok=True)
@@ -2413,43 +2399,15 @@ async def _generate_via_browser(notebook_id: str, label: str, progress_callback=
 # Module-level chunk deck generator (used by both single & multi-account modes)
 # =============================================================================
 
-async def _generate_chunk_deck_impl(client, cm: dict, notebook_id: str,
-                                     nb_title: str, source_id,
-                                     course_title: str, config: dict,
-                                     progress_callback=None) -> dict:
-    """Generate slides for a single chunk using the given NotebookLM client.
+def _chunk_deck_instructions(cm: dict, course_title: str, config: dict) -> tuple:
+    """NotebookLM generation instructions for a deck chunk.
 
-    source_id: either a single source ID string or a list of source IDs.
+    Returns (instructions, slides_target); instructions are already truncated
+    to NotebookLM's ~3000 character limit.
     """
     label = cm['label']
-    enable_research = config.get('enable_research', False)
-    num_queries = config.get('num_queries', 0)
-    slide_style = config.get('slide_style', 'Professional')
     include_notes = config.get('include_notes', False)
 
-    # Accept single ID or list of IDs
-    if isinstance(source_id, list):
-        all_source_ids = list(source_id)
-    else:
-        all_source_ids = [source_id]
-    research_count = 0
-
-    if enable_research:
-        if progress_callback:
-            progress_callback(f"[{label}] Researching {num_queries} topics...", None)
-        try:
-            queries = _extract_research_queries(cm['content'], course_title, num_queries)
-            if queries:
-                research_ids = await _do_internet_research(
-                    client, notebook_id, queries
-                )
-                all_source_ids.extend(research_ids)
-                research_count = len(research_ids)
-                if progress_callback:
-                    progress_callback(f"[{label}] Added {research_count} research sources", None)
-        except Exception as e:
-            logger.warning(f"{label} research failed: {e}")
-
     # Build instructions — matching supervisor's reference PPTX format
     # Target: 1 day = 60-100, 2 days = 120-160, 3 days = 180-220
     ctx = config.get('_context', {})
@@ -2553,6 +2511,60 @@ async def _generate_chunk_deck_impl(client, cm: dict, notebook_id: str,
     if include_notes:
         instructions += "\nInclude detailed speaker/facilitator notes for every slide."
 
+    # Truncate instructions to stay within NotebookLM's limit (~3000 chars)
+    if len(instructions) > 3000:
+        instructions = instructions[:2950] + "\n"
+        logger.info(f"[{label}] Instructions truncated to {len(instructions)} chars")
+
+    return instructions, slides_target
+
+
+async def _generate_chunk_deck_impl(client, cm: dict, notebook_id: str,
+                                     nb_title: str, source_id,
+                                     course_title: str, config: dict,
+                                     progress_callback=None, account: str = "default",
+                                     cache_key: Optional[str] = None,
+                                     browser_fallback: bool = True) -> dict:
+    """Generate slides for a single chunk using the given NotebookLM client.
+
+    source_id: either a single source ID string or a list of source IDs.
+    account: key of the shared deck status poller to wait on (one per account).
+    cache_key: deck_cache key (see _chunk_deck_cache_key); the downloaded
+        deck is stored under it before logo stamping.
+    browser_fallback: on an API rate limit, generate through the browser.
+        False returns generation_status "rate_limited" instead, so the
+        account scheduler can cool the account down and requeue the chunk.
+    """
+    label = cm['label']
+    enable_research = config.get('enable_research', False)
+    num_queries = config.get('num_queries', 0)
+    slide_style = config.get('slide_style', 'Professional')
+
+    # Accept single ID or list of IDs
+    if isinstance(source_id, list):
+        all_source_ids = list(source_id)
+    else:
+        all_source_ids = [source_id]
+    research_count = 0
+
+    if enable_research:
+        if progress_callback:
+            progress_callback(f"[{label}] Researching {num_queries} topics...", None)
+        try:
+            queries = _extract_research_queries(cm['content'], course_title, num_queries)
+            if queries:
+                research_ids = await _do_internet_research(
+                    client, notebook_id, queries
+                )
+                all_source_ids.extend(research_ids)
+                research_count = len(research_ids)
+                if progress_callback:
+                    progress_callback(f"[{label}] Added {research_count} research sources", None)
+        except Exception as e:
+            logger.warning(f"{label} research failed: {e}")
+
+    instructions, slides_target = _chunk_deck_instructions(cm, course_title, config)
+
     # Clean up any failed/error sources before generating slides
     # Failed URL sources can cause generation to fail
     try:
@@ -2576,11 +2588,7 @@ async def _generate_chunk_deck_impl(client, cm: dict, notebook_id: str,
         progress_callback(f"[{label}] Sending slide generation request...", None)
 
     # Try API generation first; if rate limited, flag for browser-based generation
-    # Truncate instructions to stay within NotebookLM's limit (~3000 chars)
-    if len(instructions) > 3000:
-        instructions = instructions[:2950] + "\n"
-        logger.info(f"[{label}] Instructions truncated to {len(instructions)} chars")
-
+    # (or, under the account scheduler, report it so the chunk is requeued)
     # Use DETAILED_DECK format + DEFAULT length for visual slides
     # NotebookLM provides images/diagrams/flowcharts; Claude AI provides the deep content
     # DEFAULT length is faster than LONG while still producing good visual slides
@@ -2594,6 +2602,8 @@ async def _generate_chunk_deck_impl(client, cm: dict, notebook_id: str,
             value = 1
         _slide_length = _DefaultLength()
 
+    from generate_slides.account_pool import is_rate_limit_error
+
     rate_limited = False
     generation_status = "pending"
     try:
@@ -2610,14 +2620,14 @@ async def _generate_chunk_deck_impl(client, cm: dict, notebook_id: str,
         logger.info(f"[{label}] API generation: status={status_val!r}")
         # Fix: Check rate limit with OR — either flag can indicate rate limiting
         if getattr(gen_result, 'is_rate_limited', False) or (
-            getattr(gen_result, 'is_failed', False) and 'rate' in str(getattr(gen_result, 'error', '')).lower()
+            getattr(gen_result, 'is_failed', False)
+            and is_rate_limit_error(str(getattr(gen_result, 'error', '')))
         ):
             rate_limited = True
         elif status_val in ('completed', 'in_progress', 'pending'):
             generation_status = "api_triggered"
     except Exception as e:
-        error_str = str(e).lower()
-        if 'rate' in error_str or 'limit' in error_str or 'quota' in error_str or '429' in error_str:
+        if is_rate_limit_error(str(e)):
             rate_limited = True
         else:
             # Retry once with minimal instructions on any other failure
@@ -2648,44 +2658,38 @@ async def _generate_chunk_deck_impl(client, cm: dict, notebook_id: str,
                 logger.error(f"[{label}] Retry also failed: {e2}")
                 raise
 
-    # If API worked, poll for completion (max 4 minutes per deck)
+    # If API worked, wait for completion via the account's shared status poller
+    # (max 5 minutes per deck)
     if generation_status == "api_triggered":
         if progress_callback:
             progress_callback(f"[{label}] API generation triggered — waiting for completion...", None)
-        for poll_i in range(120):
-            await asyncio.sleep(2)
-            try:
-                decks = await client.artifacts.list_slide_decks(notebook_id)
-                if decks:
-                    for deck in decks:
-                        # Status can be int (3=COMPLETED, 4=FAILED) or string
-                        raw_status = getattr(deck, 'status', '')
-                        ds = str(raw_status or '').lower()
-                        is_failed = getattr(deck, 'is_failed', False)
-                        is_completed = getattr(deck, 'is_completed', False)
-                        is_generating = getattr(deck, 'is_generating', None)
-                        # Check for actual failure first
-                        if is_failed or raw_status == 4 or ds in ('failed', 'error', '4'):
-                            logger.warning(f"[{label}] Deck generation failed: status={raw_status}")
-                            generation_status = f"failed: {ds}"
-                            break
-                        # Check for completion — handle int status 3, string "completed", or bool flags
-                        if (raw_status == 3 or ds == 'completed' or ds == '3'
-                                or is_completed
-                                or (is_generating is not None and not is_generating and not is_failed)):
-                            generation_status = "completed"
-                            break
-                    if generation_status == "completed" or generation_status.startswith("failed"):
-                        break
-            except Exception:
-                pass
-            if poll_i > 0 and poll_i % 10 == 0:
-                print(f"[SLIDES] [{label}] Polling... ({poll_i * 2}s) status={generation_status}")
-                if progress_callback:
-                    progress_callback(f"[{label}] Still generating... ({poll_i * 2}s)", None)
+        from generate_slides.deck_poller import wait_for_slide_deck
+
+        last_report = [0.0]
+
+        def _on_poll(elapsed):
+            if elapsed - last_report[0] < 20:
+                return
+            last_report[0] = elapsed
+            print(f"[SLIDES] [{label}] Polling... ({elapsed:.0f}s) status={generation_status}")
+            if progress_callback:
+                progress_callback(f"[{label}] Still generating... ({elapsed:.0f}s)", None)
+
+        poll = await wait_for_slide_deck(client, notebook_id, account=account,
+                                         timeout=300, on_poll=_on_poll)
+        if poll.state == "completed":
+            generation_status = "completed"
+        elif poll.state == "failed":
+            logger.warning(f"[{label}] Deck generation failed: status={poll.status}")
+            generation_status = f"failed: {poll.status}"
 
     # If API rate limited, use BROWSER to trigger generation (bypasses API limits)
-    if rate_limited:
+    if rate_limited and not browser_fallback:
+        logger.warning(f"[{label}] API rate limited — leaving the chunk to the scheduler")
+        if progress_callback:
+            progress_callback(f"[{label}] API rate limited — requeueing", None)
+        generation_status = "rate_limited"
+    elif rate_limited:
         if progress_callback:
             progress_callback(f"[{label}] API rate limited — using browser to generate...", None)
         generation_status = await _generate_via_browser(notebook_id, label, progress_callback)
@@ -2697,6 +2701,7 @@ async def _generate_chunk_deck_impl(client, cm: dict, notebook_id: str,
     if generation_status == "completed":
         try:
             import tempfile
+            from generate_slides import deck_cache
             pptx_path = tempfile.mktemp(suffix=f"_{label}.pptx")
 
             # Step 1: Try direct PPTX download from NotebookLM
@@ -2704,6 +2709,8 @@ async def _generate_chunk_deck_impl(client, cm: dict, notebook_id: str,
             print(f"[SLIDES] [{label}] Direct PPTX download: {direct_ok}")
 
             if direct_ok:
+                if cache_key:
+                    deck_cache.store(cache_key, files={"deck.pptx": pptx_path}, label=label)
                 if progress_callback:
                     progress_callback(f"[{label}] Direct PPTX downloaded!", None)
             else:
@@ -2714,6 +2721,8 @@ async def _generate_chunk_deck_impl(client, cm: dict, notebook_id: str,
                 await client.artifacts.download_slide_deck(notebook_id, pdf_path)
                 _pdf_size = os.path.getsize(pdf_path) // 1024 if os.path.exists(pdf_path) else 0
                 print(f"[SLIDES] [{label}] PDF downloaded: {_pdf_size}KB at {pdf_path}")
+                if cache_key:
+                    deck_cache.store(cache_key, files={"deck.pdf": pdf_path}, label=label)
                 _pdf_to_pptx(pdf_path, pptx_path)
                 # Keep PDF for editable conversion (Claude Agent SDK extracts text from images)
                 original_pdf_path = pdf_path
@@ -2733,6 +2742,20 @@ async def _generate_chunk_deck_impl(client, cm: dict, notebook_id: str,
     else:
         print(f"[SLIDES] [{label}] SKIPPING DOWNLOAD: status={generation_status} (not completed)")
 
+    return _chunk_deck_result(
+        cm, notebook_id, nb_title, generation_status, pptx_path, original_pdf_path,
+        research_count=research_count, total_sources=len(all_source_ids),
+        progress_callback=progress_callback,
+    )
+
+
+def _chunk_deck_result(cm: dict, notebook_id: str, nb_title: str, generation_status: str,
+                       pptx_path: Optional[str], original_pdf_path: Optional[str],
+                       research_count: int = 0, total_sources: int = 0,
+                       progress_callback=None) -> dict:
+    """Result dict for a generated (or cache-restored) deck chunk."""
+    label = cm['label']
+
     # Count slides in the downloaded PPTX
     _slide_count = 0
     if pptx_path and os.path.exists(pptx_path):
@@ -2757,7 +2780,7 @@ async def _generate_chunk_deck_impl(client, cm: dict, notebook_id: str,
         "task_id": "",
         "generation_status": generation_status,
         "research_sources_count": research_count,
-        "total_sources": len(all_source_ids),
+        "total_sources": total_sources,
         "chunk_idx": cm['chunk_idx'],
         "original_pdf_path": original_pdf_path,  # Original NotebookLM PDF (for editable conversion)
         "pdf_path": pptx_path,  # Legacy: points to PPTX
@@ -2766,155 +2789,167 @@ async def _generate_chunk_deck_impl(client, cm: dict, notebook_id: str,
     }
 
 
+def _chunk_deck_cache_key(cm: dict, course_title: str, config: dict, context: dict) -> str:
+    """deck_cache key for a chunk: the sources _add_multi_sources adds, the instructions, the deck options."""
+    from generate_slides import deck_cache
+
+    instructions, _ = _chunk_deck_instructions(cm, course_title, config)
+    try:
+        ctx_text = _build_course_context_source(context, cm)
+    except Exception:
+        ctx_text = ""
+    sources = [cm['content'][:50000]]
+    if ctx_text and len(ctx_text) > 100:
+        sources.append(ctx_text)
+    sources += _wikipedia_source_urls(cm.get('topic_names', []))
+    return deck_cache.cache_key(
+        "chunk_deck", sources, instructions,
+        slide_format="DETAILED_DECK", slide_length="DEFAULT",
+        research_queries=config.get('num_queries', 0) if config.get('enable_research') else 0,
+    )
+
+
+def _cached_chunk_deck(cm: dict, nb_title: str, cache_key: str, progress_callback=None) -> Optional[dict]:
+    """Rebuild a chunk's result from a cached NotebookLM deck, or None on a miss."""
+    import tempfile
+    from generate_slides import deck_cache
+
+    deck_path = deck_cache.restore_deck(cache_key, tempfile.mkdtemp(prefix="nblm_deck_"))
+    if not deck_path:
+        return None
+    label = cm['label']
+    original_pdf_path = None
+    try:
+        if deck_path.endswith(".pdf"):
+            pptx_path = tempfile.mktemp(suffix=f"_{label}.pptx")
+            _pdf_to_pptx(deck_path, pptx_path)
+            original_pdf_path = deck_path
+        else:
+            pptx_path = deck_path
+        _stamp_logos_on_pptx(pptx_path)
+        _replace_certificate_in_pptx(pptx_path)
+    except Exception as e:
+        logger.warning(f"[{label}] Cached deck unusable ({e}) — regenerating")
+        return None
+
+    print(f"[SLIDES] [{label}] Reusing cached NotebookLM deck {cache_key[:12]}")
+    if progress_callback:
+        progress_callback(f"[{label}] Reusing cached NotebookLM deck (same content)", None)
+    return _chunk_deck_result(cm, "", nb_title, "completed", pptx_path, original_pdf_path,
+                              progress_callback=progress_callback)
+
+
 # =============================================================================
 # Multi-account batch runner
 # =============================================================================
 
-async def _run_account_batch(account, chunk_meta_list: list,
-                              course_title: str, config: dict,
-                              progress_callback=None, context: dict = None) -> list:
-    """Run a batch of deck generations on a single NotebookLM account.
+async def _open_account_client(account):
+    """Lease the account's warm NotebookLM client from the client pool (used as ``async with``)."""
+    from generate_slides.client_pool import get_client_pool
 
-    Creates one client per account, generates up to N decks concurrently.
-    Returns list of result dicts.
-    """
-    from notebooklm import NotebookLMClient
+    return get_client_pool().lease(account.email.split("@")[0], str(account.storage_state_path))
 
-    results = []
-    try:
-        client = await NotebookLMClient.from_storage(
-            path=str(account.storage_state_path)
-        )
-        acct_name = account.email.split("@")[0]
-        async with client:
-            # Phase 1: Create notebooks
-            if progress_callback:
-                progress_callback(f"[{acct_name}] Creating {len(chunk_meta_list)} notebooks...", None)
 
-            async def _create_nb(cm):
-                nb_title = f"{course_title} - {cm['label']}: {cm['lu_title']} ({cm['topic_range']})"
-                notebook = await client.notebooks.create(nb_title)
-                return (cm, notebook.id, nb_title)
+async def _run_single_deck(client, account, cm: dict, course_title: str, config: dict,
+                           progress_callback=None, context: dict = None) -> dict:
+    """Generate one deck chunk on an already-open account client.
 
-            nb_tasks = [_create_nb(cm) for cm in chunk_meta_list]
-            nb_results = await asyncio.gather(*nb_tasks, return_exceptions=True)
+    Creates the notebook, adds sources (course material + framework +
+    Wikipedia), waits for them to be ready, then generates and downloads the
+    deck. A deck cached from identical sources and instructions is reused
+    without touching NotebookLM. Raises on notebook/source failures so the
+    scheduler can requeue.
+    """
+    acct_name = account.email.split("@")[0]
+    nb_title = f"{course_title} - {cm['label']}: {cm['lu_title']} ({cm['topic_range']})"
+    ctx = context or config.get('_context', {})
 
-            active = []
-            for res in nb_results:
-                if isinstance(res, Exception):
-                    logger.warning(f"[{acct_name}] Notebook creation failed: {res}")
-                    account.decks_failed += 1
-                    continue
-                active.append(res)
+    # Same sources + instructions as an earlier run: reuse that deck, no NotebookLM calls
+    cache_key = _chunk_deck_cache_key(cm, course_title, config, ctx)
+    cached = _cached_chunk_deck(cm, nb_title, cache_key, progress_callback)
+    if cached:
+        return cached
 
-            if not active:
-                account.error = "Failed to create any notebooks"
-                return results
+    notebook = await client.notebooks.create(nb_title)
+    nb_id = notebook.id
 
-            # Phase 2: Add multiple sources per notebook (course material + framework + Wikipedia)
-            ctx = context or config.get('_context', {})
-            if progress_callback:
-                progress_callback(f"[{acct_name}] Adding sources to {len(active)} notebooks (3-5 per deck)...", None)
+    if progress_callback:
+        progress_callback(f"[{acct_name}] Adding sources for {cm['label']} (3-5 per deck)...", None)
+    src_ids = await _add_multi_sources(client, nb_id, cm, course_title, ctx)
+    if not src_ids:
+        raise RuntimeError(f"No sources added for {cm['label']}")
 
-            async def _add_multi(cm, nb_id):
-                return await _add_multi_sources(client, nb_id, cm, course_title, ctx)
+    # Wait for sources to be ready (prevents generation failures)
+    try:
+        await client.sources.wait_for_sources(nb_id, src_ids, timeout=15.0)
+    except Exception:
+        pass
 
-            src_tasks = [_add_multi(cm, nb_id) for (cm, nb_id, _) in active]
-            src_results = await asyncio.gather(*src_tasks, return_exceptions=True)
+    result = await _generate_chunk_deck_impl(
+        client, cm, nb_id, nb_title, src_ids, course_title, config,
+        progress_callback=progress_callback, account=acct_name, cache_key=cache_key,
+        browser_fallback=False,
+    )
+    if result.get("generation_status") == "rate_limited":
+        # The requeued chunk gets a fresh notebook on another account
+        try:
+            await client.notebooks.delete(nb_id)
+        except Exception as e:
+            logger.debug(f"[{acct_name}] Could not delete rate-limited notebook {nb_id}: {e}")
+    return result
 
-            # Phase 2b: Wait for ALL sources to be ready (prevents generation failures)
-            # URL sources take longer to process than text sources — use 60s timeout
-            all_wait_tasks = []
-            for i, (cm, nb_id, nb_title) in enumerate(active):
-                src_ids = src_results[i] if not isinstance(src_results[i], Exception) else []
-                if src_ids:
-                    all_wait_tasks.append(client.sources.wait_for_sources(nb_id, src_ids, timeout=15.0))
-            if all_wait_tasks:
-                await asyncio.gather(*all_wait_tasks, return_exceptions=True)
 
-            # Phase 3: Generate slide decks IN PARALLEL
-            if progress_callback:
-                progress_callback(f"[{acct_name}] Generating {len(active)} slide decks in parallel...", None)
+async def _run_deck_scheduler(accounts: list, chunk_meta_list: list,
+                              course_title: str, config: dict,
+                              progress_callback=None, context: dict = None) -> tuple:
+    """Generate deck chunks across accounts from a shared work queue.
 
-            # Build valid (cm, nb_id, nb_title, src_ids) tuples
-            gen_inputs = []
-            for i, (cm, nb_id, nb_title) in enumerate(active):
-                src_ids = src_results[i] if not isinstance(src_results[i], Exception) else []
-                if not src_ids:
-                    logger.warning(f"[{acct_name}] Skipping {cm['label']} — no sources added")
-                    account.decks_failed += 1
-                    continue
-                gen_inputs.append((cm, nb_id, nb_title, src_ids))
+    Accounts pull chunks as they have capacity; rate-limited or failed chunks
+    are requeued (see AccountScheduler). Accounts whose auth fails a health
+    probe are left out before any deck is scheduled. Returns (results, failed)
+    where failed is a list of (chunk_meta, reason).
+    """
+    from generate_slides.account_pool import AccountScheduler
+    from generate_slides.client_pool import get_client_pool
+
+    pool = get_client_pool()
+    health = await pool.probe([(a.email.split("@")[0], str(a.storage_state_path)) for a in accounts])
+    live = []
+    for account in accounts:
+        if health[str(account.storage_state_path)]:
+            live.append(account)
+            continue
+        account.is_authenticated = False
+        account.error = f"auth check failed: {pool.error(str(account.storage_state_path))}"
+        if progress_callback:
+            progress_callback(f"[{account.email.split('@')[0]}] Skipped — {account.error}", None)
+    accounts = live
 
-            # Generate decks SEQUENTIALLY with brief delays
-            gen_results = []
-            for gi, (cm, nb_id, nb_title, src_ids) in enumerate(gen_inputs):
-                if gi > 0:
-                    # Brief pause between generation requests
-                    if progress_callback:
-                        progress_callback(f"[{acct_name}] Starting next deck...", None)
-                    await asyncio.sleep(3)
-                try:
-                    res = await _generate_chunk_deck_impl(
-                        client, cm, nb_id, nb_title, src_ids, course_title, config,
-                        progress_callback=progress_callback
-                    )
-                    gen_results.append(res)
-                except Exception as e:
-                    gen_results.append(e)
-
-            hit_rate_limit = False
-            error_details = []
-            for i, gen_res in enumerate(gen_results):
-                cm = gen_inputs[i][0]
-                if isinstance(gen_res, Exception):
-                    error_str = str(gen_res).lower()
-                    if 'rate' in error_str or 'limit' in error_str or 'quota' in error_str or '429' in error_str:
-                        logger.warning(f"[{acct_name}] Rate limit on {cm['label']}: {gen_res}")
-                        account.decks_failed += 1
-                        hit_rate_limit = True
-                        error_details.append(f"{cm['label']}: rate_limited")
-                    else:
-                        logger.warning(f"[{acct_name}] Generation failed for {cm['label']}: {gen_res}")
-                        account.decks_failed += 1
-                        error_details.append(f"{cm['label']}: {type(gen_res).__name__}: {gen_res}")
-                    continue
+    async def _run_chunk(client, account, cm):
+        return await _run_single_deck(
+            client, account, cm, course_title, config,
+            progress_callback=progress_callback, context=context,
+        )
 
-                status = gen_res.get("generation_status", "")
-                if status == "rate_limited" or "rate" in status.lower():
-                    logger.warning(f"[{acct_name}] Rate limited on {cm['label']}")
-                    account.decks_failed += 1
-                    hit_rate_limit = True
-                    error_details.append(f"{cm['label']}: rate_limited")
-                    if progress_callback:
-                        progress_callback(f"[{acct_name}] {cm['label']} rate limited", None)
-                elif status.startswith("failed") or status.startswith("incomplete"):
-                    logger.warning(f"[{acct_name}] Failed: {cm['label']}: {status}")
-                    account.decks_failed += 1
-                    error_details.append(f"{cm['label']}: {status}")
-                else:
-                    results.append(gen_res)
-                    account.decks_completed += 1
-                    if progress_callback:
-                        has_pptx = "PPTX ready" if gen_res.get("pptx_path") else "no PPTX"
-                        progress_callback(f"[{acct_name}] {gen_res['lu_num']} completed ({has_pptx})", None)
+    scheduler = AccountScheduler(accounts, chunk_meta_list, progress_callback=progress_callback)
+    return await scheduler.run(_open_account_client, _run_chunk)
 
-            if error_details:
-                account.error = "; ".join(error_details)
-            elif hit_rate_limit:
-                account.error = "rate_limited"
 
-    except FileNotFoundError as e:
-        account.error = f"Auth file not found: {account.storage_state_path}"
-        logger.error(f"[{account.email}] Storage state file missing: {e}")
-        if progress_callback:
-            progress_callback(f"[{account.email.split('@')[0]}] Auth expired or missing — run 'uv run notebooklm login'", None)
-    except Exception as e:
-        account.error = f"{type(e).__name__}: {e}"
-        logger.error(f"[{account.email}] Account batch failed: {e}")
-        if progress_callback:
-            progress_callback(f"[{account.email.split('@')[0]}] Error: {type(e).__name__}: {e}", None)
+async def _run_account_batch(account, chunk_meta_list: list,
+                              course_title: str, config: dict,
+                              progress_callback=None, context: dict = None) -> list:
+    """Run a batch of deck generations on a single NotebookLM account.
 
+    Uses one client for the account and the shared scheduler, so decks run
+    with the account's learned concurrency instead of a fixed sequential loop.
+    Returns list of successful result dicts.
+    """
+    results, failed = await _run_deck_scheduler(
+        [account], chunk_meta_list, course_title, config,
+        progress_callback=progress_callback, context=context,
+    )
+    if failed and not account.error:
+        account.error = "; ".join(f"{cm['label']}: {reason}" for cm, reason in failed)
     return results
 
 
@@ -2928,9 +2963,10 @@ async def _generate_slides_multi_account(context: dict, course_title: str,
                                           skip_lu_indices: set = None) -> Dict[str, Any]:
     """Generate slides across multiple NotebookLM accounts.
 
-    Distributes chunks across accounts (max N per account) and runs
-    all accounts concurrently. Falls back to single-account if no
-    multi-account config is available.
+    All accounts pull chunks from one shared work queue (AccountScheduler),
+    so total time tracks aggregate account capacity; rate-limited or failed
+    chunks are requeued onto other accounts. Falls back to single-account if
+    no multi-account config is available.
     """
     try:
         from notebooklm import NotebookLMClient
@@ -3089,83 +3125,15 @@ async def _generate_slides_multi_account(context: dict, course_title: str,
             f"{len(chunk_meta)} decks to generate, {num_accounts} account(s) available: {', '.join(acct_names)}", 5
         )
 
-    # ── Automatic account switching: run decks sequentially, switch on rate limit ──
+    # ── Work-stealing: all accounts pull decks from one shared queue ──
     try:
-        remaining_chunks = list(chunk_meta)
-        lu_results = []
-        account_idx = 0
-
-        while remaining_chunks and account_idx < len(all_accounts):
-            account = all_accounts[account_idx]
-            acct_name = account.email.split('@')[0]
-            batch_chunks = list(remaining_chunks)  # Try all remaining on this account
-            account.decks_assigned = len(batch_chunks)
-
+        lu_results, failed_chunks = await _run_deck_scheduler(
+            all_accounts, chunk_meta, course_title, config,
+            progress_callback=progress_callback, context=config.get('_context', {}),
+        )
+        for cm, reason in failed_chunks:
             if progress_callback:
-                progress_callback(
-                    f"[{acct_name}] Starting {len(batch_chunks)} deck(s) on account {account_idx+1}/{num_accounts}...", None
-                )
-
-            batch_results = await _run_account_batch(
-                account, batch_chunks, course_title, config, progress_callback,
-                context=config.get('_context', {})
-            )
-
-            if isinstance(batch_results, list) and len(batch_results) > 0:
-                # Separate successful and rate-limited results
-                successful = []
-                rate_limited_chunks = []
-
-                for res in batch_results:
-                    status = res.get("generation_status", "")
-                    if status == "rate_limited" or "rate" in status.lower():
-                        # Find the chunk_meta for this result to retry
-                        for cm in batch_chunks:
-                            if cm['chunk_idx'] == res.get('chunk_idx'):
-                                rate_limited_chunks.append(cm)
-                                break
-                        if progress_callback:
-                            progress_callback(
-                                f"[{acct_name}] {res['lu_num']} rate limited — will retry on next account", None
-                            )
-                    else:
-                        successful.append(res)
-
-                lu_results.extend(successful)
-
-                # Also find chunks that weren't even attempted (not in results)
-                attempted_indices = {res.get('chunk_idx') for res in batch_results}
-                not_attempted = [cm for cm in batch_chunks if cm['chunk_idx'] not in attempted_indices]
-                rate_limited_chunks.extend(not_attempted)
-
-                if rate_limited_chunks:
-                    remaining_chunks = rate_limited_chunks
-                    account_idx += 1
-                    if account_idx < len(all_accounts):
-                        next_acct = all_accounts[account_idx].email.split('@')[0]
-                        if progress_callback:
-                            progress_callback(
-                                f"[{acct_name}] Rate limited! Auto-switching to {next_acct} for {len(remaining_chunks)} remaining deck(s)...", None
-                            )
-                        await asyncio.sleep(1)  # Brief pause before switching
-                    else:
-                        if progress_callback:
-                            progress_callback(
-                                f"[{acct_name}] Rate limited but no more accounts available. {len(remaining_chunks)} deck(s) not generated.", None
-                            )
-                        break
-                else:
-                    remaining_chunks = []  # All done!
-            else:
-                # Batch returned empty list or non-list — account failed completely
-                error_msg = account.error or "Unknown error"
-                if progress_callback:
-                    progress_callback(
-                        f"[{acct_name}] Account failed: {error_msg}. Trying next account...", None
-                    )
-                account_idx += 1
-                if progress_callback:
-                    progress_callback(f"[{acct_name}] Batch failed, trying next account...", None)
+                progress_callback(f"{cm['label']} not generated: {reason}", None)
 
         # Sort by chunk_idx to maintain order
         lu_results.sort(key=lambda r: r.get("chunk_idx", 0))
@@ -3177,20 +3145,21 @@ async def _generate_slides_multi_account(context: dict, course_title: str,
         # Just collect the PPTX paths
         pptx_paths = [r["pptx_path"] for r in lu_results if r.get("pptx_path")]
 
-        # Build account status from all accounts that were used
+        # Build account status from all accounts that were used or failed their auth check
+        n_authenticated = sum(1 for acct in all_accounts if acct.is_authenticated)
         account_status = {
             "total": len(all_accounts),
-            "authenticated": len(all_accounts),
-            "unauthenticated": 0,
+            "authenticated": n_authenticated,
+            "unauthenticated": len(all_accounts) - n_authenticated,
             "max_decks_per_account": len(chunk_meta),
             "accounts": [{
                 "email": acct.email,
-                "authenticated": True,
+                "authenticated": acct.is_authenticated,
                 "decks_assigned": acct.decks_assigned,
                 "decks_completed": acct.decks_completed,
                 "decks_failed": acct.decks_failed,
                 "error": acct.error,
-            } for acct in all_accounts if acct.decks_assigned > 0],
+            } for acct in all_accounts if acct.decks_assigned > 0 or not acct.is_authenticated],
         }
 
         generated_count = len(lu_results)
@@ -3417,8 +3386,22 @@ async def _generate_slides_per_lu(context: dict, course_title: str,
                     'is_last': is_last,
                 })
 
+            # Decks generated earlier from the same sources + instructions come from the cache
+            cache_keys = {}
+            for cm in list(chunk_meta):
+                cache_keys[cm['chunk_idx']] = _chunk_deck_cache_key(
+                    cm, course_title, config, config.get('_context', {})
+                )
+                nb_title = f"{course_title} - {cm['label']}: {cm['lu_title']} ({cm['topic_range']})"
+                cached = _cached_chunk_deck(cm, nb_title, cache_keys[cm['chunk_idx']], progress_callback)
+                if cached:
+                    lu_results.append(cached)
+                    chunk_meta.remove(cm)
+
             if not chunk_meta:
-                return {"success": True, "message": "All decks already completed.", "lu_results": [], "num_lus": num_lus}
+                msg = (f"All {len(lu_results)} deck(s) reused from cache." if lu_results
+                       else "All decks already completed.")
+                return {"success": True, "message": msg, "lu_results": lu_results, "num_lus": num_lus}
 
             if progress_callback:
                 progress_callback(f"Creating {len(chunk_meta)} notebooks ({total_chunks} total decks)...", 5)
@@ -3476,7 +3459,7 @@ async def _generate_slides_per_lu(context: dict, course_title: str,
                     continue
                 gen_tasks.append(_generate_chunk_deck_impl(
                     client, cm, nb_id, nb_title, src_ids, course_title, config,
-                    progress_callback=progress_callback
+                    progress_callback=progress_callback, cache_key=cache_keys.get(cm['chunk_idx'])
                 ))
 
             gen_results = await asyncio.gather(*gen_tasks, return_exceptions=True)
@@ -3539,25 +3522,31 @@ async def _generate_slides_per_lu(context: dict, course_title: str,
 # NotebookLM logo removal from PPTX
 # =============================================================================
 
-def _remove_notebooklm_logo(pptx_bytes: bytes, progress_container=None) -> bytes:
+def _remove_notebooklm_logo(pptx_bytes: bytes, progress_container=None, workers: int = None) -> bytes:
     """
     Remove NotebookLM branding/logo from a PPTX file permanently.
 
     Simple, reliable approach:
     1. ZIP-level: Edit ALL slide images — paint over bottom-right logo area
+       (vectorized, across a process pool for large decks)
     2. XML-level: Remove any shape elements containing NotebookLM text
 
+    Members that are not changed are copied with their original compressed
+    bytes instead of being inflated and deflated again.
+
     Args:
         pptx_bytes: Raw bytes of the uploaded PPTX file.
         progress_container: Optional Streamlit container for debug output.
+        workers: Processes for the image pass (default: CPU count, 1 = serial).
 
     Returns:
         Cleaned PPTX file as bytes with NotebookLM branding removed.
     """
     import io
     import zipfile
-    from PIL import Image
     from lxml import etree
+    from generate_slides.logo_erase import erase_logo_images
+    from generate_slides.pptx_package import copy_zip_member_raw
 
     removed_count = 0
     details = []
@@ -3574,8 +3563,9 @@ def _remove_notebooklm_logo(pptx_bytes: bytes, progress_container=None) -> bytes
     _log("Starting NotebookLM logo removal...")
 
     # ═══════════════════════════════════════════════════════════════════
-    # SINGLE PASS: Process the entire PPTX as a ZIP archive
-    # Edit images (paint over logo) + clean XML (remove text shapes)
+    # Process the entire PPTX as a ZIP archive
+    # Pass 1: detect images and erase the logo from all of them at once
+    # Pass 2: write members in order (edited images, cleaned XML, raw copies)
     # ═══════════════════════════════════════════════════════════════════
     input_zip = zipfile.ZipFile(io.BytesIO(pptx_bytes), 'r')
     output_buf = io.BytesIO()
@@ -3585,50 +3575,57 @@ def _remove_notebooklm_logo(pptx_bytes: bytes, progress_container=None) -> bytes
     images_processed = 0
     images_failed = 0
 
+    # ── Detect images (by path, extension or magic bytes) ──
+    image_names = []
     for item in input_zip.infolist():
-        data = input_zip.read(item.filename)
         fname_lower = item.filename.lower()
-
-        # ── Detect images ──
         is_media = 'ppt/media/' in fname_lower
         is_image_ext = fname_lower.endswith(('.png', '.jpg', '.jpeg', '.bmp', '.tiff', '.gif', '.webp'))
-        is_image_magic = (
-            len(data) > 4 and (
-                data[:4] == b'\x89PNG' or
-                data[:2] == b'\xff\xd8' or
-                data[:6] in (b'GIF87a', b'GIF89a') or
-                data[:2] == b'BM'
+        is_image_magic = False
+        if not (is_media or is_image_ext) and not item.is_dir():
+            with input_zip.open(item) as f:
+                head = f.read(6)
+            is_image_magic = (
+                len(head) > 4 and (
+                    head[:4] == b'\x89PNG' or
+                    head[:2] == b'\xff\xd8' or
+                    head[:6] in (b'GIF87a', b'GIF89a') or
+                    head[:2] == b'BM'
+                )
             )
-        )
-
         if is_media or is_image_ext or is_image_magic:
-            try:
-                img = Image.open(io.BytesIO(data))
-                w, h = img.size
-                images_found += 1
+            image_names.append(item.filename)
 
-                # Process slide-sized images (skip tiny icons/thumbnails)
-                if w >= 400 and h >= 200:
-                    new_data = _erase_logo_region(img)
-                    if new_data:
-                        # Verify the output is valid
-                        verify = Image.open(io.BytesIO(new_data))
-                        if verify.size == (w, h):
-                            data = new_data
-                            images_processed += 1
-                            removed_count += 1
-                        else:
-                            _log(f"  WARNING: {item.filename} — output size mismatch {verify.size} != {(w, h)}")
-                            images_failed += 1
-                    else:
-                        _log(f"  WARNING: {item.filename} — _erase_logo_region returned None")
-                        images_failed += 1
-            except Exception as e:
-                details.append(f"Cannot open {item.filename}: {type(e).__name__}")
-                _log(f"  Cannot open {item.filename}: {e}")
+    erase_results = dict(zip(
+        image_names,
+        erase_logo_images([input_zip.read(name) for name in image_names], workers=workers),
+    ))
+
+    for item in input_zip.infolist():
+        fname_lower = item.filename.lower()
+
+        if item.filename in erase_results:
+            status, new_data, msg = erase_results[item.filename]
+            if status == "unreadable":
+                details.append(f"Cannot open {item.filename}: {msg.split(':')[0]}")
+                _log(f"  Cannot open {item.filename}: {msg}")
+            else:
+                images_found += 1
+            if status == "processed":
+                output_zip.writestr(item, new_data)
+                images_processed += 1
+                removed_count += 1
+                continue
+            if status == "failed":
+                _log(f"  WARNING: {item.filename} — {msg}")
+                images_failed += 1
+            copy_zip_member_raw(input_zip, output_zip, item)
+            continue
 
         # ── Clean XML: remove shapes with NotebookLM text ──
-        elif fname_lower.endswith(('.xml', '.rels')):
+        if fname_lower.endswith(('.xml', '.rels')):
+            data = input_zip.read(item.filename)
+            original_data = data
             try:
                 text_content = data.decode('utf-8', errors='replace')
                 if 'notebooklm' in text_content.lower() or 'notebook lm' in text_content.lower():
@@ -3674,7 +3671,11 @@ def _remove_notebooklm_logo(pptx_bytes: bytes, progress_container=None) -> bytes
             except Exception:
                 pass
 
-        output_zip.writestr(item, data)
+            if data is not original_data:
+                output_zip.writestr(item, data)
+                continue
+
+        copy_zip_member_raw(input_zip, output_zip, item)
 
     input_zip.close()
     output_zip.close()
@@ -3743,91 +3744,12 @@ def _diagnose_pptx(pptx_bytes: bytes) -> str:
     return "\n".join(lines)
 
 
-def _erase_logo_region(img):
+def _combine_pptx_files(pptx_files: List[bytes], remove_logo: bool = True) -> tuple:
     """
-    Erase the NotebookLM logo from a slide image.
-
-    Simple left-clone approach with a VERY TIGHT region:
-    - Region: 8% width × 3% height (just the logo, nothing else)
-    - For each row, clone the pixel from just left of the region
-    - No above-reference (avoids text streak artifacts)
+    Combine multiple PPTX files into one and optionally remove NotebookLM logos.
 
-    Returns modified image as bytes, or None on failure.
-    """
-    import io
-
-    try:
-        w, h = img.size
-        original_format = img.format or 'PNG'
-
-        if img.mode not in ('RGB', 'RGBA'):
-            img = img.convert('RGBA')
-
-        # Logo region: 8% width × 3% height — covers NotebookLM branding only
-        logo_region_w = max(int(w * 8 / 100), 70)
-        logo_region_h = max(int(h * 0.03), 23)
-        logo_left = w - logo_region_w
-        logo_top = h - logo_region_h
-
-        pixels = img.load()
-
-        # Get the background color at the right edge (above the logo)
-        # This tells us what the slide background is at the far right
-        right_bg = pixels[min(w - 1, w - 3), max(0, logo_top - 3)]
-
-        for y in range(logo_top, h):
-            left_color = pixels[max(0, logo_left - 1), y]
-
-            # Check if left color matches the right-edge background
-            dist = (abs(left_color[0] - right_bg[0]) +
-                    abs(left_color[1] - right_bg[1]) +
-                    abs(left_color[2] - right_bg[2]))
-
-            if dist < 50:
-                # Uniform background — simple left-clone
-                for x in range(logo_left, w):
-                    pixels[x, y] = left_color
-            else:
-                # Bar on the left doesn't extend to right edge
-                # Use left-clone but check each X: if the pixel ABOVE
-                # matches the bar → continue bar, otherwise → use right_bg
-                for x in range(logo_left, w):
-                    above_c = pixels[x, max(0, logo_top - 3)]
-                    dist_to_bar = (abs(above_c[0] - left_color[0]) +
-                                   abs(above_c[1] - left_color[1]) +
-                                   abs(above_c[2] - left_color[2]))
-                    dist_to_bg = (abs(above_c[0] - right_bg[0]) +
-                                  abs(above_c[1] - right_bg[1]) +
-                                  abs(above_c[2] - right_bg[2]))
-
-                    if dist_to_bar <= dist_to_bg:
-                        pixels[x, y] = left_color  # bar continues here
-                    else:
-                        pixels[x, y] = right_bg  # bar ended, use background
-
-        # ── Save ──
-        out = io.BytesIO()
-        if original_format.upper() == 'JPEG':
-            save_img = img.convert('RGB') if img.mode == 'RGBA' else img
-            save_img.save(out, format='JPEG', quality=95)
-        else:
-            img.save(out, format='PNG')
-        out.seek(0)
-        return out.read()
-
-    except Exception as e:
-        logger.error(f"_erase_logo_region failed: {type(e).__name__}: {e}")
-        import traceback
-        traceback.print_exc()
-        return None
-
-
-def _combine_pptx_files(pptx_files: List[bytes], remove_logo: bool = True) -> tuple:
-    """
-    Combine multiple PPTX files into one and optionally remove NotebookLM logos.
-
-    Uses the first file as the base presentation, then appends slides from
-    subsequent files by copying slide XML and relationships.
+    Uses the first file as the base presentation, then appends slides from
+    subsequent files at the package level (see generate_slides.pptx_package).
 
     Args:
         pptx_files: List of PPTX file bytes to combine.
@@ -3837,9 +3759,7 @@ def _combine_pptx_files(pptx_files: List[bytes], remove_logo: bool = True) -> tu
         Tuple of (combined PPTX bytes, total slide count, logos removed count).
     """
     import io
-    from pptx import Presentation
-    from copy import deepcopy
-    from lxml import etree
+    from generate_slides.pptx_package import merge_pptx_packages, count_slides
 
     if not pptx_files:
         raise ValueError("No PPTX files provided.")
@@ -3847,57 +3767,12 @@ def _combine_pptx_files(pptx_files: List[bytes], remove_logo: bool = True) -> tu
     if len(pptx_files) == 1:
         if remove_logo:
             clean, count = _remove_notebooklm_logo(pptx_files[0])
-            prs = Presentation(io.BytesIO(clean))
-            return clean, len(prs.slides), count
-        else:
-            prs = Presentation(io.BytesIO(pptx_files[0]))
-            output = io.BytesIO()
-            prs.save(output)
-            output.seek(0)
-            return output.read(), len(prs.slides), 0
-
-    # Load base presentation (first file)
-    base_prs = Presentation(io.BytesIO(pptx_files[0]))
-
-    # Append slides from remaining files
-    for file_bytes in pptx_files[1:]:
-        src_prs = Presentation(io.BytesIO(file_bytes))
-        for slide in src_prs.slides:
-            # Copy slide layout from source — use blank or first available in base
-            slide_layout = base_prs.slide_layouts[6] if len(base_prs.slide_layouts) > 6 else base_prs.slide_layouts[0]
-            new_slide = base_prs.slides.add_slide(slide_layout)
-
-            # Clear default placeholders from new slide
-            for ph in list(new_slide.placeholders):
-                sp = ph._element
-                sp.getparent().remove(sp)
-
-            # Copy all shapes from source slide
-            for shape in slide.shapes:
-                el = deepcopy(shape._element)
-                new_slide.shapes._spTree.append(el)
-
-            # Copy slide background if present
-            src_bg = slide._element.find(
-                '{http://schemas.openxmlformats.org/presentationml/2006/main}bg'
-            )
-            if src_bg is not None:
-                new_bg = deepcopy(src_bg)
-                existing_bg = new_slide._element.find(
-                    '{http://schemas.openxmlformats.org/presentationml/2006/main}bg'
-                )
-                if existing_bg is not None:
-                    new_slide._element.replace(existing_bg, new_bg)
-                else:
-                    new_slide._element.insert(0, new_bg)
+            return clean, count_slides(clean), count
+        return pptx_files[0], count_slides(pptx_files[0]), 0
 
-    total_slides = len(base_prs.slides)
-
-    # Save combined, then remove logos
     output = io.BytesIO()
-    base_prs.save(output)
-    output.seek(0)
-    combined_bytes = output.read()
+    total_slides = merge_pptx_packages(pptx_files, output)
+    combined_bytes = output.getvalue()
 
     logos_removed = 0
     if remove_logo:
@@ -4001,8 +3876,9 @@ def _add_branded_cover_slide(prs, course_title: str):
 def _merge_pptx_to_single(pptx_paths: list, output_path: str) -> tuple:
     """Merge multiple PPTX files into ONE single PPTX, preserving images and text.
 
-    Properly transfers image blobs (not just XML references) so image backgrounds
-    and editable text boxes are both preserved in the combined file.
+    Works on the package parts directly (generate_slides.pptx_package): slide
+    XML and image blobs are streamed into the combined file without being
+    decoded, and identical images across decks are stored once.
 
     Args:
         pptx_paths: List of PPTX file paths to merge (in order).
@@ -4012,9 +3888,7 @@ def _merge_pptx_to_single(pptx_paths: list, output_path: str) -> tuple:
         (output_path, total_slide_count) tuple.
     """
     import shutil
-    import tempfile
-    from copy import deepcopy
-    from pptx import Presentation
+    from generate_slides.pptx_package import merge_pptx_packages, count_slides
 
     if not pptx_paths:
         return (None, 0)
@@ -4026,59 +3900,9 @@ def _merge_pptx_to_single(pptx_paths: list, output_path: str) -> tuple:
 
     if len(valid_paths) == 1:
         shutil.copy2(valid_paths[0], output_path)
-        prs = Presentation(output_path)
-        return (output_path, len(prs.slides))
-
-    # Use the first file as the base presentation
-    base_prs = Presentation(valid_paths[0])
-
-    for src_path in valid_paths[1:]:
-        src_prs = Presentation(src_path)
-
-        for slide in src_prs.slides:
-            # Add a blank slide
-            blank_layout = base_prs.slide_layouts[6] if len(base_prs.slide_layouts) > 6 else base_prs.slide_layouts[0]
-            new_slide = base_prs.slides.add_slide(blank_layout)
+        return (output_path, count_slides(output_path))
 
-            # Clear default placeholders
-            for ph in list(new_slide.placeholders):
-                sp = ph._element
-                sp.getparent().remove(sp)
-
-            # Copy shapes — handle images specially to preserve blobs
-            for shape in slide.shapes:
-                if shape.shape_type == 13:  # Picture shape
-                    try:
-                        img_blob = shape.image.blob
-                        img_ct = shape.image.content_type or 'image/png'
-                        ext = img_ct.split('/')[-1].split('+')[0]
-                        if ext not in ('png', 'jpeg', 'jpg', 'gif', 'bmp', 'tiff'):
-                            ext = 'png'
-
-                        tmp_img = tempfile.mktemp(suffix=f'.{ext}')
-                        with open(tmp_img, 'wb') as f:
-                            f.write(img_blob)
-
-                        new_slide.shapes.add_picture(
-                            tmp_img,
-                            shape.left, shape.top,
-                            shape.width, shape.height,
-                        )
-
-                        try:
-                            os.unlink(tmp_img)
-                        except OSError:
-                            pass
-                    except Exception as e:
-                        logger.warning(f"Failed to copy image shape: {e}")
-                        # Fallback: deepcopy XML (may break image)
-                        new_slide.shapes._spTree.append(deepcopy(shape._element))
-                else:
-                    # Text boxes, groups, etc. — deepcopy works fine
-                    new_slide.shapes._spTree.append(deepcopy(shape._element))
-
-    total_slides = len(base_prs.slides)
-    base_prs.save(output_path)
+    total_slides = merge_pptx_packages(valid_paths, output_path)
     logger.info(f"Merged {len(valid_paths)} PPTX files into single deck: {total_slides} slides")
     return (output_path, total_slides)
 
@@ -4090,94 +3914,26 @@ def _merge_pptx_to_single(pptx_paths: list, output_path: str) -> tuple:
 async def _extract_slide_text_vision(image_path: str) -> dict:
     """Extract text and layout from a slide image using Claude Vision API.
 
+    Thin wrapper over generate_slides.vision_extraction (async client,
+    retry/backoff, image-hash cache).
+
     Args:
         image_path: Path to the slide image (PNG).
 
     Returns:
         Dict with 'title', 'bullets', 'layout', 'is_section_header'.
     """
-    import anthropic
-    import base64
+    from generate_slides.vision_extraction import extract_slides_vision
 
-    try:
-        with open(image_path, 'rb') as f:
-            img_data = base64.standard_b64encode(f.read()).decode('utf-8')
-
-        client = anthropic.Anthropic()
-        response = client.messages.create(
-            model="claude-sonnet-4-20250514",
-            max_tokens=1024,
-            messages=[{
-                "role": "user",
-                "content": [
-                    {
-                        "type": "image",
-                        "source": {
-                            "type": "base64",
-                            "media_type": "image/png",
-                            "data": img_data,
-                        },
-                    },
-                    {
-                        "type": "text",
-                        "text": (
-                            "Extract all text from this presentation slide. Return ONLY valid JSON:\n"
-                            "{\n"
-                            '  "title": "The slide title text",\n'
-                            '  "bullets": ["bullet point 1", "bullet point 2", ...],\n'
-                            '  "layout": "text-left" | "text-right" | "text-full" | "title-only" | "image-full",\n'
-                            '  "is_section_header": true/false,\n'
-                            '  "has_diagram": true/false\n'
-                            "}\n\n"
-                            "Layout guide:\n"
-                            '- "text-left": Text on left side, image/diagram on right\n'
-                            '- "text-right": Text on right side, image/diagram on left\n'
-                            '- "text-full": Text spans full width (no significant images)\n'
-                            '- "title-only": Just a title or section header with minimal text\n'
-                            '- "image-full": Mostly image/diagram with minimal text\n\n'
-                            "If there are no bullet points, set bullets to [].\n"
-                            "Output ONLY the JSON, nothing else."
-                        ),
-                    },
-                ],
-            }],
-        )
-
-        text = response.content[0].text.strip()
-        # Parse JSON from response
-        import json
-        # Try direct parse
-        try:
-            return json.loads(text)
-        except json.JSONDecodeError:
-            # Try extracting from code block
-            json_match = re.search(r'```(?:json)?\s*\n(.*?)\n```', text, re.DOTALL)
-            if json_match:
-                return json.loads(json_match.group(1).strip())
-            # Try finding JSON object
-            brace_start = text.find('{')
-            if brace_start != -1:
-                depth = 0
-                for i in range(brace_start, len(text)):
-                    if text[i] == '{':
-                        depth += 1
-                    elif text[i] == '}':
-                        depth -= 1
-                        if depth == 0:
-                            return json.loads(text[brace_start:i + 1])
-
-        return {"title": "", "bullets": [], "layout": "text-full", "is_section_header": False, "has_diagram": False}
-
-    except Exception as e:
-        logger.warning(f"Vision extraction failed for {image_path}: {e}")
-        return {"title": "", "bullets": [], "layout": "text-full", "is_section_header": False, "has_diagram": False}
+    results = await extract_slides_vision([image_path])
+    return results[0]
 
 
 async def _extract_slides_text_batch(image_paths: list) -> list:
-    """Extract text from MULTIPLE slides in a single Claude Vision API call.
+    """Extract text from MULTIPLE slides with batched Claude Vision API calls.
 
-    Sends up to 10 slide images in one request, returns a list of
-    extracted data dicts. This is 10x faster than calling per-slide.
+    Slides are packed into requests by encoded image size (up to 10 per
+    request) and sent concurrently; see generate_slides.vision_extraction.
 
     Args:
         image_paths: List of paths to slide images (PNG).
@@ -4185,105 +3941,9 @@ async def _extract_slides_text_batch(image_paths: list) -> list:
     Returns:
         List of dicts with 'title', 'bullets', 'layout', etc.
     """
-    import anthropic
-    import base64
-    import json
-
-    empty = {"title": "", "bullets": [], "layout": "text-full", "is_section_header": False, "has_diagram": False}
-
-    if not image_paths:
-        return []
-
-    try:
-        content_blocks = []
-        for idx, img_path in enumerate(image_paths):
-            with open(img_path, 'rb') as f:
-                img_data = base64.standard_b64encode(f.read()).decode('utf-8')
-            content_blocks.append({
-                "type": "text",
-                "text": f"--- SLIDE {idx + 1} ---",
-            })
-            content_blocks.append({
-                "type": "image",
-                "source": {
-                    "type": "base64",
-                    "media_type": "image/png",
-                    "data": img_data,
-                },
-            })
-
-        content_blocks.append({
-            "type": "text",
-            "text": (
-                f"\nExtract text from ALL {len(image_paths)} slides above. "
-                "Return ONLY a JSON array with one object per slide:\n"
-                "[\n"
-                '  {"title": "...", "bullets": ["..."], "layout": "text-full|text-left|text-right|title-only|image-full", '
-                '"is_section_header": false, "has_diagram": false},\n'
-                "  ...\n"
-                "]\n\n"
-                f"Array MUST have exactly {len(image_paths)} objects, one per slide in order.\n"
-                "Output ONLY the JSON array, nothing else."
-            ),
-        })
-
-        client = anthropic.Anthropic()
-        response = client.messages.create(
-            model="claude-sonnet-4-20250514",
-            max_tokens=4096,
-            messages=[{"role": "user", "content": content_blocks}],
-        )
-
-        text = response.content[0].text.strip()
-
-        # Parse JSON array
-        try:
-            results = json.loads(text)
-            if isinstance(results, list):
-                # Pad or trim to match input count
-                while len(results) < len(image_paths):
-                    results.append(dict(empty))
-                return results[:len(image_paths)]
-        except json.JSONDecodeError:
-            pass
-
-        # Try extracting from code block
-        json_match = re.search(r'```(?:json)?\s*\n(.*?)\n```', text, re.DOTALL)
-        if json_match:
-            try:
-                results = json.loads(json_match.group(1).strip())
-                if isinstance(results, list):
-                    while len(results) < len(image_paths):
-                        results.append(dict(empty))
-                    return results[:len(image_paths)]
-            except json.JSONDecodeError:
-                pass
+    from generate_slides.vision_extraction import extract_slides_vision
 
-        # Try finding JSON array
-        bracket_start = text.find('[')
-        if bracket_start != -1:
-            depth = 0
-            for i in range(bracket_start, len(text)):
-                if text[i] == '[':
-                    depth += 1
-                elif text[i] == ']':
-                    depth -= 1
-                    if depth == 0:
-                        try:
-                            results = json.loads(text[bracket_start:i + 1])
-                            if isinstance(results, list):
-                                while len(results) < len(image_paths):
-                                    results.append(dict(empty))
-                                return results[:len(image_paths)]
-                        except json.JSONDecodeError:
-                            break
-
-        logger.warning(f"Batch vision: could not parse response for {len(image_paths)} slides")
-        return [dict(empty) for _ in image_paths]
-
-    except Exception as e:
-        logger.warning(f"Batch vision extraction failed: {e}")
-        return [dict(empty) for _ in image_paths]
+    return await extract_slides_vision(image_paths)
 
 
 def _build_editable_slide_from_image(prs, slide_image_path: str, slide_data: dict):
@@ -4518,12 +4178,12 @@ async def _convert_notebooklm_to_editable(pdf_path: str, output_path: str,
     Returns:
         (output_path, slide_count) tuple.
     """
-    import tempfile
+    import io
 
     try:
         from pptx import Presentation
         from pptx.util import Inches, Emu
-        import fitz  # pymupdf
+        import fitz  # noqa: F401  pymupdf — used by rasterize_pdf
     except ImportError as e:
         logger.error(f"Missing dependency for editable conversion: {e}")
         return (pdf_path, 0)
@@ -4531,21 +4191,10 @@ async def _convert_notebooklm_to_editable(pdf_path: str, output_path: str,
     if progress_callback:
         progress_callback("Converting NotebookLM PDF to editable PPTX...", None)
 
-    # Step 1: Convert PDF pages to high-resolution images
-    doc = fitz.open(pdf_path)
-    num_pages = len(doc)
-    slide_images = []
-    temp_dir = tempfile.mkdtemp(prefix="slide_images_")
-
-    for page_num in range(num_pages):
-        page = doc[page_num]
-        mat = fitz.Matrix(2.0, 2.0)  # 2x resolution for crisp slides
-        pix = page.get_pixmap(matrix=mat, alpha=False)
-        img_path = os.path.join(temp_dir, f"slide_{page_num:03d}.png")
-        pix.save(img_path)
-        slide_images.append(img_path)
-
-    doc.close()
+    # Step 1: Render PDF pages to in-memory PNGs (parallel, off the event loop)
+    from generate_slides.pdf_raster import rasterize_pdf
+    pages = await asyncio.to_thread(rasterize_pdf, pdf_path)
+    num_pages = len(pages)
 
     if progress_callback:
         progress_callback(f"Converted {num_pages} pages. Building PPTX...", 50)
@@ -4555,7 +4204,7 @@ async def _convert_notebooklm_to_editable(pdf_path: str, output_path: str,
     prs.slide_width = Inches(13.333)
     prs.slide_height = Inches(7.5)
 
-    for img_path in slide_images:
+    for _, img_bytes in pages:
         blank_layout = prs.slide_layouts[6]  # Blank layout
         slide = prs.slides.add_slide(blank_layout)
         # Remove any default placeholders
@@ -4564,23 +4213,12 @@ async def _convert_notebooklm_to_editable(pdf_path: str, output_path: str,
             sp.getparent().remove(sp)
         # Add image spanning full slide
         slide.shapes.add_picture(
-            img_path, Emu(0), Emu(0), prs.slide_width, prs.slide_height
+            io.BytesIO(img_bytes), Emu(0), Emu(0), prs.slide_width, prs.slide_height
         )
 
     prs.save(output_path)
     slide_count = len(prs.slides)
 
-    # Cleanup temp images
-    for img_path in slide_images:
-        try:
-            os.unlink(img_path)
-        except OSError:
-            pass
-    try:
-        os.rmdir(temp_dir)
-    except OSError:
-        pass
-
     if progress_callback:
         progress_callback(f"Editable PPTX ready: {slide_count} slides with images!", 90)
 
@@ -4753,16 +4391,14 @@ async def _generate_hybrid_slides(context: dict, course_title: str,
                         import fitz
                         if progress_callback:
                             progress_callback(f"Extracting {lu_label} illustrations from PDF...", None)
-                        doc = fitz.open(pdf_path)
-                        for page_num in range(len(doc)):
-                            page = doc[page_num]
-                            mat = fitz.Matrix(2.0, 2.0)
-                            pix = page.get_pixmap(matrix=mat, alpha=False)
+                        from generate_slides.pdf_raster import rasterize_pdf
+                        pages = await asyncio.to_thread(rasterize_pdf, pdf_path)
+                        for page_num, img_bytes in pages:
                             img_path = os.path.join(_tmp_dir, f"{lu_label}_p{page_num:03d}.png")
-                            pix.save(img_path)
+                            with open(img_path, 'wb') as f:
+                                f.write(img_bytes)
                             all_nblm_images.append(img_path)
                             extracted += 1
-                        doc.close()
                         print(f"[SLIDES] {lu_label}: Extracted {extracted} images from PDF")
                     except Exception as e:
                         print(f"[SLIDES] {lu_label}: PDF extraction failed: {e}")
@@ -4824,9 +4460,15 @@ async def _generate_hybrid_slides(context: dict, course_title: str,
                 for lu_base, img_dirs in nblm_img_dirs_per_lu.items():
                     for img_dir in img_dirs:
                         if os.path.exists(img_dir):
-                            png_files = [f for f in os.listdir(img_dir) if f.endswith('.png')]
+                            png_files = sorted(f for f in os.listdir(img_dir) if f.endswith('.png'))
                             if png_files:
-                                text_tasks.append(extract_slides_text(img_dir))
+                                if os.environ.get("ANTHROPIC_API_KEY"):
+                                    # Async batched Vision API (shared client, image-hash cache)
+                                    text_tasks.append(_extract_slides_text_batch(
+                                        [os.path.join(img_dir, f) for f in png_files]
+                                    ))
+                                else:
+                                    text_tasks.append(extract_slides_text(img_dir))
                                 text_task_labels.append(lu_base)
 
                 if text_tasks:
@@ -5251,20 +4893,20 @@ async def _convert_notebooklm_to_editable_from_images(
     if progress_callback:
         progress_callback(f"Analyzing {num_slides} slides with Claude AI...", None)
 
-    # Extract text using Claude Agent SDK (Read tool supports images)
-    # Uses Claude Code subscription — no separate API key needed
-    from courseware_agents.slides.slides_agent import extract_slides_text
-
-    # The images are already saved as files — find their parent directory
-    if slide_images:
-        _img_dir = os.path.dirname(slide_images[0])
-    else:
-        _img_dir = ""
-
     if progress_callback:
         progress_callback(f"Claude AI reading {num_slides} slide images...", 25)
 
-    extracted_data = await extract_slides_text(_img_dir) if _img_dir else []
+    if os.environ.get("ANTHROPIC_API_KEY"):
+        # Async batched Vision API — non-blocking, cached by image hash
+        extracted_data = await _extract_slides_text_batch(slide_images)
+    else:
+        # Extract text using Claude Agent SDK (Read tool supports images)
+        # Uses Claude Code subscription — no separate API key needed
+        from courseware_agents.slides.slides_agent import extract_slides_text
+
+        # The images are already saved as files — find their parent directory
+        _img_dir = os.path.dirname(slide_images[0]) if slide_images else ""
+        extracted_data = await extract_slides_text(_img_dir) if _img_dir else []
 
     # Pad with empty entries if extraction returned fewer results
     empty = {"title": "", "bullets": [], "layout": "image-full",
@@ -5334,6 +4976,18 @@ def _get_nblm_storage_paths() -> list:
     return paths
 
 
+async def _get_healthy_nblm_accounts() -> list:
+    """_get_nblm_storage_paths() without accounts whose auth failed a health probe.
+
+    Probes run concurrently and are reused for NOTEBOOKLM_HEALTH_INTERVAL
+    (see client_pool), so no slide is sent to an account with expired auth.
+    """
+    from generate_slides.client_pool import get_client_pool
+
+    accounts = _get_nblm_storage_paths()
+    return await get_client_pool().healthy(accounts) if accounts else []
+
+
 def _get_nblm_pool_images(n_images: int, topic_idx: int = 0) -> list:
     """Get images from the pre-downloaded NotebookLM image pool.
 
@@ -5400,6 +5054,26 @@ def _run_nblm_login_subprocess() -> str:
         return f"Failed to start login: {e}"
 
 
+def _topic_image_instructions(topic_title: str, n_content_slides: int) -> str:
+    """Deck instructions for one topic's visual slides (see _try_generate_with_account)."""
+    instructions = (
+        f"Create EXACTLY {n_content_slides} visual content slides about: {topic_title}. "
+        f"EVERY slide MUST include a diagram, flowchart, process flow, comparison chart, "
+        f"or infographic that DIRECTLY illustrates that slide's specific content. "
+        f"Follow the EXACT slide structure from the source — one visual per slide section. "
+        f"Mix diagram types: process flows for procedures, comparison tables for categories, "
+        f"cycle diagrams for iterative concepts, infographics for statistics. "
+        f"STRICTLY FORBIDDEN — do NOT generate ANY of these: "
+        f"TRAQOM slides, TRAQOM surveys, attendance sheets, certificates, "
+        f"skill framework slides, cover slides, title slides, introduction slides, "
+        f"summary slides, conclusion slides, QR code slides, survey slides, "
+        f"feedback forms, evaluation forms, Q&A slides, contact slides. "
+        f"ONLY generate EXACTLY {n_content_slides} topic content slides with matching visuals. "
+        f"NOTHING ELSE. No extra slides of any kind."
+    )
+    return instructions[:3000]
+
+
 async def _try_generate_with_account(
     storage_path: str,
     account_label: str,
@@ -5409,20 +5083,21 @@ async def _try_generate_with_account(
     n_content_slides: int,
     cache_dir,
     progress_callback=None,
+    cache_key: Optional[str] = None,
 ) -> tuple:
     """Try to generate NotebookLM slides with a specific account.
 
+    cache_key: deck_cache key for this topic; the downloaded PDF and the
+    extracted images are stored under it.
+
     Returns:
         (images_list, error_str) — images on success, error on failure.
         error_str is "rate_limited" if rate-limited, other string for other errors.
     """
-    import time as _time
-
     try:
-        from notebooklm import NotebookLMClient
+        from generate_slides.client_pool import get_client_pool
 
-        client = await NotebookLMClient.from_storage(path=storage_path)
-        async with client:
+        async with get_client_pool().lease(account_label, storage_path) as client:
             # 1. Create notebook
             nb = await client.notebooks.create(f"Slides: {topic_title[:60]}")
             nb_id = nb.id
@@ -5443,25 +5118,10 @@ async def _try_generate_with_account(
                 await asyncio.sleep(5)
 
             # 4. Generate slides — each slide gets a diagram/flowchart matching its content
-            instructions = (
-                f"Create EXACTLY {n_content_slides} visual content slides about: {topic_title}. "
-                f"EVERY slide MUST include a diagram, flowchart, process flow, comparison chart, "
-                f"or infographic that DIRECTLY illustrates that slide's specific content. "
-                f"Follow the EXACT slide structure from the source — one visual per slide section. "
-                f"Mix diagram types: process flows for procedures, comparison tables for categories, "
-                f"cycle diagrams for iterative concepts, infographics for statistics. "
-                f"STRICTLY FORBIDDEN — do NOT generate ANY of these: "
-                f"TRAQOM slides, TRAQOM surveys, attendance sheets, certificates, "
-                f"skill framework slides, cover slides, title slides, introduction slides, "
-                f"summary slides, conclusion slides, QR code slides, survey slides, "
-                f"feedback forms, evaluation forms, Q&A slides, contact slides. "
-                f"ONLY generate EXACTLY {n_content_slides} topic content slides with matching visuals. "
-                f"NOTHING ELSE. No extra slides of any kind."
-            )
             gen = await client.artifacts.generate_slide_deck(
                 nb_id,
                 source_ids=[src_id],
-                instructions=instructions[:3000],
+                instructions=_topic_image_instructions(topic_title, n_content_slides),
             )
 
             # CHECK RESPONSE IMMEDIATELY for rate limit or failure
@@ -5483,33 +5143,21 @@ async def _try_generate_with_account(
                     pass
                 return ([], f"failed: {err}")
 
-            # 5. Poll for completion (max 60 seconds — fallback to pool if slow)
-            completed = False
-            start = _time.time()
-            timeout = 60
-            while _time.time() - start < timeout:
-                try:
-                    decks = await client.artifacts.list_slide_decks(nb_id)
-                    for deck in decks:
-                        st = getattr(deck, 'status', None)
-                        if getattr(deck, 'is_completed', False) or st == 3 or str(st) == '3':
-                            completed = True
-                            break
-                        if getattr(deck, 'is_failed', False) or st == 4 or str(st) == '4':
-                            logger.warning(f"[{topic_key}][{account_label}] Generation FAILED during poll")
-                            return ([], "failed_during_generation")
-                    if completed:
-                        break
-                except Exception:
-                    pass
-                await asyncio.sleep(3)
-                elapsed = int(_time.time() - start)
-                if elapsed % 15 == 0 and elapsed > 0:
-                    logger.info(f"[{topic_key}][{account_label}] Generating... ({elapsed}s)")
-                    if progress_callback:
-                        progress_callback(f"[{topic_key}] NotebookLM generating images... ({elapsed}s)", None)
+            # 5. Wait for completion (max 60 seconds — fallback to pool if slow)
+            from generate_slides.deck_poller import wait_for_slide_deck
 
-            if not completed:
+            def _on_poll(elapsed):
+                logger.info(f"[{topic_key}][{account_label}] Generating... ({elapsed:.0f}s)")
+                if progress_callback:
+                    progress_callback(f"[{topic_key}] NotebookLM generating images... ({elapsed:.0f}s)", None)
+
+            timeout = 60
+            poll = await wait_for_slide_deck(client, nb_id, account=account_label,
+                                             timeout=timeout, on_poll=_on_poll)
+            if poll.state == "failed":
+                logger.warning(f"[{topic_key}][{account_label}] Generation FAILED during poll")
+                return ([], "failed_during_generation")
+            if poll.state != "completed":
                 logger.warning(f"[{topic_key}][{account_label}] TIMEOUT after {timeout}s")
                 return ([], "timeout")
 
@@ -5520,6 +5168,9 @@ async def _try_generate_with_account(
             # 7. Extract images, skip cover + summary
             images = _extract_nblm_images(pdf_path, cache_dir, n_content_slides)
             logger.info(f"[{topic_key}][{account_label}] Extracted {len(images)} images!")
+            if cache_key and images:
+                from generate_slides import deck_cache
+                deck_cache.store(cache_key, files={"deck.pdf": pdf_path}, images=images, label=topic_key)
             return (images, None)
 
     except Exception as e:
@@ -5554,14 +5205,19 @@ async def _generate_nblm_images_for_topic(
     cache_dir = _pl.Path.home() / 'AppData' / 'Local' / 'Temp' / 'nblm_matched_images' / topic_key
     cache_dir.mkdir(parents=True, exist_ok=True)
 
-    # Check cache — if images already generated for this topic, reuse
-    cached = sorted(cache_dir.glob('slide_*.png'))
+    # Check cache — reuse images only if this exact content was generated before
+    from generate_slides import deck_cache
+    cache_key = deck_cache.cache_key(
+        "topic_images", [topic_text[:50000]],
+        _topic_image_instructions(topic_title, n_content_slides),
+    )
+    cached = deck_cache.restore_images(cache_key, cache_dir, limit=n_content_slides)
     if cached:
         logger.info(f"[{topic_key}] Using {len(cached)} cached NotebookLM images")
-        return [str(p) for p in cached[:n_content_slides]]
+        return cached
 
     # Get all available accounts
-    accounts = _get_nblm_storage_paths()
+    accounts = await _get_healthy_nblm_accounts()
     if not accounts:
         logger.warning(f"[{topic_key}] No NotebookLM accounts available")
         return []
@@ -5578,7 +5234,7 @@ async def _generate_nblm_images_for_topic(
         images, error = await _try_generate_with_account(
             storage_path, label,
             topic_text, topic_title, topic_key, n_content_slides,
-            cache_dir, progress_callback,
+            cache_dir, progress_callback, cache_key=cache_key,
         )
 
         if images:
@@ -5660,12 +5316,22 @@ def _extract_nblm_images(pdf_path: str, output_dir, max_images: int) -> list:
       skill framework, or other non-content keywords
     Returns up to max_images content page images.
     """
+    return [img_path for _, img_path, _ in _extract_nblm_pages(pdf_path, output_dir, max_images)]
+
+
+def _extract_nblm_pages(pdf_path: str, output_dir, max_images: int) -> list:
+    """Like _extract_nblm_images, but returns (page_index, image_path, page_text) tuples.
+
+    The page text lets batched decks be mapped back to the slides they were
+    generated for (see _map_nblm_pages_to_slides).
+    """
     import fitz
     import pathlib as _pl
+    from generate_slides.pdf_raster import rasterize_pdf
 
     output_dir = _pl.Path(output_dir)
-    doc = fitz.open(pdf_path)
-    total = len(doc)
+    with fitz.open(pdf_path) as doc:
+        total = len(doc)
 
     if total == 0:
         return []
@@ -5678,29 +5344,68 @@ def _extract_nblm_images(pdf_path: str, output_dir, max_images: int) -> list:
         start = 1             # Skip cover
         end = total - 1       # Skip summary
 
-    images = []
-    for idx in range(start, end):
-        if len(images) >= max_images:
-            break
-        page = doc[idx]
-        # Filter out non-content pages (TRAQOM, surveys, certificates, etc.)
-        if _is_nblm_junk_page(page):
-            continue
-        mat = fitz.Matrix(2.0, 2.0)  # 2x resolution for quality
-        pix = page.get_pixmap(matrix=mat)
+    # Junk pages (TRAQOM, surveys, certificates, etc.) are filtered by text
+    # before rendering, so they are never rasterized
+    pages = rasterize_pdf(
+        pdf_path,
+        pages=list(range(start, end)),
+        skip_page=_is_nblm_junk_page,
+        max_images=max_images,
+    )
+    with fitz.open(pdf_path) as doc:
+        texts = {idx: doc[idx].get_text("text") for idx, _ in pages}
+    extracted = []
+    for idx, img_bytes in pages:
         img_path = str(output_dir / f'slide_{idx:03d}.png')
-        pix.save(img_path)
-        images.append(img_path)
+        with open(img_path, 'wb') as f:
+            f.write(img_bytes)
+        extracted.append((idx, img_path, texts[idx]))
 
-    doc.close()
-    logger.info(f"  Extracted {len(images)}/{total} pages (filtered out {total - len(images) - 2} junk pages)")
-    return images
+    logger.info(f"  Extracted {len(extracted)}/{total} pages (filtered out {total - len(extracted) - 2} junk pages)")
+    return extracted
 
 
 # =============================================================================
 # Per-Slide NotebookLM Image Generation
 # =============================================================================
 
+# Slides packed into one notebook / deck request in per-slide image mode
+# (1 = one notebook per slide)
+_NBLM_SLIDES_PER_NOTEBOOK = int(os.environ.get("NOTEBOOKLM_SLIDES_PER_NOTEBOOK", "6"))
+_NBLM_SLIDE_TAG_RE = re.compile(r'\[\s*S\s*(\d{1,3})\s*\]', re.IGNORECASE)
+
+
+def _nblm_slide_image_dir(slide_key: str):
+    """Per-slide NotebookLM image directory (created if missing)."""
+    import pathlib as _pl
+
+    image_dir = _pl.Path.home() / 'AppData' / 'Local' / 'Temp' / 'nblm_slide_images' / slide_key
+    image_dir.mkdir(parents=True, exist_ok=True)
+    return image_dir
+
+
+def _slide_image_instructions(slide_title: str) -> str:
+    """Deck instructions for a single slide's visual (see _generate_nblm_image_for_slide)."""
+    instructions = (
+        f"Create a SINGLE visual slide about: {slide_title}. "
+        f"Generate EXACTLY 1 content slide with a relevant diagram, "
+        f"flowchart, infographic, or illustration that explains the concepts. "
+        f"Do NOT include a cover/title slide or summary slide. "
+        f"Focus on creating one high-quality visual that complements the text."
+    )
+    return instructions[:3000]
+
+
+def _slide_image_cache_key(slide_text: str, slide_title: str) -> str:
+    """deck_cache key for one slide's image: its source text and single-slide instructions.
+
+    Batched decks store each mapped page under this key too, so a slide's
+    image is reused whichever batch (or single notebook) produced it.
+    """
+    from generate_slides import deck_cache
+    return deck_cache.cache_key("slide_image", [slide_text[:50000]], _slide_image_instructions(slide_title))
+
+
 async def _generate_nblm_image_for_slide(
     slide_text: str,
     slide_title: str,
@@ -5717,7 +5422,7 @@ async def _generate_nblm_image_for_slide(
     Args:
         slide_text: Formatted source text for this slide.
         slide_title: Human-readable slide title.
-        slide_key: Cache key e.g. "LU1_T1_S1".
+        slide_key: Slide label e.g. "LU1_T1_S1".
         storage_path: Path to account's storage_state.json.
         account_label: Account label for logging.
         progress_callback: Optional progress reporter.
@@ -5725,24 +5430,22 @@ async def _generate_nblm_image_for_slide(
     Returns:
         Image file path on success, "RATE_LIMITED" if rate-limited, None on failure.
     """
-    import pathlib as _pl
-    import time as _time
+    from generate_slides import deck_cache
 
-    cache_dir = _pl.Path.home() / 'AppData' / 'Local' / 'Temp' / 'nblm_slide_images' / slide_key
-    cache_dir.mkdir(parents=True, exist_ok=True)
+    cache_dir = _nblm_slide_image_dir(slide_key)
 
-    # Check cache — reuse if already generated
-    cached = sorted(cache_dir.glob('slide_*.png'))
+    # Check cache — reuse if this exact slide content was generated before
+    cache_key = _slide_image_cache_key(slide_text, slide_title)
+    cached = deck_cache.restore_images(cache_key, cache_dir, limit=1)
     if cached:
         logger.info(f"[{slide_key}] Using cached image")
-        return str(cached[0])
+        return cached[0]
 
     nb_id = None
     try:
-        from notebooklm import NotebookLMClient
+        from generate_slides.client_pool import get_client_pool
 
-        client = await NotebookLMClient.from_storage(path=storage_path)
-        async with client:
+        async with get_client_pool().lease(account_label, storage_path) as client:
             # 1. Create notebook for this single slide
             nb = await client.notebooks.create(f"Slide: {slide_title[:60]}")
             nb_id = nb.id
@@ -5762,17 +5465,10 @@ async def _generate_nblm_image_for_slide(
                 await asyncio.sleep(3)
 
             # 4. Generate single-slide deck with targeted diagram instructions
-            instructions = (
-                f"Create a SINGLE visual slide about: {slide_title}. "
-                f"Generate EXACTLY 1 content slide with a relevant diagram, "
-                f"flowchart, infographic, or illustration that explains the concepts. "
-                f"Do NOT include a cover/title slide or summary slide. "
-                f"Focus on creating one high-quality visual that complements the text."
-            )
             gen = await client.artifacts.generate_slide_deck(
                 nb_id,
                 source_ids=[src_id],
-                instructions=instructions[:3000],
+                instructions=_slide_image_instructions(slide_title),
             )
 
             # Check for rate limit
@@ -5792,33 +5488,16 @@ async def _generate_nblm_image_for_slide(
                     pass
                 return None
 
-            # 5. Poll for completion (max 45s for single slide)
-            completed = False
-            start = _time.time()
-            timeout = 45
-            while _time.time() - start < timeout:
-                try:
-                    decks = await client.artifacts.list_slide_decks(nb_id)
-                    for deck in decks:
-                        st_val = getattr(deck, 'status', None)
-                        if getattr(deck, 'is_completed', False) or st_val == 3 or str(st_val) == '3':
-                            completed = True
-                            break
-                        if getattr(deck, 'is_failed', False) or st_val == 4 or str(st_val) == '4':
-                            logger.warning(f"[{slide_key}][{account_label}] Deck generation failed (status=4)")
-                            try:
-                                await client.notebooks.delete(nb_id)
-                            except Exception:
-                                pass
-                            return None
-                    if completed:
-                        break
-                except Exception:
-                    pass
-                await asyncio.sleep(2)
+            # 5. Wait for completion (max 45s for single slide)
+            from generate_slides.deck_poller import wait_for_slide_deck
 
-            if not completed:
-                logger.warning(f"[{slide_key}][{account_label}] Timed out after {timeout}s")
+            timeout = 45
+            poll = await wait_for_slide_deck(client, nb_id, account=account_label, timeout=timeout)
+            if poll.state != "completed":
+                if poll.state == "failed":
+                    logger.warning(f"[{slide_key}][{account_label}] Deck generation failed (status=4)")
+                else:
+                    logger.warning(f"[{slide_key}][{account_label}] Timed out after {timeout}s")
                 try:
                     await client.notebooks.delete(nb_id)
                 except Exception:
@@ -5838,6 +5517,7 @@ async def _generate_nblm_image_for_slide(
                 pass
 
             if images:
+                deck_cache.store(cache_key, files={"deck.pdf": pdf_path}, images=images, label=slide_key)
                 print(f"[NBLM] [{slide_key}][{account_label}] Image generated OK", flush=True)
             return images[0] if images else None
 
@@ -5846,15 +5526,192 @@ async def _generate_nblm_image_for_slide(
         # Try cleanup
         if nb_id:
             try:
-                from notebooklm import NotebookLMClient
-                client = await NotebookLMClient.from_storage(path=storage_path)
-                async with client:
+                from generate_slides.client_pool import get_client_pool
+                async with get_client_pool().lease(account_label, storage_path) as client:
                     await client.notebooks.delete(nb_id)
             except Exception:
                 pass
         return None
 
 
+def _map_nblm_pages_to_slides(pages: list, titles: list) -> dict:
+    """Map the content pages of a batched deck back to the slides it was made for.
+
+    pages: (page_index, image_path, page_text) from _extract_nblm_pages.
+    titles: slide titles in batch order (slide n carries the tag [S<n>]).
+
+    A page is matched by its [S<n>] tag first, then by overlap with the words
+    that distinguish one slide title from the others in the batch. If the
+    leftover pages and slides are equal in number, they are paired in order.
+    Returns {slide position: image_path}; unmatched slides are absent.
+    """
+    def _words(text):
+        return set(re.findall(r'[a-z]{3,}|\d+', (text or '').lower()))
+
+    assigned = {}
+    untagged = []
+    for page in pages:
+        m = _NBLM_SLIDE_TAG_RE.search(page[2] or '')
+        pos = int(m.group(1)) - 1 if m else -1
+        if 0 <= pos < len(titles) and pos not in assigned:
+            assigned[pos] = page[1]
+        else:
+            untagged.append(page)
+
+    title_words = [_words(t) for t in titles]
+    common = set.intersection(*title_words) if len(title_words) > 1 else set()
+    candidates = []
+    for pi, page in enumerate(untagged):
+        page_words = _words(page[2])
+        for si, words in enumerate(title_words):
+            distinctive = words - common
+            if si in assigned or not distinctive:
+                continue
+            score = len(distinctive & page_words) / len(distinctive)
+            if score >= 0.5:
+                candidates.append((-score, pi, si))
+    used_pages = set()
+    for _, pi, si in sorted(candidates):
+        if pi not in used_pages and si not in assigned:
+            assigned[si] = untagged[pi][1]
+            used_pages.add(pi)
+
+    left_pages = [p for pi, p in enumerate(untagged) if pi not in used_pages]
+    left_slides = [si for si in range(len(titles)) if si not in assigned]
+    if left_pages and len(left_pages) == len(left_slides):
+        for si, page in zip(left_slides, left_pages):
+            assigned[si] = page[1]
+    return assigned
+
+
+async def _generate_nblm_images_for_slide_batch(
+    tasks: list,
+    batch_key: str,
+    course_title: str,
+    lu_title: str,
+    storage_path: str,
+    account_label: str,
+    progress_callback=None,
+):
+    """Generate NotebookLM visual images for several slides with one notebook.
+
+    Packs the slides' content into one source, each section tagged [S<n>],
+    requests one deck with exactly that many slides, and maps the returned
+    pages back to slide keys (see _map_nblm_pages_to_slides). Each image is
+    moved to its slide's image directory and cached under its slide's
+    deck_cache key, the same places _generate_nblm_image_for_slide uses.
+
+    Args:
+        tasks: Slide tasks built by _generate_nblm_images_for_lu_slides
+            ('slide_key', 'slide_title', 'slide_data', 'topic_title').
+        batch_key: Label for logging/notebook title e.g. "LU1_B2".
+        course_title: Course title string.
+        lu_title: Learning unit title string.
+        storage_path: Path to account's storage_state.json.
+        account_label: Account label for logging.
+        progress_callback: Optional progress reporter.
+
+    Returns:
+        {slide_key: image path} for the slides that got an image (may be
+        partial), "RATE_LIMITED" if rate-limited, None on failure.
+    """
+    import tempfile
+
+    n_slides = len(tasks)
+    work_dir = tempfile.mkdtemp(prefix=f"nblm_batch_{batch_key}_")
+    try:
+        from generate_slides.client_pool import get_client_pool
+
+        async with get_client_pool().lease(account_label, storage_path) as client:
+            # 1. One notebook + one source for the whole batch
+            nb = await client.notebooks.create(f"Slides: {lu_title[:50]} ({batch_key})")
+            nb_id = nb.id
+            try:
+                src = await client.sources.add_text(
+                    nb_id,
+                    f"Slide Content: {lu_title} ({batch_key})",
+                    _format_slide_batch_as_nblm_source(tasks, course_title, lu_title)[:50000],
+                )
+                src_id = src.id
+
+                try:
+                    await client.sources.wait_for_sources(nb_id, [src_id], timeout=20.0)
+                except Exception:
+                    await asyncio.sleep(3)
+
+                # 2. One deck with one slide per section, tagged so pages can be mapped back
+                instructions = (
+                    f"Create EXACTLY {n_slides} visual content slides — one per SLIDE section "
+                    f"of the source, in the same order. Use each section's title as the slide "
+                    f"heading and show its tag (e.g. [S1]) in small text in a corner of the slide. "
+                    f"EVERY slide MUST include a diagram, flowchart, infographic, or illustration "
+                    f"that explains that section's concepts. "
+                    f"Do NOT include a cover/title slide, summary slide, or any other extra slide."
+                )
+                gen = await client.artifacts.generate_slide_deck(
+                    nb_id,
+                    source_ids=[src_id],
+                    instructions=instructions[:3000],
+                )
+
+                if hasattr(gen, 'is_rate_limited') and gen.is_rate_limited:
+                    logger.warning(f"[{batch_key}][{account_label}] Rate limited")
+                    return "RATE_LIMITED"
+
+                if hasattr(gen, 'is_failed') and gen.is_failed:
+                    logger.warning(f"[{batch_key}][{account_label}] Generation failed")
+                    return None
+
+                # 3. Wait for completion (45s for one slide, +15s per extra slide)
+                from generate_slides.deck_poller import wait_for_slide_deck
+
+                timeout = 45 + 15 * (n_slides - 1)
+                poll = await wait_for_slide_deck(client, nb_id, account=account_label, timeout=timeout)
+                if poll.state != "completed":
+                    if poll.state == "failed":
+                        logger.warning(f"[{batch_key}][{account_label}] Deck generation failed (status=4)")
+                    else:
+                        logger.warning(f"[{batch_key}][{account_label}] Timed out after {timeout}s")
+                    return None
+
+                # 4. Download, extract the content pages and map them to slide keys
+                pdf_path = os.path.join(work_dir, f'{batch_key}.pdf')
+                await client.artifacts.download_slide_deck(nb_id, pdf_path)
+                # A little slack so an unrequested intro page cannot push out a real slide
+                pages = _extract_nblm_pages(pdf_path, work_dir, max_images=n_slides + 2)
+                mapping = _map_nblm_pages_to_slides(pages, [t['slide_title'] for t in tasks])
+
+                from generate_slides import deck_cache
+
+                images = {}
+                for pos, img_path in mapping.items():
+                    task = tasks[pos]
+                    images[task['slide_key']] = shutil.move(
+                        img_path, str(_nblm_slide_image_dir(task['slide_key']) / os.path.basename(img_path))
+                    )
+                    deck_cache.store(
+                        _slide_image_cache_key(task['source_text'], task['slide_title']),
+                        images=[images[task['slide_key']]], label=task['slide_key'],
+                    )
+                print(
+                    f"[NBLM] [{batch_key}][{account_label}] {len(images)}/{n_slides} slide images "
+                    f"from {len(pages)} pages",
+                    flush=True,
+                )
+                return images
+            finally:
+                try:
+                    await client.notebooks.delete(nb_id)
+                except Exception:
+                    pass
+
+    except Exception as e:
+        logger.warning(f"[{batch_key}][{account_label}] Exception: {e}")
+        return None
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
 async def _generate_nblm_images_for_lu_slides(
     slides_data: dict,
     lu_num: str,
@@ -5862,11 +5719,16 @@ async def _generate_nblm_images_for_lu_slides(
     lu_title: str,
     progress_callback=None,
     total_timeout: int = 300,
+    slides_per_notebook: int = None,
 ):
     """Generate per-slide NBLM images for an entire LU, parallelized across accounts.
 
-    For each individual slide, creates a dedicated NBLM notebook and generates
-    a diagram/flowchart tailored to that slide's specific content.
+    Every slide gets a diagram/flowchart tailored to its own content. Slides
+    are packed slides_per_notebook at a time (default
+    NOTEBOOKLM_SLIDES_PER_NOTEBOOK) into one notebook and one deck request,
+    and the pages are mapped back to their slides
+    (_generate_nblm_images_for_slide_batch). With 1, each slide gets a
+    dedicated notebook (_generate_nblm_image_for_slide).
 
     Args:
         slides_data: Claude-generated content with 'topics' list.
@@ -5875,19 +5737,22 @@ async def _generate_nblm_images_for_lu_slides(
         lu_title: Learning unit title string.
         progress_callback: Optional progress reporter.
         total_timeout: Max seconds for entire LU image generation (default 5 min).
+        slides_per_notebook: Slides per notebook/deck request (1 = one per slide).
 
     Returns:
         Dict mapping topic_idx -> list of image paths (positional, may contain None),
         or None if generation failed completely.
     """
     import time as _time
+    from generate_slides.client_pool import get_client_pool
 
-    accounts = _get_nblm_storage_paths()
+    accounts = await _get_healthy_nblm_accounts()
     if not accounts:
         logger.warning(f"[{lu_num}] No NotebookLM accounts available for per-slide generation")
         return None
 
     n_accounts = len(accounts)
+    client_pool = get_client_pool()
 
     # Build flat list of all slide tasks
     all_tasks = []
@@ -5910,6 +5775,8 @@ async def _generate_nblm_images_for_lu_slides(
                 'slide_key': slide_key,
                 'slide_title': slide_title,
                 'source_text': source_text,
+                'slide_data': slide_data,
+                'topic_title': clean_topic,
             })
 
     total_slides = len(all_tasks)
@@ -5939,73 +5806,112 @@ async def _generate_nblm_images_for_lu_slides(
     account_counter = [0]  # mutable counter for round-robin assignment
     completed_count = [0]
     lu_start = _time.time()
+    batch_size = max(1, slides_per_notebook or _NBLM_SLIDES_PER_NOTEBOOK)
 
-    async def _generate_one_slide(task: dict) -> None:
-        """Generate image for one slide, acquiring an account from the pool."""
+    def _lost_account(result, storage_path: str) -> bool:
+        # Rate limited, or the account's auth failed during the attempt (see client_pool)
+        return result == "RATE_LIMITED" or (not result and bool(client_pool.error(storage_path)))
+
+    async def _with_account(key: str, generate):
+        """Run generate(storage_path, label) on the next account, moving on while rate-limited."""
         async with account_semaphore:
             # Round-robin account selection
             idx = account_counter[0] % n_accounts
             account_counter[0] += 1
             label, storage_path = accounts[idx]
 
-            ti = task['topic_idx']
-            si = task['slide_idx']
+            result = await generate(storage_path, label)
 
-            result = await _generate_nblm_image_for_slide(
-                task['source_text'],
-                task['slide_title'],
-                task['slide_key'],
-                storage_path,
-                label,
-                progress_callback=progress_callback,
-            )
-
-            # Handle rate limiting: try remaining accounts
-            if result == "RATE_LIMITED":
+            # Handle rate limiting / expired auth: try remaining healthy accounts
+            if _lost_account(result, storage_path):
                 for retry_offset in range(1, n_accounts):
                     retry_idx = (idx + retry_offset) % n_accounts
                     retry_label, retry_path = accounts[retry_idx]
+                    if client_pool.error(retry_path):
+                        continue
                     print(
-                        f"[NBLM] [{task['slide_key']}] Retrying with {retry_label} "
+                        f"[NBLM] [{key}] Retrying with {retry_label} "
                         f"(account {retry_idx + 1}/{n_accounts})",
                         flush=True,
                     )
-                    result = await _generate_nblm_image_for_slide(
-                        task['source_text'],
-                        task['slide_title'],
-                        task['slide_key'],
-                        retry_path,
-                        retry_label,
-                        progress_callback=progress_callback,
-                    )
-                    if result != "RATE_LIMITED":
+                    result = await generate(retry_path, retry_label)
+                    if not _lost_account(result, retry_path):
                         break
 
-            if result and result != "RATE_LIMITED":
-                results[ti][si] = result
+            return None if result == "RATE_LIMITED" else result
 
-            completed_count[0] += 1
-            elapsed = _time.time() - lu_start
-            if completed_count[0] % 3 == 0 or completed_count[0] == total_slides:
-                print(
-                    f"[NBLM] [{lu_num}] Progress: {completed_count[0]}/{total_slides} "
-                    f"slides ({elapsed:.0f}s elapsed)",
-                    flush=True,
+    def _report_progress(n_done: int) -> None:
+        completed_count[0] += n_done
+        elapsed = _time.time() - lu_start
+        if batch_size > 1 or completed_count[0] % 3 == 0 or completed_count[0] == total_slides:
+            print(
+                f"[NBLM] [{lu_num}] Progress: {completed_count[0]}/{total_slides} "
+                f"slides ({elapsed:.0f}s elapsed)",
+                flush=True,
+            )
+            if progress_callback:
+                progress_callback(
+                    f"[{lu_num}] Generated {completed_count[0]}/{total_slides} "
+                    f"slide images ({elapsed:.0f}s)...",
+                    None,
                 )
-                if progress_callback:
-                    progress_callback(
-                        f"[{lu_num}] Generated {completed_count[0]}/{total_slides} "
-                        f"slide images ({elapsed:.0f}s)...",
-                        None,
-                    )
+
+    async def _generate_one_slide(task: dict) -> None:
+        """Generate image for one slide, acquiring an account from the pool."""
+        result = await _with_account(task['slide_key'], lambda path, label: _generate_nblm_image_for_slide(
+            task['source_text'],
+            task['slide_title'],
+            task['slide_key'],
+            path,
+            label,
+            progress_callback=progress_callback,
+        ))
+        if result:
+            results[task['topic_idx']][task['slide_idx']] = result
+        _report_progress(1)
+
+    async def _generate_one_batch(batch_key: str, batch: list) -> None:
+        """Generate images for a batch of slides from one notebook."""
+        images = await _with_account(batch_key, lambda path, label: _generate_nblm_images_for_slide_batch(
+            batch,
+            batch_key,
+            course_title,
+            lu_title,
+            path,
+            label,
+            progress_callback=progress_callback,
+        )) or {}
+        for task in batch:
+            if images.get(task['slide_key']):
+                results[task['topic_idx']][task['slide_idx']] = images[task['slide_key']]
+        _report_progress(len(batch))
+
+    if batch_size > 1:
+        # Reuse cached slide images; pack the rest into notebooks of batch_size slides
+        from generate_slides import deck_cache
+
+        pending = []
+        for task in all_tasks:
+            cached = deck_cache.restore_images(
+                _slide_image_cache_key(task['source_text'], task['slide_title']),
+                _nblm_slide_image_dir(task['slide_key']), limit=1,
+            )
+            if cached:
+                results[task['topic_idx']][task['slide_idx']] = cached[0]
+                completed_count[0] += 1
+            else:
+                pending.append(task)
+        jobs = [
+            _generate_one_batch(f"{lu_num}_B{b + 1}", pending[start:start + batch_size])
+            for b, start in enumerate(range(0, len(pending), batch_size))
+        ]
+    else:
+        jobs = [_generate_one_slide(task) for task in all_tasks]
 
     # Launch all slide tasks with total timeout
     try:
         await asyncio.wait_for(
-            asyncio.gather(
-                *[_generate_one_slide(task) for task in all_tasks],
-                return_exceptions=True,
-            ),
+            asyncio.gather(*jobs, return_exceptions=True),
             timeout=total_timeout,
         )
     except asyncio.TimeoutError:
@@ -6133,6 +6039,39 @@ def _format_slide_as_nblm_source(
     return "\n".join(lines)
 
 
+def _format_slide_batch_as_nblm_source(tasks: list, course_title: str, lu_title: str) -> str:
+    """Format several slides' content as one text source for a batched NotebookLM deck.
+
+    Each slide becomes a "=== SLIDE n [Sn]: title ===" section so the
+    generated pages can be matched back to their slides by tag or title.
+    """
+    lines = [
+        f"Course: {course_title}",
+        f"Learning Unit: {lu_title}",
+        "",
+        "IMPORTANT INSTRUCTIONS:",
+        f"Generate EXACTLY {len(tasks)} visual content slides — one per SLIDE section below, in order.",
+        "Use each section's title as the slide heading and show its tag (e.g. [S1]) on the slide.",
+        "Each slide MUST contain a diagram, flowchart, or infographic matching its content.",
+        "Do NOT generate cover, title, summary, survey, certificate, QR code or Q&A slides.",
+        "",
+        "=" * 60,
+        "",
+    ]
+    for n, task in enumerate(tasks, 1):
+        lines.append(f"=== SLIDE {n} [S{n}]: {task['slide_title']} ===")
+        lines.append(f"Topic: {task['topic_title']}")
+        lines.append("")
+        for bullet in task['slide_data'].get('bullets', []):
+            lines.append(f"  - {bullet}")
+        lines.append("")
+
+    lines.append("=" * 60)
+    lines.append("")
+    lines.append(f"TOTAL: Generate EXACTLY {len(tasks)} content slides with visuals. NOTHING ELSE.")
+    return "\n".join(lines)
+
+
 def _build_fallback_slides_from_cp(lu: dict, slides_per_topic: int = 5) -> dict:
     """Build slide content directly from Course Proposal data when Claude AI times out.
 
@@ -6587,6 +6526,12 @@ def app():
                         index=0,
                         help="Sonnet 4 is fast and balanced. Opus 4.5 produces richer content but costs more.",
                     )
+                    _streaming = st.checkbox(
+                        "Stream topics through phases",
+                        value=False,
+                        help="Start content and infographics for each topic as soon as its research "
+                             "is done, instead of waiting for every topic at each phase.",
+                    )
                 with _ma_col2:
                     _blocks_options = ["Auto"] + list(range(4, 15))
                     _blocks_per_topic_raw = st.select_slider(
@@ -6602,10 +6547,18 @@ def app():
                         value=False,
                         help="If checked, uses text fallback slides instead of infographic images.",
                     )
+                    _resume_run = st.checkbox(
+                        "Resume previous run",
+                        value=False,
+                        help="Reuse research, content, skeleton and infographics saved by an earlier "
+                             "run of this course. Only failed or missing topics are regenerated.",
+                    )
                 _multi_agent_config = {
                     "research_depth": _research_depth,
                     "model": _content_model,
                     "skip_infographics": _skip_infographics,
+                    "resume": _resume_run,
+                    "streaming": _streaming,
                 }
                 if _blocks_per_topic is not None:
                     _multi_agent_config["num_blocks_per_topic"] = _blocks_per_topic
@@ -6622,11 +6575,8 @@ def app():
             _config = {'_context': extracted_info}
             _skip = skip_indices.copy() if skip_indices else None
 
-            _progress_list = []
-
-            def _progress(msg, pct):
-                _progress_list.append((msg, pct))
-                logger.info(f"[PROGRESS] {msg}")
+            # Clear previous results for fresh generation
+            st.session_state.pop('slides_result', None)
 
             if use_multi_agent:
                 from generate_slides.multi_agent_orchestrator import orchestrate_multi_agent_slides
@@ -6639,31 +6589,29 @@ def app():
                 if _selected_co:
                     _ma_cfg["company"] = _selected_co
 
-                async def _generate_slides():
-                    return await orchestrate_multi_agent_slides(
-                        context=_info,
-                        config=_ma_cfg,
-                        progress_callback=_progress,
-                    )
+                # Module-level function + plain kwargs: eligible for the durable job queue
+                job = submit_agent_job(
+                    key="generate_slides",
+                    label="Generate Slides",
+                    async_fn=orchestrate_multi_agent_slides,
+                    kwargs={"context": _info, "config": _ma_cfg},
+                    progress_kwarg="progress_callback",
+                )
             else:
-                async def _generate_slides():
+                async def _generate_slides(progress_callback=None):
                     return await _generate_editable_pptx(
                         _info, _title, _config,
-                        progress_callback=_progress,
+                        progress_callback=progress_callback,
                         skip_lu_indices=_skip,
                         use_nblm=False,
                     )
 
-            # Clear previous results for fresh generation
-            st.session_state.pop('slides_result', None)
-            job = submit_agent_job(
-                key="generate_slides",
-                label="Generate Slides",
-                async_fn=_generate_slides,
-            )
-            if job:
-                # Attach the shared progress list to the job dict
-                job["progress_messages"] = _progress_list
+                job = submit_agent_job(
+                    key="generate_slides",
+                    label="Generate Slides",
+                    async_fn=_generate_slides,
+                    progress_kwarg="progress_callback",
+                )
 
             if job is None:
                 st.warning("Slide generation is already running.")
@@ -6764,6 +6712,11 @@ def app():
             else:
                 st.error("Slide generation failed.")
                 st.markdown(result.get("message", "Unknown error occurred."))
+                if result.get("run_dir"):
+                    st.info(
+                        "Completed phases were saved. Tick **Resume previous run** in the "
+                        "configuration panel to retry without redoing them."
+                    )
                 if lu_results:
                     st.warning(
                         f"Partially completed: {len(lu_results)} deck(s). "
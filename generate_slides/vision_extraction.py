@@ -0,0 +1,387 @@
+"""
+Vision Extraction — Async, batched Claude Vision for slide images
+
+Reads text and layout back out of NotebookLM slide images (hybrid pipeline).
+
+- One shared AsyncAnthropic client per event loop; calls never block the loop,
+  so NotebookLM polling and other coroutines keep running.
+- Images are downscaled/compressed before upload (long edge <= VISION_MAX_EDGE).
+- Slides are packed into batches by encoded size, not a fixed count.
+- A semaphore bounds in-flight requests; rate-limit / overload / connection
+  errors are retried with exponential backoff (honouring retry-after).
+- Results are cached on disk (.output/vision_cache) keyed by the sha256 of the
+  image bytes, so re-extracting the same NotebookLM page is free.
+
+Usage:
+    results = await extract_slides_vision(image_paths)   # one dict per image
+"""
+
+import asyncio
+import base64
+import hashlib
+import io
+import json
+import logging
+import os
+import random
+import weakref
+from typing import Optional
+
+from utils.json_stream import extract_json
+
+logger = logging.getLogger(__name__)
+
+VISION_MODEL = "claude-sonnet-4-20250514"
+VISION_CONCURRENCY = 4                   # Max in-flight Vision requests
+VISION_BATCH_MAX_IMAGES = 10             # Max slides per request
+VISION_BATCH_MAX_BYTES = 4 * 1024 * 1024  # Max base64 payload per request
+VISION_MAX_EDGE = 1568                   # Longer edges are downscaled before upload
+VISION_MAX_RETRIES = 5
+VISION_BACKOFF_BASE = 2.0                # Seconds; doubles per retry (+ jitter)
+
+VISION_CACHE_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), ".output", "vision_cache"
+)
+_CACHE_VERSION = "v1"  # Bump when the prompt or result schema changes
+
+EMPTY_SLIDE = {"title": "", "bullets": [], "layout": "text-full",
+               "is_section_header": False, "has_diagram": False}
+
+_SINGLE_PROMPT = (
+    "Extract all text from this presentation slide. Return ONLY valid JSON:\n"
+    "{\n"
+    '  "title": "The slide title text",\n'
+    '  "bullets": ["bullet point 1", "bullet point 2", ...],\n'
+    '  "layout": "text-left" | "text-right" | "text-full" | "title-only" | "image-full",\n'
+    '  "is_section_header": true/false,\n'
+    '  "has_diagram": true/false\n'
+    "}\n\n"
+    "Layout guide:\n"
+    '- "text-left": Text on left side, image/diagram on right\n'
+    '- "text-right": Text on right side, image/diagram on left\n'
+    '- "text-full": Text spans full width (no significant images)\n'
+    '- "title-only": Just a title or section header with minimal text\n'
+    '- "image-full": Mostly image/diagram with minimal text\n\n'
+    "If there are no bullet points, set bullets to [].\n"
+    "Output ONLY the JSON, nothing else."
+)
+
+
+def _batch_prompt(count: int) -> str:
+    return (
+        f"\nExtract text from ALL {count} slides above. "
+        "Return ONLY a JSON array with one object per slide:\n"
+        "[\n"
+        '  {"title": "...", "bullets": ["..."], "layout": "text-full|text-left|text-right|title-only|image-full", '
+        '"is_section_header": false, "has_diagram": false},\n'
+        "  ...\n"
+        "]\n\n"
+        f"Array MUST have exactly {count} objects, one per slide in order.\n"
+        "Output ONLY the JSON array, nothing else."
+    )
+
+
+# ---------- Shared client / concurrency (one per event loop) ----------
+
+_loop_state: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+_stats = {"cache_hits": 0, "requests": 0, "retries": 0, "failures": 0,
+          "bytes_raw": 0, "bytes_sent": 0}
+
+
+def _get_client_and_semaphore():
+    """Return (AsyncAnthropic client, Semaphore) bound to the running loop.
+
+    Streamlit runs each action in a fresh asyncio.run(), and both the httpx
+    connection pool and asyncio.Semaphore are tied to the loop that created
+    them, so state is kept per loop rather than as plain module globals.
+    """
+    import anthropic
+
+    loop = asyncio.get_running_loop()
+    state = _loop_state.get(loop)
+    if state is None:
+        # SDK retries disabled — _create_with_retry owns backoff
+        state = (anthropic.AsyncAnthropic(max_retries=0), asyncio.Semaphore(VISION_CONCURRENCY))
+        _loop_state[loop] = state
+    return state
+
+
+def get_vision_stats() -> dict:
+    """Return cache/request/retry counters for the vision extraction engine."""
+    return dict(_stats)
+
+
+# ---------- Image pre-pass ----------
+
+def _prepare_image(image_path: str) -> tuple:
+    """Read an image, downscale and compress it for upload.
+
+    Returns:
+        (raw_bytes, upload_bytes, media_type). raw_bytes is what the cache key
+        is computed from; upload_bytes is the smaller of re-encoded PNG/JPEG.
+    """
+    with open(image_path, "rb") as f:
+        raw = f.read()
+
+    try:
+        from PIL import Image
+    except ImportError:
+        return raw, raw, "image/png"
+
+    try:
+        img = Image.open(io.BytesIO(raw))
+        img.load()
+        oversized = max(img.size) > VISION_MAX_EDGE
+        if oversized:
+            img.thumbnail((VISION_MAX_EDGE, VISION_MAX_EDGE), Image.LANCZOS)
+        if img.mode not in ("RGB", "L"):
+            img = img.convert("RGB")
+
+        png_buf = io.BytesIO()
+        img.save(png_buf, format="PNG", optimize=True)
+        jpg_buf = io.BytesIO()
+        img.save(jpg_buf, format="JPEG", quality=85, optimize=True)
+
+        candidates = [(len(raw), raw, "image/png"),
+                      (png_buf.tell(), png_buf.getvalue(), "image/png"),
+                      (jpg_buf.tell(), jpg_buf.getvalue(), "image/jpeg")]
+        if oversized:
+            candidates = candidates[1:]  # Original exceeds the edge limit
+        _, data, media_type = min(candidates, key=lambda c: c[0])
+        return raw, data, media_type
+    except Exception as e:
+        logger.debug(f"Image pre-pass skipped for {image_path}: {e}")
+        return raw, raw, "image/png"
+
+
+# ---------- Result cache ----------
+
+def _cache_key(raw: bytes) -> str:
+    h = hashlib.sha256(raw)
+    h.update(f"{VISION_MODEL}:{_CACHE_VERSION}".encode("utf-8"))
+    return h.hexdigest()
+
+
+def _cache_get(key: str) -> Optional[dict]:
+    try:
+        with open(os.path.join(VISION_CACHE_DIR, f"{key}.json"), "r", encoding="utf-8") as f:
+            data = json.load(f)
+        return data if isinstance(data, dict) else None
+    except (OSError, json.JSONDecodeError):
+        return None
+
+
+def _cache_put(key: str, result: dict) -> None:
+    try:
+        os.makedirs(VISION_CACHE_DIR, exist_ok=True)
+        path = os.path.join(VISION_CACHE_DIR, f"{key}.json")
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(result, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+    except OSError:
+        pass
+
+
+# ---------- Response parsing ----------
+
+def _parse_json(text: str, opener: str):
+    """Parse a JSON object ('{') or array ('[') from a model response.
+
+    A truncated array keeps its complete leading elements. Returns None if
+    nothing parses.
+    """
+    return extract_json(text, opener=opener, partial=opener == "[")
+
+
+def _normalize(item) -> dict:
+    if not isinstance(item, dict):
+        return dict(EMPTY_SLIDE)
+    out = dict(EMPTY_SLIDE)
+    out.update(item)
+    if not isinstance(out.get("bullets"), list):
+        out["bullets"] = []
+    return out
+
+
+# ---------- API calls ----------
+
+def _retry_after(exc) -> Optional[float]:
+    response = getattr(exc, "response", None)
+    if response is None:
+        return None
+    try:
+        return float(response.headers.get("retry-after"))
+    except (TypeError, ValueError):
+        return None
+
+
+async def _create_with_retry(content: list, max_tokens: int) -> str:
+    """Send one Messages request and return the response text.
+
+    Retries rate-limit (429), overload (529), 5xx, timeout and connection
+    errors with exponential backoff. Other errors are raised immediately.
+    """
+    import anthropic
+
+    client, semaphore = _get_client_and_semaphore()
+    attempt = 0
+    while True:
+        try:
+            async with semaphore:
+                _stats["requests"] += 1
+                response = await client.messages.create(
+                    model=VISION_MODEL,
+                    max_tokens=max_tokens,
+                    messages=[{"role": "user", "content": content}],
+                )
+            return response.content[0].text.strip()
+        except (anthropic.APIStatusError, anthropic.APIConnectionError) as e:
+            status = getattr(e, "status_code", None)
+            retryable = (
+                isinstance(e, (anthropic.RateLimitError, anthropic.APIConnectionError))
+                or (status is not None and status >= 500)
+            )
+            if not retryable or attempt >= VISION_MAX_RETRIES:
+                raise
+            delay = _retry_after(e) or VISION_BACKOFF_BASE * (2 ** attempt)
+            delay += random.uniform(0, delay / 4)
+            _stats["retries"] += 1
+            logger.warning(f"Vision request failed ({type(e).__name__}), retry {attempt + 1} in {delay:.1f}s")
+            await asyncio.sleep(delay)
+            attempt += 1
+
+
+def _image_block(data: bytes, media_type: str) -> dict:
+    return {
+        "type": "image",
+        "source": {
+            "type": "base64",
+            "media_type": media_type,
+            "data": base64.standard_b64encode(data).decode("utf-8"),
+        },
+    }
+
+
+async def _extract_batch(items: list) -> Optional[list]:
+    """Extract one batch of prepared images. items: [(data, media_type), ...].
+
+    Returns one entry per image (None where the response had none), or None
+    if a multi-image response could not be parsed at all.
+    """
+    if len(items) == 1:
+        data, media_type = items[0]
+        content = [_image_block(data, media_type), {"type": "text", "text": _SINGLE_PROMPT}]
+        text = await _create_with_retry(content, max_tokens=1024)
+        parsed = _parse_json(text, "{")
+        if isinstance(parsed, list) and parsed:
+            parsed = parsed[0]
+        return [_normalize(parsed)] if isinstance(parsed, dict) else [None]
+
+    content = []
+    for idx, (data, media_type) in enumerate(items):
+        content.append({"type": "text", "text": f"--- SLIDE {idx + 1} ---"})
+        content.append(_image_block(data, media_type))
+    content.append({"type": "text", "text": _batch_prompt(len(items))})
+
+    text = await _create_with_retry(content, max_tokens=min(8192, 600 * len(items)))
+    parsed = _parse_json(text, "[")
+    if not isinstance(parsed, list):
+        logger.warning(f"Batch vision: could not parse response for {len(items)} slides")
+        return None
+    results = [_normalize(p) for p in parsed[:len(items)]]
+    return results + [None] * (len(items) - len(results))
+
+
+def _pack_batches(prepared: list) -> list:
+    """Group (index, data, media_type) tuples by encoded size and count."""
+    batches, current, current_bytes = [], [], 0
+    for entry in prepared:
+        size = len(entry[1]) * 4 // 3  # base64 inflation
+        if current and (len(current) >= VISION_BATCH_MAX_IMAGES
+                        or current_bytes + size > VISION_BATCH_MAX_BYTES):
+            batches.append(current)
+            current, current_bytes = [], 0
+        current.append(entry)
+        current_bytes += size
+    if current:
+        batches.append(current)
+    return batches
+
+
+async def extract_slides_vision(image_paths: list, use_cache: bool = True) -> list:
+    """Extract title/bullets/layout from slide images with Claude Vision.
+
+    Args:
+        image_paths: Paths to slide images (PNG/JPEG), in slide order.
+        use_cache: Reuse results for images whose bytes were seen before.
+
+    Returns:
+        List of dicts (one per image, same order) with 'title', 'bullets',
+        'layout', 'is_section_header', 'has_diagram'. Slides that could not be
+        extracted get empty values.
+    """
+    if not image_paths:
+        return []
+
+    results: list = [None] * len(image_paths)
+    keys: list = [None] * len(image_paths)
+    pending = []
+
+    prepared_all = await asyncio.gather(
+        *[asyncio.to_thread(_prepare_image, p) for p in image_paths],
+        return_exceptions=True,
+    )
+    for i, prepared in enumerate(prepared_all):
+        if isinstance(prepared, Exception):
+            logger.warning(f"Vision: cannot read {image_paths[i]}: {prepared}")
+            results[i] = dict(EMPTY_SLIDE)
+            continue
+        raw, data, media_type = prepared
+        keys[i] = _cache_key(raw)
+        cached = _cache_get(keys[i]) if use_cache else None
+        if cached is not None:
+            _stats["cache_hits"] += 1
+            results[i] = _normalize(cached)
+            continue
+        _stats["bytes_raw"] += len(raw)
+        _stats["bytes_sent"] += len(data)
+        pending.append((i, data, media_type))
+
+    async def _run(batch):
+        try:
+            extracted = await _extract_batch([(d, m) for _, d, m in batch])
+        except Exception as e:
+            _stats["failures"] += 1
+            logger.warning(f"Vision batch of {len(batch)} slides failed: {e}")
+            extracted = None
+        if extracted is None:
+            # The request failed or its response was unusable; retrying
+            # every slide on its own would only multiply the failing calls
+            extracted = [None] * len(batch)
+        elif len(batch) > 1 and None in extracted:
+            # Parsed but short (truncated) response — retry the missing slides one by one
+            missing = [k for k, item in enumerate(extracted) if item is None]
+            retried = await asyncio.gather(
+                *[_extract_batch([(batch[k][1], batch[k][2])]) for k in missing],
+                return_exceptions=True,
+            )
+            for k, item in zip(missing, retried):
+                if not isinstance(item, Exception):
+                    extracted[k] = item[0]
+        for (i, _, _), item in zip(batch, extracted):
+            if item is None:
+                results[i] = dict(EMPTY_SLIDE)
+            else:
+                results[i] = item
+                _cache_put(keys[i], item)
+
+    if pending:
+        batches = _pack_batches(pending)
+        logger.info(
+            f"Vision: {len(pending)} slides in {len(batches)} batches "
+            f"({len(image_paths) - len(pending)} cached)"
+        )
+        await asyncio.gather(*[_run(b) for b in batches])
+
+    return results
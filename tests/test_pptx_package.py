@@ -0,0 +1,79 @@
+"""Round-trip tests for generate_slides.pptx_package: merged decks must open in python-pptx."""
+
+import io
+
+import pytest
+
+pptx = pytest.importorskip("pptx")
+Image = pytest.importorskip("PIL.Image")
+
+from pptx import Presentation
+from pptx.util import Inches
+
+from generate_slides import pptx_package
+from generate_slides.pptx_package import count_slides, merge_pptx_packages
+
+
+def _png(color) -> io.BytesIO:
+    buf = io.BytesIO()
+    Image.new("RGB", (64, 36), color).save(buf, "PNG")
+    buf.seek(0)
+    return buf
+
+
+def _deck(titles, color) -> bytes:
+    prs = Presentation()
+    for title in titles:
+        slide = prs.slides.add_slide(prs.slide_layouts[5])  # "Title Only"
+        slide.shapes.title.text = title
+        slide.shapes.add_picture(_png(color), Inches(1), Inches(2))
+        slide.notes_slide.notes_text_frame.text = f"notes for {title}"
+    buf = io.BytesIO()
+    prs.save(buf)
+    return buf.getvalue()
+
+
+def _merge(decks) -> Presentation:
+    out = io.BytesIO()
+    total = merge_pptx_packages(decks, out)
+    out.seek(0)
+    prs = Presentation(out)
+    assert total == len(prs.slides) == count_slides(out.getvalue())
+    return prs
+
+
+def _check_merged(prs):
+    titles = [slide.shapes.title.text for slide in prs.slides]
+    assert titles == ["A1", "A2", "B1", "C1", "C2"]
+    for slide in prs.slides:
+        assert slide.slide_layout.name == "Title Only"
+        pictures = [s for s in slide.shapes if s.shape_type == 13]  # MSO_SHAPE_TYPE.PICTURE
+        assert len(pictures) == 1
+        assert pictures[0].image.size == (64, 36)
+    # Appended slides' notes are dropped; the base deck keeps its own
+    assert prs.slides[0].has_notes_slide
+    assert not prs.slides[2].has_notes_slide
+
+
+def test_merged_deck_opens_in_python_pptx():
+    decks = [_deck(["A1", "A2"], "red"), _deck(["B1"], "red"), _deck(["C1", "C2"], "blue")]
+    prs = _merge(decks)
+    _check_merged(prs)
+    # The red image is identical in decks A and B and is stored once
+    blobs = {slide.shapes[1].image.sha1 for slide in prs.slides}
+    assert len(blobs) == 2
+
+
+def test_merge_without_zipfile_internals(monkeypatch):
+    monkeypatch.setattr(pptx_package, "_HAS_RAW_COPY_INTERNALS", False)
+    decks = [_deck(["A1", "A2"], "red"), _deck(["B1"], "red"), _deck(["C1", "C2"], "blue")]
+    _check_merged(_merge(decks))
+
+
+def test_merged_deck_can_be_edited_and_saved():
+    prs = _merge([_deck(["A1", "A2"], "red"), _deck(["B1"], "red"), _deck(["C1", "C2"], "blue")])
+    prs.slides.add_slide(prs.slide_layouts[6])
+    buf = io.BytesIO()
+    prs.save(buf)
+    buf.seek(0)
+    assert len(Presentation(buf).slides) == 6
@@ -7,8 +7,23 @@ status on rerun without blocking the UI.
 
 Thread safety: Python GIL ensures single-key dict mutations are atomic.
 The background thread writes to the job dict, the main thread reads on rerun.
+
+Every run_agent call inside a job streams events (session start, turns, tool
+calls, text sizes, token usage) into the job: readable lines are appended to
+job["progress_messages"] (capped at PROGRESS_MESSAGES_MAX), live sessions are
+tracked in job["agent_sessions"], per-phase latency/tokens are totalled in
+job["agent_phases"], and job["last_activity_at"] supports stall detection.
+
+With AGENT_JOB_BACKEND=queue, jobs whose function (and post_process) are
+importable module-level functions go to the durable queue in utils/job_queue.py
+instead and run in worker processes. The session dict then mirrors the queue
+row (refreshed by get_job), the job ID is kept in the URL query string so a
+browser refresh reattaches to it, and cancel_agent_job/retry_agent_job work.
+Closures still run on the thread backend.
 """
 
+import logging
+import os
 import threading
 import asyncio
 import sys
@@ -18,6 +33,14 @@ from typing import Callable, Any, Optional
 
 import streamlit as st
 
+from courseware_agents.base import agent_event_sink
+from utils import job_queue
+from utils.job_progress import make_event_sink, make_progress_callback, new_progress_state
+
+logger = logging.getLogger(__name__)
+
+AGENT_JOB_BACKEND = os.environ.get("AGENT_JOB_BACKEND", "thread")   # "thread" or "queue"
+
 # Fix for Windows: Streamlit/tornado switches to SelectorEventLoop which
 # doesn't support subprocess creation. Force ProactorEventLoop policy.
 if sys.platform == "win32":
@@ -30,11 +53,16 @@ def _run_in_thread(job: dict, async_fn: Callable, args: tuple, kwargs: dict,
     Target function for the background thread.
 
     Runs the async agent function via asyncio.run() (safe in a new thread
-    since there's no existing event loop). On completion, updates the mutable
-    job dict in-place. Optionally runs a sync post_process callback.
+    since there's no existing event loop), with agent events routed into the
+    job dict. On completion, updates the mutable job dict in-place.
+    Optionally runs a sync post_process callback.
     """
+    async def _run_with_events():
+        with agent_event_sink(make_event_sink(job)):
+            return await async_fn(*args, **kwargs)
+
     try:
-        result = asyncio.run(async_fn(*args, **kwargs))
+        result = asyncio.run(_run_with_events())
         job["result"] = result
         job["status"] = "completed"
         job["completed_at"] = datetime.now()
@@ -54,6 +82,43 @@ def _run_in_thread(job: dict, async_fn: Callable, args: tuple, kwargs: dict,
         job["completed_at"] = datetime.now()
 
 
+def _queue_status(status: str) -> str:
+    """Map a queue row status onto the runner's running/completed/failed."""
+    if status in job_queue.ACTIVE_STATUSES:
+        return "running"
+    return "completed" if status == "completed" else "failed"
+
+
+def _query_param_key(key: str) -> str:
+    return f"job_{key}"
+
+
+def _remember_job_id(key: str, job_id: Optional[str]):
+    """Keep a queue job ID in the URL so a browser refresh can reattach to it."""
+    try:
+        if job_id:
+            st.query_params[_query_param_key(key)] = job_id
+        else:
+            st.query_params.pop(_query_param_key(key), None)
+    except Exception:
+        pass  # No script run context (e.g. bare mode) — reattach is best-effort
+
+
+def _refresh_queue_job(job: dict) -> dict:
+    """Update a queue-backed session job dict in place from its queue row."""
+    if job.get("status") != "running" and job.get("queue_status"):
+        return job  # Finished rows do not change (until retried)
+    record = job_queue.get_job(job["job_id"], with_result=True)
+    if record is None:
+        job.update(status="failed", error="Job no longer exists in the queue",
+                   completed_at=datetime.now())
+        return job
+    job.update(record)
+    job["queue_status"] = record["status"]
+    job["status"] = _queue_status(record["status"])
+    return job
+
+
 def submit_agent_job(
     key: str,
     label: str,
@@ -61,6 +126,7 @@ def submit_agent_job(
     args: tuple = (),
     kwargs: dict = None,
     post_process: Optional[Callable] = None,
+    progress_kwarg: Optional[str] = None,
 ) -> Optional[dict]:
     """
     Submit a background agent job. Returns the job dict immediately.
@@ -75,16 +141,18 @@ def submit_agent_job(
         kwargs: Keyword arguments for the agent function
         post_process: Optional sync callback that receives the agent result
                       and returns a dict of additional results to store
+        progress_kwarg: If set, a progress_callback(message, pct) writing into
+                        job["progress_messages"] is passed under this keyword
     """
     if kwargs is None:
         kwargs = {}
 
     session_key = f"agent_job_{key}"
 
-    existing = st.session_state.get(session_key)
+    existing = get_job(key)
     if existing and existing.get("status") == "running":
         thread = existing.get("thread")
-        if thread and thread.is_alive():
+        if existing.get("job_id") or (thread and thread.is_alive()):
             return None
 
     job = {
@@ -99,8 +167,29 @@ def submit_agent_job(
         "post_results": None,
         "post_error": None,
         "thread": None,
-        "progress_messages": [],  # List of (message, pct) tuples from background thread
+        "job_id": None,
+        **new_progress_state(),
     }
+
+    if AGENT_JOB_BACKEND == "queue" and job_queue.function_ref(async_fn) and (
+        post_process is None or job_queue.function_ref(post_process)
+    ):
+        try:
+            job["job_id"] = job_queue.enqueue(
+                key, label, async_fn, args, kwargs,
+                post_process=post_process, progress_kwarg=progress_kwarg,
+            )
+        except ValueError as e:
+            job["job_id"] = None  # Unpicklable arguments — run on a thread instead
+            logger.warning(f"{key}: queue backend unavailable ({e}) — running on a thread")
+        else:
+            job_queue.ensure_workers()
+            st.session_state[session_key] = job
+            _remember_job_id(key, job["job_id"])
+            return job
+
+    if progress_kwarg:
+        kwargs = {**kwargs, progress_kwarg: make_progress_callback(job)}
     st.session_state[session_key] = job
 
     thread = threading.Thread(
@@ -116,16 +205,42 @@ def submit_agent_job(
 
 
 def get_job(key: str) -> Optional[dict]:
-    """Get the current job dict for a key, or None."""
-    return st.session_state.get(f"agent_job_{key}")
+    """Get the current job dict for a key, or None.
+
+    Queue-backed jobs are refreshed from the queue; after a browser refresh
+    they are reattached from the job ID in the URL.
+    """
+    session_key = f"agent_job_{key}"
+    job = st.session_state.get(session_key)
+    if job is None:
+        try:
+            job_id = st.query_params.get(_query_param_key(key))
+        except Exception:
+            job_id = None
+        if not job_id:
+            return None
+        job = {"key": key, "job_id": job_id, "thread": None, "status": "running"}
+        st.session_state[session_key] = job
+    if job.get("job_id"):
+        _refresh_queue_job(job)
+    return job
+
+
+def get_job_idle_seconds(job: dict) -> float:
+    """Seconds since the job's last agent event (or start). Large values suggest a stall."""
+    return (datetime.now() - job.get("last_activity_at", job["started_at"])).total_seconds()
 
 
 def get_all_running_jobs() -> list:
-    """Return all currently running agent jobs, with thread health check."""
+    """Return all currently running agent jobs, with thread/queue health check."""
     running = []
-    for k, v in st.session_state.items():
+    for k, v in list(st.session_state.items()):
         if k.startswith("agent_job_") and isinstance(v, dict):
             if v.get("status") == "running":
+                if v.get("job_id"):
+                    if _refresh_queue_job(v)["status"] == "running":
+                        running.append(v)
+                    continue
                 thread = v.get("thread")
                 if thread and thread.is_alive():
                     running.append(v)
@@ -136,8 +251,28 @@ def get_all_running_jobs() -> list:
     return running
 
 
+def cancel_agent_job(key: str) -> bool:
+    """Cancel a queue-backed job (thread jobs cannot be cancelled)."""
+    job = get_job(key)
+    if not job or not job.get("job_id"):
+        return False
+    return job_queue.cancel_job(job["job_id"])
+
+
+def retry_agent_job(key: str) -> bool:
+    """Re-queue a failed or cancelled queue-backed job with its original arguments."""
+    job = get_job(key)
+    if not job or not job.get("job_id") or not job_queue.retry_job(job["job_id"]):
+        return False
+    job["status"] = "running"
+    job_queue.ensure_workers()
+    _refresh_queue_job(job)
+    return True
+
+
 def clear_job(key: str):
     """Remove a completed/failed job from session state."""
     session_key = f"agent_job_{key}"
     if session_key in st.session_state:
         del st.session_state[session_key]
+    _remember_job_id(key, None)
@@ -7,7 +7,11 @@ Uses st.fragment for non-blocking auto-refresh (no time.sleep blocking).
 
 import streamlit as st
 from datetime import datetime, timedelta
-from utils.agent_runner import get_all_running_jobs, get_job
+from utils.agent_runner import (
+    cancel_agent_job, get_all_running_jobs, get_job, get_job_idle_seconds, retry_agent_job,
+)
+
+AGENT_STALL_WARNING_SECONDS = 180   # No agent events for this long → show a stall warning
 
 
 def render_sidebar_agent_status():
@@ -29,14 +33,51 @@ def render_sidebar_agent_status():
 
     for job in running_jobs:
         elapsed = (datetime.now() - job["started_at"]).seconds
+        idle = get_job_idle_seconds(job)
+        idle_note = f", idle {idle:.0f}s" if idle >= AGENT_STALL_WARNING_SECONDS else ""
         st.markdown(
             f"<div style='font-size: 0.8rem; color: #ff9800; padding: 2px 0;'>"
-            f"&#9881; {job['label']} ({elapsed}s)"
+            f"&#9881; {job['label']} ({elapsed}s{idle_note})"
             f"</div>",
             unsafe_allow_html=True,
         )
 
 
+def _render_agent_activity(job: dict):
+    """Live agent sessions plus a stall warning when no events have arrived."""
+    sessions = list(job.get("agent_sessions", {}).items())
+    if sessions:
+        lines = []
+        for session_id, s in sessions[:8]:
+            phase = f"{s['phase']} · " if s.get("phase") else ""
+            tool = f", {s['tool']}" if s.get("tool") else ""
+            items = f", {s['items']} items" if s.get("items") else ""
+            lines.append(
+                f"agent {session_id}: {phase}{s['model']} — turn {s['turn']}{tool}, "
+                f"{s['chars']} chars{items}"
+            )
+        st.caption("  \n".join(lines))
+
+    idle = get_job_idle_seconds(job)
+    if idle >= AGENT_STALL_WARNING_SECONDS:
+        st.warning(f"No agent activity for {idle:.0f}s — the job may be stalled.")
+
+
+def _render_phase_breakdown(job: dict):
+    """Per-phase agent latency/token totals for a finished job."""
+    phases = job.get("agent_phases") or {}
+    if not phases:
+        return
+    with st.expander("Agent timing by phase"):
+        for name, p in phases.items():
+            st.text(
+                f"{name}: {p['sessions']} sessions ({p['cache_hits']} cached), "
+                f"{p['seconds']:.0f}s agent time, "
+                f"{p['input_tokens']:,} in / {p['output_tokens']:,} out tokens"
+                + (f", ${p['cost_usd']:.2f}" if p["cost_usd"] else "")
+            )
+
+
 def render_page_job_status(key: str, on_complete=None, running_message="Agent is processing..."):
     """
     Render job status on a page and handle completion.
@@ -69,7 +110,17 @@ def render_page_job_status(key: str, on_complete=None, running_message="Agent is
                 st.rerun(scope="app")
                 return
             elapsed = (datetime.now() - _job["started_at"]).seconds
-            st.info(f"{running_message} (elapsed: {elapsed}s)")
+            if _job.get("queue_status") == "queued":
+                st.info(f"{_job['label']} is queued — waiting for a free worker (elapsed: {elapsed}s)")
+            else:
+                st.info(f"{running_message} (elapsed: {elapsed}s)")
+            _render_agent_activity(_job)
+            if _job.get("job_id"):
+                if _job.get("cancel_requested"):
+                    st.caption("Cancelling...")
+                elif st.button("Cancel", key=f"cancel_job_{key}"):
+                    cancel_agent_job(key)
+                    st.rerun(scope="fragment")
             st.caption("You can navigate to other pages. Results will be ready when you return.")
 
         _status_fragment()
@@ -82,6 +133,8 @@ def render_page_job_status(key: str, on_complete=None, running_message="Agent is
         if job.get("post_error"):
             st.warning(f"Post-processing warning: {job['post_error']}")
 
+        _render_phase_breakdown(job)
+
         if on_complete:
             on_complete(job)
 
@@ -94,6 +147,10 @@ def render_page_job_status(key: str, on_complete=None, running_message="Agent is
             with st.expander("Error Details"):
                 st.code(job["traceback"])
 
+        if job.get("job_id") and st.button("Retry", key=f"retry_job_{key}"):
+            if retry_agent_job(key):
+                st.rerun()
+
         return "failed"
 
     return "none"
@@ -0,0 +1,254 @@
+"""Fuzz and benchmark the shared JSON extractor (utils.json_stream).
+
+Corpus: real agent outputs from the agent response cache (.output/agent_cache),
+any .json/.txt files in an optional directory, plus built-in samples shaped
+like the research, content-block, CP and batch-vision outputs.
+
+Fuzz cases per sample (each checked against the clean parse):
+  wrapped   : prose and/or ```json fences around the value
+  control   : escaped newlines/tabs inside strings replaced by raw characters
+  commas    : trailing commas before closing brackets
+  chunked   : fed to JSONStreamParser in random-size chunks
+  truncated : cut at a random point; partial=True must return a prefix of the
+              original (complete leading elements only) and never raise
+
+Benchmark: legacy parsers (direct parse → fence regex → brace matching, plus
+the char-by-char control-char repair) vs extract_json on the same inputs.
+
+Usage:
+    uv run python -m utils.bench_json_stream [corpus_dir] [fuzz_rounds]
+"""
+import glob
+import json
+import os
+import random
+import re
+import sys
+import time
+
+from utils.json_stream import JSONStreamParser, extract_json
+
+AGENT_CACHE_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), ".output", "agent_cache"
+)
+
+
+# ---------------------------------------------------------------------------
+# Legacy reference (the parsers this module replaced)
+# ---------------------------------------------------------------------------
+
+def _legacy_extract(text: str):
+    try:
+        return json.loads(text.strip())
+    except json.JSONDecodeError:
+        pass
+    json_match = re.search(r'```(?:json)?\s*\n(.*?)\n```', text, re.DOTALL)
+    if json_match:
+        try:
+            return json.loads(json_match.group(1).strip())
+        except json.JSONDecodeError:
+            pass
+    brace_start = text.find('{')
+    if brace_start != -1:
+        depth = 0
+        for i in range(brace_start, len(text)):
+            if text[i] == '{':
+                depth += 1
+            elif text[i] == '}':
+                depth -= 1
+                if depth == 0:
+                    try:
+                        return json.loads(text[brace_start:i + 1])
+                    except json.JSONDecodeError:
+                        break
+    # parse_json_content's control-character repair pass
+    first, last = text.find('{'), text.rfind('}')
+    if first == -1 or last <= first:
+        return None
+    fixed, in_string, escape_next = [], False, False
+    for char in text[first:last + 1]:
+        if escape_next:
+            fixed.append(char)
+            escape_next = False
+        elif char == '\\':
+            fixed.append(char)
+            escape_next = True
+        elif char == '"':
+            in_string = not in_string
+            fixed.append(char)
+        elif in_string and char in '\n\r\t':
+            fixed.append({'\n': '\\n', '\r': '\\r', '\t': '\\t'}[char])
+        else:
+            fixed.append(char)
+    try:
+        return json.loads(''.join(fixed))
+    except json.JSONDecodeError:
+        return None
+
+
+# ---------------------------------------------------------------------------
+# Corpus
+# ---------------------------------------------------------------------------
+
+def _builtin_samples(rng: random.Random) -> list:
+    words = ("data protection governance risk framework policy agile scrum sprint "
+             "backlog stakeholder compliance audit control metric").split()
+
+    def phrase(n):
+        return " ".join(rng.choice(words) for _ in range(n)).capitalize()
+
+    research = {
+        "topic": phrase(3),
+        "search_queries_used": [phrase(4), phrase(4)],
+        "sources": [{"url": f"https://example.org/{i}", "title": phrase(5), "type": "article",
+                     "key_findings": [phrase(12) for _ in range(3)], "relevance_score": 0.9,
+                     "date": "2024"} for i in range(5)],
+        "summary": "\n\n".join(phrase(60) for _ in range(3)),
+        "key_statistics": [{"stat": f"{rng.randint(1, 99)}% {phrase(6)}", "source": "Survey 2024",
+                            "chart_type": "pie"} for _ in range(4)],
+        "infographic_data": {"chart_data": [{"label": phrase(2), "value": rng.randint(1, 99)}
+                                            for _ in range(4)],
+                             "process_steps": [f"Step {i}: {phrase(3)}" for i in range(1, 5)]},
+    }
+    content = {"content_blocks": [{"sub_title": phrase(4), "visualization_type": "process",
+                                   "data": {"title": phrase(3), "desc": phrase(10),
+                                            "items": [{"label": phrase(2), "desc": phrase(8)}
+                                                      for _ in range(4)]}}
+                                  for _ in range(6)]}
+    slides = [{"title": phrase(4), "bullets": [phrase(10) for _ in range(5)], "layout": "text-full",
+               "is_section_header": False, "has_diagram": rng.random() < 0.3} for _ in range(10)]
+    cp = {"Course_Title": phrase(5), "Learning_Units": [
+        {"LU_Title": phrase(4), "Topics": [{"Topic_Title": phrase(3),
+                                            "Bullet_Points": [phrase(7) for _ in range(4)]}
+                                           for _ in range(3)]} for _ in range(4)]}
+    return [json.dumps(v, indent=2) for v in (research, content, cp)] + [json.dumps(slides)]
+
+
+def _load_corpus(corpus_dir: str, rng: random.Random) -> list:
+    texts = []
+    for path in glob.glob(os.path.join(AGENT_CACHE_DIR, "*.json")):
+        try:
+            with open(path, encoding="utf-8") as f:
+                result = json.load(f).get("result", "")
+        except (OSError, ValueError):
+            continue
+        if extract_json(result) is not None:
+            texts.append(result)
+    if corpus_dir:
+        for path in glob.glob(os.path.join(corpus_dir, "*.json")) + glob.glob(os.path.join(corpus_dir, "*.txt")):
+            with open(path, encoding="utf-8") as f:
+                texts.append(f.read())
+    real = len(texts)
+    texts += _builtin_samples(rng)
+    print(f"Corpus: {real} real agent outputs, {len(texts) - real} built-in samples")
+    return texts
+
+
+# ---------------------------------------------------------------------------
+# Fuzzing
+# ---------------------------------------------------------------------------
+
+def _is_prefix(partial, original) -> bool:
+    """partial keeps only complete leading elements of original (last may itself be partial)."""
+    if isinstance(original, list):
+        if not isinstance(partial, list) or len(partial) > len(original):
+            return False
+        if not partial:
+            return True
+        return (partial[:-1] == original[:len(partial) - 1]
+                and _is_prefix(partial[-1], original[len(partial) - 1]))
+    if isinstance(original, dict):
+        if not isinstance(partial, dict) or not set(partial) <= set(original):
+            return False
+        return all(partial[k] == original[k] or _is_prefix(partial[k], original[k]) for k in partial)
+    return partial == original
+
+
+def _mutations(clean: str, rng: random.Random):
+    fence = rng.choice(["```json\n{}\n```", "```\n{}\n```", "{}"])
+    yield "wrapped", f"Here is the result [see notes]:\n{fence.replace('{}', clean, 1)}\nDone."
+    yield "control", re.sub(r'\\[nt]', lambda m: "\n" if m.group() == "\\n" else "\t", clean)
+    yield "commas", re.sub(r'(["\d\]}])(\s*[\]}])', r'\1,\2', clean, count=5)
+
+
+def fuzz(texts: list, rounds: int, rng: random.Random) -> dict:
+    counts = {}
+
+    def record(kind, ok):
+        passed, total = counts.get(kind, (0, 0))
+        counts[kind] = (passed + ok, total + 1)
+
+    for text in texts:
+        value = extract_json(text)
+        clean = json.dumps(value, indent=rng.choice([None, 2]))
+        opener = clean[0]
+        for _ in range(rounds):
+            for kind, mutated in _mutations(clean, rng):
+                record(kind, extract_json(mutated) == value)
+
+            parser = JSONStreamParser()
+            pos = 0
+            while pos < len(text):
+                step = rng.randint(1, 64)
+                parser.feed(text[pos:pos + step])
+                pos += step
+            record("chunked", parser.result() == value)
+
+            cut = rng.randint(1, len(clean) - 1)
+            try:
+                partial = extract_json(clean[:cut], opener=opener, partial=True)
+                record("truncated", partial is None or _is_prefix(partial, value))
+            except Exception:
+                record("truncated", False)
+    return counts
+
+
+# ---------------------------------------------------------------------------
+# Benchmark
+# ---------------------------------------------------------------------------
+
+def _time(fn, inputs: list, repeat: int = 20) -> float:
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        for text in inputs:
+            fn(text)
+    return (time.perf_counter() - t0) / (repeat * len(inputs)) * 1e6
+
+
+def bench(texts: list, rng: random.Random):
+    values = [extract_json(t) for t in texts]
+    objects = [json.dumps(v, indent=2) for v in values if isinstance(v, dict)]
+    variants = {
+        "clean": objects,
+        "fenced+prose": [f"Sure! Here it is:\n```json\n{t}\n```\nLet me know." for t in objects],
+        "control chars": [re.sub(r'\\n', "\n", json.dumps(v)) for v in values if isinstance(v, dict)],
+        "truncated": [t[:int(len(t) * 0.8)] for t in objects],
+    }
+    print(f"\n{'input':<15} {'legacy':>10} {'extract':>10} {'speedup':>8} {'recovered':>10}")
+    for name, inputs in variants.items():
+        legacy = _time(_legacy_extract, inputs)
+        new = _time(lambda t: extract_json(t, opener="{", partial=True), inputs)
+        recovered = sum(extract_json(t, opener="{", partial=True) is not None for t in inputs)
+        legacy_ok = sum(_legacy_extract(t) is not None for t in inputs)
+        print(f"{name:<15} {legacy:>8.0f}us {new:>8.0f}us {legacy / new:>7.1f}x "
+              f"{recovered:>4}/{len(inputs)} (legacy {legacy_ok})")
+
+
+def main():
+    corpus_dir = sys.argv[1] if len(sys.argv) > 1 else ""
+    rounds = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+    rng = random.Random(0)
+
+    texts = _load_corpus(corpus_dir, rng)
+    counts = fuzz(texts, rounds, rng)
+    failures = 0
+    print(f"\n{'fuzz case':<12} {'passed':>12}")
+    for kind, (passed, total) in counts.items():
+        failures += total - passed
+        print(f"{kind:<12} {passed:>6}/{total:<6}")
+    bench(texts, rng)
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""
+Job Progress Bookkeeping
+
+Shared by the in-process thread runner (utils/agent_runner.py) and the queue
+worker processes (utils/job_queue.py), so it has no Streamlit import.
+
+A job's progress state lives in plain dict keys:
+- progress_messages: (message, pct) lines, capped at PROGRESS_MESSAGES_MAX
+- agent_sessions: live run_agent sessions (model/phase/turn/tool/chars/items)
+- agent_phases: per-phase totals (sessions, cache hits, seconds, tokens, cost)
+- last_activity_at: time of the last agent event or progress line
+"""
+
+import logging
+from datetime import datetime
+from typing import Callable
+
+logger = logging.getLogger(__name__)
+
+PROGRESS_MESSAGES_MAX = 200   # Oldest progress lines are dropped beyond this
+
+
+def new_progress_state() -> dict:
+    """Initial progress keys for a job dict."""
+    return {
+        "progress_messages": [],  # List of (message, pct) tuples from the job
+        "last_activity_at": datetime.now(),  # Last agent event — for stall detection
+        "agent_sessions": {},     # Live run_agent sessions: id -> model/phase/turn/tool/chars
+        "agent_phases": {},       # Per-phase totals: sessions, seconds, tokens, cost
+    }
+
+
+def append_progress(job: dict, message: str, pct=None):
+    """Append a (message, pct) line to the job, keeping at most PROGRESS_MESSAGES_MAX."""
+    messages = job["progress_messages"]
+    messages.append((message, pct))
+    if len(messages) > PROGRESS_MESSAGES_MAX:
+        del messages[:len(messages) - PROGRESS_MESSAGES_MAX]
+
+
+def make_progress_callback(job: dict) -> Callable:
+    """progress_callback(message, pct) for pipeline functions, writing into the job."""
+
+    def _progress(message: str, pct=None):
+        job["last_activity_at"] = datetime.now()
+        append_progress(job, message, pct)
+        logger.info(f"[PROGRESS] {message}")
+
+    return _progress
+
+
+def make_event_sink(job: dict) -> Callable[[dict], None]:
+    """Build the run_agent event sink that publishes into a job dict."""
+
+    def _sink(event: dict):
+        job["last_activity_at"] = datetime.now()
+        session = event["session"]
+        label = f"[agent {session}{' · ' + event['phase'] if event['phase'] else ''}]"
+        kind = event["type"]
+        sessions = job["agent_sessions"]
+
+        if kind in ("start", "cache_hit"):
+            phase = job["agent_phases"].setdefault(event["phase"] or "agent", {
+                "sessions": 0, "cache_hits": 0, "seconds": 0.0,
+                "input_tokens": 0, "output_tokens": 0, "cost_usd": 0.0,
+            })
+            if kind == "cache_hit":
+                phase["cache_hits"] += 1
+                return
+            if event["attempt"] == 1:
+                phase["sessions"] += 1
+            sessions[session] = {
+                "model": event["model"], "phase": event["phase"], "turn": 0,
+                "tool": None, "chars": 0, "items": 0, "started_at": datetime.now(),
+            }
+            wait = f", queued {event['wait']:.0f}s" if event["wait"] >= 1 else ""
+            append_progress(job, f"{label} started ({event['model']}{wait})")
+            return
+
+        state = sessions.get(session)
+        if state is None:
+            return
+        if kind == "turn":
+            state["turn"] = event["turn"]
+        elif kind == "tool_call":
+            state["tool"] = event["tool"]
+            append_progress(job, f"{label} turn {state['turn']}: {event['tool']}")
+        elif kind == "text":
+            state["chars"] = event["chars"]
+            state["items"] = event["items"]
+        elif kind == "usage":
+            phase = job["agent_phases"][event["phase"] or "agent"]
+            phase["input_tokens"] += event["input_tokens"] or 0
+            phase["output_tokens"] += event["output_tokens"] or 0
+            phase["cost_usd"] += event["cost_usd"] or 0.0
+        elif kind == "rate_limited":
+            append_progress(job, f"{label} rate-limited — retrying after {event['backoff']:.0f}s")
+        elif kind == "end":
+            sessions.pop(session, None)
+            job["agent_phases"][event["phase"] or "agent"]["seconds"] += event["elapsed"]
+            append_progress(job, f"{label} {event['status']} in {event['elapsed']:.0f}s")
+
+    return _sink
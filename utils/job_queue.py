@@ -0,0 +1,514 @@
+"""
+Durable Agent Job Queue — SQLite-backed queue run by a worker process pool
+
+Optional backend for utils/agent_runner.py (AGENT_JOB_BACKEND=queue). Jobs are
+rows in .output/job_queue/jobs.db and are executed by separate worker
+processes, so a browser refresh or a Streamlit restart does not lose a running
+job, and several users' jobs run in parallel without sharing the Streamlit
+process's GIL.
+
+- A job is an importable async function ("module:qualname") plus pickled
+  args/kwargs. With progress_kwarg set, the worker passes a progress callback
+  under that keyword argument.
+- Progress (messages, live agent sessions, per-phase totals) is flushed to the
+  row with each heartbeat; results are stored on the row (pickled).
+- cancel_job() flags the row and the worker cancels the running task;
+  retry_job() re-queues a failed or cancelled job.
+- Jobs whose worker died (stale heartbeat) are re-queued automatically, up to
+  the job's max_attempts runs.
+
+Kept free of Streamlit imports so worker processes start quickly.
+
+Usage:
+    uv run python -m utils.job_queue [workers]      # run a worker pool
+
+    job_id = enqueue("extract_course_info", "Extract Course Info", interpret_cp, kwargs={...})
+    job = get_job(job_id)                            # status, progress, result...
+"""
+
+import asyncio
+import importlib
+import json
+import logging
+import multiprocessing
+import os
+import pickle
+import signal
+import socket
+import sqlite3
+import subprocess
+import sys
+import threading
+import time
+import traceback
+import uuid
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Callable, Optional
+
+from utils.job_progress import make_event_sink, make_progress_callback, new_progress_state
+
+logger = logging.getLogger(__name__)
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+JOB_QUEUE_DIR = os.path.join(PROJECT_ROOT, ".output", "job_queue")
+JOB_QUEUE_DB = os.path.join(JOB_QUEUE_DIR, "jobs.db")
+JOB_WORKER_LOG = os.path.join(JOB_QUEUE_DIR, "worker.log")
+
+AGENT_JOB_WORKERS = int(os.environ.get("AGENT_JOB_WORKERS", "2"))
+JOB_MAX_ATTEMPTS = 3           # Runs per job, counting re-runs after a worker died
+JOB_POLL_SECONDS = 1.0         # Idle worker poll interval
+JOB_HEARTBEAT_SECONDS = 3.0    # Progress flush + heartbeat interval
+JOB_STALE_SECONDS = 60         # Running job/worker without a heartbeat this long is dead
+WORKER_SPAWN_COOLDOWN = 30     # Min seconds between auto-spawned worker pools
+
+ACTIVE_STATUSES = ("queued", "running")
+
+
+# ---------------------------------------------------------------------------
+# Storage
+# ---------------------------------------------------------------------------
+
+@contextmanager
+def _connect():
+    os.makedirs(JOB_QUEUE_DIR, exist_ok=True)
+    conn = sqlite3.connect(JOB_QUEUE_DB, timeout=30, isolation_level=None)
+    conn.row_factory = sqlite3.Row
+    try:
+        _ensure_schema(conn)
+        yield conn
+    finally:
+        conn.close()
+
+
+def _ensure_schema(conn: sqlite3.Connection) -> None:
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS jobs (
+            id TEXT PRIMARY KEY,
+            key TEXT NOT NULL,
+            label TEXT NOT NULL,
+            fn TEXT NOT NULL,
+            payload BLOB NOT NULL,
+            post_process TEXT,
+            progress_kwarg TEXT,
+            status TEXT NOT NULL,
+            attempts INTEGER NOT NULL DEFAULT 0,
+            max_attempts INTEGER NOT NULL,
+            cancel_requested INTEGER NOT NULL DEFAULT 0,
+            worker TEXT,
+            created_at REAL NOT NULL,
+            started_at REAL,
+            completed_at REAL,
+            heartbeat_at REAL,
+            progress TEXT,
+            result BLOB,
+            post_results BLOB,
+            post_error TEXT,
+            error TEXT,
+            traceback TEXT
+        )
+    """)
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs(status, created_at)")
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS workers (
+            name TEXT PRIMARY KEY,
+            pid INTEGER NOT NULL,
+            host TEXT NOT NULL,
+            started_at REAL NOT NULL,
+            heartbeat_at REAL NOT NULL
+        )
+    """)
+    conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value REAL)")
+
+
+def function_ref(fn: Callable) -> Optional[str]:
+    """Return "module:qualname" for a module-level function, or None (closures, lambdas)."""
+    module = getattr(fn, "__module__", None)
+    qualname = getattr(fn, "__qualname__", "")
+    if not module or not qualname or "<" in qualname or module == "__main__":
+        return None
+    try:
+        if _resolve(f"{module}:{qualname}") is not fn:
+            return None
+    except (ImportError, AttributeError):
+        return None
+    return f"{module}:{qualname}"
+
+
+def _resolve(ref: str) -> Callable:
+    module_name, qualname = ref.split(":", 1)
+    obj = importlib.import_module(module_name)
+    for part in qualname.split("."):
+        obj = getattr(obj, part)
+    return obj
+
+
+def _to_datetime(ts: Optional[float]) -> Optional[datetime]:
+    return datetime.fromtimestamp(ts) if ts else None
+
+
+def _dump_progress(state: dict) -> str:
+    return json.dumps(
+        {k: state[k] for k in ("progress_messages", "agent_sessions", "agent_phases", "last_activity_at")},
+        default=lambda o: o.timestamp() if isinstance(o, datetime) else str(o),
+        ensure_ascii=False,
+    )
+
+
+def _load_progress(text: Optional[str]) -> dict:
+    state = new_progress_state()
+    if text:
+        data = json.loads(text)
+        state["progress_messages"] = [tuple(m) for m in data.get("progress_messages", [])]
+        state["agent_sessions"] = data.get("agent_sessions", {})
+        state["agent_phases"] = data.get("agent_phases", {})
+        state["last_activity_at"] = _to_datetime(data.get("last_activity_at")) or state["last_activity_at"]
+    return state
+
+
+# ---------------------------------------------------------------------------
+# Client API (used by the Streamlit process)
+# ---------------------------------------------------------------------------
+
+def enqueue(
+    key: str,
+    label: str,
+    async_fn: Callable,
+    args: tuple = (),
+    kwargs: dict = None,
+    post_process: Optional[Callable] = None,
+    progress_kwarg: Optional[str] = None,
+    max_attempts: int = JOB_MAX_ATTEMPTS,
+) -> str:
+    """Persist a job for the worker pool. Returns the job ID.
+
+    Raises:
+        ValueError: If async_fn or post_process is not an importable
+            module-level function, or the arguments cannot be pickled.
+    """
+    fn_ref = function_ref(async_fn)
+    if fn_ref is None:
+        raise ValueError(f"{async_fn!r} is not an importable module-level function")
+    post_ref = None
+    if post_process is not None:
+        post_ref = function_ref(post_process)
+        if post_ref is None:
+            raise ValueError(f"{post_process!r} is not an importable module-level function")
+    try:
+        payload = pickle.dumps((tuple(args), dict(kwargs or {})))
+    except Exception as e:
+        raise ValueError(f"Job arguments cannot be pickled: {e}") from e
+
+    job_id = uuid.uuid4().hex
+    with _connect() as conn:
+        conn.execute(
+            "INSERT INTO jobs (id, key, label, fn, payload, post_process, progress_kwarg, "
+            "status, max_attempts, created_at, progress) VALUES (?, ?, ?, ?, ?, ?, ?, 'queued', ?, ?, ?)",
+            (job_id, key, label, fn_ref, payload, post_ref, progress_kwarg, max_attempts,
+             time.time(), _dump_progress(new_progress_state())),
+        )
+    return job_id
+
+
+def get_job(job_id: str, with_result: bool = True) -> Optional[dict]:
+    """Load a job row as a dict shaped like agent_runner's thread jobs, or None."""
+    with _connect() as conn:
+        row = conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+    if row is None:
+        return None
+    job = {
+        "job_id": row["id"],
+        "key": row["key"],
+        "label": row["label"],
+        "status": row["status"],
+        "attempts": row["attempts"],
+        "max_attempts": row["max_attempts"],
+        "cancel_requested": bool(row["cancel_requested"]),
+        "created_at": _to_datetime(row["created_at"]),
+        "started_at": _to_datetime(row["started_at"] or row["created_at"]),
+        "completed_at": _to_datetime(row["completed_at"]),
+        "error": row["error"],
+        "traceback": row["traceback"],
+        "post_error": row["post_error"],
+        "result": None,
+        "post_results": None,
+        **_load_progress(row["progress"]),
+    }
+    if with_result and row["status"] == "completed":
+        job["result"] = pickle.loads(row["result"]) if row["result"] else None
+        job["post_results"] = pickle.loads(row["post_results"]) if row["post_results"] else None
+    return job
+
+
+def cancel_job(job_id: str) -> bool:
+    """Cancel a queued job, or ask the worker to cancel a running one."""
+    now = time.time()
+    with _connect() as conn:
+        cur = conn.execute(
+            "UPDATE jobs SET status = 'cancelled', completed_at = ?, error = 'Cancelled' "
+            "WHERE id = ? AND status = 'queued'", (now, job_id),
+        )
+        if cur.rowcount:
+            return True
+        cur = conn.execute(
+            "UPDATE jobs SET cancel_requested = 1 WHERE id = ? AND status = 'running'", (job_id,),
+        )
+        return bool(cur.rowcount)
+
+
+def retry_job(job_id: str) -> bool:
+    """Re-queue a failed or cancelled job with its original arguments."""
+    with _connect() as conn:
+        cur = conn.execute(
+            "UPDATE jobs SET status = 'queued', attempts = 0, cancel_requested = 0, worker = NULL, "
+            "started_at = NULL, completed_at = NULL, heartbeat_at = NULL, result = NULL, "
+            "post_results = NULL, post_error = NULL, error = NULL, traceback = NULL, progress = ?, "
+            "created_at = ? WHERE id = ? AND status IN ('failed', 'cancelled')",
+            (_dump_progress(new_progress_state()), time.time(), job_id),
+        )
+        return bool(cur.rowcount)
+
+
+def workers_alive() -> int:
+    """Number of worker processes with a recent heartbeat."""
+    with _connect() as conn:
+        return conn.execute(
+            "SELECT COUNT(*) FROM workers WHERE heartbeat_at >= ?",
+            (time.time() - JOB_STALE_SECONDS,),
+        ).fetchone()[0]
+
+
+def ensure_workers(workers: int = AGENT_JOB_WORKERS) -> bool:
+    """Start a detached worker pool if none is alive. Returns True if one was spawned."""
+    if workers_alive():
+        return False
+    now = time.time()
+    with _connect() as conn:
+        conn.execute("BEGIN IMMEDIATE")
+        row = conn.execute("SELECT value FROM meta WHERE key = 'spawned_at'").fetchone()
+        if row and now - row["value"] < WORKER_SPAWN_COOLDOWN:
+            conn.execute("COMMIT")
+            return False
+        conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('spawned_at', ?)", (now,))
+        conn.execute("COMMIT")
+
+    log = open(JOB_WORKER_LOG, "ab")
+    subprocess.Popen(
+        [sys.executable, "-m", "utils.job_queue", str(workers)],
+        cwd=PROJECT_ROOT,
+        stdout=log,
+        stderr=subprocess.STDOUT,
+        stdin=subprocess.DEVNULL,
+        start_new_session=os.name != "nt",
+    )
+    log.close()
+    logger.info(f"Started job worker pool ({workers} workers)")
+    return True
+
+
+# ---------------------------------------------------------------------------
+# Worker side
+# ---------------------------------------------------------------------------
+
+def _recover_stale(conn: sqlite3.Connection) -> None:
+    """Re-queue (or fail) running jobs whose worker stopped heartbeating."""
+    cutoff = time.time() - JOB_STALE_SECONDS
+    conn.execute(
+        "UPDATE jobs SET status = 'queued', worker = NULL "
+        "WHERE status = 'running' AND heartbeat_at < ? AND attempts < max_attempts "
+        "AND cancel_requested = 0",
+        (cutoff,),
+    )
+    conn.execute(
+        "UPDATE jobs SET status = 'failed', completed_at = ?, "
+        "error = 'Worker stopped responding (job abandoned)' "
+        "WHERE status = 'running' AND heartbeat_at < ?",
+        (time.time(), cutoff),
+    )
+    conn.execute("DELETE FROM workers WHERE heartbeat_at < ?", (cutoff,))
+
+
+def _claim(worker: str) -> Optional[sqlite3.Row]:
+    now = time.time()
+    with _connect() as conn:
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute("UPDATE workers SET heartbeat_at = ? WHERE name = ?", (now, worker))
+            _recover_stale(conn)
+            row = conn.execute(
+                "SELECT * FROM jobs WHERE status = 'queued' ORDER BY created_at LIMIT 1"
+            ).fetchone()
+            if row is not None:
+                conn.execute(
+                    "UPDATE jobs SET status = 'running', worker = ?, attempts = attempts + 1, "
+                    "started_at = ?, heartbeat_at = ? WHERE id = ?",
+                    (worker, now, now, row["id"]),
+                )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+    return row
+
+
+class _Heartbeat(threading.Thread):
+    """Flushes progress + heartbeat for a running job; relays cancel requests.
+
+    A thread rather than a task so long synchronous steps inside the job
+    (e.g. PPTX building) do not starve the heartbeat.
+    """
+
+    def __init__(self, job_id: str, worker: str, state: dict):
+        super().__init__(daemon=True, name=f"heartbeat-{job_id[:8]}")
+        self.job_id = job_id
+        self.worker = worker
+        self.state = state
+        self.stop_event = threading.Event()
+        self.loop = None
+        self.task = None
+
+    def flush(self) -> bool:
+        """Write progress and heartbeat. Returns True if cancellation was requested."""
+        try:
+            progress = _dump_progress(self.state)
+        except RuntimeError:
+            progress = None  # Dict changed mid-dump — next tick
+        now = time.time()
+        with _connect() as conn:
+            if progress is None:
+                conn.execute("UPDATE jobs SET heartbeat_at = ? WHERE id = ?", (now, self.job_id))
+            else:
+                conn.execute("UPDATE jobs SET heartbeat_at = ?, progress = ? WHERE id = ?",
+                             (now, progress, self.job_id))
+            conn.execute("UPDATE workers SET heartbeat_at = ? WHERE name = ?", (now, self.worker))
+            row = conn.execute("SELECT cancel_requested FROM jobs WHERE id = ?", (self.job_id,)).fetchone()
+        return bool(row and row["cancel_requested"])
+
+    def run(self):
+        while not self.stop_event.wait(JOB_HEARTBEAT_SECONDS):
+            try:
+                cancel = self.flush()
+            except sqlite3.Error as e:
+                logger.warning(f"Job {self.job_id}: heartbeat failed: {e}")
+                continue
+            if cancel and self.loop is not None and self.task is not None:
+                self.loop.call_soon_threadsafe(self.task.cancel)
+
+
+def _finish(job_id: str, state: dict, **fields) -> None:
+    fields["progress"] = _dump_progress(state)
+    fields["completed_at"] = time.time()
+    assignments = ", ".join(f"{k} = ?" for k in fields)
+    with _connect() as conn:
+        conn.execute(f"UPDATE jobs SET {assignments} WHERE id = ?", (*fields.values(), job_id))
+
+
+def _run_job(row: sqlite3.Row, worker: str) -> None:
+    from courseware_agents.base import agent_event_sink
+
+    job_id = row["id"]
+    state = new_progress_state()
+    heartbeat = _Heartbeat(job_id, worker, state)
+
+    try:
+        fn = _resolve(row["fn"])
+        args, kwargs = pickle.loads(row["payload"])
+        if row["progress_kwarg"]:
+            kwargs[row["progress_kwarg"]] = make_progress_callback(state)
+    except Exception as e:
+        _finish(job_id, state, status="failed", error=f"Cannot load job: {type(e).__name__}: {e}",
+                traceback=traceback.format_exc())
+        return
+
+    async def _main():
+        heartbeat.loop = asyncio.get_running_loop()
+        heartbeat.task = asyncio.current_task()
+        with agent_event_sink(make_event_sink(state)):
+            return await fn(*args, **kwargs)
+
+    logger.info(f"Job {job_id} ({row['key']}) started on {worker}, attempt {row['attempts'] + 1}")
+    heartbeat.start()
+    try:
+        result = asyncio.run(_main())
+    except asyncio.CancelledError:
+        heartbeat.stop_event.set()
+        _finish(job_id, state, status="cancelled", error="Cancelled")
+        logger.info(f"Job {job_id} ({row['key']}) cancelled")
+        return
+    except Exception as e:
+        heartbeat.stop_event.set()
+        _finish(job_id, state, status="failed", error=f"{type(e).__name__}: {e}",
+                traceback=traceback.format_exc())
+        logger.warning(f"Job {job_id} ({row['key']}) failed: {type(e).__name__}: {e}")
+        return
+    finally:
+        heartbeat.stop_event.set()
+
+    fields = {"status": "completed"}
+    if row["post_process"]:
+        try:
+            extra = _resolve(row["post_process"])(result)
+            if extra and isinstance(extra, dict):
+                fields["post_results"] = pickle.dumps(extra)
+        except Exception as e:
+            fields["post_error"] = str(e)
+    try:
+        fields["result"] = pickle.dumps(result)
+    except Exception as e:
+        fields = {"status": "failed", "error": f"Result cannot be stored: {type(e).__name__}: {e}"}
+    _finish(job_id, state, **fields)
+    logger.info(f"Job {job_id} ({row['key']}) {fields['status']}")
+
+
+def _worker_main(index: int, parent_pid: int) -> None:
+    """One worker process: claim and run jobs until terminated or orphaned."""
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(processName)s %(message)s")
+    worker = f"{socket.gethostname()}-{os.getpid()}-{index}"
+    now = time.time()
+    with _connect() as conn:
+        conn.execute(
+            "INSERT OR REPLACE INTO workers (name, pid, host, started_at, heartbeat_at) "
+            "VALUES (?, ?, ?, ?, ?)",
+            (worker, os.getpid(), socket.gethostname(), now, now),
+        )
+    try:
+        while os.getppid() == parent_pid:
+            row = _claim(worker)
+            if row is None:
+                time.sleep(JOB_POLL_SECONDS)
+                continue
+            _run_job(row, worker)
+    finally:
+        with _connect() as conn:
+            conn.execute("DELETE FROM workers WHERE name = ?", (worker,))
+
+
+def run_workers(workers: int = AGENT_JOB_WORKERS) -> None:
+    """Run a supervised pool of worker processes (replaces any that exit)."""
+    ctx = multiprocessing.get_context("spawn")
+    procs = {}
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))  # Run the finally below on kill
+    logger.info(f"Job worker pool: {workers} workers, queue {JOB_QUEUE_DB}")
+    try:
+        while True:
+            for i in range(workers):
+                proc = procs.get(i)
+                if proc is None or not proc.is_alive():
+                    if proc is not None:
+                        logger.warning(f"Worker {i} exited ({proc.exitcode}) — restarting")
+                    procs[i] = ctx.Process(target=_worker_main, args=(i, os.getpid()), name=f"job-worker-{i}")
+                    procs[i].start()
+            time.sleep(5)
+    except (KeyboardInterrupt, SystemExit):
+        pass
+    finally:
+        for proc in procs.values():
+            proc.terminate()
+        for proc in procs.values():
+            proc.join(timeout=10)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(processName)s %(message)s")
+    run_workers(int(sys.argv[1]) if len(sys.argv) > 1 else AGENT_JOB_WORKERS)
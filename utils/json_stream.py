@@ -0,0 +1,277 @@
+"""
+Incremental, Tolerant JSON Extraction
+
+Shared parser for JSON embedded in model/agent output. One forward pass over
+the text (regex jumps between structural characters, so string bodies are
+skipped at C speed) handles:
+
+- prose or markdown code fences around the JSON value
+- raw control characters inside strings (escaped as they are copied)
+- trailing commas and bare (unquoted) object keys
+- truncated output: the incomplete trailing element of the innermost open
+  array is dropped and open containers are closed (partial=True)
+
+Text can be fed in chunks as an agent stream arrives; `items` counts
+completed top-level list elements so far for progress reporting.
+
+Usage:
+    from utils.json_stream import extract_json, JSONStreamParser
+
+    data = extract_json(text)                        # first JSON object/array, or None
+    slides = extract_json(text, opener="[", partial=True)
+
+    parser = JSONStreamParser(opener="{")
+    for chunk in stream:
+        parser.feed(chunk)
+    data = parser.result(partial=True)
+"""
+
+import json
+import re
+from typing import Any, Optional
+
+_SCAN = {
+    None: re.compile(r"```|[{\[]"),
+    "{": re.compile(r"```|\{"),
+    "[": re.compile(r"```|\["),
+}
+_OPENERS = {None: re.compile(r"[{\[]"), "{": re.compile(r"\{"), "[": re.compile(r"\[")}
+_DECODER = json.JSONDecoder()
+_STRING_SPECIAL = re.compile(r'["\\\x00-\x1f]')
+_STRUCTURAL = re.compile(r'[\[\]{}",]')
+_NON_SPACE = re.compile(r"\S")
+_BARE_KEY = re.compile(r"[A-Za-z_$][\w$-]*")
+_CONTROL_ESCAPES = {"\n": "\\n", "\r": "\\r", "\t": "\\t", "\b": "\\b", "\f": "\\f"}
+
+_SCANNING, _IN_VALUE, _DONE = 0, 1, 2
+
+
+class JSONStreamParser:
+    """Single-pass extractor for the first JSON object/array in streamed text.
+
+    Args:
+        opener: "{" to accept only objects, "[" only arrays, None for either.
+    """
+
+    def __init__(self, opener: Optional[str] = None):
+        if opener not in _SCAN:
+            raise ValueError(f"opener must be '{{', '[' or None, got {opener!r}")
+        self._scan = _SCAN[opener]
+        self._text = ""
+        self._pos = 0
+        self._mode = _SCANNING
+        self._value: Any = None
+        self._reset_value()
+
+    def _reset_value(self):
+        self._out: list = []          # Repaired value text, in pieces
+        self._stack: list = []        # Expected closers
+        self._checkpoints: list = []  # Per depth: (piece count, closers) at the last element boundary
+        self._in_string = False
+        self._expect_key = False
+        self._after_close = False     # Last token closed a nested container
+        self.items = 0                # Completed elements of the top-level list(s)
+
+    @property
+    def done(self) -> bool:
+        """True once a complete JSON value has been parsed."""
+        return self._mode == _DONE
+
+    def feed(self, chunk: str) -> bool:
+        """Consume more text. Returns True once a complete value is available."""
+        if self._mode != _DONE and chunk:
+            self._text += chunk
+            self._advance(final=False)
+        return self._mode == _DONE
+
+    def result(self, partial: bool = False) -> Any:
+        """Return the parsed value, or None.
+
+        With partial=True, an unfinished value is recovered: open strings and
+        incomplete trailing elements are dropped and open containers closed.
+        """
+        if self._mode != _DONE:
+            self._advance(final=True)
+        if self._mode == _DONE:
+            return self._value
+        if partial and self._mode == _IN_VALUE:
+            return self._recover()
+        return None
+
+    # ------------------------------------------------------------------
+
+    def _advance(self, final: bool):
+        text, n = self._text, len(self._text)
+        while self._pos < n and self._mode != _DONE:
+            if self._mode == _SCANNING:
+                m = self._scan.search(text, self._pos)
+                if m is None:
+                    # Keep a possible partial fence ("`", "``") for the next chunk
+                    self._pos = n if final else max(self._pos, n - 2)
+                    return
+                if m.group() == "```":
+                    self._pos = m.end()
+                    continue
+                self._start_value(m.start(), m.group())
+            elif not self._step(text, n, final):
+                return
+
+    def _start_value(self, index: int, opener: str):
+        self._reset_value()
+        self._mode = _IN_VALUE
+        self._start = index
+        self._open(opener)
+        self._out.append(opener)
+        self._pos = index + 1
+
+    def _open(self, opener: str):
+        self._stack.append("}" if opener == "{" else "]")
+        self._expect_key = opener == "{"
+        self._checkpoints.append((len(self._out) + 1, "".join(reversed(self._stack))))
+
+    def _restart(self):
+        """Current candidate is not valid JSON — resume scanning after its opener."""
+        self._pos = self._start + 1
+        self._mode = _SCANNING
+
+    def _step(self, text: str, n: int, final: bool) -> bool:
+        """Advance inside a value by one token. Returns False when more input is needed."""
+        pos, out = self._pos, self._out
+
+        if self._in_string:
+            m = _STRING_SPECIAL.search(text, pos)
+            if m is None:
+                out.append(text[pos:])
+                self._pos = n
+                return False
+            i, ch = m.start(), m.group()
+            if ch == '"':
+                out.append(text[pos:i + 1])
+                self._in_string = False
+                self._pos = i + 1
+            elif ch == "\\":
+                if i + 1 >= n:
+                    out.append(text[pos:i])
+                    self._pos = i
+                    return False
+                out.append(text[pos:i + 2])
+                self._pos = i + 2
+            else:
+                out.append(text[pos:i])
+                out.append(_CONTROL_ESCAPES.get(ch, f"\\u{ord(ch):04x}"))
+                self._pos = i + 1
+            return True
+
+        if self._expect_key:
+            m = _NON_SPACE.search(text, pos)
+            if m is None:
+                return False
+            self._expect_key = False
+            key = _BARE_KEY.match(text, m.start())
+            if key is not None:
+                if key.end() >= n and not final:
+                    self._expect_key = True  # Key may continue in the next chunk
+                    return False
+                out.append(f'{text[pos:m.start()]}"{key.group()}"')
+                self._pos = key.end()
+                return True
+
+        m = _STRUCTURAL.search(text, pos)
+        if m is None:
+            out.append(text[pos:])
+            self._pos = n
+            return False
+        i, ch = m.start(), m.group()
+        segment = text[pos:i]
+
+        if ch == '"':
+            out.append(text[pos:i + 1])
+            self._in_string = True
+        elif ch in "{[":
+            out.append(segment)
+            self._open(ch)
+            out.append(ch)
+        elif ch == ",":
+            out.append(segment)
+            self._element_done(len(out), count=not self._after_close)
+            out.append(",")
+            self._after_close = False
+            self._expect_key = self._stack[-1] == "}"
+        else:
+            if ch != self._stack[-1]:
+                self._restart()
+                return True
+            if not segment.strip() and out and out[-1] == ",":
+                out.pop()  # Trailing comma
+            out.append(segment + ch)
+            self._stack.pop()
+            self._checkpoints.pop()
+            if not self._stack:
+                self._finish_value()
+                return True
+            self._element_done(len(out), count=True)
+            self._after_close = True
+        self._pos = i + 1
+        return True
+
+    def _element_done(self, pieces: int, count: bool):
+        self._checkpoints[-1] = (pieces, self._checkpoints[-1][1])
+        if count and self._stack[-1] == "]" and len(self._stack) <= 2:
+            self.items += 1
+
+    def _finish_value(self):
+        try:
+            self._value = json.loads("".join(self._out))
+        except json.JSONDecodeError:
+            self._restart()
+            return
+        self._mode = _DONE
+        self._pos = len(self._text)
+
+    def _recover(self) -> Any:
+        """Close the unfinished value at the innermost open array's last complete element."""
+        depth = len(self._stack) - 1
+        for d in range(len(self._stack) - 1, -1, -1):
+            if self._stack[d] == "]":
+                depth = d
+                break
+        pieces, closers = self._checkpoints[depth]
+        candidate = "".join(self._out[:pieces])
+        if candidate.rstrip().endswith(","):
+            candidate = candidate.rstrip()[:-1]
+        try:
+            return json.loads(candidate + closers)
+        except json.JSONDecodeError:
+            return None
+
+
+def extract_json(text: str, opener: Optional[str] = None, partial: bool = False) -> Any:
+    """Extract the first JSON object/array from model output, or None.
+
+    Well-formed values are decoded directly by the C decoder from their first
+    bracket; only malformed or truncated output goes through JSONStreamParser.
+
+    Args:
+        text: Raw output (may include prose, code fences, control characters).
+        opener: "{" for objects only, "[" for arrays only, None for either.
+        partial: Recover a truncated value instead of returning None.
+    """
+    if not text:
+        return None
+    # Prose before a code fence may contain stray brackets — try the fenced part first
+    fence = text.find("```")
+    starts = [fence, 0] if fence > 0 else [0]
+    for start in starts:
+        m = _OPENERS[opener].search(text, start)
+        if m is None:
+            continue
+        try:
+            return _DECODER.raw_decode(text, m.start())[0]
+        except json.JSONDecodeError:
+            pass
+        parser = JSONStreamParser(opener)
+        parser.feed(text[start:] if start else text)
+        value = parser.result(partial=partial)
+        if value is not None:
+            return value
+    return None